@@ -3,10 +3,93 @@ Google Gemini AI Client
 Wrapper for Google Generative AI SDK
 """
 
+import asyncio
+import time
 import google.generativeai as genai
-from typing import Optional
+from google.api_core import exceptions as google_exceptions
+from typing import Dict, Optional, Tuple
+from app.core import metrics, timing
 from app.core.config import settings
 
+# generate_interpretation() returns errors as text starting with this
+AI_ERROR_PREFIX = "❌ AI Error"
+
+DEFAULT_MODEL = "gemini-2.0-flash-exp"
+
+# Errors that mean the provider is unreachable, failing or refusing load (transport, timeouts, 429, 5xx).
+# Anything else (a safety block, a bad request) got an answer and does not trip the breaker.
+OUTAGE_ERRORS = (
+    google_exceptions.ServerError,          # 5xx: InternalServerError, ServiceUnavailable, DeadlineExceeded, ...
+    google_exceptions.TooManyRequests,      # 429, quota exhausted (ResourceExhausted)
+    google_exceptions.ResourceExhausted,
+    google_exceptions.RetryError,
+    ConnectionError,
+    TimeoutError,
+    asyncio.TimeoutError,
+    OSError,
+)
+
+
+def ai_available() -> bool:
+    """Whether an AI backend is configured."""
+    return bool(settings.GEMINI_API_KEY)
+
+
+class CircuitBreaker:
+    """
+    Fail fast while the provider keeps failing.
+    
+    closed: calls go through. After `failures` consecutive errors it opens
+    and rejects calls for `cooldown` seconds, then half-opens: one trial
+    call goes through, and its outcome closes or re-opens the circuit.
+    """
+    
+    def __init__(self, failures: int = 5, cooldown: float = 30.0):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trial_at = 0.0
+        self.trips = 0
+        self.rejected = 0
+    
+    def allow(self) -> bool:
+        now = time.monotonic()
+        if self.state == "closed":
+            return True
+        if self.state == "open" and now - self.opened_at >= self.cooldown:
+            self.state = "half_open"
+        # One trial at a time (another one if the last never reported back)
+        if self.state == "half_open" and now - self.trial_at >= self.cooldown:
+            self.trial_at = now
+            return True
+        self.rejected += 1
+        return False
+    
+    def success(self):
+        self.state = "closed"
+        self.consecutive_failures = 0
+    
+    def failure(self):
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failures:
+            if self.state != "open":
+                self.trips += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+    
+    def status(self) -> Dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+
+breaker = CircuitBreaker(settings.AI_BREAKER_FAILURES, settings.AI_BREAKER_COOLDOWN_SECONDS)
+
 
 # Configure the API
 def get_gemini_client():
@@ -18,7 +101,7 @@ def get_gemini_client():
     return genai
 
 
-def get_model(model_name: str = "gemini-2.0-flash-exp"):
+def get_model(model_name: str = DEFAULT_MODEL):
     """Get a Gemini model instance."""
     client = get_gemini_client()
     return client.GenerativeModel(model_name)
@@ -27,7 +110,7 @@ def get_model(model_name: str = "gemini-2.0-flash-exp"):
 async def generate_interpretation(
     prompt: str,
     system_instruction: Optional[str] = None,
-    model_name: str = "gemini-2.0-flash-exp",
+    model_name: str = DEFAULT_MODEL,
     temperature: float = 0.9,
     max_tokens: int = 512
 ) -> str:
@@ -44,27 +127,75 @@ async def generate_interpretation(
     Returns:
         Generated text response
     """
+    if not ai_available():
+        return f"{AI_ERROR_PREFIX}: GEMINI_API_KEY not configured. Add it to your .env file."
+    if not breaker.allow():
+        metrics.AI_REQUESTS.inc((model_name, "rejected"))
+        return f"{AI_ERROR_PREFIX}: AI temporarily unavailable, try again shortly"
+    
+    started = time.perf_counter()
+    metrics.AI_IN_FLIGHT.inc()
     try:
-        client = get_gemini_client()
-        
-        # Create model with system instruction
-        model = client.GenerativeModel(
-            model_name=model_name,
-            system_instruction=system_instruction,
-            generation_config={
-                "temperature": temperature,
-                "max_output_tokens": max_tokens,
-            }
+        # The SDK call blocks; keep it off the event loop
+        submitted_ns = time.perf_counter_ns()
+        # A hung call is abandoned (its thread finishes on its own) and counted as a failure
+        text, prompt_tokens, completion_tokens = await asyncio.wait_for(
+            asyncio.to_thread(
+                _generate_content, prompt, system_instruction, model_name, temperature, max_tokens, submitted_ns
+            ),
+            settings.AI_TIMEOUT_SECONDS
         )
-        
-        # Generate response
-        response = model.generate_content(prompt)
-        
-        return response.text
+        metrics.observe_ai_call(model_name, "ok", time.perf_counter() - started, prompt_tokens, completion_tokens)
+        breaker.success()
+        return text
         
     except Exception as e:
+        metrics.observe_ai_call(model_name, "error", time.perf_counter() - started)
+        if isinstance(e, OUTAGE_ERRORS):
+            breaker.failure()
+        else:
+            # The provider answered (e.g. blocked the prompt): it is up
+            breaker.success()
         # Return error message for debugging
-        return f"❌ AI Error: {str(e)}"
+        return f"{AI_ERROR_PREFIX}: {str(e) or type(e).__name__}"
+    finally:
+        metrics.AI_IN_FLIGHT.inc((), -1.0)
+
+
+def _generate_content(
+    prompt: str,
+    system_instruction: Optional[str],
+    model_name: str,
+    temperature: float,
+    max_tokens: int,
+    submitted_ns: int = 0
+) -> Tuple[str, int, int]:
+    """(text, prompt tokens, completion tokens) of one SDK call."""
+    # Runs in a thread with the request's context: the wait for a free thread is "ai_queue"
+    if submitted_ns:
+        timing.record("ai_queue", time.perf_counter_ns() - submitted_ns)
+    client = get_gemini_client()
+    
+    # Create model with system instruction
+    model = client.GenerativeModel(
+        model_name=model_name,
+        system_instruction=system_instruction,
+        generation_config={
+            "temperature": temperature,
+            "max_output_tokens": max_tokens,
+        }
+    )
+    
+    # Generate response
+    with timing.span("gemini"):
+        response = model.generate_content(prompt)
+    
+    usage = getattr(response, "usage_metadata", None)
+    return (
+        response.text,
+        getattr(usage, "prompt_token_count", 0) or 0,
+        getattr(usage, "candidates_token_count", 0) or 0
+    )
 
 
 async def generate_tarot_reading(
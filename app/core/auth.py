@@ -0,0 +1,137 @@
+"""
+User Authentication
+The signed-in user of a request, from its Supabase access token
+
+Supabase Auth signs access tokens (JWT, HS256) with the project's JWT
+secret; the user id is the token's "sub" claim. Tokens are checked with
+the standard library (signature, algorithm, expiry, audience), so no JWT
+package is needed. Without SUPABASE_JWT_SECRET no request has a user:
+nothing is recorded and per-user endpoints answer 503.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import Dict, Optional
+
+from fastapi import Header, HTTPException
+
+from app.core.config import settings
+
+# Seconds of clock skew tolerated on "exp" and "nbf"
+CLOCK_LEEWAY_SECONDS = 30
+
+# Longest accepted user id ("sub"); Supabase uses UUIDs
+MAX_USER_ID_LENGTH = 128
+
+
+class AuthError(ValueError):
+    """Missing, malformed, expired or wrongly signed token."""
+
+
+def auth_configured() -> bool:
+    return bool(settings.SUPABASE_JWT_SECRET)
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def verify_token(token: str, secret: str, audience: Optional[str] = None, now: Optional[float] = None) -> Dict:
+    """
+    Claims of an HS256 JWT after checking its signature and time window.
+
+    Args:
+        token: The compact JWT (header.payload.signature)
+        secret: HMAC secret it was signed with
+        audience: Required "aud" claim (None = not checked)
+        now: Current Unix time (tests)
+
+    Returns:
+        The payload claims
+
+    Raises:
+        AuthError: When the token is not valid
+    """
+    try:
+        header_b64, payload_b64, signature_b64 = token.split(".")
+        header = json.loads(_b64decode(header_b64))
+        payload = json.loads(_b64decode(payload_b64))
+        signature = _b64decode(signature_b64)
+    except (ValueError, TypeError):
+        raise AuthError("Malformed token")
+    if not isinstance(header, dict) or not isinstance(payload, dict):
+        raise AuthError("Malformed token")
+
+    # Only HS256: never let the token choose "none" or another algorithm
+    if header.get("alg") != "HS256":
+        raise AuthError("Unsupported token algorithm")
+    expected = hmac.new(secret.encode(), f"{header_b64}.{payload_b64}".encode("ascii"), hashlib.sha256).digest()
+    if not hmac.compare_digest(signature, expected):
+        raise AuthError("Invalid token signature")
+
+    now = time.time() if now is None else now
+    exp = payload.get("exp")
+    if not isinstance(exp, (int, float)) or exp + CLOCK_LEEWAY_SECONDS < now:
+        raise AuthError("Token expired")
+    nbf = payload.get("nbf")
+    if isinstance(nbf, (int, float)) and nbf - CLOCK_LEEWAY_SECONDS > now:
+        raise AuthError("Token not yet valid")
+    if audience is not None:
+        aud = payload.get("aud")
+        if aud != audience and not (isinstance(aud, list) and audience in aud):
+            raise AuthError("Invalid token audience")
+    return payload
+
+
+def user_from_authorization(authorization: Optional[str]) -> Optional[str]:
+    """
+    User id of an "Authorization: Bearer <token>" header (None without one).
+
+    Raises:
+        AuthError: When a token is sent but is not valid
+    """
+    if not authorization or not auth_configured():
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        raise AuthError("Expected a Bearer token")
+    claims = verify_token(token.strip(), settings.SUPABASE_JWT_SECRET, settings.SUPABASE_JWT_AUDIENCE or None)
+    user_id = claims.get("sub")
+    if not isinstance(user_id, str) or not user_id or len(user_id) > MAX_USER_ID_LENGTH:
+        raise AuthError("Token has no user")
+    return user_id
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(status_code=401, detail=detail, headers={"WWW-Authenticate": "Bearer"})
+
+
+# ============================================================================
+# DEPENDENCIES
+# ============================================================================
+
+async def optional_user(
+    authorization: Optional[str] = Header(None, description="Bearer access token; signed-in readings are saved to history")
+) -> Optional[str]:
+    """Signed-in user, or None for anonymous requests; 401 for an invalid token."""
+    try:
+        return user_from_authorization(authorization)
+    except AuthError as e:
+        raise _unauthorized(str(e))
+
+
+async def current_user(
+    authorization: Optional[str] = Header(None, description="Bearer access token")
+) -> str:
+    """Signed-in user; 401 without a valid token, 503 while authentication is not configured."""
+    if not auth_configured():
+        raise HTTPException(status_code=503, detail="User accounts are not configured on this server")
+    if not authorization:
+        raise _unauthorized("Sign in required")
+    try:
+        return user_from_authorization(authorization)
+    except AuthError as e:
+        raise _unauthorized(str(e))
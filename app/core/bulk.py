@@ -0,0 +1,128 @@
+"""
+Bulk Upload Parsing
+Incremental NDJSON / CSV record readers over a streamed request body
+
+Records are yielded as soon as their line is complete, so an upload is
+never held in memory as a whole.
+"""
+
+import csv
+import json
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+# Longest accepted line; longer lines are reported as errors and skipped
+MAX_LINE_BYTES = 8192
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+
+
+def detect_format(content_type: Optional[str]) -> str:
+    """Upload format from a Content-Type header (NDJSON unless it says CSV)."""
+    if content_type and "csv" in content_type.lower():
+        return FORMAT_CSV
+    return FORMAT_NDJSON
+
+
+def _decode(raw: bytes) -> Optional[str]:
+    try:
+        return raw.rstrip(b"\r").decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int = MAX_LINE_BYTES) -> AsyncIterator[Tuple[int, Optional[str]]]:
+    """
+    Split a byte stream into decoded lines.
+
+    Returns:
+        (line number, text) pairs; text is None for a line that was too
+        long or not valid UTF-8
+    """
+    tail = b""
+    line_no = 0
+    overflow = False    # currently inside an oversized line
+
+    async for chunk in chunks:
+        lines = (tail + chunk).split(b"\n")
+        tail = lines.pop()
+        for raw in lines:
+            line_no += 1
+            if overflow or len(raw) > max_line_bytes:
+                overflow = False
+                yield line_no, None
+            else:
+                yield line_no, _decode(raw)
+        if len(tail) > max_line_bytes:
+            # Drop the oversized line but keep counting it
+            tail = b""
+            overflow = True
+
+    if tail or overflow:
+        yield line_no + 1, None if overflow else _decode(tail)
+
+
+async def iter_records(chunks: AsyncIterator[bytes], fmt: str = FORMAT_NDJSON) -> AsyncIterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """
+    Parse an NDJSON or CSV upload record by record.
+
+    CSV uploads must start with a header row naming the fields.
+
+    Returns:
+        (line number, record, error) triples; exactly one of record and
+        error is set. Blank lines are skipped.
+    """
+    header = None
+    async for line_no, text in iter_lines(chunks):
+        if text is None:
+            yield line_no, None, f"Line too long (max {MAX_LINE_BYTES} bytes) or not UTF-8"
+            continue
+        if not text.strip():
+            continue
+
+        if fmt == FORMAT_CSV:
+            try:
+                values = next(csv.reader([text]))
+            except csv.Error as e:
+                yield line_no, None, f"Invalid CSV: {e}"
+                continue
+            if header is None:
+                header = [h.strip() for h in values]
+                continue
+            if len(values) != len(header):
+                yield line_no, None, f"Expected {len(header)} columns, got {len(values)}"
+                continue
+            yield line_no, {k: v.strip() for k, v in zip(header, values) if v.strip() != ""}, None
+        else:
+            try:
+                record = json.loads(text)
+            except json.JSONDecodeError as e:
+                yield line_no, None, f"Invalid JSON: {e.msg}"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, None, "Each line must be a JSON object"
+                continue
+            yield line_no, record, None
+
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body generator reads the request body itself.
+    
+    The stock response listens for client disconnects on receive() while
+    streaming (before ASGI 2.4), which would steal the upload's body
+    messages. Here the generator is the only reader; a disconnect surfaces
+    as ClientDisconnect from request.stream() or an OSError on send.
+    """
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
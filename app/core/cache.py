@@ -0,0 +1,517 @@
+"""
+Two-Tier Cache
+In-process L1 in front of a shared L2 (Redis, SQLite or in-memory)
+
+- L1: bounded LRU per process with per-entry TTL. A loader returning
+  None is cached as a negative entry with a short TTL.
+- L2: pluggable shared backend storing JSON bytes. Redis is spoken
+  directly over RESP (no client library); without REDIS_URL the default
+  is SQLite, shared by the workers of one host. The in-memory backend is
+  a bounded LRU for development and tests. L2 errors are counted and
+  treated as misses, never raised.
+- Stampede protection: concurrent misses for one key share one load.
+- Keys carry CACHE_VERSION (derived per build unless set), so every
+  deploy starts from an empty keyspace without flushing anything.
+  Namespaces of computed data also carry the generator id of the table
+  they come from (e.g. the ephemeris).
+- Hits, misses and loads are counted per namespace.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from app.core.ai_client import AI_ERROR_PREFIX
+from app.core.config import settings
+from app.engines.astrology import EPHEMERIS_GENERATOR_ID, CompactChart
+
+# Seconds an L2 operation may take before it counts as an error
+L2_TIMEOUT_SECONDS = 0.25
+
+# Expired SQLite and memory entries are swept after this many writes
+SQLITE_SWEEP_EVERY = 1000
+MEMORY_SWEEP_EVERY = 1000
+
+
+# ============================================================================
+# L1
+# ============================================================================
+
+class L1Cache:
+    """Bounded LRU with a per-entry expiry (monotonic seconds, None = no expiry)."""
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """(found, value); expired entries are dropped."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires, value = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def put(self, key: str, value: Any, ttl: Optional[float]):
+        expires = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def sweep(self) -> int:
+        """Drop every expired entry; returns how many."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (expires, _) in self._entries.items() if expires is not None and expires <= now]
+            for key in expired:
+                del self._entries[key]
+        return len(expired)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# ============================================================================
+# L2 BACKENDS
+# ============================================================================
+
+class CacheBackend:
+    """Shared L2: bytes by key with a TTL in seconds (None = no expiry)."""
+
+    name = "none"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float]):
+        pass
+
+    async def delete(self, key: str):
+        pass
+
+    async def ping(self) -> bool:
+        return True
+
+    async def close(self):
+        pass
+
+
+class MemoryBackend(CacheBackend):
+    """Process-local stand-in for a shared backend (development, tests), bounded like L1."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 10000):
+        self._entries = L1Cache(max_entries)
+        self._writes = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        found, value = self._entries.get(key)
+        return value if found else None
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float]):
+        self._entries.put(key, value, ttl)
+        self._writes += 1
+        if self._writes % MEMORY_SWEEP_EVERY == 0:
+            self._entries.sweep()
+
+    async def delete(self, key: str):
+        self._entries.delete(key)
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Single-file backend shared by every worker process on one host.
+
+    Queries run in a thread; WAL mode lets readers proceed during writes.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """Opened on first use (call with the lock held)."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)")
+            self._conn = conn
+        return self._conn
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._connection().execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return row[0]
+
+    def _set(self, key: str, value: bytes, ttl: Optional[float]):
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                (key, value, None if ttl is None else now + ttl)
+            )
+            self._writes += 1
+            if self._writes % SQLITE_SWEEP_EVERY == 0:
+                conn.execute("DELETE FROM cache WHERE expires IS NOT NULL AND expires <= ?", (now,))
+
+    def _delete(self, key: str):
+        with self._lock:
+            self._connection().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float]):
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(self._delete, key)
+
+    async def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class RedisError(Exception):
+    """Error reply from the Redis server."""
+
+
+class RedisBackend(CacheBackend):
+    """
+    Minimal Redis client over RESP: GET, SET PX, DEL, PING (+ AUTH/SELECT).
+
+    One connection, commands serialized by a lock; reconnects on the next
+    command after any failure. URL: redis://[:password@]host[:port][/db]
+    (rediss:// is accepted for TLS).
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.ssl = parsed.scheme == "rediss"
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _encode(*args) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    async def _read_reply(self):
+        line = await self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by Redis")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload
+        if kind == b"-":
+            raise RedisError(payload.decode(errors="replace"))
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            size = int(payload)
+            if size < 0:
+                return None
+            data = await self._reader.readexactly(size + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(payload)
+            return None if count < 0 else [await self._read_reply() for _ in range(count)]
+        raise ConnectionError(f"Unexpected Redis reply {line[:20]!r}")
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl or None)
+        if self.password:
+            auth = ("AUTH", self.username, self.password) if self.username else ("AUTH", self.password)
+            self._writer.write(self._encode(*auth))
+            await self._read_reply()
+        if self.db:
+            self._writer.write(self._encode("SELECT", self.db))
+            await self._read_reply()
+
+    def _disconnect(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def command(self, *args):
+        async with self._lock:
+            try:
+                if self._writer is None:
+                    await self._connect()
+                self._writer.write(self._encode(*args))
+                await self._writer.drain()
+                return await self._read_reply()
+            except RedisError:
+                raise
+            except BaseException:
+                # Reply stream state unknown (including cancellation by a timeout)
+                self._disconnect()
+                raise
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.command("GET", key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float]):
+        if ttl is None:
+            await self.command("SET", key, value)
+        else:
+            await self.command("SET", key, value, "PX", max(1, int(ttl * 1000)))
+
+    async def delete(self, key: str):
+        await self.command("DEL", key)
+
+    async def ping(self) -> bool:
+        return await self.command("PING") == b"PONG"
+
+    async def close(self):
+        async with self._lock:
+            self._disconnect()
+
+
+def create_backend() -> CacheBackend:
+    """L2 backend from settings: Redis when REDIS_URL is set, else SQLite, unless CACHE_BACKEND says otherwise."""
+    backend = settings.CACHE_BACKEND.lower()
+    if backend == "redis" or (backend == "auto" and settings.REDIS_URL):
+        return RedisBackend(settings.REDIS_URL)
+    if backend in ("sqlite", "auto"):
+        return SQLiteBackend(settings.CACHE_SQLITE_PATH)
+    if backend == "memory":
+        return MemoryBackend(settings.CACHE_MEMORY_MAX_ENTRIES)
+    return CacheBackend()
+
+
+# ============================================================================
+# TWO-TIER CACHE
+# ============================================================================
+
+class Namespace(NamedTuple):
+    """Per-namespace policy."""
+    ttl: Optional[float]                 # seconds, None = until the version changes
+    negative_ttl: float = 60.0           # for loaders returning None
+    l1: bool = True
+    l2: bool = True
+    decode: Optional[Callable[[Any], Any]] = None      # JSON value -> object (L2 reads)
+    cacheable: Optional[Callable[[Any], bool]] = None  # skip storing e.g. error texts
+    generator: str = ""                  # id of the data the values derive from, part of the key
+
+
+class NamespaceStats:
+    __slots__ = ("l1_hits", "l2_hits", "negative_hits", "misses", "coalesced", "load_errors", "l2_errors")
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+    def as_dict(self) -> Dict:
+        stats = {name: getattr(self, name) for name in self.__slots__}
+        lookups = self.l1_hits + self.l2_hits + self.misses + self.coalesced
+        hits = lookups - self.misses
+        stats["hit_ratio"] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
+
+
+class TwoTierCache:
+    """
+    get_or_load() through L1, then L2, then the loader (once per key at a time).
+
+    Values must be JSON-serializable to reach L2; tuples come back as
+    lists unless the namespace has a decode function.
+    """
+
+    def __init__(self, backend: CacheBackend, l1_size: int = 10000, version: str = "1", prefix: str = "oracle"):
+        self.backend = backend
+        self.l1 = L1Cache(l1_size)
+        self.version = version
+        self.prefix = prefix
+        self.namespaces: Dict[str, Namespace] = {}
+        self._stats: Dict[str, NamespaceStats] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def register(self, name: str, policy: Namespace):
+        self.namespaces[name] = policy
+        self._stats[name] = NamespaceStats()
+
+    def key(self, namespace: str, parts: Hashable) -> str:
+        """Versioned key; the parts are hashed so any JSON-able tuple works."""
+        digest = hashlib.blake2b(
+            json.dumps(parts, separators=(",", ":"), ensure_ascii=False, default=str).encode(), digest_size=16
+        ).hexdigest()
+        generator = self.namespaces[namespace].generator
+        if generator:
+            return f"{self.prefix}:{self.version}:{namespace}:{generator}:{digest}"
+        return f"{self.prefix}:{self.version}:{namespace}:{digest}"
+
+    async def get_or_load(self, namespace: str, parts: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Cached value of (namespace, parts), loading it on a miss.
+
+        Args:
+            namespace: A registered namespace
+            parts: Key parts (JSON-serializable)
+            loader: Coroutine function producing the value; None is cached
+                as a negative entry, exceptions are not cached
+
+        Returns:
+            The value (None for a negative entry)
+        """
+        policy = self.namespaces[namespace]
+        stats = self._stats[namespace]
+        key = self.key(namespace, parts)
+
+        if policy.l1:
+            found, value = self.l1.get(key)
+            if found:
+                stats.l1_hits += 1
+                stats.negative_hits += value is None
+                return value
+
+        flight = self._inflight.get(key)
+        if flight is not None:
+            stats.coalesced += 1
+            return await asyncio.shield(flight)
+
+        flight = asyncio.get_running_loop().create_future()
+        self._inflight[key] = flight
+        try:
+            value = await self._load(key, policy, stats, loader)
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as e:
+            flight.set_exception(e)
+            flight.exception()          # waiters still get it; no "never retrieved" warning
+            raise
+        else:
+            flight.set_result(value)
+            return value
+        finally:
+            del self._inflight[key]
+
+    async def _load(self, key: str, policy: Namespace, stats: NamespaceStats, loader) -> Any:
+        if policy.l2:
+            raw = await self._l2("get", stats, key)
+            if raw is not None:
+                value = json.loads(raw)
+                if value is not None and policy.decode is not None:
+                    value = policy.decode(value)
+                stats.l2_hits += 1
+                stats.negative_hits += value is None
+                if policy.l1:
+                    self.l1.put(key, value, policy.ttl if value is not None else policy.negative_ttl)
+                return value
+
+        stats.misses += 1
+        try:
+            value = await loader()
+        except Exception:
+            stats.load_errors += 1
+            raise
+        if value is not None and policy.cacheable is not None and not policy.cacheable(value):
+            return value
+
+        ttl = policy.ttl if value is not None else policy.negative_ttl
+        if policy.l1:
+            self.l1.put(key, value, ttl)
+        if policy.l2:
+            encoded = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+            await self._l2("set", stats, key, encoded, ttl)
+        return value
+
+    async def _l2(self, operation: str, stats: NamespaceStats, *args):
+        """Backend call with a timeout; failures count as errors and return None."""
+        try:
+            return await asyncio.wait_for(getattr(self.backend, operation)(*args), L2_TIMEOUT_SECONDS)
+        except Exception:
+            stats.l2_errors += 1
+            return None
+
+    def warm(self, namespace: str, parts: Hashable, value: Any):
+        """Put a known value into L1 (startup warmup)."""
+        self.l1.put(self.key(namespace, parts), value, self.namespaces[namespace].ttl)
+
+    async def invalidate(self, namespace: str, parts: Hashable):
+        key = self.key(namespace, parts)
+        self.l1.delete(key)
+        if self.namespaces[namespace].l2:
+            await self._l2("delete", self._stats[namespace], key)
+
+    async def ping(self) -> bool:
+        """Whether L2 answers (always True without a shared backend)."""
+        try:
+            return await asyncio.wait_for(self.backend.ping(), L2_TIMEOUT_SECONDS)
+        except Exception:
+            return False
+
+    async def close(self):
+        await self.backend.close()
+
+    def stats(self) -> Dict:
+        """Backend, L1 size and per-namespace counters, for health/metrics endpoints."""
+        return {
+            "backend": self.backend.name,
+            "version": self.version,
+            "l1_size": len(self.l1),
+            "l1_maxsize": self.l1.maxsize,
+            "namespaces": {name: stats.as_dict() for name, stats in self._stats.items()},
+        }
+
+
+cache = TwoTierCache(create_backend(), settings.CACHE_L1_SIZE, settings.CACHE_VERSION)
+
+# Namespaces used by the routers (static reference data stays in L1 only)
+cache.register("ai", Namespace(ttl=settings.AI_CACHE_TTL, cacheable=lambda text: not text.startswith(AI_ERROR_PREFIX)))
+# natal_chart_cache already is the chart L1
+cache.register("chart", Namespace(
+    ttl=settings.CHART_CACHE_TTL, l1=False, generator=EPHEMERIS_GENERATOR_ID,
+    decode=lambda v: CompactChart(*map(tuple, v[:2]), v[2], tuple(v[3]))
+))
+cache.register("transits", Namespace(ttl=settings.CHART_CACHE_TTL, generator=EPHEMERIS_GENERATOR_ID))
+cache.register("geo", Namespace(ttl=None, negative_ttl=300.0, l2=False))
+cache.register("static", Namespace(ttl=None, l2=False))
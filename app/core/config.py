@@ -3,11 +3,38 @@ Oracle Engine Configuration
 Environment variable management
 """
 
+import hashlib
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Commit of the deployed build, as set by common hosting platforms
+BUILD_COMMIT_VARS = ("GIT_COMMIT", "SOURCE_VERSION", "RENDER_GIT_COMMIT", "RAILWAY_GIT_COMMIT_SHA")
+
+
+def build_id() -> str:
+    """
+    Short id of this build: the deployed commit, else a hash of the app sources.
+    
+    Every worker of one build computes the same id; any code change gives a new one.
+    """
+    for name in BUILD_COMMIT_VARS:
+        if os.getenv(name):
+            return os.getenv(name)[:12]
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(APP_DIR):
+        dirs[:] = sorted(d for d in dirs if d not in ("data", "__pycache__"))
+        for name in sorted(files):
+            if name.endswith(".py"):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, APP_DIR).encode())
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+    return digest.hexdigest()[:12]
+
 
 class Settings:
     """Application settings from environment variables"""
@@ -24,12 +51,84 @@ class Settings:
     # Google Gemini AI
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
     
+    # Precomputed data files (ephemeris table etc.)
+    DATA_DIR: str = os.getenv("DATA_DIR", os.path.join(APP_DIR, "data"))
+    EPHEMERIS_PATH: str = os.getenv("EPHEMERIS_PATH", os.path.join(DATA_DIR, "ephemeris.bin"))
+    STATIONS_PATH: str = os.getenv("STATIONS_PATH", os.path.join(DATA_DIR, "stations.bin"))
+    CITIES_PATH: str = os.getenv("CITIES_PATH", os.path.join(APP_DIR, "data", "cities.csv"))
+    GEO_INDEX_PATH: str = os.getenv("GEO_INDEX_PATH", os.path.join(DATA_DIR, "geo_index.bin"))
+    LUNAR_PATH: str = os.getenv("LUNAR_PATH", os.path.join(DATA_DIR, "lunar.bin"))
+    
+    # CPU-bound work: "process" (worker pool) or "inline" (event loop thread)
+    COMPUTE_MODE: str = os.getenv("COMPUTE_MODE", "process")
+    COMPUTE_WORKERS: int = int(os.getenv("COMPUTE_WORKERS", str(min(4, os.cpu_count() or 1))))
+    COMPUTE_CHUNK_SIZE: int = int(os.getenv("COMPUTE_CHUNK_SIZE", "64"))
+    
+    # In-process caches
+    NATAL_CACHE_SIZE: int = int(os.getenv("NATAL_CACHE_SIZE", "4096"))
+    
+    # Background jobs (forecast pre-generation)
+    SCHEDULER_ENABLED: bool = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+    YEARLY_REFRESH_SECONDS: int = int(os.getenv("YEARLY_REFRESH_SECONDS", "21600"))
+    DAILY_REFRESH_SECONDS: int = int(os.getenv("DAILY_REFRESH_SECONDS", "1800"))
+    # One worker (the lease holder) calls the AI; the others re-read its texts
+    SCHEDULER_LEASE_SECONDS: float = float(os.getenv("SCHEDULER_LEASE_SECONDS", "60"))
+    SCHEDULER_FOLLOWER_SECONDS: float = float(os.getenv("SCHEDULER_FOLLOWER_SECONDS", "300"))
+    
+    # Per-request phase timings (Server-Timing header, latency histograms)
+    TIMING_ENABLED: bool = os.getenv("TIMING_ENABLED", "true").lower() == "true"
+    
+    # Prometheus metrics (GET /metrics). With several uvicorn workers, point
+    # METRICS_MULTIPROC_DIR at a directory shared by them
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_MULTIPROC_DIR: str = os.getenv("METRICS_MULTIPROC_DIR", os.getenv("PROMETHEUS_MULTIPROC_DIR", ""))
+    METRICS_SAMPLE_SECONDS: float = float(os.getenv("METRICS_SAMPLE_SECONDS", "1.0"))
+    
+    # AI circuit breaker: open after this many consecutive failures, retry after the cooldown
+    AI_BREAKER_FAILURES: int = int(os.getenv("AI_BREAKER_FAILURES", "5"))
+    AI_BREAKER_COOLDOWN_SECONDS: float = float(os.getenv("AI_BREAKER_COOLDOWN_SECONDS", "30"))
+    # Longest wait for one Gemini call; a timeout counts as a failure
+    AI_TIMEOUT_SECONDS: float = float(os.getenv("AI_TIMEOUT_SECONDS", "30"))
+    
+    # Live health: dependency probes in the background; /ready fails (503) past these limits
+    HEALTH_CHECK_SECONDS: float = float(os.getenv("HEALTH_CHECK_SECONDS", "5"))
+    READY_MAX_LOOP_LAG_MS: float = float(os.getenv("READY_MAX_LOOP_LAG_MS", "500"))
+    READY_MAX_IN_PROGRESS: int = int(os.getenv("READY_MAX_IN_PROGRESS", "256"))
+    READY_MAX_EXECUTOR_IN_FLIGHT: int = int(os.getenv("READY_MAX_EXECUTOR_IN_FLIGHT", "64"))
+    READY_MAX_QUEUE_FILL: float = float(os.getenv("READY_MAX_QUEUE_FILL", "0.9"))
+    # AI is reported degraded below this success rate or above this p95
+    AI_DEGRADED_SUCCESS_RATE: float = float(os.getenv("AI_DEGRADED_SUCCESS_RATE", "0.9"))
+    AI_DEGRADED_P95_MS: float = float(os.getenv("AI_DEGRADED_P95_MS", "15000"))
+    
     # Future: Database
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
+    # Verifies users' access tokens (Authorization: Bearer); unset = no user accounts
+    SUPABASE_JWT_SECRET: str = os.getenv("SUPABASE_JWT_SECRET", "")
+    SUPABASE_JWT_AUDIENCE: str = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+    
+    # Reading history: Postgres when HISTORY_DATABASE_URL is set, else SQLite
+    HISTORY_DATABASE_URL: str = os.getenv("HISTORY_DATABASE_URL", "")
+    HISTORY_SQLITE_PATH: str = os.getenv("HISTORY_SQLITE_PATH", os.path.join(DATA_DIR, "history.sqlite"))
+    HISTORY_QUEUE_SIZE: int = int(os.getenv("HISTORY_QUEUE_SIZE", "10000"))
     
-    # Future: Redis
+    # Shared cache (L2): "auto" uses Redis when REDIS_URL is set, else SQLite
     REDIS_URL: str = os.getenv("REDIS_URL", "")
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "auto")      # auto, redis, sqlite, memory, none
+    CACHE_SQLITE_PATH: str = os.getenv("CACHE_SQLITE_PATH", os.path.join(DATA_DIR, "cache.sqlite"))
+    CACHE_MEMORY_MAX_ENTRIES: int = int(os.getenv("CACHE_MEMORY_MAX_ENTRIES", "10000"))
+    CACHE_L1_SIZE: int = int(os.getenv("CACHE_L1_SIZE", "10000"))
+    # Part of every key: a new build starts from an empty keyspace
+    CACHE_VERSION: str = os.getenv("CACHE_VERSION") or f"{APP_VERSION}-{build_id()}"
+    # AI texts on disk (survive restarts); the most used warm the cache at startup
+    PROMPT_STORE_PATH: str = os.getenv("PROMPT_STORE_PATH", os.path.join(DATA_DIR, "prompts.sqlite"))
+    PROMPT_STORE_MAX_ENTRIES: int = int(os.getenv("PROMPT_STORE_MAX_ENTRIES", "100000"))
+    PROMPT_STORE_WARM_KEYS: int = int(os.getenv("PROMPT_STORE_WARM_KEYS", "2000"))
+    # Synastry candidate charts, per signed-in owner
+    SYNASTRY_POOL_PATH: str = os.getenv("SYNASTRY_POOL_PATH", os.path.join(DATA_DIR, "synastry.sqlite"))
+    SYNASTRY_POOL_MAX_PER_OWNER: int = int(os.getenv("SYNASTRY_POOL_MAX_PER_OWNER", "100000"))
+    AI_CACHE_TTL: int = int(os.getenv("AI_CACHE_TTL", str(7 * 24 * 3600)))
+    CHART_CACHE_TTL: int = int(os.getenv("CHART_CACHE_TTL", str(30 * 24 * 3600)))
 
 
 settings = Settings()
@@ -0,0 +1,253 @@
+"""
+Compute Executor
+Runs CPU-bound chart work off the event loop
+
+Heavy calculations (natal charts, transit scans, batches) go to a pool of
+warm worker processes that have the ephemeris, station, city and lunar tables
+memory-mapped at start. Trivial lookups keep running inline. Setting
+COMPUTE_MODE=inline runs the same work on a thread instead (handy for
+debugging and single-core hosts), never on the event loop.
+
+Workers are started by a fork server rather than forked from the running
+app: a fork taken while another thread holds a lock (or has a SQLite
+connection open) would inherit it, and a replacement pool is forked at
+runtime while request threads are busy.
+"""
+
+import asyncio
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from app.core import timing
+from app.core.cache import cache
+from app.core.config import settings
+from app.engines.astrology import (
+    CompactChart,
+    birth_julian_day,
+    compact_chart_for_key,
+    expand_chart,
+    natal_cache_key,
+    natal_chart_cache,
+)
+
+# Recent queue waits kept for metrics
+WAIT_SAMPLES = 256
+
+
+# ============================================================================
+# WORKER SIDE
+# ============================================================================
+
+def _warm_worker():
+    """Pool initializer: open the shared tables once per worker process."""
+    from app.engines.astrology import ensure_ephemeris, ensure_stations
+    from app.engines.geo import ensure_geo_index
+    from app.engines.thai_astrology import ensure_lunar_table
+
+    ensure_ephemeris()
+    ensure_stations()
+    ensure_geo_index()
+    ensure_lunar_table()
+
+
+def _timed_call(fn: Callable, args: tuple):
+    """Run fn in the worker and report when it started and finished."""
+    started = time.time()
+    result = fn(*args)
+    return started, time.time(), result
+
+
+def _run_chunk(fn: Callable, chunk: Sequence[tuple]) -> List[Any]:
+    """Apply fn to every argument tuple of one chunk."""
+    return [fn(*args) for args in chunk]
+
+
+def _probe(delay: float) -> bool:
+    time.sleep(delay)
+    return True
+
+
+# ============================================================================
+# EXECUTOR
+# ============================================================================
+
+class ComputeExecutor:
+    """Process pool (or inline runner) with queue metrics."""
+
+    def __init__(self, mode: str = "process", workers: int = 2, chunk_size: int = 64):
+        self.mode = mode
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Bumped on every pool replacement, so callers that saw the same broken pool replace it once
+        self._generation = 0
+        self._replace_lock = asyncio.Lock()
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.replaced = 0
+        self.in_flight = 0
+        self._waits: deque = deque(maxlen=WAIT_SAMPLES)
+        self._runs: deque = deque(maxlen=WAIT_SAMPLES)
+
+    @property
+    def pooled(self) -> bool:
+        return self._pool is not None
+
+    async def _spawn(self) -> ProcessPoolExecutor:
+        """New pool with every worker spawned and warmed up."""
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("forkserver"),
+            initializer=_warm_worker,
+        )
+        loop = asyncio.get_running_loop()
+        # Workers spawn on demand; keep them all busy briefly so each one starts now
+        await asyncio.gather(*(
+            loop.run_in_executor(pool, _probe, 0.05) for _ in range(self.workers)
+        ))
+        return pool
+
+    async def start(self):
+        """Start the pool and make sure every worker has spawned and warmed up."""
+        if self.mode != "process" or self._pool is not None:
+            return
+        self._pool = await self._spawn()
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _replace(self, generation: int):
+        """
+        Replace a broken pool, once per generation.
+
+        Every task in flight on a pool fails when one of its workers dies;
+        the first caller to get here swaps in a warm pool, the others wait
+        on the lock and find the generation already moved on.
+        """
+        async with self._replace_lock:
+            if generation != self._generation or self._pool is None:
+                return
+            broken = self._pool
+            self._pool = await self._spawn()
+            self._generation += 1
+            self.replaced += 1
+            # Its futures already failed with BrokenProcessPool; nothing left to cancel
+            broken.shutdown(wait=False)
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """
+        Run fn(*args) in a worker process (on a thread when no pool is running).
+
+        When a worker dies (e.g. OOM-killed) the pool is replaced and the
+        task retried once in the new pool; a second failure is raised.
+
+        fn and args must be picklable: use module-level functions.
+        """
+        submitted_at = time.time()
+        self.submitted += 1
+        self.in_flight += 1
+        try:
+            if self._pool is None:
+                started, finished, result = await asyncio.to_thread(_timed_call, fn, args)
+            else:
+                started, finished, result = await self._run_pooled(fn, args)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+        self.completed += 1
+        wait = max(0.0, started - submitted_at)
+        self._waits.append(wait)
+        timing.record("compute_queue", int(wait * 1e9))
+        self._runs.append(finished - started)
+        return result
+
+    async def _run_pooled(self, fn: Callable, args: tuple):
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            pool, generation = self._pool, self._generation
+            try:
+                return await loop.run_in_executor(pool, _timed_call, fn, args)
+            except BrokenProcessPool:
+                if attempt:
+                    raise
+                await self._replace(generation)
+
+    async def map_chunked(
+        self,
+        fn: Callable,
+        arg_tuples: Sequence[tuple],
+        chunk_size: Optional[int] = None,
+    ) -> List[Any]:
+        """
+        fn over many argument tuples, one pool task per chunk.
+
+        Chunking amortizes pickling and scheduling over chunk_size items.
+        Results come back in input order.
+        """
+        chunk_size = chunk_size or self.chunk_size
+        chunks = [arg_tuples[i:i + chunk_size] for i in range(0, len(arg_tuples), chunk_size)]
+        results = await asyncio.gather(*(self.run(_run_chunk, fn, chunk) for chunk in chunks))
+        return [item for chunk in results for item in chunk]
+
+    def metrics(self) -> Dict:
+        """Queue and throughput counters for health/metrics endpoints."""
+        waits = list(self._waits)
+        runs = list(self._runs)
+        return {
+            "mode": "process" if self._pool is not None else "inline",
+            "workers": self.workers if self._pool is not None else 0,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "pool_replacements": self.replaced,
+            "in_flight": self.in_flight,
+            "queue_wait_ms_avg": round(1000 * sum(waits) / len(waits), 2) if waits else 0.0,
+            "queue_wait_ms_max": round(1000 * max(waits), 2) if waits else 0.0,
+            "run_ms_avg": round(1000 * sum(runs) / len(runs), 2) if runs else 0.0,
+        }
+
+
+compute = ComputeExecutor(
+    mode=settings.COMPUTE_MODE,
+    workers=settings.COMPUTE_WORKERS,
+    chunk_size=settings.COMPUTE_CHUNK_SIZE,
+)
+
+
+# ============================================================================
+# OFFLOADED CALCULATIONS
+# ============================================================================
+
+async def natal_chart(
+    birth_date: str,
+    birth_time: str,
+    latitude: float,
+    longitude: float,
+    timezone_offset: str = "+00:00",
+    house_system: str = "equal"
+) -> Dict:
+    """
+    calculate_natal_chart() with the numeric work done in the pool.
+
+    The cache is checked and filled here in the parent, so every worker's
+    results land in the one shared natal_chart_cache; its misses go to
+    the shared L2 ("chart" namespace) before the pool.
+    """
+    jd = birth_julian_day(birth_date, birth_time, timezone_offset)
+    key = natal_cache_key(jd, latitude, longitude, house_system)
+    compact: Optional[CompactChart] = natal_chart_cache.get(key)
+    if compact is None:
+        compact = await cache.get_or_load("chart", key, lambda: compute.run(compact_chart_for_key, key))
+        natal_chart_cache.put(key, compact)
+    return expand_chart(compact)
@@ -0,0 +1,161 @@
+"""
+Live Health
+/health and /ready from live state, without adding load per probe
+
+A background task probes the dependencies (cache L2, history database)
+every HEALTH_CHECK_SECONDS and precomputes the report: rolling AI
+success rate and p95 latency, the circuit-breaker state, server errors
+per API area and the engine stats. /health returns that report;
+/ready only compares a few in-process counters (event-loop lag,
+requests in progress, executor and queue fill) with the READY_* limits,
+so a saturated worker answers 503 and the load balancer stops sending
+it traffic.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from app.core import metrics
+from app.core.ai_client import ai_available, breaker
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.executor import compute
+from app.core.history import history
+
+# API area (route prefix) of each engine component
+ENGINE_ROUTES = {
+    "tarot_engine": "/v1/tarot",
+    "western_astrology": "/v1/horoscope",
+    "thai_astrology": "/v1/thai",
+}
+
+# A component with a lower success rate (server errors) is degraded
+MIN_SUCCESS_RATE = 0.95
+
+PROBE_TIMEOUT_SECONDS = 2.0
+
+
+def saturation() -> Dict:
+    """Current saturation signals of this worker and the limits they exceed."""
+    lag_ms = metrics.sampler.lag_seconds * 1000
+    in_progress = int(metrics.HTTP_IN_PROGRESS.get())
+    history_stats = history.stats()
+    queue_fill = history_stats["queued"] / history_stats["queue_size"] if history_stats["queue_size"] else 0.0
+
+    exceeded: List[str] = []
+    if lag_ms > settings.READY_MAX_LOOP_LAG_MS:
+        exceeded.append("event_loop_lag")
+    if in_progress > settings.READY_MAX_IN_PROGRESS:
+        exceeded.append("requests_in_progress")
+    if compute.in_flight > settings.READY_MAX_EXECUTOR_IN_FLIGHT:
+        exceeded.append("executor_in_flight")
+    if queue_fill > settings.READY_MAX_QUEUE_FILL:
+        exceeded.append("history_queue")
+
+    return {
+        "event_loop_lag_ms": round(lag_ms, 1),
+        "requests_in_progress": in_progress,
+        "executor_in_flight": compute.in_flight,
+        "history_queue_fill": round(queue_fill, 4),
+        "exceeded": exceeded,
+    }
+
+
+def _ai_status(window: Dict) -> str:
+    if not ai_available():
+        return "not_configured"
+    if breaker.state != "closed":
+        return "down"
+    if window["count"] and (
+        window["success_rate"] < settings.AI_DEGRADED_SUCCESS_RATE
+        or (window["p95_ms"] or 0) > settings.AI_DEGRADED_P95_MS
+    ):
+        return "degraded"
+    return "operational"
+
+
+def _engine_status(window: Dict) -> str:
+    if window["count"] and window["success_rate"] < MIN_SUCCESS_RATE:
+        return "degraded"
+    return "operational"
+
+
+class HealthMonitor:
+    """Background probes; report() and ready() only read what they computed."""
+
+    def __init__(self, interval: float = 5.0):
+        self.interval = interval
+        self.cache_ok = True
+        self.database_ok = True
+        self._extras: Dict[str, Callable[[], Dict]] = {}
+        self._report: Optional[Dict] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add_section(self, name: str, fn: Callable[[], Dict]):
+        """Extra stats section of the report (recomputed every check)."""
+        self._extras[name] = fn
+
+    async def _probe(self, ping) -> bool:
+        try:
+            return await asyncio.wait_for(ping(), PROBE_TIMEOUT_SECONDS)
+        except Exception:
+            return False
+
+    async def check(self):
+        """Probe the dependencies and recompute the report."""
+        self.cache_ok, self.database_ok = await asyncio.gather(self._probe(cache.ping), self._probe(history.ping))
+
+        ai_window = metrics.AI_WINDOW.summary()
+        route_windows = {prefix: window.summary() for prefix, window in metrics.ROUTE_WINDOWS.items()}
+        components = {name: _engine_status(route_windows[prefix]) for name, prefix in ENGINE_ROUTES.items()}
+        components["ai_interpreter"] = _ai_status(ai_window)
+        components["cache"] = "operational" if self.cache_ok else "degraded"
+        components["database"] = "operational" if self.database_ok else "degraded"
+
+        report = {
+            "checked_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "components": components,
+            "ai": {**ai_window, "circuit": breaker.status()},
+            "routes": route_windows,
+        }
+        for name, fn in self._extras.items():
+            try:
+                report[name] = fn()
+            except Exception as e:
+                report[name] = {"error": str(e)}
+        self._report = report
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check()
+
+    def start(self):
+        self._task = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def ready(self) -> Dict:
+        """Readiness of this worker: not ready while saturated."""
+        current = saturation()
+        return {"ready": not current["exceeded"], "saturation": current}
+
+    def report(self) -> Dict:
+        """
+        Last precomputed report, with live saturation.
+
+        status is "unhealthy" while saturated, "degraded" when a component
+        is not operational ("not_configured" AI does not count), else "healthy".
+        """
+        report = self._report or {"checked_at": None, "components": {}}
+        readiness = self.ready()
+        degraded = any(state not in ("operational", "not_configured") for state in report["components"].values())
+        status = "unhealthy" if not readiness["ready"] else "degraded" if degraded else "healthy"
+        return {"status": status, **readiness, **report}
+
+
+health = HealthMonitor(settings.HEALTH_CHECK_SECONDS)
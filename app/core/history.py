@@ -0,0 +1,334 @@
+"""
+Reading History
+Every tarot, Thai and natal result of a known user, written in the background
+
+Requests only enqueue (user, kind, request, result); a writer task
+encodes and batch-inserts them off the request path, one transaction per
+batch. When the queue is full, records are dropped and counted rather
+than slowing requests down.
+
+Pages are read with keyset pagination on (created_at, id), served by an
+index on (user_id, created_at, id): every page is an index range scan,
+however deep. The store is SQLite locally and Postgres in production
+(HISTORY_DATABASE_URL, needs the psycopg package).
+"""
+
+import asyncio
+import base64
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+HISTORY_KINDS = ("tarot", "thai", "natal")
+
+# Writer: records per transaction, and the longest a record waits
+BATCH_SIZE = 500
+FLUSH_INTERVAL_SECONDS = 0.5
+
+
+class HistoryRecord(NamedTuple):
+    user_id: str
+    kind: str
+    created_us: int         # microseconds since the epoch (UTC)
+    request: Any            # dict / model, JSON-encoded by the writer
+    result: Any             # dict / model / pre-encoded JSON bytes
+
+
+def _encode(value: Any) -> str:
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    if isinstance(value, BaseModel):
+        return value.model_dump_json()
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def encode_cursor(created_us: int, row_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_us}:{row_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    """(created_us, id) of the last row of the previous page."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_us, row_id = raw.split(":")
+        return int(created_us), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def _item(row_id: int, kind: str, created_us: int, request: str, result: str) -> Dict:
+    return {
+        "id": row_id,
+        "kind": kind,
+        "created_at": datetime.fromtimestamp(created_us / 1e6, timezone.utc).isoformat(timespec="milliseconds"),
+        "request": json.loads(request),
+        "result": json.loads(result),
+    }
+
+
+# ============================================================================
+# STORES
+# ============================================================================
+
+class SQLiteHistoryStore:
+    """Local store (WAL mode); also fine for a single-host deployment."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Opened on first use (call with the lock held)."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS readings ("
+                "id INTEGER PRIMARY KEY, user_id TEXT NOT NULL, kind TEXT NOT NULL, "
+                "created_us INTEGER NOT NULL, request TEXT NOT NULL, result TEXT NOT NULL)"
+            )
+            # The only secondary index: one extra b-tree write per row
+            conn.execute("CREATE INDEX IF NOT EXISTS readings_user_created ON readings (user_id, created_us, id)")
+            self._conn = conn
+        return self._conn
+
+    def insert_many(self, rows: List[Tuple[str, str, int, str, str]]):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(
+                    "INSERT INTO readings (user_id, kind, created_us, request, result) VALUES (?, ?, ?, ?, ?)", rows
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def page(self, user_id: str, kind: Optional[str], after: Optional[Tuple[int, int]], limit: int) -> List[Tuple]:
+        """Newest first, starting below the `after` (created_us, id) cursor."""
+        sql = "SELECT id, kind, created_us, request, result FROM readings WHERE user_id = ?"
+        params: List[Any] = [user_id]
+        if after is not None:
+            sql += " AND (created_us, id) < (?, ?)"
+            params += list(after)
+        if kind is not None:
+            sql += " AND kind = ?"
+            params.append(kind)
+        sql += " ORDER BY created_us DESC, id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return self._connection().execute(sql, params).fetchall()
+
+    def ping(self) -> bool:
+        with self._lock:
+            self._connection().execute("SELECT 1")
+        return True
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class PostgresHistoryStore:
+    """Production store; requires the psycopg (v3) package."""
+
+    name = "postgres"
+
+    def __init__(self, url: str):
+        try:
+            import psycopg
+        except ImportError:
+            raise RuntimeError("HISTORY_DATABASE_URL is set but psycopg is not installed (pip install psycopg)")
+        self._psycopg = psycopg
+        self.url = url
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        """(Re)connected on demand (call with the lock held)."""
+        if self._conn is None or self._conn.closed:
+            conn = self._psycopg.connect(self.url, autocommit=True)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS readings ("
+                "id BIGSERIAL PRIMARY KEY, user_id TEXT NOT NULL, kind TEXT NOT NULL, "
+                "created_us BIGINT NOT NULL, request JSONB NOT NULL, result JSONB NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS readings_user_created "
+                "ON readings (user_id, created_us DESC, id DESC) INCLUDE (kind)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def insert_many(self, rows: List[Tuple[str, str, int, str, str]]):
+        with self._lock:
+            conn = self._connection()
+            with conn.transaction(), conn.cursor() as cur:
+                cur.executemany(
+                    "INSERT INTO readings (user_id, kind, created_us, request, result) VALUES (%s, %s, %s, %s, %s)",
+                    rows
+                )
+
+    def page(self, user_id: str, kind: Optional[str], after: Optional[Tuple[int, int]], limit: int) -> List[Tuple]:
+        sql = "SELECT id, kind, created_us, request::text, result::text FROM readings WHERE user_id = %s"
+        params: List[Any] = [user_id]
+        if after is not None:
+            sql += " AND (created_us, id) < (%s, %s)"
+            params += list(after)
+        if kind is not None:
+            sql += " AND kind = %s"
+            params.append(kind)
+        sql += " ORDER BY created_us DESC, id DESC LIMIT %s"
+        params.append(limit)
+        with self._lock:
+            return self._connection().execute(sql, params).fetchall()
+
+    def ping(self) -> bool:
+        with self._lock:
+            self._connection().execute("SELECT 1")
+        return True
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def create_store():
+    if settings.HISTORY_DATABASE_URL:
+        return PostgresHistoryStore(settings.HISTORY_DATABASE_URL)
+    return SQLiteHistoryStore(settings.HISTORY_SQLITE_PATH)
+
+
+# ============================================================================
+# WRITER
+# ============================================================================
+
+class HistoryWriter:
+    """Bounded queue in front of the store, drained in batches by one task."""
+
+    def __init__(self, store, queue_size: int = 10000):
+        self.store = store
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+
+    def record(self, user_id: Optional[str], kind: str, request: Any, result: Any):
+        """Enqueue one reading (no-op without a user id); never blocks."""
+        if not user_id or self._queue is None:
+            return
+        try:
+            self._queue.put_nowait(HistoryRecord(user_id, kind, time.time_ns() // 1000, request, result))
+            self.enqueued += 1
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    @staticmethod
+    def _rows(records: List[HistoryRecord]) -> List[Tuple[str, str, int, str, str]]:
+        return [(r.user_id, r.kind, r.created_us, _encode(r.request), _encode(r.result)) for r in records]
+
+    async def _write(self, records: List[HistoryRecord]):
+        try:
+            # Encoding and the insert both run in the thread, off the event loop
+            await asyncio.to_thread(lambda: self.store.insert_many(self._rows(records)))
+            self.written += len(records)
+            self.batches += 1
+        except Exception as e:
+            self.errors += 1
+            self.dropped += len(records)
+            self.last_error = str(e)
+
+    async def run(self):
+        """Background task: wait for a record, then take whatever else is queued (up to BATCH_SIZE)."""
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            deadline = time.monotonic() + FLUSH_INTERVAL_SECONDS
+            while len(batch) < BATCH_SIZE:
+                if queue.empty():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(queue.get_nowait())
+            await self._write(batch)
+
+    def start(self):
+        self._queue = asyncio.Queue(self.queue_size)
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop the task and write what is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._queue is not None:
+            pending = []
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            self._queue = None
+            if pending:
+                await self._write(pending)
+        self.store.close()
+
+    async def page(self, user_id: str, kind: Optional[str], cursor: Optional[str], limit: int) -> Dict:
+        """
+        One page of a user's history, newest first.
+
+        Returns:
+            items and next_cursor (None on the last page)
+        """
+        after = decode_cursor(cursor) if cursor else None
+        rows = await asyncio.to_thread(self.store.page, user_id, kind, after, limit + 1)
+        items = [_item(*row) for row in rows[:limit]]
+        next_cursor = encode_cursor(rows[limit - 1][2], rows[limit - 1][0]) if len(rows) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
+
+    async def ping(self) -> bool:
+        try:
+            return await asyncio.to_thread(self.store.ping)
+        except Exception:
+            return False
+
+    def stats(self) -> Dict:
+        return {
+            "backend": self.store.name,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+
+history = HistoryWriter(create_store(), settings.HISTORY_QUEUE_SIZE)
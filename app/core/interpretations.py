@@ -0,0 +1,259 @@
+"""
+Interpretation Store
+Pre-generated forecast texts, served from memory without calling the AI
+
+Forecast texts depend only on a few ids (year or date, year animal,
+birth day or sign, language), so scheduled jobs generate every
+combination ahead of time and requests only look them up. When no AI
+backend is configured, or a call keeps failing, the rule-based text is
+stored instead and replaced by an AI text on a later run. Only the
+scheduler's leading worker calls the AI; the others take the texts it
+has put in the prompt store.
+"""
+
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+from app.core.ai_client import AI_ERROR_PREFIX, ai_available
+from app.core.prompt_store import interpret, stored_interpretation
+from app.core.prompts import (
+    DAILY_HOROSCOPE_PROMPT,
+    YEARLY_FORECAST_PROMPT,
+    build_daily_prompt,
+    build_yearly_prompt
+)
+from app.core.scheduler import scheduler
+from app.engines.daily import daily_keys, daily_text, thai_daily, western_daily
+from app.engines.dates import iso_date
+from app.engines.thai_astrology import THAI_BIRTH_DAYS, THAI_YEAR_ANIMALS
+from app.engines.yearly import FORECAST_LANGUAGES, forecast_text, yearly_forecast
+
+# Concurrent AI calls while pre-generating
+AI_CONCURRENCY = 4
+
+# Failed AI calls are retried with exponential backoff before falling back
+AI_RETRIES = 2
+AI_RETRY_DELAY_SECONDS = 2.0
+
+# Forecast "now" is Thailand time
+THAI_TZ = timezone(timedelta(hours=7))
+
+
+class Interpretation(NamedTuple):
+    """One stored text."""
+    text: str
+    source: str            # "ai" or "rules"
+    generated_at: str      # ISO timestamp (UTC)
+
+
+class InterpretationStore:
+    """Thread-safe in-memory texts keyed by (kind, key)."""
+
+    def __init__(self):
+        self._items: Dict[Tuple[str, Hashable], Interpretation] = {}
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, key: Hashable) -> Optional[Interpretation]:
+        return self._items.get((kind, key))
+
+    def put(self, kind: str, key: Hashable, text: str, source: str) -> Interpretation:
+        item = _interpretation(text, source)
+        with self._lock:
+            self._items[(kind, key)] = item
+        return item
+
+    def publish(self, kind: str, items: Dict[Hashable, Interpretation]):
+        """Add many entries at once; readers see all of them or none."""
+        with self._lock:
+            self._items = {**self._items, **{(kind, key): item for key, item in items.items()}}
+
+    def prune(self, kind: str, keep: Callable[[Hashable], bool]) -> int:
+        """Drop the entries of a kind whose key fails `keep`; returns the count dropped."""
+        with self._lock:
+            items = {k: v for k, v in self._items.items() if k[0] != kind or keep(k[1])}
+            dropped = len(self._items) - len(items)
+            self._items = items
+        return dropped
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Entry counts per kind and source."""
+        with self._lock:
+            items = list(self._items.items())
+        stats: Dict[str, Dict[str, int]] = {}
+        for (kind, _), item in items:
+            counts = stats.setdefault(kind, {"total": 0, "ai": 0, "rules": 0})
+            counts["total"] += 1
+            counts[item.source] += 1
+        return stats
+
+
+interpretations = InterpretationStore()
+
+
+def _interpretation(text: str, source: str) -> Interpretation:
+    return Interpretation(text, source, datetime.now(timezone.utc).isoformat(timespec="seconds"))
+
+
+async def generate_text(prompt: str, system_instruction: str, fallback: str) -> Tuple[str, str]:
+    """AI text when available (retried on failure), else the rule-based fallback. Returns (text, source)."""
+    if ai_available() and not scheduler.leading:
+        # Another worker calls the model; use its text once stored
+        text = await stored_interpretation(prompt, system_instruction)
+        return (text, "ai") if text is not None else (fallback, "rules")
+    if ai_available():
+        for attempt in range(AI_RETRIES + 1):
+            if attempt:
+                await asyncio.sleep(AI_RETRY_DELAY_SECONDS * 2 ** (attempt - 1))
+            text = await interpret(prompt, system_instruction)
+            if not text.startswith(AI_ERROR_PREFIX):
+                return text, "ai"
+    return fallback, "rules"
+
+
+def _needs_generation(item: Optional[Interpretation]) -> bool:
+    return item is None or (item.source != "ai" and ai_available())
+
+
+# =============================================================================
+# YEARLY FORECASTS
+# =============================================================================
+
+def yearly_interpretation(year: int, year_animal: int, birth_day: int, lang: str) -> Interpretation:
+    """
+    Stored yearly text; the rule-based text is stored on a miss (no AI call).
+
+    Args:
+        year: Gregorian year of the forecast
+        year_animal: THAI_YEAR_ANIMALS id
+        birth_day: THAI_BIRTH_DAYS id
+        lang: One of FORECAST_LANGUAGES
+    """
+    key = (year, year_animal, birth_day, lang)
+    item = interpretations.get("yearly", key)
+    if item is None:
+        text = forecast_text(yearly_forecast(year, year_animal, birth_day), lang)
+        item = interpretations.put("yearly", key, text, "rules")
+    return item
+
+
+async def pregenerate_yearly(year: int) -> Dict[str, int]:
+    """
+    Generate every yearly text of a year (animals x birth days x languages).
+
+    Entries that already hold an AI text are kept; rule-based entries are
+    regenerated once an AI backend is available.
+
+    Returns:
+        Counts of generated, AI and skipped entries
+    """
+    semaphore = asyncio.Semaphore(AI_CONCURRENCY)
+    counts = {"generated": 0, "ai": 0, "skipped": 0}
+
+    async def generate(year_animal: int, birth_day: int, lang: str):
+        key = (year, year_animal, birth_day, lang)
+        if not _needs_generation(interpretations.get("yearly", key)):
+            counts["skipped"] += 1
+            return
+        forecast = yearly_forecast(year, year_animal, birth_day)
+        async with semaphore:
+            text, source = await generate_text(
+                build_yearly_prompt(forecast, lang),
+                YEARLY_FORECAST_PROMPT,
+                forecast_text(forecast, lang)
+            )
+        interpretations.put("yearly", key, text, source)
+        counts["generated"] += 1
+        counts["ai"] += source == "ai"
+
+    await asyncio.gather(*(
+        generate(animal, day, lang)
+        for animal in range(len(THAI_YEAR_ANIMALS))
+        for day in range(len(THAI_BIRTH_DAYS))
+        for lang in FORECAST_LANGUAGES
+    ))
+    return counts
+
+
+def thai_today(now: Optional[datetime] = None) -> int:
+    """Day number of today in Thailand."""
+    return (now or datetime.now(THAI_TZ)).astimezone(THAI_TZ).date().toordinal()
+
+
+def forecast_years(now: Optional[datetime] = None) -> List[int]:
+    """Years to keep generated: the current one, plus the next from December."""
+    now = now or datetime.now(THAI_TZ)
+    return [now.year, now.year + 1] if now.month == 12 else [now.year]
+
+
+async def refresh_yearly_forecasts() -> Dict[int, Dict[str, int]]:
+    """Scheduled job: make sure the current (and upcoming) year is generated."""
+    return {year: await pregenerate_yearly(year) for year in forecast_years()}
+
+
+# =============================================================================
+# DAILY HOROSCOPES
+# =============================================================================
+
+def _daily_data(day: int, kind: str, item_id: int) -> Dict:
+    return western_daily(day, item_id) if kind == "sign" else thai_daily(day, item_id)
+
+
+def daily_interpretation(day: int, kind: str, item_id: int, lang: str) -> Tuple[Dict, Interpretation]:
+    """
+    Daily data and its stored text; the rule-based text on a miss (not stored).
+
+    Args:
+        day: Day number of the date
+        kind: "sign" (ZODIAC_SIGNS id) or "thai_day" (THAI_BIRTH_DAYS id)
+        item_id: Sign or birth day id
+        lang: One of DAILY_LANGUAGES
+    """
+    daily = _daily_data(day, kind, item_id)
+    item = interpretations.get("daily", (iso_date(day), kind, item_id, lang))
+    return daily, item or _interpretation(daily_text(daily, lang), "rules")
+
+
+async def pregenerate_daily(day: int) -> Dict[str, int]:
+    """
+    Generate every daily text of a date (signs and birth days x languages).
+
+    The texts of the date are published together once all are done, so
+    readers never see a half-generated day.
+
+    Returns:
+        Counts of generated, AI and skipped entries
+    """
+    date = iso_date(day)
+    semaphore = asyncio.Semaphore(AI_CONCURRENCY)
+    counts = {"generated": 0, "ai": 0, "skipped": 0}
+    items: Dict[Hashable, Interpretation] = {}
+
+    async def generate(kind: str, item_id: int, lang: str):
+        key = (date, kind, item_id, lang)
+        if not _needs_generation(interpretations.get("daily", key)):
+            counts["skipped"] += 1
+            return
+        daily = _daily_data(day, kind, item_id)
+        async with semaphore:
+            text, source = await generate_text(
+                build_daily_prompt(daily, lang),
+                DAILY_HOROSCOPE_PROMPT,
+                daily_text(daily, lang)
+            )
+        items[key] = _interpretation(text, source)
+        counts["generated"] += 1
+        counts["ai"] += source == "ai"
+
+    await asyncio.gather(*(generate(kind, item_id, lang) for kind, item_id, lang in daily_keys()))
+    interpretations.publish("daily", items)
+    return counts
+
+
+async def refresh_daily_horoscopes() -> Dict[str, Dict[str, int]]:
+    """Scheduled job: today's and tomorrow's texts (Thailand time); drops days before yesterday."""
+    today = thai_today()
+    yesterday = iso_date(today - 1)
+    interpretations.prune("daily", lambda key: key[0] >= yesterday)
+    return {iso_date(day): await pregenerate_daily(day) for day in (today, today + 1)}
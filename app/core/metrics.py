@@ -0,0 +1,518 @@
+"""
+Prometheus Metrics
+Counters, gauges and histograms served as Prometheus text by GET /metrics
+
+Every process writes only its own values, from the event loop, so no
+locks are taken on the hot path. With METRICS_MULTIPROC_DIR set (one
+directory shared by all uvicorn workers) each worker keeps its values in
+a memory-mapped file of that directory and /metrics, whichever worker
+answers it, adds the files of all workers up. Files are named by pid and
+process start time, so a worker that reuses an old pid starts a new file
+instead of truncating the old one. Without it the values live in process
+memory.
+
+Counts the app already keeps (caches, executor, history, prompt store)
+are copied in by collectors: right before a scrape, and every
+METRICS_SAMPLE_SECONDS by the sampler task, which also measures
+event-loop lag. Request paths only pay for the HTTP and AI metrics.
+"""
+
+import asyncio
+import glob
+import json
+import mmap
+import os
+import struct
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.timing import UNMATCHED_ROUTE
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Sample key: (sample name, label values)
+SampleKey = Tuple[str, Tuple[str, ...]]
+
+# Process that wrote a values file: (pid, start time)
+Owner = Tuple[int, int]
+
+
+def process_start(pid: int) -> Optional[int]:
+    """Start time of a running process (clock ticks since boot), None where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+        # Fields after the parenthesized command name; starttime is field 22
+        return int(stat.rsplit(b")", 1)[1].split()[19])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# ============================================================================
+# VALUE STORES
+# ============================================================================
+
+class MemoryValues:
+    """Values of this process, in a dict."""
+
+    def __init__(self):
+        self._values: Dict[SampleKey, float] = {}
+
+    def inc(self, key: SampleKey, amount: float):
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, key: SampleKey, value: float):
+        self._values[key] = value
+
+    def get(self, key: SampleKey) -> float:
+        return self._values.get(key, 0.0)
+
+    def snapshot(self) -> List[Tuple[Optional[Owner], Dict[SampleKey, float]]]:
+        """[(owner, values)] of every process (just this one)."""
+        return [(None, dict(self._values))]
+
+
+class MmapValues:
+    """
+    Values of this process in <directory>/metrics_<pid>_<start>.db; reads all files.
+
+    File layout: used byte count (u32) and padding, then entries of key
+    length (u32), JSON key padded to 8 bytes, value (f64). An entry is
+    complete before the used count covers it, so readers never see a
+    half-written one.
+    """
+
+    INITIAL_SIZE = 1 << 20
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._mm: Optional[mmap.mmap] = None
+        self._file = None
+        self._used = 8
+        self._offsets: Dict[SampleKey, int] = {}
+        self.owner: Optional[Owner] = None
+
+    def _open(self):
+        """Opened on the first write, in the process that writes."""
+        os.makedirs(self.directory, exist_ok=True)
+        pid = os.getpid()
+        # Without /proc the start time is unknown: a unique stamp still keeps files apart
+        self.owner = (pid, process_start(pid) or -time.time_ns())
+        self._file = open(os.path.join(self.directory, f"metrics_{pid}_{self.owner[1]}.db"), "w+b")
+        self._file.truncate(self.INITIAL_SIZE)
+        self._mm = mmap.mmap(self._file.fileno(), self.INITIAL_SIZE)
+        struct.pack_into("i", self._mm, 0, self._used)
+
+    def _offset(self, key: SampleKey) -> int:
+        offset = self._offsets.get(key)
+        if offset is not None:
+            return offset
+        if self._mm is None:
+            self._open()
+        encoded = json.dumps([key[0], list(key[1])], separators=(",", ":")).encode()
+        padded = encoded + b" " * (8 - (len(encoded) + 4) % 8)
+        size = 4 + len(padded) + 8
+        if self._used + size > len(self._mm):
+            self._grow(self._used + size)
+        start = self._used
+        struct.pack_into(f"i{len(padded)}sd", self._mm, start, len(padded), padded, 0.0)
+        self._used += size
+        struct.pack_into("i", self._mm, 0, self._used)
+        offset = self._offsets[key] = start + 4 + len(padded)
+        return offset
+
+    def _grow(self, needed: int):
+        size = len(self._mm)
+        while size < needed:
+            size *= 2
+        self._mm.close()
+        self._file.truncate(size)
+        self._mm = mmap.mmap(self._file.fileno(), size)
+
+    def inc(self, key: SampleKey, amount: float):
+        offset = self._offset(key)
+        struct.pack_into("d", self._mm, offset, struct.unpack_from("d", self._mm, offset)[0] + amount)
+
+    def set(self, key: SampleKey, value: float):
+        # Offset first: it opens (or grows) the map
+        offset = self._offset(key)
+        struct.pack_into("d", self._mm, offset, value)
+
+    def get(self, key: SampleKey) -> float:
+        """This process's value."""
+        offset = self._offsets.get(key)
+        return struct.unpack_from("d", self._mm, offset)[0] if offset is not None else 0.0
+
+    @staticmethod
+    def _read(path: str) -> Dict[SampleKey, float]:
+        with open(path, "rb") as f:
+            data = f.read()
+        values: Dict[SampleKey, float] = {}
+        if len(data) < 8:
+            return values
+        used = struct.unpack_from("i", data, 0)[0]
+        pos = 8
+        while pos < used:
+            length = struct.unpack_from("i", data, pos)[0]
+            name, labels = json.loads(data[pos + 4:pos + 4 + length])
+            values[(name, tuple(labels))] = struct.unpack_from("d", data, pos + 4 + length)[0]
+            pos += 4 + length + 8
+        return values
+
+    def snapshot(self) -> List[Tuple[Optional[Owner], Dict[SampleKey, float]]]:
+        files = []
+        for path in glob.glob(os.path.join(self.directory, "metrics_*_*.db")):
+            try:
+                pid, start = os.path.basename(path)[len("metrics_"):-len(".db")].split("_")
+                files.append(((int(pid), int(start)), self._read(path)))
+            except (OSError, ValueError):
+                continue
+        return files
+
+
+def _process_alive(owner: Optional[Owner]) -> bool:
+    """Whether the process that wrote a file still runs (not just some process with its pid)."""
+    if owner is None:
+        return True
+    pid, start = owner
+    if owner == values_owner():
+        return True
+    if pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    # A reused pid: the running process started at another time
+    current = process_start(pid)
+    return current is None or start < 0 or current == start
+
+
+def values_owner() -> Optional[Owner]:
+    return getattr(values, "owner", None)
+
+
+# ============================================================================
+# METRICS
+# ============================================================================
+
+class Metric:
+    """
+    One metric family. Label values are passed as a tuple in labelnames order.
+
+    Gauges are combined across processes with `mode`: "livesum" (sum of
+    running processes) or "max"; counters and histograms always add up
+    (including exited workers, so totals never go backwards).
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), mode: str = "sum"):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.mode = mode
+        registry.append(self)
+
+    def sample_names(self) -> Tuple[str, ...]:
+        return (self.name,)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1.0):
+        values.inc((self.name, labels), amount)
+
+    def set_total(self, labels: Tuple[str, ...], total: float):
+        """Set from a count this process already keeps (collectors)."""
+        values.set((self.name, labels), total)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), mode: str = "livesum"):
+        super().__init__(name, documentation, labelnames, mode)
+
+    def set(self, labels: Tuple[str, ...], value: float):
+        values.set((self.name, labels), value)
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1.0):
+        values.inc((self.name, labels), amount)
+
+    def get(self, labels: Tuple[str, ...] = ()) -> float:
+        """This process's value."""
+        return values.get((self.name, labels))
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets: Iterable[float] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._le = tuple(repr(float(b)) for b in self.buckets) + ("+Inf",)
+
+    def sample_names(self) -> Tuple[str, ...]:
+        return (f"{self.name}_bucket", f"{self.name}_sum", f"{self.name}_count")
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        # Buckets are stored per bucket and made cumulative when rendered
+        values.inc((f"{self.name}_bucket", labels + (self._le[bisect_left(self.buckets, value)],)), 1.0)
+        values.inc((f"{self.name}_sum", labels), value)
+        values.inc((f"{self.name}_count", labels), 1.0)
+
+
+registry: List[Metric] = []
+values = MmapValues(settings.METRICS_MULTIPROC_DIR) if settings.METRICS_MULTIPROC_DIR else MemoryValues()
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HTTP_REQUESTS = Counter("oracle_http_requests_total", "HTTP requests by route template and status", ("method", "route", "status"))
+HTTP_LATENCY = Histogram("oracle_http_request_duration_seconds", "HTTP request latency", ("method", "route"), LATENCY_BUCKETS)
+HTTP_IN_PROGRESS = Gauge("oracle_http_requests_in_progress", "HTTP requests being handled")
+RATE_LIMITED = Counter("oracle_rate_limited_total", "Requests rejected by the rate limiter", ("route",))
+
+AI_REQUESTS = Counter("oracle_ai_requests_total", "AI provider calls by outcome", ("model", "outcome"))
+AI_LATENCY = Histogram("oracle_ai_request_duration_seconds", "AI provider call latency", ("model",), LATENCY_BUCKETS)
+AI_TOKENS = Counter("oracle_ai_tokens_total", "AI tokens used", ("model", "type"))
+AI_IN_FLIGHT = Gauge("oracle_ai_requests_in_flight", "AI provider calls in progress")
+AI_CIRCUIT_OPEN = Gauge("oracle_ai_circuit_open", "1 while the AI circuit breaker rejects calls", mode="max")
+
+CACHE_LOOKUPS = Counter("oracle_cache_lookups_total", "Cache lookups by result (hit ratio = non-miss / all)", ("cache", "result"))
+CACHE_ERRORS = Counter("oracle_cache_errors_total", "Cache loader and L2 errors", ("cache", "kind"))
+CACHE_ENTRIES = Gauge("oracle_cache_entries", "Entries in the in-process caches", ("cache",))
+
+EXECUTOR_TASKS = Counter("oracle_executor_tasks_total", "Compute pool tasks", ("state",))
+QUEUE_DEPTH = Gauge("oracle_queue_depth", "Items waiting in internal queues", ("queue",))
+HISTORY_RECORDS = Counter("oracle_history_records_total", "Reading history records", ("state",))
+
+LOOP_LAG = Histogram(
+    "oracle_event_loop_lag_seconds", "Event-loop lag (sampler wake-up delay)", (),
+    (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+
+
+# ============================================================================
+# ROLLING WINDOWS (live health)
+# ============================================================================
+
+class RollingWindow:
+    """Outcomes and latencies of the latest events (at most max_samples, within `seconds`)."""
+
+    def __init__(self, seconds: float = 300.0, max_samples: int = 1000):
+        self.seconds = seconds
+        self._events: deque = deque(maxlen=max_samples)
+
+    def record(self, ok: bool, latency: Optional[float] = None):
+        self._events.append((time.monotonic(), ok, latency))
+
+    def summary(self) -> Dict:
+        """Count, success rate and p95 latency (ms) over the window."""
+        cutoff = time.monotonic() - self.seconds
+        events = [event for event in list(self._events) if event[0] >= cutoff]
+        if not events:
+            return {"count": 0, "success_rate": None, "p95_ms": None}
+        latencies = sorted(event[2] for event in events if event[2] is not None)
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] if latencies else None
+        return {
+            "count": len(events),
+            "success_rate": round(sum(1 for event in events if event[1]) / len(events), 4),
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+
+
+# AI provider calls, and server errors per API area (route prefix)
+AI_WINDOW = RollingWindow()
+ROUTE_WINDOWS: Dict[str, RollingWindow] = {
+    prefix: RollingWindow() for prefix in ("/v1/tarot", "/v1/horoscope", "/v1/thai", "/v1/ai")
+}
+
+
+def observe_ai_call(model: str, outcome: str, seconds: float, prompt_tokens: int = 0, completion_tokens: int = 0):
+    """One AI provider call ("ok" or "error")."""
+    AI_REQUESTS.inc((model, outcome))
+    AI_LATENCY.observe((model,), seconds)
+    AI_WINDOW.record(outcome == "ok", seconds)
+    if prompt_tokens:
+        AI_TOKENS.inc((model, "prompt"), prompt_tokens)
+    if completion_tokens:
+        AI_TOKENS.inc((model, "completion"), completion_tokens)
+
+
+def route_template(scope: Dict) -> str:
+    route = scope.get("route")
+    return route.path if route is not None else UNMATCHED_ROUTE
+
+
+# ============================================================================
+# COLLECTORS AND SAMPLER
+# ============================================================================
+
+_collectors: List[Callable[[], None]] = []
+
+
+def add_collector(fn: Callable[[], None]):
+    """fn copies existing counts into metrics; run before scrapes and by the sampler."""
+    _collectors.append(fn)
+
+
+def collect():
+    for fn in _collectors:
+        try:
+            fn()
+        except Exception:
+            # A broken collector must not break /metrics
+            pass
+
+
+class Sampler:
+    """Background task: event-loop lag and collectors every `interval` seconds."""
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self.lag_seconds = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lag_seconds = max(0.0, loop.time() - started - self.interval)
+            LOOP_LAG.observe((), self.lag_seconds)
+            collect()
+
+    def start(self):
+        self._task = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+sampler = Sampler(settings.METRICS_SAMPLE_SECONDS)
+
+
+# ============================================================================
+# EXPOSITION
+# ============================================================================
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], label_values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, label_values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _aggregate() -> Dict[SampleKey, float]:
+    """All processes' samples combined per each metric's mode."""
+    modes = {sample: metric.mode for metric in registry for sample in metric.sample_names()}
+    combined: Dict[SampleKey, float] = {}
+    for owner, samples in values.snapshot():
+        alive = None
+        for key, value in samples.items():
+            mode = modes.get(key[0], "sum")
+            if mode != "sum":
+                if alive is None:
+                    alive = _process_alive(owner)
+                if not alive:
+                    continue
+            if mode == "max":
+                combined[key] = max(combined.get(key, value), value)
+            else:
+                combined[key] = combined.get(key, 0.0) + value
+    return combined
+
+
+def render() -> str:
+    """Prometheus text exposition (format 0.0.4) of every registered metric."""
+    collect()
+    combined = _aggregate()
+    by_sample: Dict[str, List[Tuple[Tuple[str, ...], float]]] = {}
+    for (sample, label_values), value in combined.items():
+        by_sample.setdefault(sample, []).append((label_values, value))
+
+    lines: List[str] = []
+    for metric in registry:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        if isinstance(metric, Histogram):
+            lines.extend(_histogram_lines(metric, by_sample))
+            continue
+        for label_values, value in sorted(by_sample.get(metric.name, [])):
+            lines.append(f"{metric.name}{_labels(metric.labelnames, label_values)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(metric: Histogram, by_sample: Dict) -> List[str]:
+    buckets: Dict[Tuple[str, ...], Dict[str, float]] = {}
+    for label_values, value in by_sample.get(f"{metric.name}_bucket", []):
+        buckets.setdefault(label_values[:-1], {})[label_values[-1]] = value
+    sums = dict(by_sample.get(f"{metric.name}_sum", []))
+    counts = dict(by_sample.get(f"{metric.name}_count", []))
+
+    lines = []
+    names = metric.labelnames + ("le",)
+    for label_values in sorted(counts):
+        cumulative = 0.0
+        for le in metric._le:
+            cumulative += buckets.get(label_values, {}).get(le, 0.0)
+            lines.append(f"{metric.name}_bucket{_labels(names, label_values + (le,))} {_number(cumulative)}")
+        labels = _labels(metric.labelnames, label_values)
+        lines.append(f"{metric.name}_sum{labels} {_number(sums.get(label_values, 0.0))}")
+        lines.append(f"{metric.name}_count{labels} {_number(counts[label_values])}")
+    return lines
+
+
+# ============================================================================
+# MIDDLEWARE
+# ============================================================================
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: request count, latency and in-progress gauge per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = "500"
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc((), 1.0)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_PROGRESS.inc((), -1.0)
+            method = scope.get("method", "")
+            route = route_template(scope)
+            HTTP_REQUESTS.inc((method, route, status))
+            elapsed = time.perf_counter() - started
+            HTTP_LATENCY.observe((method, route), elapsed)
+            for prefix, window in ROUTE_WINDOWS.items():
+                if route.startswith(prefix):
+                    window.record(status[0] != "5", elapsed)
+                    break
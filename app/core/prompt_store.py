@@ -0,0 +1,285 @@
+"""
+Persistent Prompt Store
+AI texts on disk (SQLite, WAL mode), keyed by the hash of the canonical prompt
+
+Every AI call goes through interpret(): the two-tier cache first, then
+this store, and only then the model. Texts survive restarts, so a fresh
+deploy answers repeated prompts without calling Gemini. Writes and usage
+counts are buffered in memory and flushed in batches by a background
+task, off the request path. The table is bounded (least recently used
+rows are evicted), and startup warms the cache L1 with the most-used
+texts. The same database holds the leases that elect one worker to run
+the scheduled AI jobs.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.core import timing
+from app.core.ai_client import AI_ERROR_PREFIX, DEFAULT_MODEL, generate_interpretation
+from app.core.cache import cache
+from app.core.config import settings
+
+# Buffered writes are flushed this often, or sooner once this many are pending
+FLUSH_INTERVAL_SECONDS = 1.0
+FLUSH_BATCH_SIZE = 256
+
+
+def prompt_key(prompt: str, system_instruction: Optional[str] = None, model_name: str = DEFAULT_MODEL) -> str:
+    """SHA-256 of the canonical (model, system instruction, prompt) triple."""
+    canonical = json.dumps([model_name, system_instruction or "", prompt.strip()], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class PromptStore:
+    """SQLite table of AI texts with buffered writes and LRU eviction."""
+
+    def __init__(self, path: str, max_entries: int = 100000):
+        self.path = path
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # Not yet flushed: new texts, and uses per key since the last flush
+        self._pending: Dict[str, Tuple[str, float]] = {}
+        self._uses: Dict[str, int] = {}
+        # Being written by the current flush (still readable meanwhile)
+        self._flushing: Dict[str, Tuple[str, float]] = {}
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.disk_hits = 0
+        self.disk_misses = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.evicted = 0
+        # Rows on disk, kept by the writer so stats() never queries (None until opened)
+        self.size: Optional[int] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Opened on first use (call with the lock held)."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS prompts ("
+                "key TEXT PRIMARY KEY, text TEXT NOT NULL, created REAL NOT NULL, "
+                "last_used REAL NOT NULL, uses INTEGER NOT NULL DEFAULT 0)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS prompts_last_used ON prompts (last_used)")
+            conn.execute("CREATE INDEX IF NOT EXISTS prompts_uses ON prompts (uses)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, holder TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            self.size = conn.execute("SELECT COUNT(*) FROM prompts").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    # ------------------------------------------------------------------ reads
+
+    def _read(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection().execute("SELECT text FROM prompts WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    async def get(self, key: str) -> Optional[str]:
+        pending = self._pending.get(key) or self._flushing.get(key)
+        if pending is not None:
+            return pending[0]
+        with timing.span("prompt_store"):
+            text = await asyncio.to_thread(self._read, key)
+        if text is None:
+            self.disk_misses += 1
+        else:
+            self.disk_hits += 1
+        return text
+
+    def most_used(self, limit: int) -> List[Tuple[str, str]]:
+        """(key, text) of the most-used entries, most used first."""
+        with self._lock:
+            return self._connection().execute(
+                "SELECT key, text FROM prompts ORDER BY uses DESC, last_used DESC LIMIT ?", (limit,)
+            ).fetchall()
+
+    # ----------------------------------------------------------------- writes
+
+    @property
+    def pending_writes(self) -> int:
+        return len(self._pending)
+
+    def put(self, key: str, text: str):
+        """Buffer a new text; the writer task persists it."""
+        self._pending[key] = (text, time.time())
+        if len(self._pending) >= FLUSH_BATCH_SIZE and self._wake is not None:
+            self._wake.set()
+
+    def touch(self, key: str):
+        """Count one use of a key (for eviction and warmup order)."""
+        self._uses[key] = self._uses.get(key, 0) + 1
+
+    def _write(self, pending: Dict[str, Tuple[str, float]], uses: Dict[str, int]):
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(
+                    "INSERT INTO prompts (key, text, created, last_used) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET text = excluded.text",
+                    [(key, text, created, created) for key, (text, created) in pending.items()]
+                )
+                conn.executemany(
+                    "UPDATE prompts SET uses = uses + ?, last_used = ? WHERE key = ?",
+                    [(count, now, key) for key, count in uses.items()]
+                )
+                size = conn.execute("SELECT COUNT(*) FROM prompts").fetchone()[0]
+                excess = size - self.max_entries
+                if excess > 0:
+                    conn.execute(
+                        "DELETE FROM prompts WHERE key IN (SELECT key FROM prompts ORDER BY last_used LIMIT ?)",
+                        (excess,)
+                    )
+                    size -= excess
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            self.size = size
+            if excess > 0:
+                self.evicted += excess
+
+    async def flush(self):
+        """Persist everything buffered so far (one transaction)."""
+        if not self._pending and not self._uses:
+            return
+        pending, self._pending = self._pending, {}
+        uses, self._uses = self._uses, {}
+        self._flushing = pending
+        try:
+            await asyncio.to_thread(self._write, pending, uses)
+            self.flushes += 1
+        except Exception:
+            # Keep the texts for the next attempt (newer ones win)
+            self.flush_errors += 1
+            self._pending = {**pending, **self._pending}
+            for key, count in uses.items():
+                self._uses[key] = self._uses.get(key, 0) + count
+        finally:
+            self._flushing = {}
+
+    async def run_writer(self):
+        """Background task: flush every FLUSH_INTERVAL_SECONDS or when a batch fills."""
+        self._wake = asyncio.Event()
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), FLUSH_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def start(self):
+        self._task = asyncio.create_task(self.run_writer())
+
+    async def stop(self):
+        """Stop the writer and flush what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ----------------------------------------------------------------- leases
+
+    def _acquire_lease(self, name: str, holder: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT INTO leases (name, holder, expires) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET holder = excluded.holder, expires = excluded.expires "
+                    "WHERE leases.holder = excluded.holder OR leases.expires < ?",
+                    (name, holder, now + ttl, now)
+                )
+                row = conn.execute("SELECT holder FROM leases WHERE name = ?", (name,)).fetchone()
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return row is not None and row[0] == holder
+
+    def _release_lease(self, name: str, holder: str):
+        with self._lock:
+            self._connection().execute("DELETE FROM leases WHERE name = ? AND holder = ?", (name, holder))
+
+    async def acquire_lease(self, name: str, holder: str, ttl: float) -> bool:
+        """
+        Take or renew a named lease shared by every worker using this store.
+
+        Returns:
+            True while holder owns it (until ttl seconds without a renewal)
+        """
+        return await asyncio.to_thread(self._acquire_lease, name, holder, ttl)
+
+    async def release_lease(self, name: str, holder: str):
+        """Give the lease up so another worker can take it right away."""
+        await asyncio.to_thread(self._release_lease, name, holder)
+
+    def warm(self, limit: int) -> int:
+        """Put the most-used texts into the cache L1; returns how many."""
+        entries = self.most_used(limit)
+        for key, text in entries:
+            cache.warm("ai", key, text)
+        return len(entries)
+
+    def stats(self) -> Dict:
+        """Counters only: runs on the event loop, so no database access."""
+        return {
+            "size": self.size,
+            "max_entries": self.max_entries,
+            "pending_writes": self.pending_writes,
+            "disk_hits": self.disk_hits,
+            "disk_misses": self.disk_misses,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "evicted": self.evicted,
+        }
+
+
+prompt_store = PromptStore(settings.PROMPT_STORE_PATH, settings.PROMPT_STORE_MAX_ENTRIES)
+
+
+async def interpret(prompt: str, system_instruction: Optional[str] = None) -> str:
+    """
+    AI text for a prompt: cache, then the persistent store, then the model.
+
+    Error texts (AI_ERROR_PREFIX) are returned but never stored.
+    """
+    key = prompt_key(prompt, system_instruction)
+    prompt_store.touch(key)
+
+    async def load() -> str:
+        text = await prompt_store.get(key)
+        if text is None:
+            text = await generate_interpretation(prompt, system_instruction=system_instruction)
+            if not text.startswith(AI_ERROR_PREFIX):
+                prompt_store.put(key, text)
+        return text
+
+    return await cache.get_or_load("ai", key, load)
+
+
+async def stored_interpretation(prompt: str, system_instruction: Optional[str] = None) -> Optional[str]:
+    """AI text for a prompt if one is stored already; never calls the model."""
+    return await prompt_store.get(prompt_key(prompt, system_instruction))
@@ -5,6 +5,8 @@ Personas and prompt builders for fortune interpretation
 
 from typing import List, Optional, Dict
 
+from app.core.timing import timed
+
 # ============================================================================
 # PERSONA PROMPTS
 # ============================================================================
@@ -47,6 +49,24 @@ THAI_FORTUNE_PROMPT = """คุณเป็นผู้เชี่ยวชา
 ตัวอย่างรูปแบบคำตอบ:
 ปีมะเมียธาตุไฟผสานกับวันอังคารซึ่งเป็นดาวแห่งพลัง ทำให้เป็นคนมีความมุ่งมั่นสูง การงานปีนี้มีโอกาสก้าวหน้า แต่ควรระวังการใช้จ่ายในช่วงกลางปี ความรักราบรื่น สุขภาพควรออกกำลังกายสม่ำเสมอ"""
 
+YEARLY_FORECAST_PROMPT = """คุณเป็นผู้เชี่ยวชาญด้านโหราศาสตร์ไทย ทำนายดวงรายปี
+
+หลักการตอบ:
+- ตอบเป็นภาษาที่ระบุในคำขอ (ไทยหรืออังกฤษ)
+- ไม่ใช้คำเรียกแทนตัวเอง ไม่ใช้ emoji
+- ทำนายจากความสัมพันธ์ของปีนักษัตร ธาตุ และวันอธิบดีของปีกับดวงเดิม
+- ครอบคลุม: การงาน การเงิน ความรัก สุขภาพ และคำแนะนำเสริมดวง
+- ความยาว 150-200 คำ"""
+
+DAILY_HOROSCOPE_PROMPT = """คุณเป็นนักโหราศาสตร์ เขียนดวงรายวัน
+
+หลักการตอบ:
+- ตอบเป็นภาษาที่ระบุในคำขอ (ไทยหรืออังกฤษ)
+- ไม่ใช้คำเรียกแทนตัวเอง ไม่ใช้ emoji
+- ทำนายจากข้อมูลของวันที่ให้มาเท่านั้น
+- ครอบคลุม: การงาน การเงิน ความรัก และคำแนะนำสั้นๆ
+- ความยาว 60-90 คำ"""
+
 WESTERN_ASTROLOGER_PROMPT = """You are an experienced Western astrologer.
 
 Guidelines:
@@ -61,6 +81,7 @@ Guidelines:
 # PROMPT BUILDERS
 # ============================================================================
 
+@timed("prompt")
 def build_tarot_prompt(
     cards: List[Dict],
     question: Optional[str] = None,
@@ -107,6 +128,7 @@ Spread type: {spread_type}
     return prompt
 
 
+@timed("prompt")
 def build_thai_prompt(
     birth_data: Dict,
     question: Optional[str] = None
@@ -139,6 +161,7 @@ def build_thai_prompt(
     return prompt
 
 
+@timed("prompt")
 def build_natal_prompt(
     natal_data: Dict,
     question: Optional[str] = None,
@@ -171,3 +194,77 @@ Chart data:
         prompt += f"\nQuestion: {question}"
     
     return prompt
+
+
+@timed("prompt")
+def build_yearly_prompt(forecast: Dict, lang: str = "th") -> str:
+    """Build prompt for a yearly forecast (from yearly.yearly_forecast)."""
+    animal = forecast["person_year_animal"]
+    day = forecast["person_birth_day"]
+    year_animal = forecast["year_animal"]
+    relations = forecast["relations"]
+    
+    if lang == "th":
+        return f"""กรุณาทำนายดวงประจำปี พ.ศ. {forecast['thai_year']} เป็นภาษาไทย
+
+ข้อมูลปี:
+- ปีนักษัตร: {year_animal['name_th']} {forecast['element_th']}
+- วันอธิบดี (วันขึ้น 1 ค่ำ เดือน 5): {forecast['ruling_day']['name_th']}
+
+ข้อมูลเจ้าของดวง:
+- ปีนักษัตร: {animal['name_th']} ({animal['element_th']})
+- วันเกิด: {day['name_th']}
+
+ความสัมพันธ์:
+- ปีนักษัตร: {relations['year_animal']['label_th']}
+- ธาตุ: {relations['element']['label_th']}
+- วันอธิบดีเป็น{relations['ruling_day']['label_th']}ของวันเกิด
+"""
+    return f"""Please write the yearly forecast for {forecast['year']} in English.
+
+The year:
+- Animal: {year_animal['animal_en']}, element {forecast['element']}
+- Ruling day (first day of the 5th lunar month): {forecast['ruling_day']['name_en']}
+
+The person:
+- Year animal: {animal['animal_en']} ({animal['element']})
+- Birth day: {day['name_en']}
+
+Relations:
+- Year animal: {relations['year_animal']['label_en']}
+- Element: {relations['element']['label_en']}
+- The ruling day is the person's {relations['ruling_day']['label_en']} day
+"""
+
+
+@timed("prompt")
+def build_daily_prompt(daily: Dict, lang: str = "th") -> str:
+    """Build prompt for a daily horoscope (from daily.western_daily / daily.thai_daily)."""
+    if "sign" in daily:
+        if lang == "th":
+            retrograde = ", ".join(daily["retrograde"]) or "ไม่มี"
+            return f"""กรุณาเขียนดวงประจำวันที่ {daily['date']} ของ{daily['sign']['name_th']} เป็นภาษาไทย
+
+- ดวงจันทร์อยู่{daily['moon_sign']['name_th']} ({daily['aspect_th']})
+- ดาวถอยหลัง: {retrograde}
+"""
+        retrograde = ", ".join(daily["retrograde"]) or "none"
+        return f"""Please write the daily horoscope for {daily['sign']['name_en']} on {daily['date']} in English.
+
+- The Moon is in {daily['moon_sign']['name_en']} ({daily['aspect_en']})
+- Retrograde planets: {retrograde}
+"""
+    
+    if lang == "th":
+        holy_day = "\n- วันนี้เป็นวันพระ" if daily["holy_day"] else ""
+        return f"""กรุณาเขียนดวงประจำวันที่ {daily['date']} ของผู้เกิด{daily['birth_day']['name_th']} เป็นภาษาไทย
+
+- วันนี้ ({daily['weekday']['name_th']}) เป็นวัน{daily['role_th']}ของผู้เกิด{daily['birth_day']['name_th']} (ทักษา)
+- สีมงคล: {daily['lucky_color_th']}{holy_day}
+"""
+    holy_day = "\n- It is a Buddhist holy day (วันพระ)" if daily["holy_day"] else ""
+    return f"""Please write the daily Thai horoscope for people born on {daily['birth_day']['name_en']}, for {daily['date']}, in English.
+
+- Today ({daily['weekday']['name_en']}) is their {daily['role_en']} day in the Thai taksa wheel
+- Lucky color: {daily['lucky_color']}{holy_day}
+"""
@@ -0,0 +1,121 @@
+"""
+Thai Reading Templates
+Pre-encoded JSON fragments for /v1/thai/reading
+
+A reading depends only on a handful of ids (year animal, birth day,
+lagna) plus the echoed inputs, the lunar date and the sidereal lagna
+degree. Every id combination is rendered once through the response
+models into JSON bytes, so a request only resolves its ids and joins
+cached fragments. The bytes are identical to what FastAPI would emit
+for ThaiReadingResponse.
+"""
+
+import json
+import threading
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from app.engines.thai_astrology import (
+    THAI_BIRTH_DAYS,
+    THAI_LAGNA,
+    THAI_YEAR_ANIMALS,
+    ReadingCore,
+    lunar_date_dict,
+    reading_summary
+)
+from app.models.thai_astrology_models import ThaiBirthDay, ThaiLagna, ThaiLunarDate, ThaiYearAnimal
+
+# Distinct birth dates whose lunar-date fragment is kept
+LUNAR_FRAGMENT_CACHE_SIZE = 65536
+
+NO_LAGNA = len(THAI_LAGNA)
+
+
+def dumps(value) -> bytes:
+    """Encode exactly like Starlette's JSONResponse."""
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+class ReadingTemplates:
+    """All fragments of every reading, indexed by ids."""
+
+    def __init__(self):
+        # (animal, day) -> ',"year_animal":{...},"birth_day":{...},"lagna":'
+        self.heads: List[List[bytes]] = [
+            [
+                b',"year_animal":' + dumps(ThaiYearAnimal(**animal).model_dump(mode="json"))
+                + b',"birth_day":' + dumps(ThaiBirthDay(**day).model_dump(mode="json"))
+                + b',"lagna":'
+                for day in THAI_BIRTH_DAYS
+            ]
+            for animal in THAI_YEAR_ANIMALS
+        ]
+
+        # lagna id -> simplified lagna object; the sidereal prefix stops before the degree
+        self.lagnas: List[bytes] = [
+            dumps(ThaiLagna(**lagna).model_dump(mode="json")) for lagna in THAI_LAGNA
+        ] + [b"null"]
+        self.sidereal_prefixes: List[bytes] = []
+        for lagna in THAI_LAGNA:
+            encoded = dumps(ThaiLagna(**lagna, degree=0.0).model_dump(mode="json"))
+            self.sidereal_prefixes.append(encoded[:encoded.rindex(b"0.0}")])
+
+        # (animal, day, lagna or NO_LAGNA) -> ',"summary_th":"..."}'
+        self.tails: List[List[List[bytes]]] = [
+            [
+                [
+                    b',"summary_th":' + dumps(reading_summary(a, d, None if l == NO_LAGNA else l)) + b"}"
+                    for l in range(NO_LAGNA + 1)
+                ]
+                for d in range(len(THAI_BIRTH_DAYS))
+            ]
+            for a in range(len(THAI_YEAR_ANIMALS))
+        ]
+
+        self.methods = {
+            None: b',"lagna_method":null,"lunar_date":',
+            "simplified": b',"lagna_method":"simplified","lunar_date":',
+            "sidereal": b',"lagna_method":"sidereal","lunar_date":',
+        }
+
+    def render(self, birth_date: str, birth_time: Optional[str], core: ReadingCore) -> bytes:
+        """Full ThaiReadingResponse JSON for one reading."""
+        if core.lagna_method == "sidereal":
+            lagna = self.sidereal_prefixes[core.lagna] + repr(core.lagna_degree).encode() + b"}"
+        else:
+            lagna = self.lagnas[NO_LAGNA if core.lagna is None else core.lagna]
+        return b"".join((
+            b'{"birth_date":', dumps(birth_date),
+            b',"birth_time":', dumps(birth_time),
+            self.heads[core.year_animal][core.birth_day],
+            lagna,
+            self.methods[core.lagna_method],
+            lunar_fragment(birth_date, core.lunar_date) if core.lunar_date else b"null",
+            self.tails[core.year_animal][core.birth_day][NO_LAGNA if core.lagna is None else core.lagna],
+        ))
+
+    def size(self) -> Tuple[int, int]:
+        """(fragment count, total bytes)."""
+        fragments = [b for row in self.heads for b in row]
+        fragments += self.lagnas + self.sidereal_prefixes
+        fragments += [b for plane in self.tails for row in plane for b in row]
+        return len(fragments), sum(len(b) for b in fragments)
+
+
+@lru_cache(maxsize=LUNAR_FRAGMENT_CACHE_SIZE)
+def lunar_fragment(birth_date: str, lunar_date) -> bytes:
+    return dumps(ThaiLunarDate(**lunar_date_dict(birth_date, lunar_date)).model_dump(mode="json"))
+
+
+_templates: Optional[ReadingTemplates] = None
+_templates_lock = threading.Lock()
+
+
+def get_reading_templates() -> ReadingTemplates:
+    """Process-wide templates, built on first use (warmed at startup)."""
+    global _templates
+    if _templates is None:
+        with _templates_lock:
+            if _templates is None:
+                _templates = ReadingTemplates()
+    return _templates
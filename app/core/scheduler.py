@@ -0,0 +1,136 @@
+"""
+Background Scheduler
+Periodic async jobs (interpretation pre-generation etc.) run inside the app's event loop
+
+Every uvicorn worker runs the jobs, since each keeps its own in-memory
+results, but only one of them leads: the worker holding the shared
+lease (renewed every third of its duration) is the one allowed to call
+the AI. The others (followers) run the jobs more often and only pick up
+what the leader has stored. When the leader dies its lease expires and
+another worker takes over.
+"""
+
+import asyncio
+import os
+import socket
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+# (lease name, holder, ttl seconds) -> whether holder has it
+LeaseAcquirer = Callable[[str, str, float], Awaitable[bool]]
+LeaseReleaser = Callable[[str, str], Awaitable[None]]
+
+LEASE_NAME = "scheduler"
+
+
+class Job:
+    """One periodic job and its last-run status."""
+
+    def __init__(self, name: str, fn: Callable[[], Awaitable], every_seconds: float):
+        self.name = name
+        self.fn = fn
+        self.every_seconds = every_seconds
+        self.runs = 0
+        self.failures = 0
+        self.last_run: Optional[str] = None
+        self.last_duration_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_result = None
+
+    async def run_once(self):
+        started = time.perf_counter()
+        try:
+            self.last_result = await self.fn()
+            self.last_error = None
+        except Exception as e:
+            # Keep the loop alive; the error shows in status()
+            self.failures += 1
+            self.last_error = str(e)
+        self.runs += 1
+        self.last_run = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.last_duration_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    def status(self) -> Dict:
+        return {
+            "every_seconds": self.every_seconds,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_run": self.last_run,
+            "last_duration_ms": self.last_duration_ms,
+            "last_error": self.last_error,
+            "last_result": self.last_result,
+        }
+
+
+class Scheduler:
+    """Runs each registered job right away, then every `every_seconds` (sooner on followers)."""
+
+    def __init__(self, lease_seconds: float = 60.0, follower_seconds: float = 300.0):
+        self.jobs: Dict[str, Job] = {}
+        self.lease_seconds = lease_seconds
+        self.follower_seconds = follower_seconds
+        self.holder = f"{socket.gethostname()}:{os.getpid()}"
+        self.leading = False
+        self.lease_errors = 0
+        self._acquire: Optional[LeaseAcquirer] = None
+        self._release: Optional[LeaseReleaser] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def add(self, name: str, fn: Callable[[], Awaitable], every_seconds: float) -> Job:
+        job = Job(name, fn, every_seconds)
+        self.jobs[name] = job
+        return job
+
+    async def elect(self):
+        """Take or renew the lease; without a lease function this worker always leads."""
+        if self._acquire is None:
+            self.leading = True
+            return
+        try:
+            self.leading = await self._acquire(LEASE_NAME, self.holder, self.lease_seconds)
+        except Exception:
+            # Unknown state: stop calling the AI until the lease is confirmed again
+            self.lease_errors += 1
+            self.leading = False
+
+    async def _run_election(self):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            await self.elect()
+
+    async def _run_job(self, job: Job):
+        while True:
+            await job.run_once()
+            await asyncio.sleep(job.every_seconds if self.leading else min(job.every_seconds, self.follower_seconds))
+
+    async def start(self, acquire: Optional[LeaseAcquirer] = None, release: Optional[LeaseReleaser] = None):
+        """Elect a leader, then start every job as a task of the running event loop."""
+        self._acquire, self._release = acquire, release
+        await self.elect()
+        self._tasks = [asyncio.create_task(self._run_election())]
+        self._tasks += [asyncio.create_task(self._run_job(job)) for job in self.jobs.values()]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        if self.leading and self._release is not None:
+            try:
+                await self._release(LEASE_NAME, self.holder)
+            except Exception:
+                pass
+        self.leading = False
+
+    def status(self) -> Dict:
+        return {
+            "leading": self.leading,
+            "holder": self.holder,
+            "lease_errors": self.lease_errors,
+            "jobs": {name: job.status() for name, job in self.jobs.items()},
+        }
+
+
+scheduler = Scheduler(settings.SCHEDULER_LEASE_SECONDS, settings.SCHEDULER_FOLLOWER_SECONDS)
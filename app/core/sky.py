@@ -0,0 +1,63 @@
+"""
+Current Sky Snapshot
+Positions of all planets "now", recomputed in the background and shared by every request
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional, Tuple
+
+from app.engines.astrology import calculate_planet_positions, datetime_to_jd
+
+# How often the background task recomputes the snapshot
+SKY_REFRESH_SECONDS = 60
+
+# A snapshot older than this is reported as stale (refresh task stalled)
+SKY_STALE_SECONDS = 3 * SKY_REFRESH_SECONDS
+
+
+class SkySnapshot(NamedTuple):
+    """Immutable planet positions at one instant."""
+    computed_at: datetime
+    jd: float
+    planets: Tuple[Mapping, ...]
+
+
+_snapshot: Optional[SkySnapshot] = None
+
+
+def compute_sky(now: Optional[datetime] = None) -> SkySnapshot:
+    """Compute a snapshot for now (UTC) without publishing it."""
+    now = now or datetime.now(timezone.utc)
+    jd = datetime_to_jd(now.replace(tzinfo=None))
+    planets = tuple(MappingProxyType(p) for p in calculate_planet_positions(jd))
+    return SkySnapshot(computed_at=now, jd=jd, planets=planets)
+
+
+def refresh_sky() -> SkySnapshot:
+    """Recompute and publish the snapshot (a single reference swap)."""
+    global _snapshot
+    _snapshot = compute_sky()
+    return _snapshot
+
+
+def get_sky() -> SkySnapshot:
+    """Latest published snapshot; computed on the spot if none exists yet."""
+    return _snapshot or refresh_sky()
+
+
+def sky_age_seconds(snapshot: SkySnapshot) -> float:
+    """Seconds since the snapshot was computed."""
+    return (datetime.now(timezone.utc) - snapshot.computed_at).total_seconds()
+
+
+async def run_sky_refresher():
+    """Background task: publish a fresh snapshot every SKY_REFRESH_SECONDS."""
+    while True:
+        await asyncio.sleep(SKY_REFRESH_SECONDS)
+        try:
+            refresh_sky()
+        except Exception:
+            # Keep serving the previous snapshot; staleness shows in responses
+            continue
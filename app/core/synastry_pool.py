@@ -0,0 +1,165 @@
+"""
+Synastry Pool
+Candidate charts of each owner on disk (SQLite, WAL mode), shared by every worker
+
+Each signed-in owner has their own pool of up to SYNASTRY_POOL_MAX_PER_OWNER
+charts, stored as packed body longitudes. Ids are unique per owner: adding
+one that exists is refused rather than silently replacing the chart.
+Ranking reads the owner's pool and scores it in a compute worker
+(rank_owner_pool), off the event loop.
+"""
+
+import os
+import sqlite3
+import threading
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.engines.aspects import pack_longitudes, rank_packed
+from app.engines.astrology import birth_longitudes
+
+# Largest SQLite "IN (...)" list per query when checking ids
+ID_CHECK_BATCH = 500
+
+
+class CandidateExistsError(ValueError):
+    """Some of the ids are already in the owner's pool."""
+
+    def __init__(self, ids: Sequence[str]):
+        self.ids = list(ids)
+        shown = ", ".join(self.ids[:10]) + (", ..." if len(self.ids) > 10 else "")
+        super().__init__(f"Candidate ids already in the pool: {shown}")
+
+
+class PoolFullError(ValueError):
+    """Adding the candidates would take the pool past its size limit."""
+
+
+class SynastryPool:
+    """SQLite table of candidate charts keyed by (owner, id)."""
+
+    def __init__(self, path: str, max_per_owner: int = 100000):
+        self.path = path
+        self.max_per_owner = max_per_owner
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Opened on first use (call with the lock held)."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS candidates ("
+                "owner TEXT NOT NULL, id TEXT NOT NULL, longitudes BLOB NOT NULL, "
+                "PRIMARY KEY (owner, id))"
+            )
+            self._conn = conn
+        return self._conn
+
+    def add(self, owner: str, candidates: Sequence[Tuple[str, Sequence[float]]]) -> int:
+        """
+        Store new candidates of an owner, all or none.
+
+        Args:
+            owner: User the pool belongs to
+            candidates: (id, body longitudes) pairs
+
+        Returns:
+            Pool size after the insert
+
+        Raises:
+            CandidateExistsError: An id is repeated or already stored
+            PoolFullError: The pool would exceed max_per_owner
+        """
+        ids = [candidate_id for candidate_id, _ in candidates]
+        seen, repeated = set(), []
+        for candidate_id in ids:
+            if candidate_id in seen:
+                repeated.append(candidate_id)
+            seen.add(candidate_id)
+        if repeated:
+            raise CandidateExistsError(repeated)
+        rows = [(owner, candidate_id, pack_longitudes(lons)) for candidate_id, lons in candidates]
+
+        with self._lock:
+            conn = self._connection()
+            # IMMEDIATE: the size and id checks hold until the commit, across processes
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                existing = []
+                for i in range(0, len(ids), ID_CHECK_BATCH):
+                    batch = ids[i:i + ID_CHECK_BATCH]
+                    existing += [row[0] for row in conn.execute(
+                        f"SELECT id FROM candidates WHERE owner = ? AND id IN ({','.join('?' * len(batch))})",
+                        (owner, *batch)
+                    )]
+                if existing:
+                    raise CandidateExistsError(existing)
+                size = conn.execute("SELECT COUNT(*) FROM candidates WHERE owner = ?", (owner,)).fetchone()[0]
+                if size + len(rows) > self.max_per_owner:
+                    raise PoolFullError(
+                        f"The pool holds {size} charts; adding {len(rows)} would exceed the limit of {self.max_per_owner}"
+                    )
+                conn.executemany("INSERT INTO candidates (owner, id, longitudes) VALUES (?, ?, ?)", rows)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return size + len(rows)
+
+    def load(self, owner: str) -> Tuple[List[str], array]:
+        """Ids and packed longitudes (row after row) of an owner's pool."""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT id, longitudes FROM candidates WHERE owner = ? ORDER BY rowid", (owner,)
+            ).fetchall()
+        packed = array("f")
+        for _, longitudes in rows:
+            packed.frombytes(longitudes)
+        return [row[0] for row in rows], packed
+
+    def size(self, owner: str) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM candidates WHERE owner = ?", (owner,)).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+synastry_pool = SynastryPool(settings.SYNASTRY_POOL_PATH, settings.SYNASTRY_POOL_MAX_PER_OWNER)
+
+# Worker side: one connection per database file and process
+_worker_pools: Dict[str, SynastryPool] = {}
+
+
+def rank_owner_pool(
+    path: str,
+    owner: str,
+    birth_date: str,
+    birth_time: str,
+    timezone_offset: str,
+    top_k: int,
+    orbs: Optional[Dict[str, float]] = None,
+) -> Tuple[int, List[Tuple[str, float]]]:
+    """
+    Rank an owner's pool against one birth moment (runs in a compute worker).
+
+    Args:
+        path: Database of the pool (the caller's, as workers do not share its objects)
+
+    Returns:
+        Pool size and the top_k (candidate_id, score), best first
+    """
+    pool = _worker_pools.get(path)
+    if pool is None:
+        pool = _worker_pools[path] = SynastryPool(path)
+    lons = birth_longitudes(birth_date, birth_time, timezone_offset)
+    ids, packed = pool.load(owner)
+    return len(ids), rank_packed(ids, packed, lons, top_k, orbs)
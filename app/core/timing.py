@@ -0,0 +1,230 @@
+"""
+Request Timing
+Per-request phase durations, sent as a Server-Timing header and kept as per-route histograms
+
+TimingMiddleware starts a RequestTimings for every HTTP request; code on
+the request path adds phases with span() / timed() / record(), all
+measured with perf_counter_ns. When the response starts, the phases (and
+the total so far) go out in the Server-Timing header; when it ends, each
+phase is added to the (route, phase) histogram. Outside a request, or
+with TIMING_ENABLED=false, span() and record() do nothing and timed()
+returns the function undecorated.
+"""
+
+import functools
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter_ns
+from typing import Callable, Dict, Optional
+
+from app.core.config import settings
+
+ENABLED = settings.TIMING_ENABLED
+
+# Histogram bucket upper bounds (ms); the last bucket is unbounded
+BUCKETS_MS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+_BUCKETS_NS = [int(ms * 1_000_000) for ms in BUCKETS_MS]
+
+# Requests that match no route share one label (keeps the histogram bounded)
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestTimings:
+    """Phase durations (ns) of one request; a phase seen twice adds up."""
+
+    __slots__ = ("started_ns", "phases")
+
+    def __init__(self):
+        self.started_ns = perf_counter_ns()
+        self.phases: Dict[str, int] = {}
+
+    def add(self, name: str, ns: int):
+        self.phases[name] = self.phases.get(name, 0) + ns
+
+    def header(self, total_ns: int) -> bytes:
+        parts = [f"{name};dur={ns / 1e6:.3f}" for name, ns in self.phases.items()]
+        parts.append(f"total;dur={total_ns / 1e6:.3f}")
+        return ", ".join(parts).encode("latin-1")
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+# ============================================================================
+# SPANS
+# ============================================================================
+
+class _Span:
+    __slots__ = ("timings", "name", "started_ns")
+
+    def __init__(self, timings: RequestTimings, name: str):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.started_ns = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.timings.add(self.name, perf_counter_ns() - self.started_ns)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str):
+    """Context manager timing one phase of the current request."""
+    timings = _current.get()
+    return _NO_SPAN if timings is None else _Span(timings, name)
+
+
+def record(name: str, ns: int):
+    """Add a duration measured elsewhere (e.g. a queue wait) to the current request."""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, ns)
+
+
+def mark(name: str):
+    """Record the time from the start of the request until now (e.g. "validation" at the top of a handler)."""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, perf_counter_ns() - timings.started_ns)
+
+
+def timed(name: str) -> Callable:
+    """Decorator: time every call of a sync function as a phase."""
+    def decorator(fn: Callable) -> Callable:
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            timings = _current.get()
+            if timings is None:
+                return fn(*args, **kwargs)
+            started = perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timings.add(name, perf_counter_ns() - started)
+        return wrapper
+    return decorator
+
+
+# ============================================================================
+# HISTOGRAMS
+# ============================================================================
+
+class Histogram:
+    """Fixed-bucket latency histogram (updated on the event loop only)."""
+
+    __slots__ = ("counts", "count", "sum_ns")
+
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKETS_NS) + 1)
+        self.count = 0
+        self.sum_ns = 0
+
+    def observe(self, ns: int):
+        self.counts[bisect_left(_BUCKETS_NS, ns)] += 1
+        self.count += 1
+        self.sum_ns += ns
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound (ms) of the bucket holding the q-quantile; None when empty or past the last bound."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else None
+        return None
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.sum_ns / self.count / 1e6, 3) if self.count else 0.0,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+        }
+
+
+class TimingStats:
+    """Histograms per route and phase."""
+
+    def __init__(self):
+        self.histograms: Dict[str, Dict[str, Histogram]] = {}
+
+    def observe(self, route: str, timings: RequestTimings, total_ns: int):
+        phases = self.histograms.get(route)
+        if phases is None:
+            phases = self.histograms[route] = {"total": Histogram()}
+        phases["total"].observe(total_ns)
+        for name, ns in timings.phases.items():
+            histogram = phases.get(name)
+            if histogram is None:
+                histogram = phases[name] = Histogram()
+            histogram.observe(ns)
+
+    def stats(self) -> Dict[str, Dict[str, Dict]]:
+        """{route: {phase: summary}}"""
+        return {
+            route: {phase: histogram.summary() for phase, histogram in phases.items()}
+            for route, phases in sorted(self.histograms.items())
+        }
+
+
+timing_stats = TimingStats()
+
+
+def route_label(scope: Dict) -> str:
+    """Route template of a handled request ("/v1/ai/natal"), not the raw path."""
+    method = scope.get("method", "")
+    route = scope.get("route")
+    return f"{method} {route.path}" if route is not None else f"{method} {UNMATCHED_ROUTE}"
+
+
+# ============================================================================
+# MIDDLEWARE
+# ============================================================================
+
+class TimingMiddleware:
+    """Pure ASGI middleware: Server-Timing header and histograms for every HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                header = (b"server-timing", timings.header(perf_counter_ns() - timings.started_ns))
+                message = {**message, "headers": [*message.get("headers", ()), header]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            timing_stats.observe(route_label(scope), timings, perf_counter_ns() - timings.started_ns)
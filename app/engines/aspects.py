@@ -0,0 +1,176 @@
+"""
+Aspect Engine
+Angular relationships between charts and one-to-many synastry ranking
+
+Aspects are found from a difference matrix over plain longitude lists.
+Ranking many candidates never compares charts pairwise: the reference chart
+is first turned into a score profile over quantized longitudes, after which
+each candidate costs one table lookup per planet.
+"""
+
+import heapq
+from array import array
+from operator import add
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# ============================================================================
+# ASPECT DATA
+# ============================================================================
+
+ASPECTS: List[Dict] = [
+    {"name_en": "Conjunction", "name_th": "กุม", "angle": 0.0, "orb": 8.0, "harmony": 1.0},
+    {"name_en": "Sextile", "name_th": "โยค", "angle": 60.0, "orb": 4.0, "harmony": 1.0},
+    {"name_en": "Square", "name_th": "จตุโกณ", "angle": 90.0, "orb": 6.0, "harmony": -1.0},
+    {"name_en": "Trine", "name_th": "ตรีโกณ", "angle": 120.0, "orb": 6.0, "harmony": 1.5},
+    {"name_en": "Opposition", "name_th": "เล็ง", "angle": 180.0, "orb": 8.0, "harmony": -0.5},
+]
+
+# Synastry profiles quantize longitudes to this many bins per degree
+PROFILE_BINS_PER_DEGREE = 4
+PROFILE_SIZE = 360 * PROFILE_BINS_PER_DEGREE
+
+
+def resolve_orbs(orbs: Optional[Dict[str, float]] = None) -> List[float]:
+    """Orb per entry of ASPECTS, with optional overrides by English name."""
+    orbs = {k.lower(): v for k, v in (orbs or {}).items()}
+    return [float(orbs.get(a["name_en"].lower(), a["orb"])) for a in ASPECTS]
+
+
+def separation_matrix(lons_a: Sequence[float], lons_b: Sequence[float]) -> List[List[float]]:
+    """Angular separation (0-180) between every longitude in a and every one in b."""
+    return [[abs((a - b + 180.0) % 360.0 - 180.0) for b in lons_b] for a in lons_a]
+
+
+# ============================================================================
+# ASPECT DETECTION
+# ============================================================================
+
+def find_aspects(
+    lons_a: Sequence[float],
+    lons_b: Sequence[float],
+    orbs: Optional[Dict[str, float]] = None,
+    same_chart: bool = False,
+) -> List[Tuple[int, int, int, float]]:
+    """
+    Find all aspects between two lists of longitudes.
+
+    Args:
+        lons_a: Longitudes of the first chart
+        lons_b: Longitudes of the second chart
+        orbs: Optional orb overrides by aspect name (e.g. {"Trine": 5})
+        same_chart: If lons_a is lons_b, only report each pair once
+
+    Returns:
+        List of (index_a, index_b, aspect_index, deviation from exact)
+    """
+    orb_list = resolve_orbs(orbs)
+    found = []
+    for i, row in enumerate(separation_matrix(lons_a, lons_b)):
+        for j, sep in enumerate(row):
+            if same_chart and j <= i:
+                continue
+            for k, aspect in enumerate(ASPECTS):
+                deviation = abs(sep - aspect["angle"])
+                if deviation <= orb_list[k]:
+                    found.append((i, j, k, deviation))
+                    break
+    return found
+
+
+def describe_aspects(
+    names_a: Sequence[str],
+    names_b: Sequence[str],
+    aspects: Sequence[Tuple[int, int, int, float]],
+) -> List[Dict]:
+    """Turn find_aspects() tuples into response dicts."""
+    return [
+        {
+            "planet_a": names_a[i],
+            "planet_b": names_b[j],
+            "aspect_en": ASPECTS[k]["name_en"],
+            "aspect_th": ASPECTS[k]["name_th"],
+            "angle": ASPECTS[k]["angle"],
+            "orb": round(deviation, 2),
+        }
+        for i, j, k, deviation in aspects
+    ]
+
+
+def aspect_score(sep: float, orb_list: Sequence[float]) -> float:
+    """Harmony score of one separation: strongest when exact, zero outside the orb."""
+    for k, aspect in enumerate(ASPECTS):
+        deviation = abs(sep - aspect["angle"])
+        if deviation <= orb_list[k]:
+            if not orb_list[k]:
+                return aspect["harmony"]
+            return aspect["harmony"] * (1.0 - deviation / orb_list[k])
+    return 0.0
+
+
+# ============================================================================
+# ONE-TO-MANY SYNASTRY
+# ============================================================================
+
+def longitude_bin(longitude: float) -> int:
+    """Quantize a longitude to a profile bin."""
+    return int((longitude % 360.0) * PROFILE_BINS_PER_DEGREE) % PROFILE_SIZE
+
+
+def build_score_profile(lons: Sequence[float], orbs: Optional[Dict[str, float]] = None) -> List[float]:
+    """
+    Total harmony a single planet placed in each bin would have with lons.
+
+    A candidate's synastry score is then the sum of the profile at each of
+    its planets' bins.
+    """
+    orb_list = resolve_orbs(orbs)
+    profile = []
+    for b in range(PROFILE_SIZE):
+        center = (b + 0.5) / PROFILE_BINS_PER_DEGREE
+        profile.append(sum(aspect_score(abs((lon - center + 180.0) % 360.0 - 180.0), orb_list) for lon in lons))
+    return profile
+
+
+def pack_longitudes(lons: Sequence[float]) -> bytes:
+    """Candidate longitudes as stored by the synastry pool (float32 per body)."""
+    return array("f", lons).tobytes()
+
+
+def rank_packed(
+    ids: Sequence[str],
+    packed: array,
+    lons: Sequence[float],
+    top_k: int = 10,
+    orbs: Optional[Dict[str, float]] = None,
+) -> List[Tuple[str, float]]:
+    """
+    Score every candidate against lons and return the top_k.
+
+    Scores come from the reference profile (PROFILE_SIZE quantized bins,
+    a quarter degree each), not an exact difference matrix per candidate,
+    so they can differ from the pairwise sum by a fraction of a degree's orb.
+
+    Args:
+        ids: Candidate ids, in storage order
+        packed: Their longitudes, one row of len(lons) bodies per candidate
+        lons: Longitudes of the reference chart
+        top_k: Number of matches to return
+        orbs: Orb overrides by aspect name
+
+    Returns:
+        List of (candidate_id, score), best first
+    """
+    if not ids:
+        return []
+    bodies = len(lons)
+    if len(packed) != bodies * len(ids):
+        raise ValueError(f"Expected {bodies} longitudes per candidate")
+    lookup = build_score_profile(lons, orbs).__getitem__
+
+    # One column of bins per planet; each candidate costs a lookup per planet
+    scores = [lookup(longitude_bin(lon)) for lon in packed[0::bodies]]
+    for k in range(1, bodies):
+        scores = list(map(add, scores, (lookup(longitude_bin(lon)) for lon in packed[k::bodies])))
+
+    best = heapq.nlargest(top_k, range(len(ids)), key=scores.__getitem__)
+    return [(ids[i], round(scores[i], 3)) for i in best]
@@ -3,10 +3,22 @@ Western Astrology Engine
 Natal chart calculations using pure Python (no external dependencies)
 """
 
-from typing import List, Dict, Tuple, Optional
-from datetime import datetime
+from typing import List, Dict, NamedTuple, Optional, Sequence, Tuple
+from datetime import datetime, timedelta
+from collections import OrderedDict
+from functools import lru_cache
+import threading
 import math
 
+from app.core.config import settings
+from app.engines import ephemeris
+from app.engines.ephemeris import EPHEMERIS_BODIES, EphemerisTable, StationTable
+from app.engines.aspects import find_aspects, describe_aspects
+from app.engines.dates import parse_iso_date, sun_sign_id
+from app.engines.houses import (
+    SiderealFrame, sidereal_frame, ascendant, house_cusps, assign_house
+)
+
 # ============================================================================
 # ZODIAC SIGNS DATA (12 Signs)
 # ============================================================================
@@ -208,6 +220,24 @@ def julian_day(year: int, month: int, day: int, hour: float = 12.0) -> float:
     return jd
 
 
+J2000_DATETIME = datetime(2000, 1, 1, 12, 0)
+
+
+def jd_to_datetime(jd: float) -> datetime:
+    """Convert a Julian Day to a naive UTC datetime."""
+    return J2000_DATETIME + timedelta(days=jd - 2451545.0)
+
+
+def datetime_to_jd(dt: datetime) -> float:
+    """Convert a naive UTC datetime to a Julian Day."""
+    return 2451545.0 + (dt - J2000_DATETIME) / timedelta(days=1)
+
+
+def jd_to_iso(jd: float) -> str:
+    """Format a Julian Day as an ISO 8601 UTC timestamp to the minute."""
+    return (jd_to_datetime(jd) + timedelta(seconds=30)).strftime("%Y-%m-%dT%H:%MZ")
+
+
 def sun_longitude(jd: float) -> float:
     """Calculate Sun's ecliptic longitude (simplified)."""
     # Days since J2000.0
@@ -250,80 +280,450 @@ def moon_longitude(jd: float) -> float:
     return L % 360
 
 
-def calculate_ascendant(jd: float, latitude: float, longitude: float) -> float:
-    """Calculate Ascendant (Rising Sign) - simplified."""
-    # Local Sidereal Time
+def calculate_ascendant(
+    jd: float,
+    latitude: float,
+    longitude: float,
+    frame: Optional[SiderealFrame] = None
+) -> float:
+    """
+    Calculate Ascendant (Rising Sign).
+    
+    Pass a precomputed sidereal frame to reuse GMST/LST/obliquity across
+    the ascendant, midheaven and house cusps of one chart.
+    """
+    frame = frame or sidereal_frame(jd, longitude)
+    return ascendant(frame, latitude)
+
+
+# Keplerian elements at J2000 and their rates per Julian century
+# (JPL "Approximate Positions of the Planets", Table 2a, valid 3000 BC-3000 AD,
+# which covers the whole 1900-2100 ephemeris table):
+# a (AU), e, I, L, longitude of perihelion, longitude of ascending node (degrees)
+ORBITAL_ELEMENTS: Dict[str, Tuple[Tuple[float, ...], Tuple[float, ...]]] = {
+    "Mercury": (
+        (0.38709843, 0.20563661, 7.00559432, 252.25166724, 77.45771895, 48.33961819),
+        (0.00000000, 0.00002123, -0.00590158, 149472.67486623, 0.15940013, -0.12214182),
+    ),
+    "Venus": (
+        (0.72332102, 0.00676399, 3.39777545, 181.97970850, 131.76755713, 76.67261496),
+        (-0.00000026, -0.00005107, 0.00043494, 58517.81560260, 0.05679648, -0.27274174),
+    ),
+    "Earth": (
+        (1.00000018, 0.01673163, -0.00054346, 100.46691572, 102.93005885, -5.11260389),
+        (-0.00000003, -0.00003661, -0.01337178, 35999.37306329, 0.31795260, -0.24123856),
+    ),
+    "Mars": (
+        (1.52371243, 0.09336511, 1.85181869, -4.56813164, -23.91744784, 49.71320984),
+        (0.00000097, 0.00009149, -0.00724757, 19140.29934243, 0.45223625, -0.26852431),
+    ),
+    "Jupiter": (
+        (5.20248019, 0.04853590, 1.29861416, 34.33479152, 14.27495244, 100.29282654),
+        (-0.00002864, 0.00018026, -0.00322699, 3034.90371757, 0.18199196, 0.13024619),
+    ),
+    "Saturn": (
+        (9.54149883, 0.05550825, 2.49424102, 50.07571329, 92.86136063, 113.63998702),
+        (-0.00003065, -0.00032044, 0.00451969, 1222.11494724, 0.54179478, -0.25015002),
+    ),
+}
+
+# Extra mean anomaly terms for the outer planets (JPL Table 2b):
+# M += b*T^2 + c*cos(f*T) + s*sin(f*T)
+MEAN_ANOMALY_TERMS: Dict[str, Tuple[float, float, float, float]] = {
+    "Jupiter": (-0.00012452, 0.06064060, -0.35635438, 38.35125000),
+    "Saturn": (0.00025899, -0.13434469, 0.87320147, 38.35125000),
+}
+
+
+def heliocentric_position(planet: str, T: float) -> Tuple[float, float, float]:
+    """Heliocentric ecliptic (J2000) coordinates in AU from Keplerian elements."""
+    base, rate = ORBITAL_ELEMENTS[planet]
+    a, e, inc, L, peri, node = (base[i] + rate[i] * T for i in range(6))
+    
+    # Mean anomaly and Kepler's equation (Newton iterations)
+    M = L - peri
+    if planet in MEAN_ANOMALY_TERMS:
+        b, c, s, f = MEAN_ANOMALY_TERMS[planet]
+        fT = math.radians(f * T)
+        M += b * T * T + c * math.cos(fT) + s * math.sin(fT)
+    M = math.radians((M + 180) % 360 - 180)
+    E = M + e * math.sin(M)
+    for _ in range(6):
+        E -= (E - e * math.sin(E) - M) / (1 - e * math.cos(E))
+    
+    # Position in the orbital plane
+    xp = a * (math.cos(E) - e)
+    yp = a * math.sqrt(1 - e * e) * math.sin(E)
+    
+    # Rotate to the ecliptic
+    w = math.radians(peri - node)
+    O = math.radians(node)
+    I = math.radians(inc)
+    cw, sw, cO, sO, cI, sI = math.cos(w), math.sin(w), math.cos(O), math.sin(O), math.cos(I), math.sin(I)
+    x = (cw * cO - sw * sO * cI) * xp + (-sw * cO - cw * sO * cI) * yp
+    y = (cw * sO + sw * cO * cI) * xp + (-sw * sO + cw * cO * cI) * yp
+    z = (sw * sI) * xp + (cw * sI) * yp
+    return x, y, z
+
+
+def approximate_planet_longitude(planet: str, jd: float) -> float:
+    """
+    Approximate geocentric planet longitude (arc-minute level).
+    
+    Subtracts Earth's heliocentric position from the planet's, so apparent
+    retrograde motion is reproduced. The J2000 result is precessed to the
+    equinox of date to match the Sun and Moon series.
+    """
+    if planet not in ORBITAL_ELEMENTS:
+        return 0.0
+    
     T = (jd - 2451545.0) / 36525.0
+    px, py, _ = heliocentric_position(planet, T)
+    ex, ey, _ = heliocentric_position("Earth", T)
     
-    # Greenwich Mean Sidereal Time
-    GMST = 280.46061837 + 360.98564736629 * (jd - 2451545.0)
-    GMST = GMST + 0.000387933 * T * T - T * T * T / 38710000.0
+    L = math.degrees(math.atan2(py - ey, px - ex))
     
-    # Local Sidereal Time
-    LST = (GMST + longitude) % 360
+    # General precession in longitude since J2000
+    L += 1.3969713 * T
     
-    # Obliquity of the ecliptic
-    epsilon = 23.4393 - 0.0000004 * (jd - 2451545.0)
+    return L % 360
+
+
+# ============================================================================
+# EPHEMERIS TABLE LOOKUP
+# ============================================================================
+
+# Bump whenever the series above change so stale tables are rebuilt on load
+EPHEMERIS_GENERATOR_ID = "kepler-v2"
+
+
+def series_longitude(body: str, jd: float) -> float:
+    """Longitude of any body computed directly from the series (no table)."""
+    if body == "Sun":
+        return sun_longitude(jd)
+    if body == "Moon":
+        return moon_longitude(jd)
+    return approximate_planet_longitude(body, jd)
+
+
+def ensure_ephemeris(force: bool = False) -> EphemerisTable:
+    """Open the shared ephemeris table, building it first if needed."""
+    if force:
+        ephemeris.build_table(settings.EPHEMERIS_PATH, series_longitude, EPHEMERIS_GENERATOR_ID)
+    return ephemeris.get_table(settings.EPHEMERIS_PATH, series_longitude, EPHEMERIS_GENERATOR_ID)
+
+
+def body_longitudes(jd: float) -> Dict[str, float]:
+    """
+    Longitudes of all bodies at jd.
     
-    # Calculate Ascendant
-    lat_rad = math.radians(latitude)
-    eps_rad = math.radians(epsilon)
-    lst_rad = math.radians(LST)
+    Uses the memory-mapped table inside 1900-2100 and falls back to the
+    series outside of it.
+    """
+    table = ensure_ephemeris()
+    if table.covers(jd):
+        return dict(zip(EPHEMERIS_BODIES, table.longitudes(jd)))
+    return {body: series_longitude(body, jd) for body in EPHEMERIS_BODIES}
+
+
+def body_speeds(jd: float) -> Dict[str, float]:
+    """Longitudinal speeds (degrees/day) of all bodies by finite differences."""
+    table = ensure_ephemeris()
+    if table.covers(jd):
+        return dict(zip(EPHEMERIS_BODIES, table.speeds(jd)))
+    h = ephemeris.STEP_DAYS
+    return {
+        body: ((series_longitude(body, jd + h) - series_longitude(body, jd - h) + 180) % 360 - 180) / (2 * h)
+        for body in EPHEMERIS_BODIES
+    }
+
+
+def body_longitude(body: str, jd: float) -> float:
+    """Longitude of a single body at jd (table lookup with series fallback)."""
+    table = ensure_ephemeris()
+    if table.covers(jd):
+        return table.longitude(EPHEMERIS_BODIES.index(body), jd)
+    return series_longitude(body, jd)
+
+
+# ============================================================================
+# RETROGRADE STATIONS
+# ============================================================================
+
+# Sun and Moon never station; only these bodies appear in the station table
+RETROGRADE_BODIES: List[str] = ["Mercury", "Venus", "Mars", "Jupiter", "Saturn"]
+
+
+def ensure_stations(force: bool = False) -> StationTable:
+    """Open the precomputed retrograde-station table, building it if needed."""
+    table = ensure_ephemeris()
+    if force:
+        ephemeris.build_station_table(
+            settings.STATIONS_PATH, table, series_longitude, EPHEMERIS_GENERATOR_ID, RETROGRADE_BODIES
+        )
+    return ephemeris.get_station_table(
+        settings.STATIONS_PATH, table, series_longitude, EPHEMERIS_GENERATOR_ID, RETROGRADE_BODIES
+    )
+
+
+def get_retrograde_periods(jd_from: float, jd_to: float, bodies: Optional[List[str]] = None) -> List[Dict]:
+    """
+    List retrograde periods overlapping a Julian Day range.
     
-    # Ascendant formula
-    y = -math.cos(lst_rad)
-    x = math.sin(lst_rad) * math.cos(eps_rad) + math.tan(lat_rad) * math.sin(eps_rad)
+    Args:
+        jd_from: Range start (Julian Day)
+        jd_to: Range end (Julian Day)
+        bodies: Planets to include (default: all that can be retrograde)
+        
+    Returns:
+        Periods sorted by station date, each with both station times (UTC)
+        and the sign where the planet turned retrograde
+    """
+    stations = ensure_stations()
+    periods = []
+    
+    for body in bodies or RETROGRADE_BODIES:
+        planet_data = PLANETS[body]
+        for start, end in stations.periods(body, jd_from, jd_to):
+            period = {
+                "planet_en": planet_data["name_en"],
+                "planet_th": planet_data["name_th"],
+                "station_retrograde": jd_to_iso(start) if start else None,
+                "station_direct": jd_to_iso(end) if end else None,
+                "sign_en": None,
+                "sign_th": None,
+                "degree": None
+            }
+            if start:
+                sign, degree = degree_to_sign(body_longitude(body, start))
+                period.update(sign_en=sign["name_en"], sign_th=sign["name_th"], degree=degree)
+            periods.append(period)
+    
+    periods.sort(key=lambda p: p["station_retrograde"] or "")
+    return periods
+
+
+# ============================================================================
+# SIGN INGRESSES (TRANSITS)
+# ============================================================================
+
+# Sampling step per body: small enough that no body can cross two sign
+# boundaries between samples (the Moon moves up to ~15 degrees per day)
+INGRESS_SCAN_STEP: Dict[str, float] = {"Moon": 0.25}
+INGRESS_TOLERANCE_DAYS = 1.0 / 1440
+
+
+def _sign_index(body: str, jd: float) -> int:
+    return int(body_longitude(body, jd) // 30) % 12
+
+
+@lru_cache(maxsize=512)
+def _yearly_ingresses(body: str, year: int) -> Tuple[Tuple[float, int, int], ...]:
+    """
+    All sign ingresses of body during a calendar year (UTC).
     
-    asc = math.degrees(math.atan2(y, x))
-    asc = (asc + 180) % 360
+    Samples the longitude at a fixed step and, whenever the sign changes,
+    bisects the bracket down to one minute. Cached per (body, year).
     
-    return asc
+    Returns:
+        Tuple of (jd, from_sign_id, to_sign_id)
+    """
+    step = INGRESS_SCAN_STEP.get(body, 1.0)
+    jd_end = julian_day(year + 1, 1, 1, 0.0)
+    
+    events = []
+    a = julian_day(year, 1, 1, 0.0)
+    sign_a = _sign_index(body, a)
+    while a < jd_end:
+        b = min(a + step, jd_end)
+        sign_b = _sign_index(body, b)
+        if sign_b != sign_a:
+            lo, hi = a, b
+            while hi - lo > INGRESS_TOLERANCE_DAYS:
+                mid = (lo + hi) / 2
+                if _sign_index(body, mid) == sign_a:
+                    lo = mid
+                else:
+                    hi = mid
+            events.append((hi, sign_a, sign_b))
+        a, sign_a = b, sign_b
+    
+    return tuple(events)
 
 
-def approximate_planet_longitude(planet: str, jd: float) -> float:
-    """Approximate planet longitude (very simplified for demo)."""
-    T = (jd - 2451545.0) / 36525.0
+def find_ingresses(jd_from: float, jd_to: float, bodies: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Find every sign ingress between two Julian Days.
     
-    # Simplified mean longitudes (rough approximations)
-    if planet == "Mercury":
-        L = 252.2509 + 149472.6746 * T
-    elif planet == "Venus":
-        L = 181.9798 + 58517.8156 * T
-    elif planet == "Mars":
-        L = 355.4330 + 19140.2993 * T
-    elif planet == "Jupiter":
-        L = 34.3515 + 3034.9057 * T
-    elif planet == "Saturn":
-        L = 50.0774 + 1222.1138 * T
-    else:
-        L = 0
+    Args:
+        jd_from: Range start (Julian Day)
+        jd_to: Range end (Julian Day)
+        bodies: Bodies to include (default: all PLANETS)
+        
+    Returns:
+        Ingress events sorted by time
+    """
+    first_year = jd_to_datetime(jd_from).year
+    last_year = jd_to_datetime(jd_to).year
+    
+    events = []
+    for body in bodies or list(PLANETS):
+        planet_data = PLANETS[body]
+        for year in range(first_year, last_year + 1):
+            for jd, from_id, to_id in _yearly_ingresses(body, year):
+                if not jd_from <= jd <= jd_to:
+                    continue
+                from_sign = ZODIAC_SIGNS[from_id]
+                to_sign = ZODIAC_SIGNS[to_id]
+                events.append((jd, {
+                    "planet_en": planet_data["name_en"],
+                    "planet_th": planet_data["name_th"],
+                    "time": jd_to_iso(jd),
+                    "from_sign_en": from_sign["name_en"],
+                    "from_sign_th": from_sign["name_th"],
+                    "to_sign_en": to_sign["name_en"],
+                    "to_sign_th": to_sign["name_th"],
+                    # Moving back into the previous sign
+                    "retrograde": (to_id - from_id) % 12 == 11
+                }))
+    
+    events.sort(key=lambda e: e[0])
+    return [event for _, event in events]
+
+
+# ============================================================================
+# PLANET POSITIONS
+# ============================================================================
+
+def _planet_dicts(longitudes: Sequence[float], retrograde: Sequence[bool]) -> List[Dict]:
+    """Planet dicts (sign, degree, retrograde) from longitudes in PLANETS order."""
+    planets = []
+    for planet_data, planet_lon, is_retrograde in zip(PLANETS.values(), longitudes, retrograde):
+        planet_sign, planet_deg = degree_to_sign(planet_lon)
+        
+        planets.append({
+            "planet_en": planet_data["name_en"],
+            "planet_th": planet_data["name_th"],
+            "sign_en": planet_sign["name_en"],
+            "sign_th": planet_sign["name_th"],
+            "degree": planet_deg,
+            "full_degree": round(planet_lon, 2),
+            "house": None,
+            "retrograde": is_retrograde
+        })
     
-    return L % 360
+    return planets
+
+
+def calculate_planet_positions(jd: float) -> List[Dict]:
+    """
+    Positions of all PLANETS at a Julian Day.
+    
+    Returns:
+        One dict per planet (sign, degree, retrograde); house is left None
+    """
+    longitudes = body_longitudes(jd)
+    speeds = body_speeds(jd)
+    return _planet_dicts(
+        [longitudes[name] for name in PLANETS],
+        [speeds[name] < 0 for name in PLANETS]
+    )
+
+
+# ============================================================================
+# NATAL CHART CACHE
+# ============================================================================
+
+# Birth coordinates are rounded to this many decimals (~1 km) before computing
+NATAL_COORD_DECIMALS = 2
+
+
+class CompactChart(NamedTuple):
+    """The numbers a natal chart is rendered from (what the cache stores)."""
+    longitudes: Tuple[float, ...]   # PLANETS order
+    retrograde: Tuple[bool, ...]
+    ascendant: float
+    cusps: Tuple[float, ...]
+
+
+def natal_cache_key(jd: float, latitude: float, longitude: float, house_system: str) -> Tuple[int, float, float, str]:
+    """Normalized key: UTC minute, quantized coordinates and house system."""
+    return (
+        round(jd * 1440),
+        round(latitude, NATAL_COORD_DECIMALS),
+        round(longitude, NATAL_COORD_DECIMALS),
+        house_system.lower()
+    )
+
+
+class NatalChartCache:
+    """
+    Bounded LRU of CompactChart by natal_cache_key().
+    
+    get/put are public so results computed elsewhere (e.g. in a worker
+    process) can be stored by the caller.
+    """
+    
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple, CompactChart]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: Tuple) -> Optional[CompactChart]:
+        with self._lock:
+            chart = self._entries.get(key)
+            if chart is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return chart
+    
+    def put(self, key: Tuple, chart: CompactChart):
+        with self._lock:
+            self._entries[key] = chart
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+    
+    def stats(self) -> Dict:
+        """Size and hit ratio, for health/metrics endpoints."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Shared by /v1/horoscope/natal and /v1/ai/natal
+natal_chart_cache = NatalChartCache(settings.NATAL_CACHE_SIZE)
 
 
 # ============================================================================
 # NATAL CHART CALCULATION
 # ============================================================================
 
-def calculate_natal_chart(
-    birth_date: str,
-    birth_time: str,
-    latitude: float,
-    longitude: float,
-    timezone_offset: str = "+00:00"
-) -> Dict:
+def birth_julian_day(birth_date: str, birth_time: str, timezone_offset: str = "+00:00") -> float:
     """
-    Calculate a natal chart using pure Python.
+    Julian Day (UT) of a local birth date and time.
     
     Args:
         birth_date: Date in YYYY-MM-DD format
         birth_time: Time in HH:MM format (24-hour)
-        latitude: Birth location latitude
-        longitude: Birth location longitude
         timezone_offset: UTC offset (e.g., "+07:00")
-        
-    Returns:
-        Dict containing sun_sign, moon_sign, ascendant, planets, houses
     """
     # Parse date and time
     date_parts = birth_date.split("-")
@@ -345,69 +745,43 @@ def calculate_natal_chart(
     # Convert to UT
     decimal_hour = hour + minute / 60.0 - tz_offset
     
-    # Calculate Julian Day
-    jd = julian_day(year, month, day, decimal_hour)
-    
-    # Calculate Sun position
-    sun_lon = sun_longitude(jd)
-    sun_sign, sun_deg = degree_to_sign(sun_lon)
-    
-    # Calculate Moon position
-    moon_lon = moon_longitude(jd)
-    moon_sign, moon_deg = degree_to_sign(moon_lon)
-    
-    # Calculate Ascendant
-    asc_lon = calculate_ascendant(jd, latitude, longitude)
-    asc_sign, asc_deg = degree_to_sign(asc_lon)
-    
-    # Build planet positions
-    planets = []
+    return julian_day(year, month, day, decimal_hour)
+
+
+def birth_longitudes(birth_date: str, birth_time: str, timezone_offset: str = "+00:00") -> List[float]:
+    """Body longitudes for a local birth moment, in EPHEMERIS_BODIES order."""
+    return list(body_longitudes(birth_julian_day(birth_date, birth_time, timezone_offset)).values())
+
+
+def compute_compact_chart(jd: float, latitude: float, longitude: float, house_system: str = "equal") -> CompactChart:
+    """Compute the numeric chart for a UT Julian Day and location (no cache)."""
+    longitudes = body_longitudes(jd)
+    speeds = body_speeds(jd)
+    
+    # Sidereal time, obliquity and RAMC once for the whole chart
+    frame = sidereal_frame(jd, longitude)
+    
+    return CompactChart(
+        longitudes=tuple(longitudes[name] for name in PLANETS),
+        retrograde=tuple(speeds[name] < 0 for name in PLANETS),
+        ascendant=calculate_ascendant(jd, latitude, longitude, frame),
+        cusps=tuple(house_cusps(frame, latitude, house_system))
+    )
+
+
+def expand_chart(compact: CompactChart) -> Dict:
+    """Render a CompactChart into the natal chart dict."""
+    planets = _planet_dicts(compact.longitudes, compact.retrograde)
+    sun_sign = get_sign_by_name(planets[0]["sign_en"])
+    moon_sign = get_sign_by_name(planets[1]["sign_en"])
+    asc_sign, asc_deg = degree_to_sign(compact.ascendant)
     
-    # Sun
-    planets.append({
-        "planet_en": "Sun",
-        "planet_th": "อาทิตย์",
-        "sign_en": sun_sign["name_en"],
-        "sign_th": sun_sign["name_th"],
-        "degree": sun_deg,
-        "full_degree": round(sun_lon, 2),
-        "house": None,
-        "retrograde": False
-    })
-    
-    # Moon
-    planets.append({
-        "planet_en": "Moon",
-        "planet_th": "จันทร์",
-        "sign_en": moon_sign["name_en"],
-        "sign_th": moon_sign["name_th"],
-        "degree": moon_deg,
-        "full_degree": round(moon_lon, 2),
-        "house": None,
-        "retrograde": False
-    })
-    
-    # Other planets
-    for planet_name in ["Mercury", "Venus", "Mars", "Jupiter", "Saturn"]:
-        planet_lon = approximate_planet_longitude(planet_name, jd)
-        planet_sign, planet_deg = degree_to_sign(planet_lon)
-        planet_data = PLANETS[planet_name]
-        
-        planets.append({
-            "planet_en": planet_data["name_en"],
-            "planet_th": planet_data["name_th"],
-            "sign_en": planet_sign["name_en"],
-            "sign_th": planet_sign["name_th"],
-            "degree": planet_deg,
-            "full_degree": round(planet_lon, 2),
-            "house": None,
-            "retrograde": False
-        })
+    # House placements
+    for planet in planets:
+        planet["house"] = assign_house(planet["full_degree"], compact.cusps)
     
-    # Build house data (simplified - equal house system from Ascendant)
     houses = []
-    for i in range(12):
-        house_lon = (asc_lon + i * 30) % 360
+    for i, house_lon in enumerate(compact.cusps):
         house_sign, house_deg = degree_to_sign(house_lon)
         houses.append({
             "house_number": i + 1,
@@ -416,15 +790,68 @@ def calculate_natal_chart(
             "degree": house_deg
         })
     
+    # Aspects between the chart's own planets
+    longitudes = [p["full_degree"] for p in planets]
+    names = [p["planet_en"] for p in planets]
+    aspects = describe_aspects(names, names, find_aspects(longitudes, longitudes, same_chart=True))
+    
     return {
         "sun_sign": sun_sign,
         "moon_sign": moon_sign,
         "ascendant": asc_sign,
         "planets": planets,
-        "houses": houses
+        "houses": houses,
+        "aspects": aspects
     }
 
 
+def compact_chart_for_key(key: Tuple[int, float, float, str]) -> CompactChart:
+    """Compute the chart a natal_cache_key() stands for."""
+    minute, latitude, longitude, house_system = key
+    return compute_compact_chart(minute / 1440, latitude, longitude, house_system)
+
+
+def cached_compact_chart(jd: float, latitude: float, longitude: float, house_system: str = "equal") -> CompactChart:
+    """
+    CompactChart via natal_chart_cache.
+    
+    Inputs are quantized to the cache key before computing, so a cached
+    chart is exactly what a fresh calculation would return.
+    """
+    key = natal_cache_key(jd, latitude, longitude, house_system)
+    compact = natal_chart_cache.get(key)
+    if compact is None:
+        compact = compact_chart_for_key(key)
+        natal_chart_cache.put(key, compact)
+    return compact
+
+
+def calculate_natal_chart(
+    birth_date: str,
+    birth_time: str,
+    latitude: float,
+    longitude: float,
+    timezone_offset: str = "+00:00",
+    house_system: str = "equal"
+) -> Dict:
+    """
+    Calculate a natal chart using pure Python.
+    
+    Args:
+        birth_date: Date in YYYY-MM-DD format
+        birth_time: Time in HH:MM format (24-hour)
+        latitude: Birth location latitude
+        longitude: Birth location longitude
+        timezone_offset: UTC offset (e.g., "+07:00")
+        house_system: "equal", "placidus" or "koch"
+        
+    Returns:
+        Dict containing sun_sign, moon_sign, ascendant, planets, houses, aspects
+    """
+    jd = birth_julian_day(birth_date, birth_time, timezone_offset)
+    return expand_chart(cached_compact_chart(jd, latitude, longitude, house_system))
+
+
 def get_sun_sign_from_date(birth_date: str) -> Dict:
     """
     Get sun sign from birth date only.
@@ -435,32 +862,5 @@ def get_sun_sign_from_date(birth_date: str) -> Dict:
     Returns:
         Zodiac sign data
     """
-    date = datetime.strptime(birth_date, "%Y-%m-%d")
-    month = date.month
-    day = date.day
-    
-    # Zodiac date ranges
-    if (month == 3 and day >= 21) or (month == 4 and day <= 19):
-        return ZODIAC_SIGNS[0]  # Aries
-    elif (month == 4 and day >= 20) or (month == 5 and day <= 20):
-        return ZODIAC_SIGNS[1]  # Taurus
-    elif (month == 5 and day >= 21) or (month == 6 and day <= 20):
-        return ZODIAC_SIGNS[2]  # Gemini
-    elif (month == 6 and day >= 21) or (month == 7 and day <= 22):
-        return ZODIAC_SIGNS[3]  # Cancer
-    elif (month == 7 and day >= 23) or (month == 8 and day <= 22):
-        return ZODIAC_SIGNS[4]  # Leo
-    elif (month == 8 and day >= 23) or (month == 9 and day <= 22):
-        return ZODIAC_SIGNS[5]  # Virgo
-    elif (month == 9 and day >= 23) or (month == 10 and day <= 22):
-        return ZODIAC_SIGNS[6]  # Libra
-    elif (month == 10 and day >= 23) or (month == 11 and day <= 21):
-        return ZODIAC_SIGNS[7]  # Scorpio
-    elif (month == 11 and day >= 22) or (month == 12 and day <= 21):
-        return ZODIAC_SIGNS[8]  # Sagittarius
-    elif (month == 12 and day >= 22) or (month == 1 and day <= 19):
-        return ZODIAC_SIGNS[9]  # Capricorn
-    elif (month == 1 and day >= 20) or (month == 2 and day <= 18):
-        return ZODIAC_SIGNS[10]  # Aquarius
-    else:
-        return ZODIAC_SIGNS[11]  # Pisces
+    _, month, day = parse_iso_date(birth_date)
+    return ZODIAC_SIGNS[sun_sign_id(month, day)]
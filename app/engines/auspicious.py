@@ -0,0 +1,259 @@
+"""
+Auspicious Dates (ฤกษ์ดี)
+Ranks the days of a date range for a person's birth day and year animal
+
+Rules (weights in the tables below):
+- ทักษา: the weekday's role in the birth day's taksa wheel; กาลกิณี days are excluded
+- จันทรคติ: waxing moon, วันพระ and, for weddings, the traditional even months
+- นักษัตรประจำวัน: the day's animal in the 60-day cycle against the birth
+  year animal; a clash (ชง) is excluded
+
+Each rule is precomputed per Gregorian year as one bitmask per value
+(bit i = day i of the year) and cached, so a query only ORs a few masks
+to drop excluded days and scores the days that remain.
+"""
+
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Tuple
+
+from app.engines.dates import day_number, iso_date, is_leap_year, lookup_date
+from app.engines.thai_astrology import (
+    THAI_BIRTH_DAYS,
+    THAI_YEAR_ANIMALS,
+    ensure_lunar_table,
+    get_lunar_date
+)
+
+# ============================================================================
+# RULE TABLES
+# ============================================================================
+
+# Taksa wheel (ทักษา) in THAI_BIRTH_DAYS ids: Sun, Mon, Tue, Wed, Sat, Thu, Rahu, Fri
+TAKSA_WHEEL: Tuple[int, ...] = (0, 1, 2, 3, 6, 4, 7, 5)
+
+# Roles counted around the wheel from the birth day; the score of a day in that role
+TAKSA_ROLES: Tuple[Tuple[str, str, int], ...] = (
+    ("บริวาร", "Companions", 1),
+    ("อายุ", "Longevity", 1),
+    ("เดช", "Power", 3),
+    ("ศรี", "Fortune", 3),
+    ("มูละ", "Foundation", 1),
+    ("อุตสาหะ", "Diligence", 1),
+    ("มนตรี", "Patronage", 2),
+    ("กาลกิณี", "Misfortune", 0),
+)
+KALAKINI = 7
+
+# Day animal vs. birth year animal (ids into THAI_YEAR_ANIMALS)
+SAME_ANIMAL_SCORE = 2
+TRINE_SCORE = 2         # สามสหาย: animals 4 apart
+HARMONY_SCORE = 3       # คู่มิตร: ids summing to 1 mod 12 (Rat-Ox, Tiger-Pig ...)
+
+WAXING_SCORE = 2
+
+# Extra weights per purpose
+PURPOSES: Dict[str, Dict] = {
+    "general": {
+        "weekdays": {},
+        "months": {},
+        "waxing": 0,
+        "holy_day": 0,
+    },
+    "wedding": {
+        "weekdays": {2: -2, 6: -2},     # ไม่นิยมแต่งวันอังคารและวันเสาร์
+        "months": {2: 2, 4: 2, 6: 2, 8: 2, 9: 2, 12: 2},   # เดือนคู่ and เดือนเก้า
+        "waxing": 1,
+        "holy_day": -1,
+    },
+    "business": {
+        "weekdays": {4: 1, 5: 1},
+        "months": {},
+        "waxing": 2,
+        "holy_day": 0,
+    },
+}
+
+# Longest range scanned per request
+MAX_RANGE_DAYS = 3 * 366
+
+# Gregorian day number -> Julian Day Number
+JDN_OFFSET = 1721425
+
+
+# ============================================================================
+# PER-YEAR MASKS
+# ============================================================================
+
+class YearRules(NamedTuple):
+    """Rule bitmasks and lunar columns for one Gregorian year."""
+    first_day: int              # day number of 1 January
+    days: int
+    weekday: Tuple[int, ...]    # mask per weekday (0 = Sunday)
+    animal: Tuple[int, ...]     # mask per day animal (0 = Rat)
+    month: Tuple[int, ...]      # mask per lunar month (index 1-12)
+    waxing: int                 # ข้างขึ้น
+    holy_day: int               # วันพระ: ขึ้น/แรม 8 ค่ำ, ขึ้น 15 ค่ำ, last day of the month
+
+
+def day_animal(n: int) -> int:
+    """Animal of a day in the 60-day cycle (2000-01-01 was a Horse day)."""
+    return (n + JDN_OFFSET + 49) % 60 % 12
+
+
+@lru_cache(maxsize=64)
+def year_rules(year: int) -> YearRules:
+    """Precompute every rule mask for a year (1900-2100)."""
+    table = ensure_lunar_table()
+    first = day_number(year, 1, 1)
+    days = 366 if is_leap_year(year) else 365
+    if not (table.covers(first) and table.covers(first + days - 1)):
+        raise ValueError("Auspicious dates are available for 1900-2100 only")
+
+    weekday = [0] * 7
+    animal = [0] * 12
+    month = [0] * 13
+    waxing = 0
+    holy_day = 0
+    for i in range(days):
+        n = first + i
+        bit = 1 << i
+        lunar_date = table.to_lunar(n)
+        weekday[n % 7] |= bit
+        animal[day_animal(n)] |= bit
+        month[lunar_date.month] |= bit
+        if lunar_date.day <= 15:
+            waxing |= bit
+        if lunar_date.day in (8, 15, 23) or lunar_date.day == lunar_date.month_days:
+            holy_day |= bit
+    return YearRules(first, days, tuple(weekday), tuple(animal), tuple(month), waxing, holy_day)
+
+
+# ============================================================================
+# SEARCH
+# ============================================================================
+
+def taksa_roles(birth_day: int) -> List[int]:
+    """Taksa role (index into TAKSA_ROLES) of each weekday 0-6 for a birth day 0-7."""
+    start = TAKSA_WHEEL.index(birth_day)
+    roles = [0] * 8
+    for step in range(8):
+        roles[TAKSA_WHEEL[(start + step) % 8]] = step
+    return roles[:7]
+
+
+def animal_score(day: int, birth: int) -> int:
+    if day == birth:
+        return SAME_ANIMAL_SCORE
+    if (day - birth) % 4 == 0:
+        return TRINE_SCORE
+    if (day + birth) % 12 == 1:
+        return HARMONY_SCORE
+    return 0
+
+
+def find_auspicious_dates(
+    start_date: str,
+    end_date: str,
+    birth_day: int,
+    year_animal: int,
+    purpose: str = "general",
+    limit: int = 10
+) -> Dict:
+    """
+    Rank the days of a range for a birth day and year animal.
+
+    Args:
+        start_date: First day (YYYY-MM-DD)
+        end_date: Last day, inclusive (YYYY-MM-DD)
+        birth_day: THAI_BIRTH_DAYS id (0-7)
+        year_animal: THAI_YEAR_ANIMALS id (0-11)
+        purpose: Key of PURPOSES
+        limit: Number of dates to return
+
+    Returns:
+        Dict with scanned/excluded counts and the top dates, best first
+    """
+    try:
+        weights = PURPOSES[purpose]
+    except KeyError:
+        raise ValueError(f"Unknown purpose '{purpose}'. Choose from: {', '.join(PURPOSES)}")
+    start = lookup_date(start_date)
+    end = lookup_date(end_date)
+    if end.day_number < start.day_number:
+        raise ValueError("end_date must not be before start_date")
+    if end.day_number - start.day_number + 1 > MAX_RANGE_DAYS:
+        raise ValueError(f"Date range too long (max {MAX_RANGE_DAYS} days)")
+
+    roles = taksa_roles(birth_day)
+    kalakini_weekday = roles.index(KALAKINI) if KALAKINI in roles else None
+    clash = (year_animal + 6) % 12
+
+    # Score of each categorical value, combined per day below
+    weekday_scores = [
+        TAKSA_ROLES[role][2] + weights["weekdays"].get(wd, 0) for wd, role in enumerate(roles)
+    ]
+    animal_scores = [animal_score(a, year_animal) for a in range(12)]
+
+    candidates: List[Tuple[int, int]] = []
+    scanned = 0
+    excluded = 0
+    for year in range(start.year, end.year + 1):
+        rules = year_rules(year)
+        lo = max(start.day_number, rules.first_day) - rules.first_day
+        hi = min(end.day_number, rules.first_day + rules.days - 1) - rules.first_day
+        in_range = ((1 << (hi + 1)) - 1) ^ ((1 << lo) - 1)
+
+        excluded_mask = rules.animal[clash]
+        if kalakini_weekday is not None:
+            excluded_mask |= rules.weekday[kalakini_weekday]
+        mask = in_range & ~excluded_mask
+        scanned += hi - lo + 1
+        excluded += bin(in_range & excluded_mask).count("1")
+
+        # Lunar rules as (mask, score) pairs
+        bonuses = [(rules.waxing, WAXING_SCORE + weights["waxing"])]
+        if weights["holy_day"]:
+            bonuses.append((rules.holy_day, weights["holy_day"]))
+        bonuses.extend((rules.month[m], score) for m, score in weights["months"].items())
+
+        while mask:
+            low = mask & -mask
+            i = low.bit_length() - 1
+            mask ^= low
+            n = rules.first_day + i
+            score = weekday_scores[n % 7] + animal_scores[day_animal(n)]
+            for bonus_mask, bonus in bonuses:
+                if bonus_mask & low:
+                    score += bonus
+            candidates.append((score, n))
+
+    candidates.sort(key=lambda c: (-c[0], c[1]))
+    dates = [
+        _describe(n, score, roles, year_animal) for score, n in candidates[:limit]
+    ]
+    return {"scanned_days": scanned, "excluded_days": excluded, "dates": dates}
+
+
+def _describe(n: int, score: int, roles: List[int], year_animal: int) -> Dict:
+    """Full description of one ranked date (only built for the top results)."""
+    date = iso_date(n)
+    weekday = n % 7
+    role_th, role_en, _ = TAKSA_ROLES[roles[weekday]]
+    animal = THAI_YEAR_ANIMALS[day_animal(n)]
+    lunar_date = get_lunar_date(date)
+
+    reasons = [f"{THAI_BIRTH_DAYS[weekday]['name_th']} เป็นวัน{role_th}ของผู้เกิด"]
+    if not lunar_date["waning"]:
+        reasons.append("ข้างขึ้น")
+    if animal_score(animal["id"], year_animal):
+        reasons.append(f"วัน{animal['animal_th']} ถูกโฉลกกับ{THAI_YEAR_ANIMALS[year_animal]['name_th']}")
+    return {
+        "date": date,
+        "score": score,
+        "weekday": THAI_BIRTH_DAYS[weekday]["name_th"],
+        "taksa_role": role_th,
+        "taksa_role_en": role_en,
+        "day_animal": animal["animal_th"],
+        "lunar_date": lunar_date["text_th"],
+        "reasons": reasons,
+    }
@@ -0,0 +1,352 @@
+"""
+Thai Compatibility (ดวงสมพงษ์)
+Pairwise and one-to-many matching from precomputed relationship matrices
+
+A person is reduced to three ids: ปีนักษัตร (0-11), วันเกิด (0-7, with
+Wednesday night) and ลัคนา (0-11, or 12 when the birth time is unknown).
+Every pair of ids has a precomputed score:
+
+- Year animals: สามสหาย, คู่มิตร, ปีชง, คู่กัด, plus the element interaction
+  of the two animals (generating / controlling cycle)
+- Birth days: the role each day plays in the other's ทักษา wheel
+- Lagna: element of the two rising signs
+
+Ranking many candidates folds the user's three matrix rows into a single
+table indexed by the candidate's combined id, so each candidate costs one
+index computation and one lookup.
+"""
+
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.engines.auspicious import TAKSA_ROLES, TAKSA_WHEEL, KALAKINI
+from app.engines.dates import lookup_columns, lookup_date
+from app.engines.thai_astrology import (
+    THAI_BIRTH_DAYS,
+    THAI_LAGNA,
+    THAI_YEAR_ANIMALS,
+    calculate_thai_lagna,
+    ensure_lunar_table,
+    get_thai_birth_day,
+    thai_day_column,
+    year_animal_for_date
+)
+
+# ============================================================================
+# RELATIONSHIP MATRICES
+# ============================================================================
+
+ANIMALS = 12
+DAYS = 8
+LAGNAS = 13             # 12 rasi + unknown
+UNKNOWN_LAGNA = 12
+
+
+def animal_relation(a: int, b: int) -> Tuple[str, str, int]:
+    """(Thai label, English label, score) of two year animals."""
+    if a == b:
+        return ("ปีเดียวกัน", "Same animal", 2)
+    if (a - b) % 12 == 6:
+        return ("ปีชง", "Clash", -5)
+    if (a + b) % 12 == 1:
+        return ("คู่มิตร", "Secret friends", 5)
+    if (a - b) % 4 == 0:
+        return ("สามสหาย", "Trine", 4)
+    if (a + b) % 12 == 7:
+        return ("คู่กัด", "Harm", -3)
+    return ("เป็นกลาง", "Neutral", 0)
+
+
+# Generating cycle: Wood -> Fire -> Earth -> Metal -> Water -> Wood
+ELEMENT_CYCLE = ("Wood", "Fire", "Earth", "Metal", "Water")
+
+
+def element_relation(a: str, b: str) -> Tuple[str, str, int]:
+    """(Thai label, English label, score) of two Chinese elements."""
+    step = (ELEMENT_CYCLE.index(b) - ELEMENT_CYCLE.index(a)) % 5
+    if step == 0:
+        return ("ธาตุเดียวกัน", "Same element", 1)
+    if step in (1, 4):
+        return ("ธาตุส่งเสริม", "Generating", 2)
+    return ("ธาตุข่ม", "Controlling", -2)
+
+
+KALAKINI_PENALTY = -3
+
+
+def taksa_role(a: int, b: int) -> int:
+    """Role (index into TAKSA_ROLES) of birth day b in birth day a's wheel."""
+    return (TAKSA_WHEEL.index(b) - TAKSA_WHEEL.index(a)) % 8
+
+
+def role_score(role: int) -> int:
+    return KALAKINI_PENALTY if role == KALAKINI else TAKSA_ROLES[role][2]
+
+
+def lagna_relation(a: int, b: int) -> Tuple[str, str, int]:
+    """
+    (Thai label, English label, score) of two lagna ids (12 = unknown).
+
+    Rasi run fire, earth, air, water, so signs 4 apart share an element
+    and signs an even distance apart are fire/air or earth/water.
+    """
+    if a == UNKNOWN_LAGNA or b == UNKNOWN_LAGNA:
+        return ("ไม่ทราบลัคนา", "Unknown", 0)
+    distance = (b - a) % 12
+    if distance == 0:
+        return ("ลัคนาเดียวกัน", "Same sign", 2)
+    if distance in (4, 8):
+        return ("ธาตุเดียวกัน", "Same element", 3)
+    if distance in (2, 6, 10):
+        return ("ธาตุเกื้อกูล", "Complementary element", 2)
+    if distance in (3, 9):
+        return ("มุมฉาก", "Square", -2)
+    return ("เป็นกลาง", "Neutral", 0)
+
+
+def _build_matrix(size: int, score) -> Tuple[array, ...]:
+    return tuple(array("b", [score(a, b) for b in range(size)]) for a in range(size))
+
+
+# Year animal matrix including the element interaction of the two animals
+ANIMAL_MATRIX = _build_matrix(
+    ANIMALS,
+    lambda a, b: animal_relation(a, b)[2]
+    + element_relation(THAI_YEAR_ANIMALS[a]["element"], THAI_YEAR_ANIMALS[b]["element"])[2]
+)
+DAY_MATRIX = _build_matrix(DAYS, lambda a, b: role_score(taksa_role(a, b)) + role_score(taksa_role(b, a)))
+LAGNA_MATRIX = _build_matrix(LAGNAS, lambda a, b: lagna_relation(a, b)[2])
+
+MATRICES = (ANIMAL_MATRIX, DAY_MATRIX, LAGNA_MATRIX)
+MIN_SCORE = sum(min(min(row) for row in m) for m in MATRICES)
+MAX_SCORE = sum(max(max(row) for row in m) for m in MATRICES)
+
+LEVELS: Tuple[Tuple[int, str, str], ...] = (
+    (80, "ดีมาก", "Excellent"),
+    (60, "ดี", "Good"),
+    (40, "ปานกลาง", "Fair"),
+    (0, "ควรระวัง", "Challenging"),
+)
+
+
+def percent(raw: int) -> int:
+    """Raw matrix sum -> 0-100."""
+    return round(100 * (raw - MIN_SCORE) / (MAX_SCORE - MIN_SCORE))
+
+
+def level(score: int) -> Tuple[str, str]:
+    for threshold, name_th, name_en in LEVELS:
+        if score >= threshold:
+            return name_th, name_en
+    return LEVELS[-1][1], LEVELS[-1][2]
+
+
+# ============================================================================
+# PAIRWISE
+# ============================================================================
+
+def person_ids(birth_date: str, birth_time: Optional[str] = None) -> Tuple[int, int, int]:
+    """(year animal, birth day, lagna) ids of one person."""
+    year_animal = year_animal_for_date(lookup_date(birth_date))
+    birth_day = get_thai_birth_day(birth_date, birth_time)
+    lagna = calculate_thai_lagna(birth_time)["lagna_id"] if birth_time else UNKNOWN_LAGNA
+    return year_animal["id"], birth_day["day_number"], lagna
+
+
+def compare(person_a: Tuple[int, int, int], person_b: Tuple[int, int, int]) -> Dict:
+    """
+    Compatibility of two people.
+
+    Args:
+        person_a: (year animal, birth day, lagna) ids
+        person_b: (year animal, birth day, lagna) ids
+
+    Returns:
+        Score (0-100), level and the breakdown of every relation
+    """
+    animal_a, day_a, lagna_a = person_a
+    animal_b, day_b, lagna_b = person_b
+
+    animal_th, animal_en, animal_score = animal_relation(animal_a, animal_b)
+    element_th, element_en, element_score = element_relation(
+        THAI_YEAR_ANIMALS[animal_a]["element"], THAI_YEAR_ANIMALS[animal_b]["element"]
+    )
+    role_ab = taksa_role(day_a, day_b)
+    role_ba = taksa_role(day_b, day_a)
+    lagna_th, lagna_en, lagna_score = lagna_relation(lagna_a, lagna_b)
+
+    score = percent(ANIMAL_MATRIX[animal_a][animal_b] + DAY_MATRIX[day_a][day_b] + LAGNA_MATRIX[lagna_a][lagna_b])
+    level_th, level_en = level(score)
+    return {
+        "score": score,
+        "level_th": level_th,
+        "level_en": level_en,
+        "relations": [
+            {
+                "aspect": "year_animal",
+                "label_th": animal_th,
+                "label_en": animal_en,
+                "score": animal_score,
+                "detail_th": f"{THAI_YEAR_ANIMALS[animal_a]['name_th']} กับ {THAI_YEAR_ANIMALS[animal_b]['name_th']}",
+            },
+            {
+                "aspect": "element",
+                "label_th": element_th,
+                "label_en": element_en,
+                "score": element_score,
+                "detail_th": f"{THAI_YEAR_ANIMALS[animal_a]['element_th']} กับ {THAI_YEAR_ANIMALS[animal_b]['element_th']}",
+            },
+            {
+                "aspect": "birth_day",
+                "label_th": f"{TAKSA_ROLES[role_ab][0]} / {TAKSA_ROLES[role_ba][0]}",
+                "label_en": f"{TAKSA_ROLES[role_ab][1]} / {TAKSA_ROLES[role_ba][1]}",
+                "score": DAY_MATRIX[day_a][day_b],
+                "detail_th": (
+                    f"{THAI_BIRTH_DAYS[day_b]['name_th']} เป็น{TAKSA_ROLES[role_ab][0]}ของ{THAI_BIRTH_DAYS[day_a]['name_th']}"
+                    f" และ{THAI_BIRTH_DAYS[day_a]['name_th']} เป็น{TAKSA_ROLES[role_ba][0]}ของ{THAI_BIRTH_DAYS[day_b]['name_th']}"
+                ),
+            },
+            {
+                "aspect": "lagna",
+                "label_th": lagna_th,
+                "label_en": lagna_en,
+                "score": lagna_score,
+                "detail_th": (
+                    f"{THAI_LAGNA[lagna_a]['name_th']} กับ {THAI_LAGNA[lagna_b]['name_th']}"
+                    if UNKNOWN_LAGNA not in (lagna_a, lagna_b) else "ต้องระบุเวลาเกิดทั้งสองฝ่าย"
+                ),
+            },
+        ],
+    }
+
+
+# ============================================================================
+# ONE-TO-MANY
+# ============================================================================
+
+# Byte value marking an invalid candidate in the id and score columns
+INVALID_SCORE = 255
+
+# Per-candidate partial scores are shifted to be non-negative bytes and
+# summed as big integers (SWAR): with these bounds no byte can carry into
+# the next one, and any invalid id pushes the sum to VALID_RAW_LIMIT or more.
+_INVALID_PARTIAL = 64
+VALID_RAW_LIMIT = _INVALID_PARTIAL
+
+
+def _shifted(row: array, shift: int) -> bytes:
+    """256-entry translation table: id -> row[id] + shift, anything else invalid."""
+    table = bytearray([_INVALID_PARTIAL]) * 256
+    for i, value in enumerate(row):
+        table[i] = value + shift
+    return bytes(table)
+
+
+_SHIFTS = tuple(-min(min(row) for row in m) for m in MATRICES)
+
+
+def _check_swar_bounds():
+    """Fail at import if a matrix change would let a valid sum reach the invalid range or carry."""
+    valid_max = sum(max(max(row) for row in m) + shift for m, shift in zip(MATRICES, _SHIFTS))
+    if valid_max >= _INVALID_PARTIAL:
+        raise RuntimeError(f"Shifted matrix scores reach {valid_max}; the invalid marker is {_INVALID_PARTIAL}")
+    if len(MATRICES) * _INVALID_PARTIAL >= 256:
+        raise RuntimeError("Summed partial scores would carry into the next candidate's byte")
+
+
+_check_swar_bounds()
+
+
+def _percent_table() -> bytes:
+    """Shifted raw sum -> 0-100 score (INVALID_SCORE for invalid candidates)."""
+    shift = sum(_SHIFTS)
+    return bytes(
+        min(100, max(0, percent(raw - shift))) if raw < VALID_RAW_LIMIT else INVALID_SCORE
+        for raw in range(256)
+    )
+
+
+PERCENT_TABLE = _percent_table()
+
+
+def score_column(person: Tuple[int, int, int], animals: bytes, days: bytes, lagnas: bytes) -> bytes:
+    """
+    0-100 score of every candidate against one person.
+
+    Args:
+        person: (year animal, birth day, lagna) ids of the user
+        animals, days, lagnas: One id byte per candidate (-1 / 255 = invalid)
+
+    Returns:
+        One score byte per candidate, INVALID_SCORE where an id is invalid
+    """
+    count = len(animals)
+    total = 0
+    for matrix, shift, user_id, column in zip(MATRICES, _SHIFTS, person, (animals, days, lagnas)):
+        # Gather: translate every candidate id through the user's matrix row
+        total += int.from_bytes(column.translate(_shifted(matrix[user_id], shift)), "little")
+    return total.to_bytes(count, "little").translate(PERCENT_TABLE)
+
+
+def id_columns(birth_dates: Sequence[str], birth_times: Optional[Sequence[Optional[str]]] = None) -> Tuple[bytes, bytes, bytes]:
+    """(year animal, birth day, lagna) id bytes for many birth dates and optional times."""
+    columns = lookup_columns(birth_dates, ensure_lunar_table().new_year_days())
+    if birth_times is not None:
+        days = thai_day_column(birth_dates, birth_times)
+        lagnas = lagna_column(birth_times)
+    else:
+        days = columns["weekday"]
+        lagnas = array("b", [UNKNOWN_LAGNA]) * len(birth_dates)
+    return columns["naksat"].tobytes(), days.tobytes(), lagnas.tobytes()
+
+
+def lagna_column(birth_times: Sequence[Optional[str]]) -> array:
+    """Simplified lagna id per birth time (12 when missing or invalid), memoized per time."""
+    ids: Dict[Optional[str], int] = {}
+    result = array("b", [UNKNOWN_LAGNA]) * len(birth_times)
+    for i, birth_time in enumerate(birth_times):
+        lagna = ids.get(birth_time)
+        if lagna is None:
+            try:
+                lagna = calculate_thai_lagna(birth_time)["lagna_id"] if birth_time else UNKNOWN_LAGNA
+            except (ValueError, IndexError, AttributeError):
+                lagna = UNKNOWN_LAGNA
+            ids[birth_time] = lagna
+        result[i] = lagna
+    return result
+
+
+def rank_candidates(person: Tuple[int, int, int], animals: bytes, days: bytes, lagnas: bytes, limit: int = 20) -> Dict:
+    """
+    Score one person against many candidates and keep the best.
+
+    Args:
+        person: (year animal, birth day, lagna) ids of the user
+        animals, days, lagnas: Candidate id columns (see id_columns())
+        limit: Number of top candidates to return
+
+    Returns:
+        Dict with the top (index, score) pairs, best first, the score
+        histogram and the number of invalid candidates
+    """
+    scores = score_column(person, animals, days, lagnas)
+    histogram = Counter(scores)
+    invalid = histogram.pop(INVALID_SCORE, 0)
+
+    # Top-N by score bucket: walk down from the best score until enough are found
+    top: List[Tuple[int, int]] = []
+    for score in sorted(histogram, reverse=True):
+        if len(top) >= limit:
+            break
+        needle = bytes([score])
+        i = scores.find(needle)
+        while i != -1 and len(top) < limit:
+            top.append((i, score))
+            i = scores.find(needle, i + 1)
+
+    return {
+        "top": top,
+        "histogram": dict(sorted(histogram.items())),
+        "invalid": invalid,
+    }
@@ -0,0 +1,170 @@
+"""
+Daily Horoscopes (ดวงรายวัน)
+Rule-based daily outlook per Western sun sign and per Thai birth day
+
+A day's horoscope is the same for everyone sharing a sun sign (12) or a
+วันเกิด (8, with Wednesday night), so the texts are pre-generated by the
+scheduler for every sign, birth day and language.
+
+- Western: the Moon's sign at noon Bangkok time, as an aspect to the sun
+  sign, plus the planets that are retrograde that day
+- Thai: the weekday's ทักษา role for the birth day, วันพระ, and the
+  lucky color (the color of the birth day's ศรี day)
+"""
+
+from typing import Dict, List
+
+from app.engines.astrology import ZODIAC_SIGNS, body_longitudes, body_speeds
+from app.engines.auspicious import KALAKINI, TAKSA_ROLES, TAKSA_WHEEL
+from app.engines.compatibility import role_score, taksa_role
+from app.engines.dates import iso_date
+from app.engines.thai_astrology import THAI_BIRTH_DAYS, ensure_lunar_table
+
+DAILY_LANGUAGES = ("th", "en")
+
+# Julian Day of noon Bangkok time (05:00 UT) on day number n
+JD_NOON_BANGKOK = 1721424.5 + 5 / 24
+
+# Planets whose retrograde motion is mentioned
+RETROGRADE_WATCH = ("Mercury", "Venus", "Mars")
+
+SRI = 3
+
+# Moon's sign counted from the sun sign -> (Thai, English, score)
+MOON_ASPECTS = {
+    0: ("จันทร์เข้าราศี", "Moon in your sign", 2),
+    2: ("จันทร์เล็งมุมเกื้อกูล", "Moon sextile", 1),
+    3: ("จันทร์ทำมุมฉาก", "Moon square", -1),
+    4: ("จันทร์ทำมุมตรีโกณ", "Moon trine", 2),
+    6: ("จันทร์เล็ง", "Moon opposite", -2),
+}
+MOON_NEUTRAL = ("จันทร์เป็นกลาง", "Moon neutral", 0)
+
+MOON_OUTLOOK = {
+    2: ("อารมณ์แจ่มใส สัญชาตญาณแม่นยำ เหมาะกับการเริ่มต้นสิ่งใหม่",
+        "Your mood is bright and your instincts are sharp: a good day to start something new."),
+    1: ("มีโอกาสดีจากการพูดคุยและเครือข่าย", "Conversations and contacts bring small opportunities."),
+    0: ("วันที่ราบรื่น ทำงานตามแผนได้ดี", "A steady day: stick to your plans."),
+    -1: ("มีแรงกดดันเล็กน้อย ควรใจเย็นและยืดหยุ่น", "Some pressure builds: stay calm and flexible."),
+    -2: ("ระวังความขัดแย้งกับคนใกล้ตัว ควรฟังมากกว่าพูด", "Watch for friction with people close to you: listen more than you speak."),
+}
+
+ROLE_OUTLOOK = {
+    "บริวาร": ("วันนี้เป็นวันบริวาร คนรอบตัวให้ความช่วยเหลือ", "Today is your Companions day: people around you help."),
+    "อายุ": ("วันนี้เป็นวันอายุ สุขภาพดี ใช้ชีวิตได้ราบรื่น", "Today is your Longevity day: health and routine go smoothly."),
+    "เดช": ("วันนี้เป็นวันเดช เหมาะกับการเจรจาและตัดสินใจ", "Today is your Power day: good for negotiating and deciding."),
+    "ศรี": ("วันนี้เป็นวันศรี โชคลาภและเสน่ห์เด่น", "Today is your Fortune day: luck and charm stand out."),
+    "มูละ": ("วันนี้เป็นวันมูละ เหมาะกับเรื่องบ้านและการเก็บออม", "Today is your Foundation day: good for home matters and saving."),
+    "อุตสาหะ": ("วันนี้เป็นวันอุตสาหะ งานสำเร็จด้วยความขยัน", "Today is your Diligence day: effort pays off."),
+    "มนตรี": ("วันนี้เป็นวันมนตรี ผู้ใหญ่ให้การสนับสนุน", "Today is your Patronage day: mentors support you."),
+    "กาลกิณี": ("วันนี้เป็นวันกาลกิณี ควรเลี่ยงการเริ่มเรื่องสำคัญ", "Today is your Misfortune day: avoid starting anything important."),
+}
+
+
+def western_daily(day: int, sign: int) -> Dict:
+    """
+    Rule-based daily outlook of a sun sign.
+
+    Args:
+        day: Day number (dates.day_number) of the horoscope date
+        sign: ZODIAC_SIGNS id (0-11)
+    """
+    jd = day + JD_NOON_BANGKOK
+    longitudes = body_longitudes(jd)
+    speeds = body_speeds(jd)
+    moon_sign = int(longitudes["Moon"] % 360 // 30)
+    distance = min((moon_sign - sign) % 12, (sign - moon_sign) % 12)
+    aspect_th, aspect_en, score = MOON_ASPECTS.get(distance, MOON_NEUTRAL)
+    retrograde = [body for body in RETROGRADE_WATCH if speeds[body] < 0]
+
+    outlook_th, outlook_en = MOON_OUTLOOK[score]
+    outlook = {"th": [outlook_th], "en": [outlook_en]}
+    if "Mercury" in retrograde:
+        outlook["th"].append("ดาวพุธถอยหลัง ตรวจสอบเอกสารและการสื่อสารให้รอบคอบ")
+        outlook["en"].append("Mercury is retrograde: double-check documents and messages.")
+
+    return {
+        "date": iso_date(day),
+        "sign": ZODIAC_SIGNS[sign],
+        "moon_sign": ZODIAC_SIGNS[moon_sign],
+        "aspect_th": aspect_th,
+        "aspect_en": aspect_en,
+        "retrograde": retrograde,
+        "score": score,
+        "outlook": outlook,
+    }
+
+
+def thai_daily(day: int, birth_day: int) -> Dict:
+    """
+    Rule-based daily outlook of a วันเกิด.
+
+    Args:
+        day: Day number (dates.day_number) of the horoscope date
+        birth_day: THAI_BIRTH_DAYS id (0-7)
+    """
+    weekday = day % 7
+    role = taksa_role(birth_day, weekday)
+    role_th, role_en, _ = TAKSA_ROLES[role]
+    lunar = ensure_lunar_table().to_lunar(day)
+    holy_day = lunar.day in (8, 15, 23) or lunar.day == lunar.month_days
+    lucky_day = THAI_BIRTH_DAYS[TAKSA_WHEEL[(TAKSA_WHEEL.index(birth_day) + SRI) % 8]]
+
+    outlook_th, outlook_en = ROLE_OUTLOOK[role_th]
+    outlook = {
+        "th": [outlook_th, f"สีมงคล: {lucky_day['color_th']}"],
+        "en": [outlook_en, f"Lucky color: {lucky_day['color']}."],
+    }
+    if holy_day:
+        outlook["th"].append("วันนี้เป็นวันพระ เหมาะกับการทำบุญ")
+        outlook["en"].append("It is a Buddhist holy day (วันพระ): a good day for merit-making.")
+
+    return {
+        "date": iso_date(day),
+        "birth_day": THAI_BIRTH_DAYS[birth_day],
+        "weekday": THAI_BIRTH_DAYS[weekday],
+        "role_th": role_th,
+        "role_en": role_en,
+        "kalakini": role == KALAKINI,
+        "holy_day": holy_day,
+        "lucky_color": lucky_day["color"],
+        "lucky_color_th": lucky_day["color_th"],
+        "score": role_score(role),
+        "outlook": outlook,
+    }
+
+
+def sign_id(value: str) -> int:
+    """ZODIAC_SIGNS id from an id ("0"-"11") or English name ("aries")."""
+    for sign in ZODIAC_SIGNS:
+        if value.lower() in (str(sign["id"]), sign["name_en"].lower()):
+            return sign["id"]
+    raise ValueError(f"Unknown sign '{value}'. Use 0-11 or an English name such as 'aries'")
+
+
+def birth_day_id(value: str) -> int:
+    """THAI_BIRTH_DAYS id from an id ("0"-"7") or English name ("monday", "wednesday-night")."""
+    for day in THAI_BIRTH_DAYS:
+        if value.lower() in (str(day["day_number"]), day["name_en"].lower().replace(" ", "-")):
+            return day["day_number"]
+    raise ValueError(f"Unknown birth day '{value}'. Use 0-7 or an English name such as 'monday'")
+
+
+def daily_text(daily: Dict, lang: str = "th") -> str:
+    """Plain daily text from the rules (used when no AI text is available)."""
+    if lang not in DAILY_LANGUAGES:
+        raise ValueError(f"Unsupported language '{lang}'. Choose from: {', '.join(DAILY_LANGUAGES)}")
+    if "sign" in daily:
+        name = daily["sign"]["name_th"] if lang == "th" else daily["sign"]["name_en"]
+    else:
+        name = f"ผู้เกิด{daily['birth_day']['name_th']}" if lang == "th" else f"Born on {daily['birth_day']['name_en']}"
+    intro = f"ดวงวันที่ {daily['date']} {name}:" if lang == "th" else f"{name}, {daily['date']}:"
+    return " ".join([intro] + daily["outlook"][lang])
+
+
+def daily_keys() -> List[tuple]:
+    """Every (kind, id, lang) generated for a day."""
+    return (
+        [("sign", sign, lang) for sign in range(len(ZODIAC_SIGNS)) for lang in DAILY_LANGUAGES]
+        + [("thai_day", day, lang) for day in range(len(THAI_BIRTH_DAYS)) for lang in DAILY_LANGUAGES]
+    )
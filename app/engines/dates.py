@@ -0,0 +1,203 @@
+"""
+Calendar Core
+Fast ISO date parsing and table-driven sun sign / weekday / naksat lookups
+
+Dates are parsed once into a day number (proleptic Gregorian ordinal,
+0001-01-01 = 1, same as date.toordinal()). Weekday and naksat are plain
+arithmetic on it; the sun sign comes from a 366-entry day-of-year table.
+"""
+
+from array import array
+from datetime import date
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+# ============================================================================
+# TABLES
+# ============================================================================
+
+DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+# Days before each month (index 1-12) in a common year
+DAYS_BEFORE_MONTH = (0, 0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+
+# Day-of-year slots laid out as a leap year, so Feb 29 has its own slot
+LEAP_DAYS_BEFORE_MONTH = (0, 0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335)
+
+# (month, day) each tropical sign starts on, in ZODIAC_SIGNS order (Aries = 0)
+SUN_SIGN_STARTS: Tuple[Tuple[int, int], ...] = (
+    (3, 21), (4, 20), (5, 21), (6, 21), (7, 23), (8, 23),
+    (9, 23), (10, 23), (11, 22), (12, 22), (1, 20), (2, 19),
+)
+
+
+def _build_sun_sign_table() -> array:
+    starts = sorted((LEAP_DAYS_BEFORE_MONTH[m] + d - 1, sign_id) for sign_id, (m, d) in enumerate(SUN_SIGN_STARTS))
+    table = array("B", [starts[-1][1]]) * 366   # before the first start: the year's last sign (Capricorn)
+    for (slot, sign_id), (next_slot, _) in zip(starts, starts[1:] + [(366, None)]):
+        for i in range(slot, next_slot):
+            table[i] = sign_id
+    return table
+
+
+# Sun sign id for each day-of-year slot (0 = Jan 1, 59 = Feb 29, 365 = Dec 31)
+SUN_SIGN_BY_DAY = _build_sun_sign_table()
+
+INVALID = -1
+
+
+# ============================================================================
+# PARSING
+# ============================================================================
+
+def is_leap_year(year: int) -> bool:
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def parse_iso_date(value: str) -> Tuple[int, int, int]:
+    """
+    Parse a strict YYYY-MM-DD string.
+
+    Raises:
+        ValueError: If the format or the date itself is invalid
+    """
+    if (
+        len(value) != 10 or value[4] != "-" or value[7] != "-"
+        or not (value[0:4] + value[5:7] + value[8:10]).isdigit()
+    ):
+        raise ValueError(f"Invalid date '{value}'. Use YYYY-MM-DD.")
+    year = int(value[0:4])
+    month = int(value[5:7])
+    day = int(value[8:10])
+    if year < 1 or not 1 <= month <= 12:
+        raise ValueError(f"Invalid date '{value}'. Use YYYY-MM-DD.")
+    dim = 29 if month == 2 and is_leap_year(year) else DAYS_IN_MONTH[month]
+    if not 1 <= day <= dim:
+        raise ValueError(f"Invalid date '{value}': day out of range for month")
+    return year, month, day
+
+
+def parse_time_minutes(value: str) -> int:
+    """Minutes after midnight of an HH:MM time."""
+    hour, _, minute = value.partition(":")
+    if not (hour.isdigit() and minute.isdigit()) or int(hour) > 23 or int(minute) > 59:
+        raise ValueError(f"Invalid time '{value}'. Use HH:MM.")
+    return int(hour) * 60 + int(minute)
+
+
+def parse_utc_offset(value: str) -> int:
+    """Minutes east of UTC of an offset like "+07:00" (or "-5")."""
+    sign = -1 if value.startswith("-") else 1
+    hours, _, minutes = value.lstrip("+-").partition(":")
+    return sign * (int(hours) * 60 + int(minutes or 0))
+
+
+def day_number(year: int, month: int, day: int) -> int:
+    """Proleptic Gregorian ordinal (0001-01-01 = 1)."""
+    y = year - 1
+    leap_shift = 1 if month > 2 and is_leap_year(year) else 0
+    return 365 * y + y // 4 - y // 100 + y // 400 + DAYS_BEFORE_MONTH[month] + leap_shift + day
+
+
+def iso_date(n: int) -> str:
+    """YYYY-MM-DD of a day number."""
+    return date.fromordinal(n).isoformat()
+
+
+def day_of_year_slot(month: int, day: int) -> int:
+    """Index into SUN_SIGN_BY_DAY."""
+    return LEAP_DAYS_BEFORE_MONTH[month] + day - 1
+
+
+# ============================================================================
+# LOOKUPS
+# ============================================================================
+
+def weekday_from_day_number(n: int) -> int:
+    """Thai day number: 0 = Sunday ... 6 = Saturday (0001-01-01 was a Monday)."""
+    return n % 7
+
+
+def sun_sign_id(month: int, day: int) -> int:
+    """Tropical sun sign id (Aries = 0) for a calendar month and day."""
+    return SUN_SIGN_BY_DAY[day_of_year_slot(month, day)]
+
+
+def naksat_id(year: int) -> int:
+    """Thai year animal id (Rat = 0): 1900 was a Rat year."""
+    return (year - 4) % 12
+
+
+class DateInfo(NamedTuple):
+    """Everything the lookups need from one parsed date."""
+    year: int
+    month: int
+    day: int
+    day_number: int
+    weekday: int        # 0 = Sunday
+    sun_sign: int       # ZODIAC_SIGNS index
+    naksat: int         # THAI_YEAR_ANIMALS index
+
+
+def lookup_date(value: str) -> DateInfo:
+    """Parse an ISO date once and resolve all table lookups for it."""
+    year, month, day = parse_iso_date(value)
+    n = day_number(year, month, day)
+    return DateInfo(year, month, day, n, n % 7, sun_sign_id(month, day), naksat_id(year))
+
+
+def lookup_columns(values: Sequence[str], new_year_days: Optional[Mapping[int, int]] = None) -> Dict[str, object]:
+    """
+    Columnar lookups for many ISO dates.
+
+    Parsing is memoized per "YYYY-MM" prefix, so each date costs a dict
+    hit, one int() and a few table reads.
+
+    Args:
+        values: ISO dates
+        new_year_days: Optional day number on which each Gregorian year's
+            naksat begins (the Thai lunar new year); dates before it get the
+            previous year's animal. Years missing from it change on Jan 1.
+
+    Returns:
+        Dict with sun_sign, weekday and naksat columns (array('b'), -1 for
+        an invalid date) and the positions of invalid dates
+    """
+    count = len(values)
+    sun_signs = array("b", [INVALID]) * count
+    weekdays = array("b", [INVALID]) * count
+    naksats = array("b", [INVALID]) * count
+    invalid: List[int] = []
+
+    # "YYYY-MM" -> (day number of day 0, days in month, sun-sign slot of day 0,
+    #              naksat, first day of the month with that naksat, naksat before it)
+    months: Dict[str, Tuple[int, int, int, int, int, int]] = {}
+    table = SUN_SIGN_BY_DAY
+
+    for i, value in enumerate(values):
+        try:
+            prefix = value[:7]
+            month_info = months.get(prefix)
+            if month_info is None:
+                year, month, _ = parse_iso_date(prefix + "-01")
+                dim = 29 if month == 2 and is_leap_year(year) else DAYS_IN_MONTH[month]
+                base = day_number(year, month, 1) - 1
+                boundary = 0
+                if new_year_days and year in new_year_days:
+                    boundary = new_year_days[year] - base
+                month_info = (base, dim, day_of_year_slot(month, 1) - 1, naksat_id(year), boundary, naksat_id(year - 1))
+                months[prefix] = month_info
+            base, dim, slot, naksat, boundary, previous_naksat = month_info
+            day_digits = value[8:10]
+            if len(value) != 10 or value[7] != "-" or not day_digits.isdigit():
+                raise ValueError
+            day = int(day_digits)
+            if not 1 <= day <= dim:
+                raise ValueError
+        except (ValueError, TypeError):
+            invalid.append(i)
+            continue
+        sun_signs[i] = table[slot + day]
+        weekdays[i] = (base + day) % 7
+        naksats[i] = naksat if day >= boundary else previous_naksat
+
+    return {"sun_sign": sun_signs, "weekday": weekdays, "naksat": naksats, "invalid": invalid}
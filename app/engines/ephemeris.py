@@ -0,0 +1,377 @@
+"""
+Ephemeris Table
+Precomputed, memory-mapped ecliptic longitudes (1900-2100) with interpolation
+
+The table is a flat float32 file: one row per time step, one column per body.
+It is built once (``python -m app.engines.ephemeris``) and opened read-only with
+mmap, so every worker process shares the same pages through the OS page cache.
+"""
+
+import mmap
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# ============================================================================
+# TABLE LAYOUT
+# ============================================================================
+
+EPHEMERIS_BODIES: List[str] = ["Sun", "Moon", "Mercury", "Venus", "Mars", "Jupiter", "Saturn"]
+
+JD_START = 2415020.5    # 1900-01-01 00:00 UT
+JD_END = 2488434.5      # 2101-01-01 00:00 UT
+STEP_DAYS = 0.5
+
+MAGIC = b"OEPH"
+FORMAT_VERSION = 1
+
+# magic, format version, body count, row count, jd_start, step, generator id
+HEADER = struct.Struct("<4sHHIdd16s")
+HEADER_SIZE = 64        # header is padded so the float32 payload stays aligned
+
+LongitudeGenerator = Callable[[str, float], float]
+
+# Station table file: magic, format version, record count, generator id
+STATIONS_MAGIC = b"OSTN"
+STATIONS_HEADER = struct.Struct("<4sHI16s")
+STATIONS_HEADER_SIZE = 32
+STATION_RECORD = struct.Struct("<dBB6x")     # jd, body index, station kind
+
+STATION_RETROGRADE = 0      # speed turns negative
+STATION_DIRECT = 1          # speed turns positive again
+
+
+class EphemerisTable:
+    """Read-only view over a memory-mapped ephemeris file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, bodies, rows, jd_start, step, generator_id = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Not an ephemeris table (version {FORMAT_VERSION}): {path}")
+
+        self.bodies = bodies
+        self.rows = rows
+        self.jd_start = jd_start
+        self.step = step
+        self.jd_end = jd_start + (rows - 1) * step
+        self.generator_id = generator_id.rstrip(b"\0").decode("ascii")
+        self._values = memoryview(self._mmap)[HEADER_SIZE:HEADER_SIZE + rows * bodies * 4].cast("f")
+
+    def covers(self, jd: float) -> bool:
+        """Whether jd falls inside the tabulated range."""
+        return self.jd_start <= jd <= self.jd_end
+
+    def _stencil(self, jd: float):
+        """Return the first row of the 4-point stencil and the fractional offset."""
+        x = (jd - self.jd_start) / self.step
+        i0 = min(max(int(x), 1), self.rows - 3)
+        return i0 - 1, x - i0
+
+    def longitude(self, body_index: int, jd: float) -> float:
+        """Interpolated longitude (0-360) of a single body."""
+        row, f = self._stencil(jd)
+        values = self._values
+        n = self.bodies
+        base = row * n + body_index
+        return _cubic(values[base], values[base + n], values[base + 2 * n], values[base + 3 * n], f)
+
+    def longitudes(self, jd: float) -> List[float]:
+        """Interpolated longitudes of every body at jd, in EPHEMERIS_BODIES order."""
+        row, f = self._stencil(jd)
+        n = self.bodies
+        block = self._values[row * n:(row + 4) * n].tolist()
+        return [_cubic(block[b], block[b + n], block[b + 2 * n], block[b + 3 * n], f) for b in range(n)]
+
+    def speeds(self, jd: float, h: float = STEP_DAYS) -> List[float]:
+        """Longitudinal speed (degrees/day) of every body by central difference."""
+        before = self.longitudes(jd - h)
+        after = self.longitudes(jd + h)
+        return [((b - a + 180.0) % 360.0 - 180.0) / (2 * h) for a, b in zip(before, after)]
+
+    def close(self):
+        if getattr(self, "_values", None) is not None:
+            self._values.release()
+            self._values = None
+        self._mmap.close()
+        self._file.close()
+
+
+def _cubic(y0: float, y1: float, y2: float, y3: float, f: float) -> float:
+    """4-point Lagrange interpolation on nodes -1, 0, 1, 2, unwrapping across 360°."""
+    d0 = (y0 - y1 + 180.0) % 360.0 - 180.0
+    d2 = (y2 - y1 + 180.0) % 360.0 - 180.0
+    d3 = (y3 - y1 + 180.0) % 360.0 - 180.0
+    value = (
+        -d0 * f * (f - 1) * (f - 2) / 6.0
+        - d2 * (f + 1) * f * (f - 2) / 2.0
+        + d3 * (f + 1) * f * (f - 1) / 6.0
+    )
+    return (y1 + value) % 360.0
+
+
+# ============================================================================
+# BUILD & LOAD
+# ============================================================================
+
+def build_table(
+    path: str,
+    generator: LongitudeGenerator,
+    generator_id: str,
+    bodies: Sequence[str] = EPHEMERIS_BODIES,
+    jd_start: float = JD_START,
+    jd_end: float = JD_END,
+    step: float = STEP_DAYS,
+) -> str:
+    """
+    Tabulate generator(body, jd) for every step and write the table file.
+
+    The file is written next to its destination and renamed into place, so
+    concurrently starting workers never observe a half-written table.
+    """
+    rows = int(round((jd_end - jd_start) / step)) + 1
+    values = array("f")
+    for i in range(rows):
+        jd = jd_start + i * step
+        values.extend(generator(body, jd) % 360.0 for body in bodies)
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(bodies), rows, jd_start, step,
+                         generator_id.encode("ascii")[:16])
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+        values.tofile(f)
+    os.replace(tmp_path, path)
+    return path
+
+
+def open_table(path: str, generator: LongitudeGenerator, generator_id: str) -> EphemerisTable:
+    """Open the table at path, (re)building it first if missing or stale."""
+    try:
+        table = EphemerisTable(path)
+        if table.generator_id == generator_id:
+            return table
+        table.close()
+    except (OSError, ValueError, struct.error):
+        pass
+
+    build_table(path, generator, generator_id)
+    return EphemerisTable(path)
+
+
+# ============================================================================
+# RETROGRADE STATIONS
+# ============================================================================
+
+class StationTable:
+    """Sorted retrograde/direct station times per body, searched by bisection."""
+
+    def __init__(self, bodies: Sequence[str], records: Sequence[Tuple[float, int, int]], generator_id: str):
+        self.generator_id = generator_id
+        self._jds: Dict[str, array] = {body: array("d") for body in bodies}
+        self._kinds: Dict[str, bytearray] = {body: bytearray() for body in bodies}
+        for jd, body_index, kind in sorted(records):
+            body = bodies[body_index]
+            self._jds[body].append(jd)
+            self._kinds[body].append(kind)
+
+    def stations(self, body: str, jd_from: float, jd_to: float) -> List[Tuple[float, int]]:
+        """Stations of body with jd_from <= jd <= jd_to."""
+        jds = self._jds.get(body)
+        if not jds:
+            return []
+        lo = bisect_left(jds, jd_from)
+        hi = bisect_right(jds, jd_to)
+        kinds = self._kinds[body]
+        return [(jds[i], kinds[i]) for i in range(lo, hi)]
+
+    def is_retrograde(self, body: str, jd: float) -> bool:
+        """Whether body is retrograde at jd (last station before it turned retrograde)."""
+        jds = self._jds.get(body)
+        if not jds:
+            return False
+        i = bisect_right(jds, jd)
+        return i > 0 and self._kinds[body][i - 1] == STATION_RETROGRADE
+
+    def periods(self, body: str, jd_from: float, jd_to: float) -> List[Tuple[Optional[float], Optional[float]]]:
+        """
+        Retrograde periods of body overlapping [jd_from, jd_to].
+        
+        Each period is (station retrograde jd, station direct jd); an end is
+        None when it falls outside the tabulated range.
+        """
+        jds = self._jds.get(body)
+        if not jds:
+            return []
+        kinds = self._kinds[body]
+
+        i = bisect_left(jds, jd_from)
+        # Already retrograde at jd_from: start with the preceding station
+        if i < len(jds) and kinds[i] == STATION_DIRECT:
+            i -= 1
+
+        periods = []
+        while i < len(jds) and (i < 0 or jds[i] <= jd_to):
+            start = jds[i] if i >= 0 else None
+            end = jds[i + 1] if i + 1 < len(jds) else None
+            periods.append((start, end))
+            i += 2
+        return periods
+
+
+def _speed(generator: LongitudeGenerator, body: str, jd: float, h: float = 0.01) -> float:
+    """Longitudinal speed of body straight from the generator (degrees/day)."""
+    return ((generator(body, jd + h) - generator(body, jd - h) + 180.0) % 360.0 - 180.0) / (2 * h)
+
+
+def find_stations(
+    table: EphemerisTable,
+    generator: LongitudeGenerator,
+    body: str,
+    tolerance_days: float = 1.0 / 1440,
+) -> List[Tuple[float, int]]:
+    """
+    Find the stations of one body over the whole table.
+    
+    Speed sign changes are located by scanning successive table rows, then
+    each bracket is refined by bisection on the generator's own speed. Sign
+    flips closer than a few days apart are float32 noise around a single
+    station and are merged into one bracket.
+    """
+    body_index = EPHEMERIS_BODIES.index(body)
+    n = table.bodies
+    values = table._values[body_index::n].tolist()
+
+    flips = []
+    previous = None
+    for i in range(1, len(values)):
+        negative = (values[i] - values[i - 1] + 180.0) % 360.0 - 180.0 < 0
+        if previous is not None and negative != previous:
+            flips.append(table.jd_start + (i - 1) * table.step)
+        previous = negative
+
+    # Merge noisy flips into brackets
+    brackets = []
+    for jd in flips:
+        if brackets and jd - brackets[-1][1] < 4.0:
+            brackets[-1][1] = jd
+        else:
+            brackets.append([jd, jd])
+
+    stations = []
+    for first, last in brackets:
+        a = max(first - 2.0, table.jd_start)
+        b = min(last + 2.0, table.jd_end)
+        speed_a = _speed(generator, body, a)
+        if (speed_a < 0) == (_speed(generator, body, b) < 0):
+            continue
+        while b - a > tolerance_days:
+            mid = (a + b) / 2
+            if (_speed(generator, body, mid) < 0) == (speed_a < 0):
+                a = mid
+            else:
+                b = mid
+        kind = STATION_RETROGRADE if speed_a > 0 else STATION_DIRECT
+        stations.append(((a + b) / 2, kind))
+    return stations
+
+
+def build_station_table(
+    path: str,
+    table: EphemerisTable,
+    generator: LongitudeGenerator,
+    generator_id: str,
+    bodies: Sequence[str],
+) -> str:
+    """Compute stations for bodies and write the station file."""
+    records = []
+    for body in bodies:
+        body_index = EPHEMERIS_BODIES.index(body)
+        records.extend((jd, body_index, kind) for jd, kind in find_stations(table, generator, body))
+    records.sort()
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        header = STATIONS_HEADER.pack(STATIONS_MAGIC, FORMAT_VERSION, len(records),
+                                      generator_id.encode("ascii")[:16])
+        f.write(header.ljust(STATIONS_HEADER_SIZE, b"\0"))
+        for record in records:
+            f.write(STATION_RECORD.pack(*record))
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_station_table(path: str) -> StationTable:
+    """Load a station file written by build_station_table."""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, count, generator_id = STATIONS_HEADER.unpack_from(data, 0)
+    if magic != STATIONS_MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"Not a station table (version {FORMAT_VERSION}): {path}")
+    records = [
+        STATION_RECORD.unpack_from(data, STATIONS_HEADER_SIZE + i * STATION_RECORD.size)
+        for i in range(count)
+    ]
+    return StationTable(EPHEMERIS_BODIES, records, generator_id.rstrip(b"\0").decode("ascii"))
+
+
+_table: Optional[EphemerisTable] = None
+_stations: Optional[StationTable] = None
+_table_lock = threading.Lock()
+
+
+def get_table(path: str, generator: LongitudeGenerator, generator_id: str) -> EphemerisTable:
+    """Process-wide table, opened on first use."""
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                _table = open_table(path, generator, generator_id)
+    return _table
+
+
+def get_station_table(
+    path: str,
+    table: EphemerisTable,
+    generator: LongitudeGenerator,
+    generator_id: str,
+    bodies: Sequence[str],
+) -> StationTable:
+    """Process-wide station table, (re)built from the ephemeris if missing or stale."""
+    global _stations
+    if _stations is None:
+        with _table_lock:
+            if _stations is None:
+                try:
+                    stations = read_station_table(path)
+                except (OSError, ValueError, struct.error):
+                    stations = None
+                if stations is None or stations.generator_id != generator_id:
+                    build_station_table(path, table, generator, generator_id, bodies)
+                    stations = read_station_table(path)
+                _stations = stations
+    return _stations
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from app.engines.astrology import ensure_ephemeris, ensure_stations
+
+    started = time.perf_counter()
+    table = ensure_ephemeris(force="--force" in sys.argv)
+    ensure_stations(force="--force" in sys.argv)
+    size_kb = os.path.getsize(table.path) / 1024
+    print(f"Ephemeris table ready: {table.path} ({table.rows} rows, {size_kb:.0f} KB, "
+          f"{time.perf_counter() - started:.1f}s)")
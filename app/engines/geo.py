@@ -0,0 +1,378 @@
+"""
+Offline Geocoding & Timezones
+Bundled city database with a prefix index, a KD-tree for nearest-city lookups,
+and historical UTC offsets from the IANA database (zoneinfo)
+
+The city list lives in app/data/cities.csv. On first use it is compiled into
+a binary index (sorted name keys + an implicit KD-tree over unit vectors)
+that is opened with mmap, so forked workers share one copy.
+"""
+
+import csv
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.core.config import settings
+
+# ============================================================================
+# INDEX LAYOUT
+# ============================================================================
+
+GEO_MAGIC = b"OGEO"
+GEO_FORMAT_VERSION = 1
+
+# magic, version, city count, key count, csv digest
+GEO_HEADER = struct.Struct("<4sHII16s")
+GEO_HEADER_SIZE = 64
+
+KEY_WIDTH = 60                      # UTF-8 bytes of a normalized name
+KEY_RECORD = struct.Struct(f"<{KEY_WIDTH}sI")
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def normalize_name(name: str) -> str:
+    """Case-insensitive, whitespace-collapsed form used for name lookups."""
+    return " ".join(name.casefold().split())
+
+
+def _unit_vector(latitude: float, longitude: float) -> Tuple[float, float, float]:
+    lat = math.radians(latitude)
+    lon = math.radians(longitude)
+    return math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat)
+
+
+def load_cities(csv_path: str) -> List[Dict]:
+    """Read the bundled city list."""
+    with open(csv_path, encoding="utf-8", newline="") as f:
+        return [
+            {
+                "id": i,
+                "name_en": row["name_en"],
+                "name_th": row["name_th"],
+                "country": row["country"],
+                "latitude": float(row["latitude"]),
+                "longitude": float(row["longitude"]),
+                "timezone": row["timezone"],
+            }
+            for i, row in enumerate(csv.DictReader(f))
+        ]
+
+
+def _csv_digest(csv_path: str) -> bytes:
+    with open(csv_path, "rb") as f:
+        return hashlib.sha1(f.read()).digest()[:16]
+
+
+# ============================================================================
+# BUILD
+# ============================================================================
+
+def _kd_order(points: List[Tuple[float, float, float, int]], lo: int, hi: int, depth: int):
+    """Arrange points[lo:hi] so each range's middle element splits it on one axis."""
+    if hi - lo <= 1:
+        return
+    axis = depth % 3
+    points[lo:hi] = sorted(points[lo:hi], key=lambda p: p[axis])
+    mid = (lo + hi) // 2
+    _kd_order(points, lo, mid, depth + 1)
+    _kd_order(points, mid + 1, hi, depth + 1)
+
+
+def build_geo_index(csv_path: str, path: str) -> str:
+    """Compile cities.csv into the binary index file."""
+    cities = load_cities(csv_path)
+
+    points = [_unit_vector(c["latitude"], c["longitude"]) + (c["id"],) for c in cities]
+    _kd_order(points, 0, len(points), 0)
+
+    keys = set()
+    for c in cities:
+        for name in (c["name_en"], c["name_th"]):
+            if name:
+                key = normalize_name(name).encode("utf-8")[:KEY_WIDTH]
+                keys.add((key, c["id"]))
+    keys = sorted(keys)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        header = GEO_HEADER.pack(GEO_MAGIC, GEO_FORMAT_VERSION, len(points), len(keys), _csv_digest(csv_path))
+        f.write(header.ljust(GEO_HEADER_SIZE, b"\0"))
+        f.write(struct.pack(f"<{3 * len(points)}d", *(v for p in points for v in p[:3])))
+        f.write(struct.pack(f"<{len(points)}I", *(p[3] for p in points)))
+        if len(points) % 2:
+            f.write(b"\0" * 4)      # keep the key section 8-byte aligned
+        for key, city_id in keys:
+            f.write(KEY_RECORD.pack(key, city_id))
+    os.replace(tmp_path, path)
+    return path
+
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+class _KeyColumn:
+    """Sequence view over the sorted key records, so bisect works on the mmap."""
+
+    def __init__(self, buffer: memoryview, count: int):
+        self._buffer = buffer
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i: int) -> bytes:
+        offset = i * KEY_RECORD.size
+        return bytes(self._buffer[offset:offset + KEY_WIDTH]).rstrip(b"\0")
+
+    def city_id(self, i: int) -> int:
+        return KEY_RECORD.unpack_from(self._buffer, i * KEY_RECORD.size)[1]
+
+
+class GeoIndex:
+    """Memory-mapped city index: name prefix search and nearest-city queries."""
+
+    def __init__(self, path: str, cities: List[Dict]):
+        self.cities = cities
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, key_count, self.digest = GEO_HEADER.unpack_from(self._mmap, 0)
+        if magic != GEO_MAGIC or version != GEO_FORMAT_VERSION:
+            raise ValueError(f"Not a geo index (version {GEO_FORMAT_VERSION}): {path}")
+
+        self.count = count
+        view = memoryview(self._mmap)
+        offset = GEO_HEADER_SIZE
+        self._xyz = view[offset:offset + 24 * count].cast("d")
+        offset += 24 * count
+        self._ids = view[offset:offset + 4 * count].cast("I")
+        offset += 4 * count + (4 if count % 2 else 0)
+        self._keys = _KeyColumn(view[offset:offset + KEY_RECORD.size * key_count], key_count)
+
+    def search(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """Cities whose English or Thai name starts with prefix (exact matches first)."""
+        key = normalize_name(prefix).encode("utf-8")
+        if not key:
+            return []
+        keys = self._keys
+        i = bisect_left(keys, key)
+
+        found: List[Dict] = []
+        seen = set()
+        while i < len(keys) and len(found) < limit:
+            candidate = keys[i]
+            if not candidate.startswith(key):
+                break
+            city_id = keys.city_id(i)
+            if city_id not in seen:
+                seen.add(city_id)
+                found.append(self.cities[city_id])
+            i += 1
+        return found
+
+    def find(self, name: str) -> Optional[Dict]:
+        """Exact (normalized) name match, else the first prefix match."""
+        matches = self.search(name, limit=10)
+        target = normalize_name(name)
+        for city in matches:
+            if target in (normalize_name(city["name_en"]), normalize_name(city["name_th"])):
+                return city
+        return matches[0] if matches else None
+
+    def nearest(self, latitude: float, longitude: float) -> Tuple[Dict, float]:
+        """Nearest city and its great-circle distance in km."""
+        target = _unit_vector(latitude, longitude)
+        xyz = self._xyz
+        best = [float("inf"), -1]
+
+        def visit(lo: int, hi: int, depth: int):
+            if lo >= hi:
+                return
+            mid = (lo + hi) // 2
+            px, py, pz = xyz[3 * mid], xyz[3 * mid + 1], xyz[3 * mid + 2]
+            d2 = (px - target[0]) ** 2 + (py - target[1]) ** 2 + (pz - target[2]) ** 2
+            if d2 < best[0]:
+                best[0], best[1] = d2, mid
+
+            axis = depth % 3
+            diff = target[axis] - xyz[3 * mid + axis]
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            visit(near[0], near[1], depth + 1)
+            if diff * diff < best[0]:
+                visit(far[0], far[1], depth + 1)
+
+        visit(0, self.count, 0)
+        chord = math.sqrt(best[0])
+        distance = 2 * EARTH_RADIUS_KM * math.asin(min(chord / 2, 1.0))
+        return self.cities[self._ids[best[1]]], round(distance, 1)
+
+
+_index: Optional[GeoIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_geo_index(csv_path: str, path: str) -> GeoIndex:
+    """Process-wide index, (re)compiled when missing or older than the CSV."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                cities = load_cities(csv_path)
+                try:
+                    index = GeoIndex(path, cities)
+                    if index.digest != _csv_digest(csv_path):
+                        index = None
+                except (OSError, ValueError, struct.error):
+                    index = None
+                if index is None:
+                    build_geo_index(csv_path, path)
+                    index = GeoIndex(path, cities)
+                _index = index
+    return _index
+
+
+def ensure_geo_index() -> GeoIndex:
+    """Open the shared city index configured in settings."""
+    return get_geo_index(settings.CITIES_PATH, settings.GEO_INDEX_PATH)
+
+
+# ============================================================================
+# TIMEZONES
+# ============================================================================
+
+@lru_cache(maxsize=4096)
+def _zone_segments(zone: str, year: int) -> Tuple[Tuple[datetime, int], ...]:
+    """
+    UTC offset segments of a zone around one year, memoized per (zone, year).
+
+    Returns:
+        Tuple of (UTC start, offset in seconds), covering a day either side
+        of the year so local times near New Year resolve too
+    """
+    try:
+        tz = ZoneInfo(zone)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone '{zone}'")
+
+    def offset_at(moment: datetime) -> int:
+        return int(moment.astimezone(tz).utcoffset().total_seconds())
+
+    start = datetime(year, 1, 1, tzinfo=timezone.utc) - timedelta(days=1)
+    end = datetime(year + 1, 1, 1, tzinfo=timezone.utc) + timedelta(days=1)
+
+    segments = [(start, offset_at(start))]
+    day = start
+    while day < end:
+        next_day = day + timedelta(days=1)
+        if offset_at(next_day) != segments[-1][1]:
+            # Bisect the transition down to the minute
+            lo, hi = day, next_day
+            while hi - lo > timedelta(minutes=1):
+                mid = lo + (hi - lo) / 2
+                if offset_at(mid) == segments[-1][1]:
+                    lo = mid
+                else:
+                    hi = mid
+            segments.append((hi, offset_at(next_day)))
+        day = next_day
+    return tuple(segments)
+
+
+def utc_offset_seconds(zone: str, local: datetime) -> int:
+    """
+    UTC offset of a naive local time in an IANA zone.
+
+    Times skipped by a DST jump resolve to the offset in force before it,
+    and repeated times to the first occurrence.
+    """
+    segments = _zone_segments(zone, local.year)
+    local_utc = local.replace(tzinfo=timezone.utc)
+    for i, (seg_start, offset) in enumerate(segments):
+        seg_end = segments[i + 1][0] if i + 1 < len(segments) else None
+        utc = local_utc - timedelta(seconds=offset)
+        if utc >= seg_start and (seg_end is None or utc < seg_end):
+            return offset
+    # Inside a gap: keep the offset before the transition
+    for i in range(len(segments) - 1, 0, -1):
+        if local_utc - timedelta(seconds=segments[i - 1][1]) >= segments[i][0]:
+            return segments[i - 1][1]
+    return segments[0][1]
+
+
+def format_utc_offset(seconds: int) -> str:
+    """Format an offset in seconds as "+HH:MM" (rounded to the minute)."""
+    sign = "+" if seconds >= 0 else "-"
+    minutes = round(abs(seconds) / 60)
+    return f"{sign}{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+# Years with zone offsets (the segment scan needs a day either side of the year)
+TIMEZONE_MIN_YEAR = 1800
+TIMEZONE_MAX_YEAR = 2200
+
+
+def resolve_timezone_offset(zone: str, birth_date: str, birth_time: str = "12:00") -> str:
+    """UTC offset ("+07:00") in force in zone at a local birth date and time."""
+    local = datetime.strptime(f"{birth_date} {birth_time}", "%Y-%m-%d %H:%M")
+    if not TIMEZONE_MIN_YEAR <= local.year <= TIMEZONE_MAX_YEAR:
+        raise ValueError(f"Timezone lookups cover years {TIMEZONE_MIN_YEAR}-{TIMEZONE_MAX_YEAR}")
+    return format_utc_offset(utc_offset_seconds(zone, local))
+
+
+# ============================================================================
+# BIRTH PLACE RESOLUTION
+# ============================================================================
+
+def resolve_birth_place(
+    birth_date: str,
+    birth_time: str,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    city: Optional[str] = None,
+    tz: Optional[str] = None,
+    timezone_offset: str = "+00:00",
+) -> Dict:
+    """
+    Fill in coordinates and UTC offset for a birth from whatever was given.
+    
+    Explicit coordinates win over the city's; an IANA zone (given, or the
+    city's) wins over the fixed timezone_offset, so historical and DST
+    offsets are applied automatically.
+    
+    Returns:
+        Dict with latitude, longitude, timezone_offset, tz and city (or None)
+    """
+    match = None
+    if city:
+        match = ensure_geo_index().find(city)
+        if match is None:
+            raise ValueError(f"Unknown city '{city}'")
+        if latitude is None or longitude is None:
+            latitude, longitude = match["latitude"], match["longitude"]
+        tz = tz or match["timezone"]
+
+    if latitude is None or longitude is None:
+        raise ValueError("Provide latitude and longitude, or a city")
+
+    if tz:
+        timezone_offset = resolve_timezone_offset(tz, birth_date, birth_time)
+
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "timezone_offset": timezone_offset,
+        "tz": tz,
+        "city": match,
+    }
@@ -0,0 +1,184 @@
+"""
+House Systems
+Sidereal time pipeline and Equal / Placidus / Koch house cusps
+
+Everything a chart needs from sidereal time (GMST, LST/RAMC, obliquity) is
+computed once into a SiderealFrame and passed to the cusp helpers, instead of
+each helper deriving it again from the Julian Day.
+"""
+
+import math
+from bisect import bisect_right
+from typing import Callable, Dict, List, NamedTuple, Sequence
+
+# ============================================================================
+# SIDEREAL FRAME
+# ============================================================================
+
+class SiderealFrame(NamedTuple):
+    """Sidereal quantities shared by every house and angle calculation."""
+    jd: float
+    gmst: float         # Greenwich Mean Sidereal Time (degrees)
+    ramc: float         # Local sidereal time = right ascension of the MC (degrees)
+    obliquity: float    # Obliquity of the ecliptic (degrees)
+    ramc_rad: float
+    eps_rad: float
+
+
+def sidereal_frame(jd: float, longitude: float) -> SiderealFrame:
+    """Compute the sidereal frame for a moment and geographic longitude."""
+    T = (jd - 2451545.0) / 36525.0
+
+    # Greenwich Mean Sidereal Time
+    gmst = 280.46061837 + 360.98564736629 * (jd - 2451545.0)
+    gmst = (gmst + 0.000387933 * T * T - T * T * T / 38710000.0) % 360
+
+    # Local Sidereal Time
+    ramc = (gmst + longitude) % 360
+
+    # Obliquity of the ecliptic
+    epsilon = 23.4393 - 0.0000004 * (jd - 2451545.0)
+
+    return SiderealFrame(jd, gmst, ramc, epsilon, math.radians(ramc), math.radians(epsilon))
+
+
+# ============================================================================
+# ANGLES
+# ============================================================================
+
+def ascendant_at(ramc: float, eps_rad: float, lat_rad: float) -> float:
+    """Ecliptic longitude rising at a given RAMC (degrees)."""
+    ramc_rad = math.radians(ramc)
+    y = -math.cos(ramc_rad)
+    x = math.sin(ramc_rad) * math.cos(eps_rad) + math.tan(lat_rad) * math.sin(eps_rad)
+    return (math.degrees(math.atan2(y, x)) + 180) % 360
+
+
+def ecliptic_from_ra(ra: float, eps_rad: float) -> float:
+    """Ecliptic longitude of the ecliptic point with right ascension ra."""
+    ra_rad = math.radians(ra)
+    return math.degrees(math.atan2(math.sin(ra_rad), math.cos(ra_rad) * math.cos(eps_rad))) % 360
+
+
+def ascensional_difference(longitude: float, eps_rad: float, lat_rad: float) -> float:
+    """Ascensional difference (degrees) of an ecliptic point at a latitude."""
+    declination = math.asin(math.sin(eps_rad) * math.sin(math.radians(longitude)))
+    x = math.tan(lat_rad) * math.tan(declination)
+    if abs(x) > 1:
+        raise ValueError("Point is circumpolar at this latitude")
+    return math.degrees(math.asin(x))
+
+
+def ascendant(frame: SiderealFrame, latitude: float) -> float:
+    """Ascendant longitude for a frame and latitude."""
+    return ascendant_at(frame.ramc, frame.eps_rad, math.radians(latitude))
+
+
+def midheaven(frame: SiderealFrame) -> float:
+    """Midheaven (MC) longitude for a frame."""
+    return ecliptic_from_ra(frame.ramc, frame.eps_rad)
+
+
+# ============================================================================
+# HOUSE SYSTEMS
+# ============================================================================
+
+def _check_latitude(frame: SiderealFrame, latitude: float, system: str):
+    if abs(latitude) >= 90 - frame.obliquity:
+        raise ValueError(f"{system} houses are undefined above the polar circles; use equal houses")
+
+
+def _with_opposites(mc: float, c11: float, c12: float, asc: float, c2: float, c3: float) -> List[float]:
+    """Expand the six eastern cusps to all twelve (cusp n+6 is opposite cusp n)."""
+    first_half = [asc, c2, c3, (mc + 180) % 360, (c11 + 180) % 360, (c12 + 180) % 360]
+    return first_half + [(c + 180) % 360 for c in first_half]
+
+
+def equal_cusps(frame: SiderealFrame, latitude: float) -> List[float]:
+    """Equal houses: 30 degrees each, starting at the Ascendant."""
+    asc = ascendant(frame, latitude)
+    return [(asc + i * 30) % 360 for i in range(12)]
+
+
+def placidus_cusps(frame: SiderealFrame, latitude: float, iterations: int = 10) -> List[float]:
+    """
+    Placidus houses: trisect each point's own diurnal / nocturnal semi-arc.
+
+    Intermediate cusps are solved by fixed-point iteration on right ascension.
+    """
+    _check_latitude(frame, latitude, "Placidus")
+    lat_rad = math.radians(latitude)
+    eps_rad = frame.eps_rad
+    ramc = frame.ramc
+
+    def solve(fraction: float, nocturnal: bool) -> float:
+        ra = ramc + (180 - 90 * fraction if nocturnal else 90 * fraction)
+        lon = ecliptic_from_ra(ra, eps_rad)
+        for _ in range(iterations):
+            ad = ascensional_difference(lon, eps_rad, lat_rad)
+            if nocturnal:
+                ra = ramc + 180 - fraction * (90 - ad)
+            else:
+                ra = ramc + fraction * (90 + ad)
+            lon = ecliptic_from_ra(ra, eps_rad)
+        return lon
+
+    return _with_opposites(
+        midheaven(frame),
+        solve(1 / 3, False),
+        solve(2 / 3, False),
+        ascendant(frame, latitude),
+        solve(2 / 3, True),
+        solve(1 / 3, True),
+    )
+
+
+def koch_cusps(frame: SiderealFrame, latitude: float) -> List[float]:
+    """
+    Koch (birthplace) houses: trisect the MC degree's diurnal semi-arc in
+    time and take the Ascendant at each of those sidereal times.
+
+    The Ascendant at RAMC - DSA is the MC degree itself, so stepping by
+    DSA / 3 from there gives cusps 11, 12 and 1; the same steps past the
+    RAMC give cusps 2 and 3.
+    """
+    _check_latitude(frame, latitude, "Koch")
+    lat_rad = math.radians(latitude)
+    eps_rad = frame.eps_rad
+    ramc = frame.ramc
+
+    mc = midheaven(frame)
+    diurnal = 90 + ascensional_difference(mc, eps_rad, lat_rad)
+
+    return _with_opposites(
+        mc,
+        ascendant_at(ramc - 2 * diurnal / 3, eps_rad, lat_rad),
+        ascendant_at(ramc - diurnal / 3, eps_rad, lat_rad),
+        ascendant_at(ramc, eps_rad, lat_rad),
+        ascendant_at(ramc + diurnal / 3, eps_rad, lat_rad),
+        ascendant_at(ramc + 2 * diurnal / 3, eps_rad, lat_rad),
+    )
+
+
+HOUSE_SYSTEMS: Dict[str, Callable[[SiderealFrame, float], List[float]]] = {
+    "equal": equal_cusps,
+    "placidus": placidus_cusps,
+    "koch": koch_cusps,
+}
+
+
+def house_cusps(frame: SiderealFrame, latitude: float, system: str = "equal") -> List[float]:
+    """Twelve cusp longitudes (house 1 first) for a house system."""
+    try:
+        cusps_fn = HOUSE_SYSTEMS[system.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown house system '{system}'. Choose from: {', '.join(HOUSE_SYSTEMS)}")
+    return cusps_fn(frame, latitude)
+
+
+def assign_house(longitude: float, cusps: Sequence[float]) -> int:
+    """House number (1-12) containing longitude, by binary search over the cusps."""
+    start = cusps[0]
+    unwrapped = [start + (c - start) % 360 for c in cusps]
+    return bisect_right(unwrapped, start + (longitude - start) % 360)
+
@@ -0,0 +1,370 @@
+"""
+Thai Lunar Calendar Table
+Precomputed month starts and leap-month flags for Gregorian <-> Thai lunar conversion
+
+Months follow the traditional arithmetic calendar (สุริยยาตร์) used for the
+official Thai calendar, not the astronomical new moon. Odd months have 29
+days and even months 30; an adhikawan year (อธิกวาร, 355 days) gives
+month 7 a 30th day and an adhikamas year (อธิกมาส, 384 days) repeats
+month 8 (เดือน 8-8). Which years those are comes from the Chula Sakarat
+year arithmetic (horakhun, avoman, tithi) with the rules that keep an
+intercalary day and month out of the same year and the new-year
+weekdays in sequence; OFFICIAL_ADHIKAWAN records the years where the
+published calendar placed the intercalary day differently.
+
+The table is built once into a binary file and opened with mmap,
+like the ephemeris table.
+"""
+
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, List, NamedTuple, Optional
+
+# ============================================================================
+# FILE LAYOUT
+# ============================================================================
+
+LUNAR_MAGIC = b"OLUN"
+LUNAR_FORMAT_VERSION = 1
+
+# magic, version, first lunar year, year count, lunation count, generator id
+LUNAR_HEADER = struct.Struct("<4sHhHI16s")
+LUNAR_HEADER_SIZE = 32
+
+# Flag bits per lunation
+SECOND_EIGHTH_MONTH = 1     # this is the repeated เดือน 8 (8-8)
+LEAP_YEAR = 2               # the lunar year has 13 months
+
+SYNODIC_MONTH = 29.530588853
+
+
+# ============================================================================
+# CHULA SAKARAT YEAR ARITHMETIC (after Eade, The Calendrical Systems of Mainland South-East Asia)
+# ============================================================================
+
+# Horakhun (หรคุณ, days since the epoch) advances 292207 days per 800 solar years
+SOLAR_DAYS_PER_800_YEARS = 292207
+HORAKHUN_EPOCH_OFFSET = 373
+# Day number of horakhun 0 (Julian Day 1954167, March 638)
+HORAKHUN_EPOCH_DAY = 1954167 - 1721425
+# Gregorian year of the Songkran that starts a Chula Sakarat year
+CS_YEAR_OFFSET = 638
+
+NORMAL_YEAR_DAYS = 354
+ADHIKAWAN_YEAR_DAYS = 355
+ADHIKAMAS_YEAR_DAYS = 384
+
+# Lunar years (by the Gregorian year of their เดือน 5) whose month 7 has
+# 30 days (True) or 29 (False) in the published calendar, where that
+# differs from the arithmetic: 2014 (พ.ศ. 2557) had its adhikawan day
+# moved to 2016 (พ.ศ. 2559)
+OFFICIAL_ADHIKAWAN = {2014: False, 2016: True}
+
+
+class _CsYear:
+    """Year quantities on the new-year day of Chula Sakarat year `year`."""
+
+    __slots__ = ("horakhun", "tithi", "langsak", "new_year_weekday", "next_weekday", "kind", "offset")
+
+    def __init__(self, year: int):
+        units = year * SOLAR_DAYS_PER_800_YEARS + HORAKHUN_EPOCH_OFFSET
+        self.horakhun = units // 800 + 1
+        solar_leap_day = 800 - units % 800 <= 207      # กัมมัชพล
+
+        quotient, avoman = divmod(self.horakhun * 11 + 650, 692)
+        self.tithi = (quotient + self.horakhun) % 30
+        if avoman == 0:
+            avoman = 692
+            self.tithi -= 1
+        next_horakhun = ((year + 1) * SOLAR_DAYS_PER_800_YEARS + HORAKHUN_EPOCH_OFFSET) // 800 + 1
+        next_tithi = (next_horakhun * 11 + 650) // 692 + next_horakhun
+        next_tithi %= 30
+
+        # เถลิงศก falls on this lunar day (counted from ขึ้น 1 ค่ำ เดือน 5)
+        self.langsak = max(1, self.tithi)
+        days_into_month = self.langsak + 29 if self.langsak < 6 else self.langsak
+        self.new_year_weekday = (self.horakhun % 7 - days_into_month + 1 + 35) % 7
+        self.offset = False
+
+        # "A" normal, "B" adhikawan, "C" adhikamas, "c" both (resolved later)
+        self.kind = "C" if self.tithi > 24 or self.tithi < 6 else "A"
+        if self.tithi == 25 and next_tithi == 5:
+            self.kind = "A"
+        if avoman <= (126 if solar_leap_day else 137):
+            self.kind = "c" if self.kind == "C" else "B"
+        self.next_weekday = (self.new_year_weekday + {"A": 4, "B": 5}.get(self.kind, 6)) % 7
+
+
+def _fifth_month_start(year: int) -> int:
+    """
+    Day number of ขึ้น 1 ค่ำ เดือน 5 before the new-year day of CS year `year`.
+
+    The rules for a year look two years either side: an intercalary day
+    falling in an adhikamas year moves to the neighbour that keeps the
+    new-year weekdays in sequence, and a year still out of sequence
+    starts a day later in the month.
+    """
+    window = [_CsYear(year + i) for i in range(-2, 3)]
+    if window[2].tithi == 24 and window[3].tithi == 6:
+        for cs_year in window:
+            cs_year.kind = "C"
+            cs_year.next_weekday = (cs_year.next_weekday + 2) % 7
+
+    for i in (1, 2, 3):
+        if window[i].kind == "c":
+            neighbour = window[i + 1] if window[i].new_year_weekday == window[i - 1].next_weekday else window[i - 1]
+            neighbour.kind = "B"
+            neighbour.next_weekday = (neighbour.next_weekday + 1) % 7
+
+    for i in (1, 2, 3):
+        if window[i - 1].next_weekday != window[i].new_year_weekday and window[i].next_weekday != window[i + 1].new_year_weekday:
+            window[i].offset = True
+            window[i].langsak += 1
+            window[i].new_year_weekday = (window[i].new_year_weekday + 6) % 7
+            window[i].next_weekday = (window[i].next_weekday + 6) % 7
+
+    current = window[2]
+    # Days from ขึ้น 1 ค่ำ เดือน 5 to the new-year day, counting both
+    days = current.langsak
+    if days < 6 + current.offset:
+        days += 29
+    return HORAKHUN_EPOCH_DAY + current.horakhun + 1 - days
+
+
+# ============================================================================
+# TABLE
+# ============================================================================
+
+class LunarDate(NamedTuple):
+    """A day in the Thai lunar calendar."""
+    lunar_year: int         # Gregorian year in which this lunar year's month 5 began
+    month: int              # 1-12 (1 = เดือนอ้าย, 2 = เดือนยี่)
+    second_eighth: bool     # the repeated เดือน 8 (8-8)
+    day: int                # 1-30 within the month (1-15 waxing, 16+ waning)
+    month_days: int         # 29 or 30
+    leap_year: bool         # the lunar year has 13 months
+
+
+# Month numbers of a lunar year, starting at month 5
+MONTH_ORDER = (5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3, 4)
+
+
+class LunarTable:
+    """Memory-mapped lunar calendar with O(1) conversions."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.first_year, self.years, self.count, generator_id = LUNAR_HEADER.unpack_from(self._mmap, 0)
+        if magic != LUNAR_MAGIC or version != LUNAR_FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Not a lunar table (version {LUNAR_FORMAT_VERSION}): {path}")
+        self.generator_id = generator_id.rstrip(b"\0").decode("ascii")
+
+        view = memoryview(self._mmap)
+        offset = LUNAR_HEADER_SIZE
+        self._year_index = view[offset:offset + 4 * (self.years + 1)].cast("i")
+        offset += 4 * (self.years + 1)
+        self._starts = view[offset:offset + 4 * (self.count + 1)].cast("i")
+        offset += 4 * (self.count + 1)
+        self._months = view[offset:offset + self.count].cast("B")
+        offset += self.count
+        self._flags = view[offset:offset + self.count].cast("B")
+
+    def close(self):
+        for attr in ("_year_index", "_starts", "_months", "_flags"):
+            view = getattr(self, attr, None)
+            if view is not None:
+                view.release()
+        self._mmap.close()
+        self._file.close()
+
+    @property
+    def first_day(self) -> int:
+        return self._starts[0]
+
+    @property
+    def last_day(self) -> int:
+        return self._starts[self.count] - 1
+
+    def covers(self, day_number: int) -> bool:
+        return self._starts[0] <= day_number < self._starts[self.count]
+
+    def lunation_index(self, day_number: int) -> int:
+        """Index of the lunation containing a day (estimate, then at most a step or two)."""
+        if not self.covers(day_number):
+            raise ValueError("Date outside the lunar calendar table")
+        starts = self._starts
+        i = min(int((day_number - starts[0]) / SYNODIC_MONTH), self.count - 1)
+        while starts[i] > day_number:
+            i -= 1
+        while starts[i + 1] <= day_number:
+            i += 1
+        return i
+
+    def lunar_year_of(self, index: int) -> int:
+        """Lunar year a lunation belongs to."""
+        year = self.first_year + min(int(index / 12.37), self.years - 1)
+        year_index = self._year_index
+        while year_index[year - self.first_year] > index:
+            year -= 1
+        while year_index[year - self.first_year + 1] <= index:
+            year += 1
+        return year
+
+    def to_lunar(self, day_number: int) -> LunarDate:
+        """Gregorian day number -> Thai lunar date."""
+        i = self.lunation_index(day_number)
+        start = self._starts[i]
+        flags = self._flags[i]
+        return LunarDate(
+            lunar_year=self.lunar_year_of(i),
+            month=self._months[i],
+            second_eighth=bool(flags & SECOND_EIGHTH_MONTH),
+            day=day_number - start + 1,
+            month_days=self._starts[i + 1] - start,
+            leap_year=bool(flags & LEAP_YEAR),
+        )
+
+    def from_lunar(self, lunar_year: int, month: int, day: int, second_eighth: bool = False) -> int:
+        """Thai lunar date -> Gregorian day number."""
+        if not self.first_year <= lunar_year < self.first_year + self.years:
+            raise ValueError("Lunar year outside the table")
+        if not 1 <= month <= 12:
+            raise ValueError("Lunar month must be 1-12")
+
+        first = self._year_index[lunar_year - self.first_year]
+        leap = bool(self._flags[first] & LEAP_YEAR)
+        if second_eighth and (month != 8 or not leap):
+            raise ValueError(f"Lunar year {lunar_year} has no second 8th month")
+
+        position = MONTH_ORDER.index(month)
+        if leap and (position > 3 or second_eighth):
+            position += 1
+        i = first + position
+        month_days = self._starts[i + 1] - self._starts[i]
+        if not 1 <= day <= month_days:
+            raise ValueError(f"Day must be 1-{month_days} in this month")
+        return self._starts[i] + day - 1
+
+    def new_year_day(self, lunar_year: int) -> Optional[int]:
+        """Day number of ขึ้น 1 ค่ำ เดือน 5 of a lunar year (None outside the table)."""
+        if not self.first_year <= lunar_year < self.first_year + self.years:
+            return None
+        return self._starts[self._year_index[lunar_year - self.first_year]]
+
+    def new_year_days(self) -> Dict[int, int]:
+        """new_year_day() for every year in the table."""
+        return {
+            self.first_year + y: self._starts[self._year_index[y]]
+            for y in range(self.years)
+        }
+
+
+# ============================================================================
+# BUILD
+# ============================================================================
+
+def _month_days(month: int, year_days: int, second_eighth: bool = False) -> int:
+    """Days in a month: 29 odd, 30 even, plus the adhikawan day of month 7."""
+    if second_eighth or month % 2 == 0:
+        return 30
+    return 30 if month == 7 and year_days == ADHIKAWAN_YEAR_DAYS else 29
+
+
+def build_lunar_table(
+    path: str,
+    generator_id: str,
+    first_year: int = 1899,
+    last_year: int = 2100,
+) -> str:
+    """
+    Compute lunar years first_year..last_year and write the table file.
+
+    Args:
+        path: Output file
+        generator_id: Stored in the header; a mismatch triggers a rebuild
+        first_year: First lunar year (its month 5 starts around March or April)
+        last_year: Last lunar year (ends at month 4 of the next year)
+    """
+    years = last_year - first_year + 1
+    fifth_months = [_fifth_month_start(year - CS_YEAR_OFFSET) for year in range(first_year, last_year + 2)]
+    year_lengths = [end - start for start, end in zip(fifth_months, fifth_months[1:])]
+    for y, year_days in enumerate(year_lengths):
+        if year_days not in (NORMAL_YEAR_DAYS, ADHIKAWAN_YEAR_DAYS, ADHIKAMAS_YEAR_DAYS):
+            raise ValueError(f"Lunar year {first_year + y} has {year_days} days")
+        adhikawan = OFFICIAL_ADHIKAWAN.get(first_year + y)
+        if adhikawan is not None and year_days != ADHIKAMAS_YEAR_DAYS:
+            year_lengths[y] = ADHIKAWAN_YEAR_DAYS if adhikawan else NORMAL_YEAR_DAYS
+
+    year_index: List[int] = []
+    starts: List[int] = []
+    months: List[int] = []
+    flags: List[int] = []
+    day = fifth_months[0]
+    for year_days in year_lengths:
+        leap = year_days == ADHIKAMAS_YEAR_DAYS
+        year_index.append(len(starts))
+        for position in range(13 if leap else 12):
+            second_eighth = leap and position == 4
+            month = MONTH_ORDER[position - 1 if leap and position >= 4 else position]
+            starts.append(day)
+            months.append(month)
+            flags.append((SECOND_EIGHTH_MONTH if second_eighth else 0) | (LEAP_YEAR if leap else 0))
+            day += _month_days(month, year_days, second_eighth)
+    year_index.append(len(starts))
+    starts.append(day)
+
+    count = len(months)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        header = LUNAR_HEADER.pack(LUNAR_MAGIC, LUNAR_FORMAT_VERSION, first_year, years, count,
+                                   generator_id.encode("ascii")[:16])
+        f.write(header.ljust(LUNAR_HEADER_SIZE, b"\0"))
+        f.write(struct.pack(f"<{years + 1}i", *year_index))
+        f.write(struct.pack(f"<{count + 1}i", *starts))
+        f.write(bytes(months))
+        f.write(bytes(flags))
+    os.replace(tmp_path, path)
+    return path
+
+
+_lunar_table: Optional[LunarTable] = None
+_lunar_lock = threading.Lock()
+
+
+def get_lunar_table(path: str, generator_id: str) -> LunarTable:
+    """Process-wide lunar table, (re)built if missing or stale."""
+    global _lunar_table
+    if _lunar_table is None:
+        with _lunar_lock:
+            if _lunar_table is None:
+                try:
+                    table = LunarTable(path)
+                    if table.generator_id != generator_id:
+                        table.close()
+                        table = None
+                except (OSError, ValueError, struct.error):
+                    table = None
+                if table is None:
+                    build_lunar_table(path, generator_id)
+                    table = LunarTable(path)
+                _lunar_table = table
+    return _lunar_table
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from app.engines.thai_astrology import ensure_lunar_table
+
+    started = time.perf_counter()
+    table = ensure_lunar_table(force="--force" in sys.argv)
+    print(f"Lunar table ready: {table.path} ({table.years} years, {table.count} months, "
+          f"{time.perf_counter() - started:.1f}s)")
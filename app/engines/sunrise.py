@@ -0,0 +1,104 @@
+"""
+Sunrise & Sunset
+Memoized sunrise/sunset tables for the sunrise-based Thai day
+
+Times come from the NOAA solar equations (about one minute accuracy).
+They only depend on the day of the year and on latitude, so they are
+tabulated once per whole degree of latitude at longitude 0 and shifted
+for the exact longitude (4 minutes per degree) at lookup time.
+"""
+
+import math
+from array import array
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from app.engines.dates import LEAP_DAYS_BEFORE_MONTH, DAYS_BEFORE_MONTH, is_leap_year
+
+# Standard sunrise altitude: refraction plus the solar semi-diameter
+SUNRISE_ZENITH = 90.833
+
+# Table value for days without a sunrise or sunset (polar day / night)
+NO_EVENT = -32768
+
+
+def _sun_events(day_of_year: int, days_in_year: int, latitude: float) -> Tuple[int, int]:
+    """
+    Sunrise and sunset in minutes after 00:00 UTC at longitude 0.
+
+    Returns:
+        (sunrise, sunset), or (NO_EVENT, NO_EVENT) for polar day or night
+    """
+    gamma = 2 * math.pi / days_in_year * (day_of_year - 1)
+    eqtime = 229.18 * (
+        0.000075 + 0.001868 * math.cos(gamma) - 0.032077 * math.sin(gamma)
+        - 0.014615 * math.cos(2 * gamma) - 0.040849 * math.sin(2 * gamma)
+    )
+    decl = (
+        0.006918 - 0.399912 * math.cos(gamma) + 0.070257 * math.sin(gamma)
+        - 0.006758 * math.cos(2 * gamma) + 0.000907 * math.sin(2 * gamma)
+        - 0.002697 * math.cos(3 * gamma) + 0.00148 * math.sin(3 * gamma)
+    )
+    lat = math.radians(latitude)
+    x = math.cos(math.radians(SUNRISE_ZENITH)) / (math.cos(lat) * math.cos(decl)) - math.tan(lat) * math.tan(decl)
+    if abs(x) > 1:
+        return NO_EVENT, NO_EVENT
+    hour_angle = math.degrees(math.acos(x))
+    return round(720 - 4 * hour_angle - eqtime), round(720 + 4 * hour_angle - eqtime)
+
+
+@lru_cache(maxsize=None)
+def sun_table(band: int, leap: bool) -> Tuple[array, array]:
+    """
+    Sunrise and sunset minutes (UTC, longitude 0) for every day of a year.
+
+    Args:
+        band: Whole degree of latitude (-90..90)
+        leap: Whether the year has 366 days
+
+    Returns:
+        (sunrise, sunset) arrays of int16 indexed by day of year - 1
+    """
+    days = 366 if leap else 365
+    sunrise = array("h", [0]) * days
+    sunset = array("h", [0]) * days
+    for i in range(days):
+        sunrise[i], sunset[i] = _sun_events(i + 1, days, band)
+    return sunrise, sunset
+
+
+def _day_index(year: int, month: int, day: int) -> Tuple[int, bool]:
+    leap = is_leap_year(year)
+    before = LEAP_DAYS_BEFORE_MONTH if leap else DAYS_BEFORE_MONTH
+    return before[month] + day - 1, leap
+
+
+def _interpolate(low: int, high: int, fraction: float) -> Optional[float]:
+    if low == NO_EVENT or high == NO_EVENT:
+        return None
+    return low + (high - low) * fraction
+
+
+def sun_times(year: int, month: int, day: int, latitude: float, longitude: float) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Sunrise and sunset for a civil date and place.
+
+    Returns:
+        (sunrise, sunset) in minutes after 00:00 UTC of that date (may be
+        negative east of Greenwich); None when the sun does not rise or set
+    """
+    index, leap = _day_index(year, month, day)
+    latitude = max(-89.0, min(89.0, latitude))
+    band = math.floor(latitude)
+    fraction = latitude - band
+
+    rise_low, set_low = sun_table(band, leap)
+    rise_high, set_high = sun_table(band + 1, leap) if fraction else (rise_low, set_low)
+    sunrise = _interpolate(rise_low[index], rise_high[index], fraction)
+    sunset = _interpolate(set_low[index], set_high[index], fraction)
+
+    shift = 4 * longitude
+    return (
+        sunrise - shift if sunrise is not None else None,
+        sunset - shift if sunset is not None else None,
+    )
@@ -3,8 +3,18 @@ Thai Astrology Engine (โหราศาสตร์ไทย)
 Implements Thai zodiac year animals (นักษัตร), birth days, and Lagna calculation
 """
 
-from typing import Dict, List, Optional, Tuple
-from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from array import array
+from functools import lru_cache
+import math
+
+from app.core.config import settings
+from app.engines import lunar
+from app.engines.astrology import birth_julian_day
+from app.engines.dates import DateInfo, iso_date, lookup_date, naksat_id, parse_time_minutes, parse_utc_offset
+from app.engines.lunar import LunarDate, LunarTable
+from app.engines.houses import ascendant_at, sidereal_frame
+from app.engines.sunrise import sun_times
 
 # ============================================================================
 # 12 ปีนักษัตร (Thai Zodiac Year Animals)
@@ -196,8 +206,26 @@ THAI_BIRTH_DAYS: List[Dict] = [
         "color_th": "สีม่วง",
         "characteristics": ["รอบคอบ", "มีระเบียบ", "อดทน", "จริงจัง", "รับผิดชอบ"]
     },
+    {
+        "day_number": 7,
+        "name_th": "วันพุธกลางคืน",
+        "name_en": "Wednesday night",
+        "ruling_planet_th": "พระราหู",
+        "ruling_planet_en": "Rahu",
+        "color": "Gray",
+        "color_th": "สีเทา",
+        "characteristics": ["มีความคิดลึกซึ้ง", "กล้าเสี่ยง", "มีความลับ", "ไม่ยึดติดกรอบ", "มีเสน่ห์ลึกลับ"]
+    },
 ]
 
+WEDNESDAY = 3
+WEDNESDAY_NIGHT = 7     # ราหู: from Wednesday sunset until Thursday sunrise
+
+# Birth place assumed for the sunrise-based day when none is given (Bangkok)
+DEFAULT_LATITUDE = 13.7563
+DEFAULT_LONGITUDE = 100.5018
+DEFAULT_TIMEZONE_OFFSET = "+07:00"
+
 # ============================================================================
 # 12 ลัคนาราศี (Thai Lagna / Rising Signs)
 # ============================================================================
@@ -317,25 +345,135 @@ def get_thai_year_animal(birth_year: int) -> Dict:
     # 1900: (1900-4) % 12 = 0 (Rat) ✓
     # 1990: (1990-4) % 12 = 6 (Horse) ✓
     
-    animal_id = (birth_year - 4) % 12
-    return THAI_YEAR_ANIMALS[animal_id]
+    return THAI_YEAR_ANIMALS[naksat_id(birth_year)]
+
+
+def check_place(latitude: float, longitude: float, timezone_offset: str) -> int:
+    """
+    Validate a birth place for the sunrise-based day.
+
+    Returns:
+        The UTC offset in minutes
+
+    Raises:
+        ValueError: Latitude outside -90..90, longitude outside -180..180
+            (or not finite), or an unreadable offset
+    """
+    if not (isinstance(latitude, (int, float)) and math.isfinite(latitude) and -90 <= latitude <= 90):
+        raise ValueError(f"Invalid latitude {latitude!r}: must be between -90 and 90")
+    if not (isinstance(longitude, (int, float)) and math.isfinite(longitude) and -180 <= longitude <= 180):
+        raise ValueError(f"Invalid longitude {longitude!r}: must be between -180 and 180")
+    try:
+        return parse_utc_offset(timezone_offset)
+    except (ValueError, AttributeError):
+        raise ValueError(f"Invalid timezone_offset {timezone_offset!r}. Use +HH:MM.")
+
+
+def _local_sun_times(date: DateInfo, latitude: float, longitude: float, offset_minutes: int) -> Tuple[float, Optional[float]]:
+    """Local sunrise and sunset (minutes after local midnight) for a civil date."""
+    sunrise, sunset = sun_times(date.year, date.month, date.day, latitude, longitude)
+    # No sunrise (polar day/night): the Thai day falls back to midnight
+    local_sunrise = sunrise + offset_minutes if sunrise is not None else 0
+    local_sunset = sunset + offset_minutes if sunset is not None else None
+    return local_sunrise, local_sunset
+
+
+def _thai_day_number(weekday: int, minute: int, local_sunrise: float, local_sunset: Optional[float]) -> int:
+    """Thai day (0-7) of a local time, given that civil date's sunrise and sunset."""
+    if minute < local_sunrise:
+        # Before sunrise: still the night of the previous Thai day
+        weekday = (weekday - 1) % 7
+        night = True
+    else:
+        night = local_sunset is not None and minute >= local_sunset
+    if weekday == WEDNESDAY and night:
+        return WEDNESDAY_NIGHT
+    return weekday
+
+
+def thai_day_number(
+    birth_date: str,
+    birth_time: str,
+    latitude: float = DEFAULT_LATITUDE,
+    longitude: float = DEFAULT_LONGITUDE,
+    timezone_offset: str = DEFAULT_TIMEZONE_OFFSET
+) -> int:
+    """
+    Thai birth day number, where the day starts at sunrise.
+    
+    Returns:
+        0 = Sunday ... 6 = Saturday, 7 = Wednesday night (ราหู)
+    """
+    offset = check_place(latitude, longitude, timezone_offset)
+    date = lookup_date(birth_date)
+    sunrise, sunset = _local_sun_times(date, latitude, longitude, offset)
+    return _thai_day_number(date.weekday, parse_time_minutes(birth_time), sunrise, sunset)
 
 
-def get_thai_birth_day(birth_date: str) -> Dict:
+def thai_day_column(
+    birth_dates: Sequence[str],
+    birth_times: Sequence[Optional[str]],
+    latitude: float = DEFAULT_LATITUDE,
+    longitude: float = DEFAULT_LONGITUDE,
+    timezone_offset: str = DEFAULT_TIMEZONE_OFFSET
+) -> array:
+    """
+    thai_day_number() for many births at one place.
+    
+    Sunrise is looked up once per distinct date. A missing time falls back
+    to the civil weekday; an invalid date or time gives -1.
+
+    Raises:
+        ValueError: When the place is invalid (see check_place)
+    """
+    offset = check_place(latitude, longitude, timezone_offset)
+    days: Dict[str, Tuple[int, float, Optional[float]]] = {}
+    result = array("b", [-1]) * len(birth_dates)
+    
+    for i, (birth_date, birth_time) in enumerate(zip(birth_dates, birth_times)):
+        try:
+            day = days.get(birth_date)
+            if day is None:
+                date = lookup_date(birth_date)
+                day = (date.weekday,) + _local_sun_times(date, latitude, longitude, offset)
+                days[birth_date] = day
+            if birth_time:
+                result[i] = _thai_day_number(day[0], parse_time_minutes(birth_time), day[1], day[2])
+            else:
+                result[i] = day[0]
+        except (ValueError, TypeError):
+            continue
+    return result
+
+
+def get_thai_birth_day(
+    birth_date: str,
+    birth_time: Optional[str] = None,
+    latitude: float = DEFAULT_LATITUDE,
+    longitude: float = DEFAULT_LONGITUDE,
+    timezone_offset: str = DEFAULT_TIMEZONE_OFFSET
+) -> Dict:
     """
     Get Thai birth day information from date.
     
+    Without a birth time this is the civil weekday. With one, the Thai day
+    starts at sunrise at the birth place, and Wednesday after sunset is
+    Wednesday night (ราหู).
+    
     Args:
         birth_date: Date in YYYY-MM-DD format
+        birth_time: Optional time in HH:MM format
+        latitude: Birth latitude (default Bangkok)
+        longitude: Birth longitude (default Bangkok)
+        timezone_offset: UTC offset of birth_time
         
     Returns:
         Thai birth day data
     """
-    date = datetime.strptime(birth_date, "%Y-%m-%d")
-    # weekday(): Monday=0, Sunday=6
-    # We want: Sunday=0, Monday=1, ..., Saturday=6
-    day_number = (date.weekday() + 1) % 7
-    return THAI_BIRTH_DAYS[day_number]
+    if birth_time:
+        return THAI_BIRTH_DAYS[thai_day_number(birth_date, birth_time, latitude, longitude, timezone_offset)]
+    # Sunday=0, Monday=1, ..., Saturday=6
+    return THAI_BIRTH_DAYS[lookup_date(birth_date).weekday]
 
 
 def calculate_thai_lagna(birth_time: str) -> Dict:
@@ -374,47 +512,323 @@ def calculate_thai_lagna(birth_time: str) -> Dict:
     return THAI_LAGNA[lagna_id]
 
 
+# ============================================================================
+# SIDEREAL LAGNA (ลัคนาตามจริง)
+# ============================================================================
+
+# Ayanamsa: value at J2000 (degrees) and drift per Julian century
+AYANAMSAS: Dict[str, Tuple[float, float]] = {
+    "lahiri": (23.85306, 1.39688),
+}
+
+# Rising tables: tropical Ascendant every RISING_TABLE_STEP degrees of RAMC,
+# one table per whole degree of latitude (interpolation error < 0.1 degree
+# up to RISING_MAX_LATITUDE; beyond it the exact formula is used)
+RISING_TABLE_STEP = 0.5
+RISING_MAX_LATITUDE = 60
+RISING_OBLIQUITY = 23.4393
+
+
+def ayanamsa(jd: float, system: str = "lahiri") -> float:
+    """Ayanamsa (degrees) to subtract from tropical longitudes at jd."""
+    try:
+        at_j2000, per_century = AYANAMSAS[system.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown ayanamsa '{system}'. Choose from: {', '.join(AYANAMSAS)}")
+    return at_j2000 + per_century * (jd - 2451545.0) / 36525.0
+
+
+@lru_cache(maxsize=None)
+def rising_table(band: int) -> Tuple[float, ...]:
+    """
+    Tropical Ascendant at each RAMC step for one latitude band.
+    
+    Values are unwrapped (monotonically increasing past 360) so neighbours
+    can be interpolated directly.
+    """
+    eps_rad = math.radians(RISING_OBLIQUITY)
+    lat_rad = math.radians(band)
+    steps = int(round(360 / RISING_TABLE_STEP))
+    
+    values = []
+    offset = 0.0
+    for i in range(steps + 1):
+        asc = ascendant_at(i * RISING_TABLE_STEP, eps_rad, lat_rad) + offset
+        if values and asc < values[-1]:
+            offset += 360.0
+            asc += 360.0
+        values.append(asc)
+    return tuple(values)
+
+
+def _table_ascendant(band: int, ramc: float) -> float:
+    table = rising_table(band)
+    position = (ramc % 360) / RISING_TABLE_STEP
+    i = int(position)
+    return table[i] + (table[i + 1] - table[i]) * (position - i)
+
+
+def tabulated_ascendant(ramc: float, latitude: float) -> float:
+    """
+    Tropical Ascendant from the rising tables (RAMC and latitude interpolated).
+    
+    At high latitudes the Ascendant moves too unevenly for the tables;
+    the exact formula is used there.
+    """
+    if abs(latitude) >= RISING_MAX_LATITUDE:
+        return ascendant_at(ramc, math.radians(RISING_OBLIQUITY), math.radians(latitude))
+    
+    band = math.floor(latitude)
+    fraction = latitude - band
+    low = _table_ascendant(band, ramc)
+    if not fraction:
+        return low % 360
+    high = _table_ascendant(band + 1, ramc)
+    return (low + fraction * ((high - low + 180) % 360 - 180)) % 360
+
+
+def sidereal_ascendant(
+    birth_date: str,
+    birth_time: str,
+    latitude: float,
+    longitude: float,
+    timezone_offset: str = DEFAULT_TIMEZONE_OFFSET,
+    ayanamsa_system: str = "lahiri"
+) -> float:
+    """Sidereal Ascendant longitude (0-360) at a birth time and place."""
+    jd = birth_julian_day(birth_date, birth_time, timezone_offset)
+    frame = sidereal_frame(jd, longitude)
+    return (tabulated_ascendant(frame.ramc, latitude) - ayanamsa(jd, ayanamsa_system)) % 360
+
+
+def calculate_sidereal_lagna(
+    birth_date: str,
+    birth_time: str,
+    latitude: float,
+    longitude: float,
+    timezone_offset: str = DEFAULT_TIMEZONE_OFFSET,
+    ayanamsa_system: str = "lahiri"
+) -> Dict:
+    """
+    Thai Lagna from the real sidereal Ascendant at the birth place.
+    
+    Args:
+        birth_date: Date in YYYY-MM-DD format
+        birth_time: Time in HH:MM format (24-hour)
+        latitude: Birth location latitude
+        longitude: Birth location longitude
+        timezone_offset: UTC offset (Thailand: "+07:00")
+        ayanamsa_system: Ayanamsa to subtract (default Lahiri)
+        
+    Returns:
+        Thai Lagna data plus the sidereal degree within the rasi
+    """
+    sidereal_asc = sidereal_ascendant(birth_date, birth_time, latitude, longitude, timezone_offset, ayanamsa_system)
+    lagna_id = int(sidereal_asc // 30)
+    return {**THAI_LAGNA[lagna_id], "degree": round(sidereal_asc % 30, 2)}
+
+
+# ============================================================================
+# LUNAR CALENDAR (ปฏิทินจันทรคติ)
+# ============================================================================
+
+# Bump whenever the calendar rules change so the table is rebuilt
+LUNAR_GENERATOR_ID = "suriyayatra-v1"
+
+THAI_LUNAR_MONTHS = {
+    1: "เดือนอ้าย", 2: "เดือนยี่", 3: "เดือนสาม", 4: "เดือนสี่",
+    5: "เดือนห้า", 6: "เดือนหก", 7: "เดือนเจ็ด", 8: "เดือนแปด",
+    9: "เดือนเก้า", 10: "เดือนสิบ", 11: "เดือนสิบเอ็ด", 12: "เดือนสิบสอง",
+}
+
+
+def ensure_lunar_table(force: bool = False) -> LunarTable:
+    """Open the precomputed lunar calendar table, building it first if needed."""
+    if force:
+        lunar.build_lunar_table(settings.LUNAR_PATH, LUNAR_GENERATOR_ID)
+    return lunar.get_lunar_table(settings.LUNAR_PATH, LUNAR_GENERATOR_ID)
+
+
+def year_animal_for_date(date: DateInfo) -> Dict:
+    """
+    ปีนักษัตร of a date: the animal year starts at ขึ้น 1 ค่ำ เดือน 5.
+    
+    Outside the lunar table (1900-2100) the Gregorian year is used.
+    """
+    new_year = ensure_lunar_table().new_year_day(date.year)
+    if new_year is not None and date.day_number < new_year:
+        return THAI_YEAR_ANIMALS[naksat_id(date.year - 1)]
+    return THAI_YEAR_ANIMALS[date.naksat]
+
+
+def get_lunar_date(birth_date: str) -> Dict:
+    """
+    Convert a Gregorian date to the Thai lunar calendar.
+    
+    Args:
+        birth_date: Date in YYYY-MM-DD format
+        
+    Returns:
+        Lunar day (ขึ้น/แรม ... ค่ำ), month, 8-8 flag, lunar year and its animal
+    """
+    date = lookup_date(birth_date)
+    table = ensure_lunar_table()
+    if not table.covers(date.day_number):
+        raise ValueError("Lunar calendar covers 1900-2100 only")
+    return lunar_date_dict(birth_date, table.to_lunar(date.day_number))
+
+
+def gregorian_from_lunar(lunar_year: int, month: int, day: int, waning: bool = False, second_eighth: bool = False) -> str:
+    """
+    Convert a Thai lunar date back to a Gregorian YYYY-MM-DD date.
+    
+    Args:
+        lunar_year: Gregorian year in which the lunar year's เดือน 5 begins
+        month: Lunar month 1-12
+        day: ค่ำ (1-15)
+        waning: แรม (waning) instead of ขึ้น (waxing)
+        second_eighth: The repeated เดือน 8 (8-8) of a leap year
+    """
+    if not 1 <= day <= 15:
+        raise ValueError("Lunar day (ค่ำ) must be 1-15")
+    n = ensure_lunar_table().from_lunar(lunar_year, month, day + 15 if waning else day, second_eighth)
+    return iso_date(n)
+
+
+def lunar_date_dict(gregorian_date: str, lunar_date: LunarDate) -> Dict:
+    waning = lunar_date.day > 15
+    day = lunar_date.day - 15 if waning else lunar_date.day
+    phase_th = "แรม" if waning else "ขึ้น"
+    month_th = "เดือนแปดหลัง" if lunar_date.second_eighth else THAI_LUNAR_MONTHS[lunar_date.month]
+    year_animal = THAI_YEAR_ANIMALS[naksat_id(lunar_date.lunar_year)]
+    return {
+        "gregorian_date": gregorian_date,
+        "lunar_year": lunar_date.lunar_year,
+        "thai_year": gregorian_to_thai_year(lunar_date.lunar_year),
+        "month": lunar_date.month,
+        "month_th": month_th,
+        "second_eighth": lunar_date.second_eighth,
+        "day": day,
+        "waning": waning,
+        "month_days": lunar_date.month_days,
+        "leap_year": lunar_date.leap_year,
+        "year_animal": year_animal,
+        "text_th": f"{phase_th} {day} ค่ำ {month_th} {year_animal['name_th']}",
+    }
+
+
 def gregorian_to_thai_year(year: int) -> int:
     """Convert Gregorian year to Thai Buddhist Era (พ.ศ.)"""
     return year + 543
 
 
-def get_thai_reading(birth_date: str, birth_time: Optional[str] = None) -> Dict:
+class ReadingCore(NamedTuple):
+    """Everything a Thai reading depends on, as table ids."""
+    year_animal: int                    # THAI_YEAR_ANIMALS id
+    birth_day: int                      # THAI_BIRTH_DAYS id (7 = Wednesday night)
+    lagna: Optional[int]                # THAI_LAGNA id, None without a birth time
+    lagna_degree: Optional[float]       # sidereal lagna only
+    lagna_method: Optional[str]         # "sidereal", "simplified" or None
+    lunar_date: Optional[LunarDate]     # None outside 1900-2100
+
+
+def thai_reading_core(
+    birth_date: str,
+    birth_time: Optional[str] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    timezone_offset: str = DEFAULT_TIMEZONE_OFFSET
+) -> ReadingCore:
+    """Resolve the ids of a reading (same arguments as get_thai_reading)."""
+    # Parse once; year animal and birth day come from the same lookup
+    date = lookup_date(birth_date)
+    
+    # The animal year begins at the lunar new year (ขึ้น 1 ค่ำ เดือน 5)
+    table = ensure_lunar_table()
+    lunar_date = None
+    year_animal = date.naksat
+    if table.covers(date.day_number):
+        lunar_date = table.to_lunar(date.day_number)
+        year_animal = naksat_id(lunar_date.lunar_year)
+    
+    if birth_time:
+        # The Thai day begins at sunrise (Bangkok unless a place is given)
+        sunrise, sunset = _local_sun_times(
+            date,
+            DEFAULT_LATITUDE if latitude is None else latitude,
+            DEFAULT_LONGITUDE if longitude is None else longitude,
+            parse_utc_offset(timezone_offset)
+        )
+        birth_day = _thai_day_number(date.weekday, parse_time_minutes(birth_time), sunrise, sunset)
+    else:
+        birth_day = date.weekday
+    
+    lagna = None
+    lagna_degree = None
+    lagna_method = None
+    if birth_time and latitude is not None and longitude is not None:
+        sidereal_asc = sidereal_ascendant(birth_date, birth_time, latitude, longitude, timezone_offset)
+        lagna, lagna_degree = int(sidereal_asc // 30), round(sidereal_asc % 30, 2)
+        lagna_method = "sidereal"
+    elif birth_time:
+        lagna = calculate_thai_lagna(birth_time)["lagna_id"]
+        lagna_method = "simplified"
+    
+    return ReadingCore(year_animal, birth_day, lagna, lagna_degree, lagna_method, lunar_date)
+
+
+def reading_summary(year_animal: int, birth_day: int, lagna: Optional[int]) -> str:
+    """summary_th of a reading."""
+    animal = THAI_YEAR_ANIMALS[year_animal]
+    day = THAI_BIRTH_DAYS[birth_day]
+    summary_parts = [
+        f"คุณเกิด{animal['name_th']} ({animal['animal_th']})",
+        f"ตรงกับ{day['name_th']}",
+        f"มีดาวประจำวันคือ{day['ruling_planet_th']}",
+        f"สีประจำวันคือ{day['color_th']}"
+    ]
+    
+    if lagna is not None:
+        summary_parts.append(f"มี{THAI_LAGNA[lagna]['name_th']}")
+    
+    return " ".join(summary_parts)
+
+
+def get_thai_reading(
+    birth_date: str,
+    birth_time: Optional[str] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    timezone_offset: str = DEFAULT_TIMEZONE_OFFSET
+) -> Dict:
     """
     Get complete Thai horoscope reading.
     
     Args:
         birth_date: Date in YYYY-MM-DD format
         birth_time: Optional time in HH:MM format
+        latitude: Optional birth latitude (enables the sidereal lagna)
+        longitude: Optional birth longitude (enables the sidereal lagna)
+        timezone_offset: UTC offset of birth_time (default Thailand)
         
     Returns:
         Complete Thai reading data
     """
-    date = datetime.strptime(birth_date, "%Y-%m-%d")
-    year = date.year
-    
-    year_animal = get_thai_year_animal(year)
-    birth_day = get_thai_birth_day(birth_date)
-    lagna = calculate_thai_lagna(birth_time) if birth_time else None
+    core = thai_reading_core(birth_date, birth_time, latitude, longitude, timezone_offset)
     
-    # Generate summary
-    summary_parts = [
-        f"คุณเกิด{year_animal['name_th']} ({year_animal['animal_th']})",
-        f"ตรงกับ{birth_day['name_th']}",
-        f"มีดาวประจำวันคือ{birth_day['ruling_planet_th']}",
-        f"สีประจำวันคือ{birth_day['color_th']}"
-    ]
-    
-    if lagna:
-        summary_parts.append(f"มี{lagna['name_th']}")
-    
-    summary_th = " ".join(summary_parts)
+    lagna = None
+    if core.lagna_method == "sidereal":
+        lagna = {**THAI_LAGNA[core.lagna], "degree": core.lagna_degree}
+    elif core.lagna is not None:
+        lagna = THAI_LAGNA[core.lagna]
     
     return {
         "birth_date": birth_date,
         "birth_time": birth_time,
-        "year_animal": year_animal,
-        "birth_day": birth_day,
+        "year_animal": THAI_YEAR_ANIMALS[core.year_animal],
+        "birth_day": THAI_BIRTH_DAYS[core.birth_day],
         "lagna": lagna,
-        "summary_th": summary_th
+        "lagna_method": core.lagna_method,
+        "lunar_date": lunar_date_dict(birth_date, core.lunar_date) if core.lunar_date else None,
+        "summary_th": reading_summary(core.year_animal, core.birth_day, core.lagna)
     }
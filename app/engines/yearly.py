@@ -0,0 +1,157 @@
+"""
+Yearly Forecast (ดวงรายปี)
+Crosses a year's animal, element and ruling day with a person's ปีนักษัตร and วันเกิด
+
+A year is described by its animal (lunar year), its element (the
+heavenly-stem cycle, two years per element) and its ruling day: the
+weekday of ขึ้น 1 ค่ำ เดือน 5. A person only matters through their year
+animal and birth day, so there are 12 x 8 forecasts per year, which are
+pre-generated by the scheduler.
+"""
+
+from typing import Dict
+
+from app.engines.compatibility import animal_relation, element_relation, role_score, taksa_role
+from app.engines.auspicious import TAKSA_ROLES, KALAKINI
+from app.engines.dates import iso_date, naksat_id
+from app.engines.thai_astrology import (
+    THAI_BIRTH_DAYS,
+    THAI_YEAR_ANIMALS,
+    ensure_lunar_table,
+    gregorian_to_thai_year
+)
+
+# Element of each heavenly stem, (year - 4) % 10: 1984 was Wood
+STEM_ELEMENTS = ("Wood", "Wood", "Fire", "Fire", "Earth", "Earth", "Metal", "Metal", "Water", "Water")
+
+ELEMENTS_TH = {
+    "Wood": "ธาตุไม้",
+    "Fire": "ธาตุไฟ",
+    "Earth": "ธาตุดิน",
+    "Metal": "ธาตุทอง",
+    "Water": "ธาตุน้ำ",
+}
+
+FORECAST_LANGUAGES = ("th", "en")
+
+# Score range of the three relations, for the 0-100 overall score
+_MIN_SCORE = -5 - 2 - 3
+_MAX_SCORE = 5 + 2 + 3
+
+# Outlook sentence per relation (Thai, English)
+ANIMAL_OUTLOOK = {
+    "ปีเดียวกัน": ("เป็นปีนักษัตรของตัวเอง มีเรื่องเปลี่ยนแปลงมาก ควรรอบคอบก่อนตัดสินใจเรื่องใหญ่",
+                   "It is your own animal year: expect changes and weigh big decisions carefully."),
+    "ปีชง": ("เป็นปีชง ควรระวังอุบัติเหตุและความขัดแย้ง ทำบุญเสริมดวงและไม่ประมาท",
+             "A clash year: be careful with accidents and conflicts, and avoid unnecessary risks."),
+    "คู่มิตร": ("ปีนักษัตรเป็นคู่มิตร มีผู้ใหญ่และเพื่อนคอยอุปถัมภ์ งานที่ริเริ่มมีโอกาสสำเร็จ",
+                "The year animal is a secret friend: supporters appear and new ventures can succeed."),
+    "สามสหาย": ("ปีนักษัตรเป็นสามสหาย การงานและการเงินราบรื่น ได้รับความร่วมมือที่ดี",
+                "The year animal is a trine ally: work and money run smoothly with good cooperation."),
+    "คู่กัด": ("ปีนักษัตรเป็นคู่กัด ระวังคำพูดและเรื่องเข้าใจผิดกับคนใกล้ตัว",
+               "The year animal harms yours: mind your words and misunderstandings with those close to you."),
+    "เป็นกลาง": ("ปีนักษัตรเป็นกลางกับดวงเดิม ผลลัพธ์ขึ้นกับความขยันของตัวเอง",
+                 "The year animal is neutral to yours: results follow your own effort."),
+}
+ELEMENT_OUTLOOK = {
+    "ธาตุเดียวกัน": ("ธาตุของปีเป็นธาตุเดียวกัน ช่วยให้มั่นคง", "The year's element matches yours, bringing stability."),
+    "ธาตุส่งเสริม": ("ธาตุของปีส่งเสริมกัน การเงินมีช่องทางเพิ่ม", "The elements support each other: new income channels open."),
+    "ธาตุข่ม": ("ธาตุของปีข่มกัน ควรวางแผนการเงินและดูแลสุขภาพ", "The elements control each other: plan finances and look after your health."),
+}
+ROLE_OUTLOOK = {
+    "บริวาร": ("วันอธิบดีของปีเป็นบริวาร ได้แรงสนับสนุนจากคนรอบตัว", "The year's ruling day is your Companions day: people around you help."),
+    "อายุ": ("วันอธิบดีของปีเป็นอายุ สุขภาพและชีวิตประจำวันราบรื่น", "The ruling day is your Longevity day: health and daily life are steady."),
+    "เดช": ("วันอธิบดีของปีเป็นเดช มีอำนาจ บารมี เหมาะกับการเลื่อนตำแหน่ง", "The ruling day is your Power day: authority grows and promotions are likely."),
+    "ศรี": ("วันอธิบดีของปีเป็นศรี โชคลาภและเสน่ห์โดดเด่น", "The ruling day is your Fortune day: luck and charm stand out."),
+    "มูละ": ("วันอธิบดีของปีเป็นมูละ เหมาะกับการสะสมทรัพย์และสร้างรากฐาน", "The ruling day is your Foundation day: good for saving and building assets."),
+    "อุตสาหะ": ("วันอธิบดีของปีเป็นอุตสาหะ ความสำเร็จมาจากความขยัน", "The ruling day is your Diligence day: success comes through hard work."),
+    "มนตรี": ("วันอธิบดีของปีเป็นมนตรี มีผู้ใหญ่ให้คำปรึกษาและช่วยเหลือ", "The ruling day is your Patronage day: mentors advise and assist."),
+    "กาลกิณี": ("วันอธิบดีของปีเป็นกาลกิณี ควรระวังอุปสรรคและไม่ลงทุนเสี่ยง", "The ruling day is your Misfortune day: expect obstacles and avoid risky investments."),
+}
+
+
+def year_element(year: int) -> str:
+    return STEM_ELEMENTS[(year - 4) % 10]
+
+
+def year_profile(year: int) -> Dict:
+    """
+    Animal, element and ruling day of a lunar year.
+
+    Args:
+        year: Gregorian year in which the lunar year's เดือน 5 begins (1900-2100)
+    """
+    new_year = ensure_lunar_table().new_year_day(year)
+    if new_year is None:
+        raise ValueError("Yearly forecasts are available for 1900-2100 only")
+    element = year_element(year)
+    return {
+        "year": year,
+        "thai_year": gregorian_to_thai_year(year),
+        "year_animal": THAI_YEAR_ANIMALS[naksat_id(year)],
+        "element": element,
+        "element_th": ELEMENTS_TH[element],
+        "new_year_date": iso_date(new_year),
+        "ruling_day": THAI_BIRTH_DAYS[new_year % 7],
+    }
+
+
+def yearly_forecast(year: int, year_animal: int, birth_day: int) -> Dict:
+    """
+    Rule-based forecast of a year for one year animal and birth day.
+
+    Args:
+        year: Gregorian year of the forecast (lunar year)
+        year_animal: THAI_YEAR_ANIMALS id of the person
+        birth_day: THAI_BIRTH_DAYS id of the person (0-7)
+
+    Returns:
+        Year profile, the three relations, a 0-100 score and outlook
+        sentences in every FORECAST_LANGUAGES language
+    """
+    profile = year_profile(year)
+    person_animal = THAI_YEAR_ANIMALS[year_animal]
+
+    animal_th, animal_en, animal_score = animal_relation(year_animal, profile["year_animal"]["id"])
+    element_th, element_en, element_score = element_relation(person_animal["element"], profile["element"])
+    role = taksa_role(birth_day, profile["ruling_day"]["day_number"])
+    day_score = role_score(role)
+
+    raw = animal_score + element_score + max(-3, min(3, day_score))
+    score = round(100 * (raw - _MIN_SCORE) / (_MAX_SCORE - _MIN_SCORE))
+    outlook = [ANIMAL_OUTLOOK[animal_th], ELEMENT_OUTLOOK[element_th], ROLE_OUTLOOK[TAKSA_ROLES[role][0]]]
+
+    return {
+        **profile,
+        "person_year_animal": person_animal,
+        "person_birth_day": THAI_BIRTH_DAYS[birth_day],
+        "relations": {
+            "year_animal": {"label_th": animal_th, "label_en": animal_en, "score": animal_score},
+            "element": {"label_th": element_th, "label_en": element_en, "score": element_score},
+            "ruling_day": {"label_th": TAKSA_ROLES[role][0], "label_en": TAKSA_ROLES[role][1], "score": day_score},
+        },
+        "clash": animal_th == "ปีชง",
+        "kalakini": role == KALAKINI,
+        "score": score,
+        "outlook": {"th": [th for th, _ in outlook], "en": [en for _, en in outlook]},
+    }
+
+
+def forecast_text(forecast: Dict, lang: str = "th") -> str:
+    """Plain forecast text from the rules (used when no AI text is available)."""
+    if lang not in FORECAST_LANGUAGES:
+        raise ValueError(f"Unsupported language '{lang}'. Choose from: {', '.join(FORECAST_LANGUAGES)}")
+    animal = forecast["person_year_animal"]
+    day = forecast["person_birth_day"]
+    year_animal = forecast["year_animal"]
+    if lang == "th":
+        intro = (
+            f"ดวงปี พ.ศ. {forecast['thai_year']} ({year_animal['name_th']} {forecast['element_th']}) "
+            f"สำหรับผู้เกิด{animal['name_th']} {day['name_th']}:"
+        )
+    else:
+        intro = (
+            f"{forecast['year']} ({forecast['element']} {year_animal['animal_en']}) "
+            f"for a {animal['animal_en']} born on {day['name_en']}:"
+        )
+    return " ".join([intro] + forecast["outlook"][lang])
@@ -3,19 +3,139 @@ The Oracle Engine - Universal AI Horoscope API
 Main FastAPI Application Entry Point
 """
 
-from fastapi import FastAPI, Request
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
+from app.core import metrics
+from app.core.ai_client import breaker
+from app.core.cache import cache
 from app.core.config import settings
-from app.routers import v1_tarot, v1_horoscope, v1_thai, v1_ai
+from app.core.executor import compute
+from app.core.health import health
+from app.core.history import history
+from app.core.prompt_store import prompt_store
+from app.core.interpretations import interpretations, refresh_daily_horoscopes, refresh_yearly_forecasts
+from app.core.reading_templates import get_reading_templates
+from app.core.scheduler import scheduler
+from app.core.timing import TimingMiddleware, timing_stats
+from app.core.sky import refresh_sky, run_sky_refresher
+from app.engines.astrology import ensure_ephemeris, ensure_stations, natal_chart_cache
+from app.engines.geo import ensure_geo_index
+from app.engines.thai_astrology import ensure_lunar_table
+from app.routers import v1_tarot, v1_horoscope, v1_thai, v1_ai, v1_geo, v1_lookup, v1_history
 
 # Rate limiter setup
 limiter = Limiter(key_func=get_remote_address)
 
+
+def collect_metrics():
+    """Copy the counts the engines already keep into the Prometheus metrics."""
+    for name, stats in cache.stats()["namespaces"].items():
+        for result, field in (("l1_hit", "l1_hits"), ("l2_hit", "l2_hits"), ("coalesced", "coalesced"), ("miss", "misses")):
+            metrics.CACHE_LOOKUPS.set_total((name, result), stats[field])
+        metrics.CACHE_ERRORS.set_total((name, "load"), stats["load_errors"])
+        metrics.CACHE_ERRORS.set_total((name, "l2"), stats["l2_errors"])
+    natal_stats = natal_chart_cache.stats()
+    metrics.CACHE_LOOKUPS.set_total(("natal_chart", "l1_hit"), natal_stats["hits"])
+    metrics.CACHE_LOOKUPS.set_total(("natal_chart", "miss"), natal_stats["misses"])
+    metrics.CACHE_LOOKUPS.set_total(("prompt_store", "disk_hit"), prompt_store.disk_hits)
+    metrics.CACHE_LOOKUPS.set_total(("prompt_store", "miss"), prompt_store.disk_misses)
+    metrics.CACHE_ENTRIES.set(("natal_chart",), natal_stats["size"])
+    metrics.CACHE_ENTRIES.set(("two_tier_l1",), len(cache.l1))
+    
+    metrics.EXECUTOR_TASKS.set_total(("submitted",), compute.submitted)
+    metrics.EXECUTOR_TASKS.set_total(("completed",), compute.completed)
+    metrics.EXECUTOR_TASKS.set_total(("failed",), compute.failed)
+    metrics.QUEUE_DEPTH.set(("executor",), compute.in_flight)
+    
+    history_stats = history.stats()
+    metrics.QUEUE_DEPTH.set(("history",), history_stats["queued"])
+    metrics.HISTORY_RECORDS.set_total(("written",), history_stats["written"])
+    metrics.HISTORY_RECORDS.set_total(("dropped",), history_stats["dropped"])
+    metrics.QUEUE_DEPTH.set(("prompt_store_writes",), prompt_store.pending_writes)
+    metrics.AI_CIRCUIT_OPEN.set((), 1.0 if breaker.state == "open" else 0.0)
+
+
+metrics.add_collector(collect_metrics)
+
+# Stats sections of /health, recomputed by the health monitor (not per probe)
+health.add_section("executor", compute.metrics)
+health.add_section("caches", lambda: {
+    "natal_chart": natal_chart_cache.stats(),
+    "two_tier": cache.stats(),
+    "prompt_store": prompt_store.stats()
+})
+health.add_section("history", history.stats)
+health.add_section("timings", timing_stats.stats)
+health.add_section("interpretations", interpretations.stats)
+health.add_section("scheduler", scheduler.status)
+
+
+async def rate_limit_exceeded(request: Request, exc: RateLimitExceeded):
+    """slowapi's 429 response, counted per route."""
+    metrics.RATE_LIMITED.inc((metrics.route_template(request.scope),))
+    return _rate_limit_exceeded_handler(request, exc)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm shared tables and start background tasks before serving traffic."""
+    # Opens (or builds on first deploy) the memory-mapped ephemeris table
+    ensure_ephemeris()
+    ensure_stations()
+    ensure_geo_index()
+    ensure_lunar_table()
+    
+    # Every Thai reading core, pre-encoded as JSON fragments
+    get_reading_templates()
+    
+    # Most-used AI texts from disk into the cache; batched writes from now on
+    prompt_store.warm(settings.PROMPT_STORE_WARM_KEYS)
+    prompt_store.start()
+    
+    # Reading history: enqueued by requests, batch-inserted by a writer task
+    history.start()
+    
+    # Worker processes for CPU-bound charts (tables mapped in each worker)
+    await compute.start()
+    
+    # Current sky: computed once now, then refreshed every minute
+    refresh_sky()
+    sky_task = asyncio.create_task(run_sky_refresher())
+    
+    # Event-loop lag and engine counts (/metrics, /ready)
+    metrics.sampler.start()
+    
+    # Dependency probes and the /health report, refreshed in the background
+    await health.check()
+    health.start()
+    
+    # Forecast texts pre-generated ahead of requests
+    if settings.SCHEDULER_ENABLED:
+        scheduler.add("yearly_forecasts", refresh_yearly_forecasts, settings.YEARLY_REFRESH_SECONDS)
+        # Today and tomorrow: tomorrow is ready long before midnight Bangkok time
+        scheduler.add("daily_horoscopes", refresh_daily_horoscopes, settings.DAILY_REFRESH_SECONDS)
+        await scheduler.start(prompt_store.acquire_lease, prompt_store.release_lease)
+    
+    yield
+    
+    await scheduler.stop()
+    health.stop()
+    metrics.sampler.stop()
+    sky_task.cancel()
+    compute.shutdown()
+    await prompt_store.stop()
+    await history.stop()
+    await cache.close()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
@@ -23,6 +143,7 @@ app = FastAPI(
     version=settings.APP_VERSION,
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
     openapi_tags=[
         {
             "name": "AI Interpretation",
@@ -36,6 +157,18 @@ app = FastAPI(
             "name": "Horoscope",
             "description": "Western natal chart and zodiac sign endpoints"
         },
+        {
+            "name": "Geo",
+            "description": "Offline city search and timezone lookups"
+        },
+        {
+            "name": "Lookup",
+            "description": "Columnar bulk lookups (ราศี, วันเกิด, ปีนักษัตร) for many dates"
+        },
+        {
+            "name": "History",
+            "description": "Past readings of the signed-in user"
+        },
         {
             "name": "Tarot Test",
             "description": "Test endpoints for Tarot card drawing"
@@ -49,7 +182,7 @@ app = FastAPI(
 
 # Attach rate limiter to app
 app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded)
 
 # CORS middleware - whitelist only allowed origins
 ALLOWED_ORIGINS = [
@@ -63,13 +196,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "OPTIONS"],
     allow_headers=["Authorization", "Content-Type"],
+    expose_headers=["Server-Timing"],
 )
 
+# Request count and latency per route (/metrics)
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+# Outermost: phase timings of every request (Server-Timing header, histograms)
+if settings.TIMING_ENABLED:
+    app.add_middleware(TimingMiddleware)
+
 # Include routers
 app.include_router(v1_ai.router)
 app.include_router(v1_thai.router)
 app.include_router(v1_horoscope.router)
 app.include_router(v1_tarot.router)
+app.include_router(v1_geo.router)
+app.include_router(v1_lookup.router)
+app.include_router(v1_history.router)
 
 
 @app.get("/", tags=["Health"])
@@ -89,16 +234,34 @@ async def root():
 @app.get("/health", tags=["Health"])
 async def health_check():
     """
-    Detailed health check for monitoring systems.
+    Health from live state, for monitoring systems.
+    
+    Components, AI success rate / p95 latency and circuit state come from
+    the last background check (every HEALTH_CHECK_SECONDS); saturation is
+    current. Always 200: see **status** ("healthy", "degraded", "unhealthy").
     """
-    return {
-        "status": "healthy",
-        "components": {
-            "tarot_engine": "operational",
-            "western_astrology": "operational",
-            "thai_astrology": "operational",
-            "ai_interpreter": "pending",      # Phase 2
-            "cache": "pending",               # Phase 4
-            "database": "pending"             # Phase 4
-        }
-    }
+    return health.report()
+
+
+@app.get("/ready", tags=["Health"])
+async def readiness_check():
+    """
+    Readiness probe for the load balancer.
+    
+    503 while this worker is saturated (event-loop lag, requests in
+    progress, executor or history queue over the READY_* limits).
+    """
+    readiness = health.ready()
+    return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
+
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """
+    Prometheus metrics: requests, latency, AI calls and tokens, caches, queues and event-loop lag.
+    
+    Adds up all uvicorn workers when METRICS_MULTIPROC_DIR is set.
+    """
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -19,9 +19,12 @@ class NatalChartRequest(BaseModel):
         description="เวลาเกิด (Birth time) - Format: HH:MM (24-hour) เช่น 14:30",
         examples=["14:30"]
     )
-    latitude: float = Field(..., ge=-90, le=90, description="Birth location latitude", examples=[13.7563])
-    longitude: float = Field(..., ge=-180, le=180, description="Birth location longitude", examples=[100.5018])
+    latitude: Optional[float] = Field(None, ge=-90, le=90, description="Birth location latitude (or give city)", examples=[13.7563])
+    longitude: Optional[float] = Field(None, ge=-180, le=180, description="Birth location longitude (or give city)", examples=[100.5018])
+    city: Optional[str] = Field(None, description="Birth city (English or Thai name) - fills coordinates and timezone", examples=["Chiang Mai"])
+    tz: Optional[str] = Field(None, description="IANA timezone (e.g., Asia/Bangkok) - overrides timezone_offset", examples=["Asia/Bangkok"])
     timezone_offset: str = Field("+00:00", description="UTC offset (e.g., +07:00 for Bangkok)", examples=["+07:00"])
+    house_system: str = Field("equal", description="House system: 'equal', 'placidus' or 'koch'", examples=["placidus"])
     lang: str = Field("th", description="Response language: 'th' or 'en'", examples=["th"])
 
     class Config:
@@ -32,6 +35,7 @@ class NatalChartRequest(BaseModel):
                 "latitude": 13.7563,
                 "longitude": 100.5018,
                 "timezone_offset": "+07:00",
+                "house_system": "placidus",
                 "lang": "th"
             }
         }
@@ -57,6 +61,16 @@ class HouseData(BaseModel):
     degree: float = Field(..., description="Degree of the cusp")
 
 
+class AspectData(BaseModel):
+    """Angular aspect between two planets"""
+    planet_a: str = Field(..., description="First planet (English)")
+    planet_b: str = Field(..., description="Second planet (English)")
+    aspect_en: str = Field(..., description="Aspect name in English (e.g. Trine)")
+    aspect_th: str = Field(..., description="Aspect name in Thai")
+    angle: float = Field(..., description="Exact aspect angle")
+    orb: float = Field(..., description="Deviation from the exact angle in degrees")
+
+
 class ZodiacSign(BaseModel):
     """Zodiac sign information"""
     id: int = Field(..., ge=0, le=11, description="Sign ID (0-11)")
@@ -84,6 +98,9 @@ class NatalChartResponse(BaseModel):
     
     # Houses
     houses: List[HouseData] = Field(..., description="12 house cusps")
+    
+    # Aspects
+    aspects: List[AspectData] = Field(default_factory=list, description="Aspects between planets")
 
 
 class SunSignRequest(BaseModel):
@@ -97,3 +114,98 @@ class SunSignResponse(BaseModel):
     birth_date: str
     sun_sign: ZodiacSign
     message: str = Field(..., description="Personalized message about the sign")
+
+
+class RetrogradePeriod(BaseModel):
+    """A retrograde period between two stations"""
+    planet_en: str = Field(..., description="Planet name in English")
+    planet_th: str = Field(..., description="Planet name in Thai")
+    station_retrograde: Optional[str] = Field(None, description="Station retrograde (UTC, ISO 8601)")
+    station_direct: Optional[str] = Field(None, description="Station direct (UTC, ISO 8601)")
+    sign_en: Optional[str] = Field(None, description="Sign at the retrograde station in English")
+    sign_th: Optional[str] = Field(None, description="Sign at the retrograde station in Thai")
+    degree: Optional[float] = Field(None, description="Degree within the sign at the retrograde station")
+
+
+class RetrogradeResponse(BaseModel):
+    """Retrograde periods overlapping a date range"""
+    from_date: str
+    to_date: str
+    periods: List[RetrogradePeriod] = Field(..., description="Retrograde periods sorted by start")
+
+
+class TransitEvent(BaseModel):
+    """A planet entering a new zodiac sign"""
+    planet_en: str = Field(..., description="Planet name in English")
+    planet_th: str = Field(..., description="Planet name in Thai")
+    time: str = Field(..., description="Ingress time (UTC, ISO 8601, to the minute)")
+    from_sign_en: str = Field(..., description="Sign being left in English")
+    from_sign_th: str = Field(..., description="Sign being left in Thai")
+    to_sign_en: str = Field(..., description="Sign being entered in English")
+    to_sign_th: str = Field(..., description="Sign being entered in Thai")
+    retrograde: bool = Field(False, description="Whether the planet re-enters the previous sign")
+
+
+class TransitResponse(BaseModel):
+    """Sign ingresses within a date range"""
+    from_date: str
+    to_date: str
+    events: List[TransitEvent] = Field(..., description="Ingresses sorted by time")
+
+
+class CurrentSkyResponse(BaseModel):
+    """Where the planets are right now"""
+    computed_at: str = Field(..., description="When the snapshot was computed (UTC, ISO 8601)")
+    age_seconds: float = Field(..., description="Seconds since the snapshot was computed")
+    stale: bool = Field(..., description="True if the background refresh has stalled")
+    planets: List[PlanetPosition] = Field(..., description="Current planet positions")
+
+
+class SynastryBirthData(BaseModel):
+    """Birth moment of a chart used for synastry (location does not affect planets)"""
+    birth_date: str = Field(..., description="Format: YYYY-MM-DD", examples=["1990-05-15"])
+    birth_time: str = Field("12:00", description="Format: HH:MM (24-hour)", examples=["14:30"])
+    timezone_offset: str = Field("+00:00", description="UTC offset", examples=["+07:00"])
+
+
+class SynastryCandidate(SynastryBirthData):
+    """A stored chart that can be matched against"""
+    id: str = Field(..., min_length=1, max_length=64, description="Caller's identifier for this chart")
+
+
+class SynastryCandidatesRequest(BaseModel):
+    """Batch of charts to add to the synastry pool"""
+    candidates: List[SynastryCandidate] = Field(..., max_length=100000)
+
+
+class SynastryRankRequest(SynastryBirthData):
+    """Rank the stored charts against one chart"""
+    top_k: int = Field(10, ge=1, le=1000, description="Number of best matches to return")
+    orbs: Optional[dict] = Field(None, description="Orb overrides by aspect name, e.g. {\"Trine\": 5}")
+
+
+class SynastryMatch(BaseModel):
+    """A ranked synastry candidate"""
+    id: str
+    score: float = Field(..., description="Sum of aspect harmony between the two charts")
+
+
+class SynastryRankResponse(BaseModel):
+    """Top synastry matches"""
+    total_candidates: int
+    matches: List[SynastryMatch]
+
+
+class DailyHoroscopeResponse(BaseModel):
+    """Daily horoscope of one sun sign"""
+    date: str = Field(..., description="Date (Thailand time) in YYYY-MM-DD format")
+    sign: ZodiacSign
+    moon_sign: ZodiacSign = Field(..., description="Moon's sign at noon Bangkok time")
+    aspect_th: str
+    aspect_en: str
+    retrograde: List[str] = Field(..., description="Retrograde planets among Mercury, Venus, Mars")
+    score: int = Field(..., description="Moon aspect score (-2 to 2)")
+    lang: str
+    horoscope: str = Field(..., description="Horoscope text (pre-generated)")
+    source: str = Field(..., description="ai or rules")
+    generated_at: str
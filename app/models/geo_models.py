@@ -0,0 +1,38 @@
+"""
+Geo Pydantic Models
+Response schemas for city search and timezone lookups
+"""
+
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class City(BaseModel):
+    """A city from the bundled offline database"""
+    name_en: str = Field(..., description="English name")
+    name_th: str = Field(..., description="Thai name")
+    country: str = Field(..., description="ISO country code")
+    latitude: float
+    longitude: float
+    timezone: str = Field(..., description="IANA timezone, e.g. Asia/Bangkok")
+
+
+class CitySearchResponse(BaseModel):
+    """Autocomplete results for a name prefix"""
+    query: str
+    cities: List[City]
+
+
+class NearestCityResponse(BaseModel):
+    """Closest known city to a coordinate"""
+    city: City
+    distance_km: float = Field(..., description="Great-circle distance to the city")
+
+
+class TimezoneOffsetResponse(BaseModel):
+    """UTC offset in force for a local date and time"""
+    tz: str
+    date: str
+    time: str
+    utc_offset: str = Field(..., description="Offset such as +07:00")
+    city: Optional[City] = None
@@ -0,0 +1,22 @@
+"""
+History Pydantic Models
+Response schemas for reading history
+"""
+
+from typing import Any, List, Optional
+from pydantic import BaseModel, Field
+
+
+class HistoryItem(BaseModel):
+    """One stored reading"""
+    id: int
+    kind: str = Field(..., description="tarot, thai or natal")
+    created_at: str = Field(..., description="ISO 8601 UTC timestamp")
+    request: Any = Field(..., description="Request body as sent")
+    result: Any = Field(..., description="Response as returned")
+
+
+class HistoryResponse(BaseModel):
+    """A page of history, newest first"""
+    items: List[HistoryItem]
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor for the next page; null on the last page")
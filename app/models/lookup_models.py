@@ -0,0 +1,34 @@
+"""
+Lookup Pydantic Models
+Schemas for the columnar bulk date lookup API
+"""
+
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+
+
+class BulkLookupRequest(BaseModel):
+    """Dates to resolve (documentation schema; the body is parsed directly for speed)"""
+    dates: List[str] = Field(
+        ...,
+        description="Dates in YYYY-MM-DD format",
+        examples=[["1990-05-15", "2000-01-01"]]
+    )
+    times: Optional[List[Optional[str]]] = Field(
+        None,
+        description="Optional HH:MM birth times (same length as dates) - adds the sunrise-based thai_day column"
+    )
+    latitude: float = Field(13.7563, ge=-90, le=90, description="Birth place for sunrise (default Bangkok)")
+    longitude: float = Field(100.5018, ge=-180, le=180)
+    timezone_offset: str = Field("+07:00", description="UTC offset of the times")
+
+
+class BulkLookupResponse(BaseModel):
+    """Columnar results: position i of every column belongs to dates[i]"""
+    count: int = Field(..., description="Number of dates received")
+    columns: Dict[str, List[int]] = Field(
+        ...,
+        description="sun_sign, weekday (0=Sunday), naksat and (with times) thai_day ids; -1 where invalid"
+    )
+    invalid: List[int] = Field(..., description="Positions of invalid dates")
+    legend: Dict[str, List[Dict[str, str]]] = Field(..., description="Names for each id, per column")
@@ -3,7 +3,7 @@ Thai Astrology Pydantic Models
 Request and Response schemas for Thai Horoscope API
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -20,7 +20,7 @@ class ThaiYearAnimal(BaseModel):
 
 class ThaiBirthDay(BaseModel):
     """Thai birth day information (วันเกิด)"""
-    day_number: int = Field(..., ge=0, le=6, description="Day number (0=Sunday)")
+    day_number: int = Field(..., ge=0, le=7, description="Day number (0=Sunday, 7=Wednesday night/ราหู)")
     name_th: str = Field(..., description="Thai day name")
     name_en: str = Field(..., description="English day name")
     ruling_planet_th: str = Field(..., description="Ruling planet in Thai")
@@ -37,6 +37,23 @@ class ThaiLagna(BaseModel):
     rasi_th: str = Field(..., description="Rasi name in Thai")
     rasi_en: str = Field(..., description="Rasi name in English")
     meaning: str = Field(..., description="Meaning and influence")
+    degree: Optional[float] = Field(None, description="Sidereal degree within the rasi (location-based lagna only)")
+
+
+class ThaiLunarDate(BaseModel):
+    """Thai lunar calendar date (วันทางจันทรคติ)"""
+    gregorian_date: str = Field(..., description="Date in YYYY-MM-DD format")
+    lunar_year: int = Field(..., description="ค.ศ. year in which this lunar year's เดือน 5 began")
+    thai_year: int = Field(..., description="Buddhist Era year (พ.ศ.) of the lunar year")
+    month: int = Field(..., ge=1, le=12, description="Lunar month (1 = เดือนอ้าย, 5 = เดือนห้า)")
+    month_th: str = Field(..., description="Month name in Thai")
+    second_eighth: bool = Field(..., description="The repeated 8th month (เดือนแปดหลัง) of a leap year")
+    day: int = Field(..., ge=1, le=15, description="ค่ำ (1-15)")
+    waning: bool = Field(..., description="แรม (waning) if true, ขึ้น (waxing) if false")
+    month_days: int = Field(..., description="Days in this lunar month (29 or 30)")
+    leap_year: bool = Field(..., description="Lunar year with 13 months (อธิกมาส)")
+    year_animal: ThaiYearAnimal = Field(..., description="ปีนักษัตร of the lunar year")
+    text_th: str = Field(..., description="e.g. ขึ้น 1 ค่ำ เดือนห้า ปีมะโรง")
 
 
 class ThaiReadingRequest(BaseModel):
@@ -51,12 +68,18 @@ class ThaiReadingRequest(BaseModel):
         description="เวลาเกิด (Birth time) - optional",
         json_schema_extra={"format": "HH:MM", "example": "14:30", "placeholder": "14:30"}
     )
+    latitude: Optional[float] = Field(None, ge=-90, le=90, description="Birth latitude - optional, enables the real (sidereal) lagna")
+    longitude: Optional[float] = Field(None, ge=-180, le=180, description="Birth longitude - optional")
+    city: Optional[str] = Field(None, description="Birth city instead of coordinates (e.g., เชียงใหม่)")
+    tz: Optional[str] = Field(None, description="IANA timezone - overrides timezone_offset")
+    timezone_offset: str = Field("+07:00", description="UTC offset of birth_time (default Thailand)")
     
     class Config:
         json_schema_extra = {
             "example": {
                 "birth_date": "1990-05-15",
-                "birth_time": "14:30"
+                "birth_time": "14:30",
+                "city": "Bangkok"
             }
         }
 
@@ -69,6 +92,8 @@ class ThaiReadingResponse(BaseModel):
     year_animal: ThaiYearAnimal = Field(..., description="ปีนักษัตร")
     birth_day: ThaiBirthDay = Field(..., description="วันเกิด")
     lagna: Optional[ThaiLagna] = Field(None, description="ลัคนา (if birth time provided)")
+    lagna_method: Optional[str] = Field(None, description="'sidereal' (from birth place) or 'simplified' (time only)")
+    lunar_date: Optional[ThaiLunarDate] = Field(None, description="วันทางจันทรคติ (1900-2100)")
     
     summary_th: str = Field(..., description="Summary in Thai")
 
@@ -79,3 +104,166 @@ class NaksatResponse(BaseModel):
     thai_year: int = Field(..., description="Buddhist Era year (พ.ศ.)")
     year_animal: ThaiYearAnimal
     message: str
+
+
+class AuspiciousRequest(BaseModel):
+    """Request for ฤกษ์ดี (auspicious dates)"""
+    birth_date: str = Field(..., description="วันเกิด YYYY-MM-DD")
+    birth_time: Optional[str] = Field(None, description="เวลาเกิด HH:MM - optional, for births before sunrise or on Wednesday night")
+    start_date: Optional[str] = Field(None, description="First day to consider (default today, Thailand time)")
+    end_date: Optional[str] = Field(None, description="Last day to consider (default 180 days after start_date)")
+    purpose: str = Field("general", description="general, wedding (แต่งงาน) or business (เปิดกิจการ)")
+    limit: int = Field(10, ge=1, le=100, description="Number of dates to return")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "birth_date": "1990-05-15",
+                "start_date": "2026-01-01",
+                "end_date": "2026-06-30",
+                "purpose": "wedding",
+                "limit": 5
+            }
+        }
+
+
+class AuspiciousDate(BaseModel):
+    """One ranked date"""
+    date: str
+    score: int = Field(..., description="Higher is better")
+    weekday: str = Field(..., description="Weekday in Thai")
+    taksa_role: str = Field(..., description="ทักษา role of the weekday for the birth day (e.g., ศรี)")
+    taksa_role_en: str
+    day_animal: str = Field(..., description="Animal of the day in the 60-day cycle")
+    lunar_date: str = Field(..., description="e.g. ขึ้น 9 ค่ำ เดือนหก ปีมะเมีย")
+    reasons: List[str] = Field(..., description="Why the date scores well, in Thai")
+
+
+class AuspiciousResponse(BaseModel):
+    """Ranked auspicious dates"""
+    birth_day: ThaiBirthDay
+    year_animal: ThaiYearAnimal
+    purpose: str
+    start_date: str
+    end_date: str
+    scanned_days: int
+    excluded_days: int = Field(..., description="กาลกิณี weekdays and days clashing (ชง) with the year animal")
+    dates: List[AuspiciousDate]
+
+
+class ThaiPerson(BaseModel):
+    """One person for ดวงสมพงษ์"""
+    birth_date: str = Field(..., description="วันเกิด YYYY-MM-DD")
+    birth_time: Optional[str] = Field(None, description="เวลาเกิด HH:MM - optional, enables the lagna match")
+
+
+class CompatibilityRequest(BaseModel):
+    """Pairwise compatibility request"""
+    person_a: ThaiPerson
+    person_b: ThaiPerson
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "person_a": {"birth_date": "1990-05-15", "birth_time": "14:30"},
+                "person_b": {"birth_date": "1992-08-01", "birth_time": "09:00"}
+            }
+        }
+
+
+class CompatibilityRelation(BaseModel):
+    """One scored relation between the two people"""
+    aspect: str = Field(..., description="year_animal, element, birth_day or lagna")
+    label_th: str
+    label_en: str
+    score: int = Field(..., description="Matrix score (negative = unfavourable)")
+    detail_th: str
+
+
+class CompatibilityResponse(BaseModel):
+    """ดวงสมพงษ์ result"""
+    score: int = Field(..., ge=0, le=100, description="Overall compatibility 0-100")
+    level_th: str
+    level_en: str
+    year_animal_a: ThaiYearAnimal
+    year_animal_b: ThaiYearAnimal
+    birth_day_a: ThaiBirthDay
+    birth_day_b: ThaiBirthDay
+    relations: List[CompatibilityRelation]
+
+
+class CompatibilityCandidates(BaseModel):
+    """Candidates as columns: birth dates (and times), or precomputed ids"""
+    birth_dates: Optional[List[str]] = Field(None, description="YYYY-MM-DD per candidate")
+    birth_times: Optional[List[Optional[str]]] = Field(None, description="HH:MM or null per candidate (same length as birth_dates)")
+    year_animals: Optional[List[int]] = Field(None, description="Precomputed ปีนักษัตร ids (0-11) - use with birth_days and lagnas")
+    birth_days: Optional[List[int]] = Field(None, description="Precomputed วันเกิด ids (0-7)")
+    lagnas: Optional[List[int]] = Field(None, description="Precomputed ลัคนา ids (0-11, 12 = unknown)")
+
+
+class CompatibilityRankRequest(BaseModel):
+    """One-to-many ranking request (documentation schema; the body is parsed directly for speed)"""
+    user: ThaiPerson
+    candidates: CompatibilityCandidates
+    limit: int = Field(20, ge=1, le=10000, description="Number of best candidates to return")
+
+
+class RankedCandidate(BaseModel):
+    """One ranked candidate"""
+    index: int = Field(..., description="Position in the candidate columns")
+    score: int = Field(..., ge=0, le=100)
+    level_th: str
+
+
+class CompatibilityRankResponse(BaseModel):
+    """Best candidates, best first"""
+    count: int = Field(..., description="Candidates received")
+    invalid: int = Field(..., description="Candidates with an invalid date or id")
+    top: List[RankedCandidate]
+    histogram: Dict[int, int] = Field(..., description="Number of candidates per score")
+
+
+class YearlyRelation(BaseModel):
+    """One relation between the year and the person"""
+    label_th: str
+    label_en: str
+    score: int = Field(..., description="Relation score (negative = unfavourable)")
+
+
+class YearlyForecastResponse(BaseModel):
+    """ดวงรายปี for one ปีนักษัตร and วันเกิด"""
+    year: int = Field(..., description="ค.ศ. year of the forecast")
+    thai_year: int = Field(..., description="พ.ศ. year")
+    year_animal: ThaiYearAnimal = Field(..., description="ปีนักษัตร of the year")
+    element: str = Field(..., description="Element of the year (heavenly stem)")
+    element_th: str
+    new_year_date: str = Field(..., description="ขึ้น 1 ค่ำ เดือน 5 (start of the lunar year)")
+    ruling_day: ThaiBirthDay = Field(..., description="วันอธิบดี: weekday of the lunar new year")
+    person_year_animal: ThaiYearAnimal
+    person_birth_day: ThaiBirthDay
+    relations: Dict[str, YearlyRelation] = Field(..., description="year_animal, element and ruling_day relations")
+    clash: bool = Field(..., description="ปีชง for the person")
+    kalakini: bool = Field(..., description="The ruling day is the person's กาลกิณี")
+    score: int = Field(..., ge=0, le=100, description="Overall outlook 0-100")
+    lang: str
+    forecast: str = Field(..., description="Forecast text (pre-generated)")
+    source: str = Field(..., description="ai or rules")
+    generated_at: str
+
+
+class ThaiDailyResponse(BaseModel):
+    """ดวงรายวัน of one วันเกิด"""
+    date: str = Field(..., description="Date (Thailand time) in YYYY-MM-DD format")
+    birth_day: ThaiBirthDay
+    weekday: ThaiBirthDay = Field(..., description="Weekday of the date")
+    role_th: str = Field(..., description="ทักษา role of the weekday for the birth day")
+    role_en: str
+    kalakini: bool = Field(..., description="The weekday is the birth day's กาลกิณี")
+    holy_day: bool = Field(..., description="วันพระ")
+    lucky_color: str
+    lucky_color_th: str
+    score: int = Field(..., description="ทักษา role score")
+    lang: str
+    horoscope: str = Field(..., description="Horoscope text (pre-generated)")
+    source: str = Field(..., description="ai or rules")
+    generated_at: str
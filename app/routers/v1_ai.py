@@ -3,13 +3,16 @@ AI Interpretation API Router
 Endpoints for AI-powered fortune interpretation
 """
 
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-from app.core.ai_client import generate_interpretation
+from app.core import timing
+from app.core.auth import optional_user
+from app.core.history import history
+from app.core.prompt_store import interpret
 from app.core.prompts import (
     TAROT_GYPSY_PROMPT,
     THAI_FORTUNE_PROMPT,
@@ -20,7 +23,8 @@ from app.core.prompts import (
 )
 from app.engines.tarot import draw_single, draw_three, draw_celtic_cross
 from app.engines.thai_astrology import get_thai_reading
-from app.engines.astrology import calculate_natal_chart
+from app.core.executor import natal_chart
+from app.engines.geo import resolve_birth_place
 
 router = APIRouter(prefix="/v1/ai", tags=["AI Interpretation"])
 
@@ -68,9 +72,12 @@ class NatalInterpretRequest(BaseModel):
     """Request for AI natal chart interpretation"""
     birth_date: str = Field(..., description="Format: YYYY-MM-DD")
     birth_time: str = Field(..., description="Format: HH:MM")
-    latitude: float = Field(..., ge=-90, le=90)
-    longitude: float = Field(..., ge=-180, le=180)
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    city: Optional[str] = Field(None, description="Birth city instead of coordinates")
+    tz: Optional[str] = Field(None, description="IANA timezone, e.g. Asia/Bangkok")
     timezone_offset: str = Field("+00:00")
+    house_system: str = Field("equal", description="equal, placidus or koch")
     question: Optional[str] = Field(None)
     lang: str = Field("th")
 
@@ -87,7 +94,11 @@ class InterpretResponse(BaseModel):
 
 @router.post("/tarot", response_model=InterpretResponse, summary="AI Tarot Reading 🔮")
 @limiter.limit("10/minute")
-async def interpret_tarot(request: Request, body: TarotInterpretRequest):
+async def interpret_tarot(
+    request: Request,
+    body: TarotInterpretRequest,
+    user_id: Optional[str] = Depends(optional_user)
+):
     """
     Draw tarot cards and get AI interpretation.
     
@@ -97,6 +108,8 @@ async def interpret_tarot(request: Request, body: TarotInterpretRequest):
     
     Uses the "แม่หมอยิปซี" (Gypsy Fortune Teller) persona for Thai readings.
     """
+    timing.mark("validation")
+    
     # Draw cards based on count - functions return tuple (cards, spread_type, positions)
     if body.count == 1:
         card, spread_type, positions = draw_single()
@@ -112,11 +125,12 @@ async def interpret_tarot(request: Request, body: TarotInterpretRequest):
     # Build prompt
     prompt = build_tarot_prompt(cards, body.question, spread_type, body.lang)
     
-    # Get AI interpretation
+    # Get AI interpretation (cached and persisted per prompt)
     system_prompt = TAROT_GYPSY_PROMPT
-    interpretation = await generate_interpretation(prompt, system_instruction=system_prompt)
+    with timing.span("ai"):
+        interpretation = await interpret(prompt, system_instruction=system_prompt)
     
-    return InterpretResponse(
+    response = InterpretResponse(
         interpretation=interpretation,
         data={
             "cards": [{"name_th": c["name_th"], "name_en": c["name_en"]} for c in cards],
@@ -124,11 +138,17 @@ async def interpret_tarot(request: Request, body: TarotInterpretRequest):
             "positions": positions
         }
     )
+    history.record(user_id, "tarot", body, response)
+    return response
 
 
 @router.post("/thai", response_model=InterpretResponse, summary="AI Thai Fortune 🇹🇭")
 @limiter.limit("10/minute")
-async def interpret_thai(request: Request, body: ThaiInterpretRequest):
+async def interpret_thai(
+    request: Request,
+    body: ThaiInterpretRequest,
+    user_id: Optional[str] = Depends(optional_user)
+):
     """
     Get AI Thai fortune reading based on birth data.
     
@@ -136,17 +156,20 @@ async def interpret_thai(request: Request, body: ThaiInterpretRequest):
     
     Includes: ปีนักษัตร, วันเกิด, ลัคนา (if birth time provided)
     """
+    timing.mark("validation")
     try:
         # Get Thai reading data
-        reading = get_thai_reading(body.birth_date, body.birth_time)
+        with timing.span("reading"):
+            reading = get_thai_reading(body.birth_date, body.birth_time)
         
         # Build prompt
         prompt = build_thai_prompt(reading, body.question)
         
-        # Get AI interpretation
-        interpretation = await generate_interpretation(prompt, system_instruction=THAI_FORTUNE_PROMPT)
+        # Get AI interpretation (cached and persisted per prompt)
+        with timing.span("ai"):
+            interpretation = await interpret(prompt, system_instruction=THAI_FORTUNE_PROMPT)
         
-        return InterpretResponse(
+        response = InterpretResponse(
             interpretation=interpretation,
             data={
                 "year_animal": reading["year_animal"]["name_th"],
@@ -154,36 +177,56 @@ async def interpret_thai(request: Request, body: ThaiInterpretRequest):
                 "lagna": reading["lagna"]["name_th"] if reading["lagna"] else None
             }
         )
+        history.record(user_id, "thai", body, response)
+        return response
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid input: {str(e)}")
 
 
 @router.post("/natal", response_model=InterpretResponse, summary="AI Natal Chart Reading ⭐")
 @limiter.limit("10/minute")
-async def interpret_natal(request: Request, body: NatalInterpretRequest):
+async def interpret_natal(
+    request: Request,
+    body: NatalInterpretRequest,
+    user_id: Optional[str] = Depends(optional_user)
+):
     """
     Get AI interpretation of Western natal chart.
     
-    Requires birth date, time, and location for accurate calculation.
+    Requires birth date, time, and location (coordinates or city) for accurate calculation.
     """
+    timing.mark("validation")
     try:
-        # Calculate natal chart
-        chart = calculate_natal_chart(
+        place = resolve_birth_place(
             body.birth_date,
             body.birth_time,
-            body.latitude,
-            body.longitude,
-            body.timezone_offset
+            latitude=body.latitude,
+            longitude=body.longitude,
+            city=body.city,
+            tz=body.tz,
+            timezone_offset=body.timezone_offset
         )
         
+        # Calculate natal chart
+        with timing.span("chart"):
+            chart = await natal_chart(
+                body.birth_date,
+                body.birth_time,
+                place["latitude"],
+                place["longitude"],
+                place["timezone_offset"],
+                body.house_system
+            )
+        
         # Build prompt
         prompt = build_natal_prompt(chart, body.question, body.lang)
         
-        # Get AI interpretation
+        # Get AI interpretation (cached and persisted per prompt)
         system_prompt = THAI_FORTUNE_PROMPT if body.lang == "th" else WESTERN_ASTROLOGER_PROMPT
-        interpretation = await generate_interpretation(prompt, system_instruction=system_prompt)
+        with timing.span("ai"):
+            interpretation = await interpret(prompt, system_instruction=system_prompt)
         
-        return InterpretResponse(
+        response = InterpretResponse(
             interpretation=interpretation,
             data={
                 "sun_sign": chart["sun_sign"]["name_th"] if body.lang == "th" else chart["sun_sign"]["name_en"],
@@ -191,5 +234,7 @@ async def interpret_natal(request: Request, body: NatalInterpretRequest):
                 "ascendant": chart["ascendant"]["name_th"] if body.lang == "th" else chart["ascendant"]["name_en"]
             }
         )
+        history.record(user_id, "natal", body, response)
+        return response
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Chart calculation error: {str(e)}")
@@ -0,0 +1,80 @@
+"""
+Geo API Router
+Offline city autocomplete, nearest-city and timezone lookups
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+
+from app.models.geo_models import (
+    City, CitySearchResponse, NearestCityResponse, TimezoneOffsetResponse
+)
+from app.core.cache import cache
+from app.engines.geo import ensure_geo_index, normalize_name, resolve_timezone_offset
+
+router = APIRouter(prefix="/v1/geo", tags=["Geo"])
+
+
+@router.get("/cities", response_model=CitySearchResponse, summary="Autocomplete city names")
+async def search_cities(
+    q: str = Query(..., min_length=1, max_length=60, description="Name prefix (English or Thai)", examples=["chiang"]),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """
+    Search the bundled city list by name prefix.
+    
+    Matches English and Thai names, case-insensitively.
+    """
+    cities = ensure_geo_index().search(q, limit)
+    return CitySearchResponse(query=q, cities=[City(**c) for c in cities])
+
+
+@router.get("/nearest", response_model=NearestCityResponse, summary="Nearest known city")
+async def nearest_city(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180)
+):
+    """
+    Find the closest city in the bundled list to a coordinate.
+    
+    Useful to suggest a timezone for a map pin.
+    """
+    city, distance = ensure_geo_index().nearest(latitude, longitude)
+    return NearestCityResponse(city=City(**city), distance_km=distance)
+
+
+@router.get("/timezone", response_model=TimezoneOffsetResponse, summary="UTC offset at a local time")
+async def timezone_offset(
+    date: str = Query(..., description="Local date YYYY-MM-DD", examples=["1990-05-15"]),
+    time: str = Query("12:00", description="Local time HH:MM", examples=["14:30"]),
+    tz: Optional[str] = Query(None, description="IANA timezone", examples=["America/New_York"]),
+    city: Optional[str] = Query(None, description="City name instead of tz")
+):
+    """
+    Historical UTC offset (including DST) for a local date and time.
+    
+    Give either an IANA timezone or a city name. Dates from 1800 to 2200.
+    """
+    match = None
+    if city:
+        # Unknown names are cached too (negative entries)
+        match = await cache.get_or_load("geo", ("find", normalize_name(city)), lambda: _find_city(city))
+        if match is None:
+            raise HTTPException(status_code=404, detail=f"Unknown city '{city}'")
+        tz = tz or match["timezone"]
+    if not tz:
+        raise HTTPException(status_code=400, detail="Provide tz or city")
+    
+    try:
+        offset = resolve_timezone_offset(tz, date, time)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return TimezoneOffsetResponse(
+        tz=tz, date=date, time=time, utc_offset=offset,
+        city=City(**match) if match else None
+    )
+
+
+async def _find_city(name: str):
+    return ensure_geo_index().find(name)
@@ -0,0 +1,40 @@
+"""
+History API Router
+The signed-in user's past readings
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+
+from app.models.history_models import HistoryItem, HistoryResponse
+from app.core.auth import current_user
+from app.core.history import HISTORY_KINDS, history
+
+router = APIRouter(prefix="/v1/history", tags=["History"])
+
+
+@router.get("", response_model=HistoryResponse, summary="Reading history of a user")
+async def get_history(
+    user_id: str = Depends(current_user),
+    kind: Optional[str] = Query(None, description="Only tarot, thai or natal"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page")
+):
+    """
+    Past tarot, Thai and natal readings of the signed-in user, newest first.
+    
+    Needs an **Authorization: Bearer** access token; readings are recorded
+    for requests that send one. Pages continue from **cursor** (keyset pagination), so they stay fast
+    and stable however far back they go.
+    """
+    if kind is not None and kind not in HISTORY_KINDS:
+        raise HTTPException(status_code=400, detail=f"Invalid kind. Choose from: {', '.join(HISTORY_KINDS)}")
+    try:
+        page = await history.page(user_id, kind, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return HistoryResponse(
+        items=[HistoryItem(**item) for item in page["items"]],
+        next_cursor=page["next_cursor"]
+    )
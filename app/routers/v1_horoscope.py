@@ -3,63 +3,266 @@ Horoscope API Router
 Endpoints for natal charts and zodiac information
 """
 
-from fastapi import APIRouter, HTTPException
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import ValidationError
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime
+import asyncio
+import json
+import time
 
 from app.models.astrology_models import (
     NatalChartRequest, NatalChartResponse,
     SunSignRequest, SunSignResponse,
-    ZodiacSign, PlanetPosition, HouseData
+    ZodiacSign, PlanetPosition, HouseData, AspectData,
+    RetrogradePeriod, RetrogradeResponse,
+    TransitEvent, TransitResponse,
+    CurrentSkyResponse, DailyHoroscopeResponse,
+    SynastryCandidatesRequest, SynastryRankRequest,
+    SynastryMatch, SynastryRankResponse
 )
+from app.core.bulk import UploadStreamingResponse, detect_format, iter_records
+from app.core.cache import cache
+from app.core.executor import compute, natal_chart
+from app.core import timing
+from app.core.auth import current_user, optional_user
+from app.core.history import history
+from app.core.synastry_pool import CandidateExistsError, PoolFullError, rank_owner_pool, synastry_pool
+from app.core.interpretations import daily_interpretation, thai_today
+from app.core.sky import get_sky, sky_age_seconds, SKY_STALE_SECONDS
 from app.engines.astrology import (
-    calculate_natal_chart,
     get_sun_sign_from_date,
     get_all_zodiac_signs,
     get_sign_by_id,
+    get_retrograde_periods,
+    find_ingresses,
+    birth_longitudes,
+    birth_julian_day,
+    natal_cache_key,
+    natal_chart_cache,
+    compact_chart_for_key,
+    expand_chart,
+    CompactChart,
+    datetime_to_jd,
+    RETROGRADE_BODIES,
+    PLANETS,
     ZODIAC_SIGNS
 )
+from app.engines.daily import DAILY_LANGUAGES, sign_id
+from app.engines.dates import lookup_date
+from app.engines.geo import resolve_birth_place
 
 router = APIRouter(tags=["Horoscope"])
 
 
 @router.post("/v1/horoscope/natal", response_model=NatalChartResponse, summary="Calculate natal chart")
-async def create_natal_chart(request: NatalChartRequest):
+async def create_natal_chart(
+    request: NatalChartRequest,
+    user_id: Optional[str] = Depends(optional_user)
+):
     """
     Calculate a complete natal chart based on birth data.
     
     Requires:
     - **birth_date**: YYYY-MM-DD format
     - **birth_time**: HH:MM format (24-hour)
-    - **latitude/longitude**: Birth location coordinates
-    - **timezone_offset**: UTC offset (e.g., +07:00 for Bangkok)
+    - **latitude/longitude**: Birth location coordinates, or
+    - **city**: Birth city name (fills coordinates and timezone)
+    - **tz**: IANA timezone (optional) - or a fixed **timezone_offset** (e.g., +07:00)
+    - **house_system**: equal (default), placidus or koch
     
     Returns sun sign, moon sign, ascendant, planet positions, and house cusps.
     """
+    timing.mark("validation")
     try:
-        chart_data = calculate_natal_chart(
-            birth_date=request.birth_date,
-            birth_time=request.birth_time,
+        place = resolve_birth_place(
+            request.birth_date,
+            request.birth_time,
             latitude=request.latitude,
             longitude=request.longitude,
+            city=request.city,
+            tz=request.tz,
             timezone_offset=request.timezone_offset
         )
+        with timing.span("chart"):
+            chart_data = await natal_chart(
+                birth_date=request.birth_date,
+                birth_time=request.birth_time,
+                latitude=place["latitude"],
+                longitude=place["longitude"],
+                timezone_offset=place["timezone_offset"],
+                house_system=request.house_system
+            )
         
-        return NatalChartResponse(
+        response = NatalChartResponse(
             birth_data={
                 "date": request.birth_date,
                 "time": request.birth_time,
-                "latitude": request.latitude,
-                "longitude": request.longitude,
-                "timezone": request.timezone_offset
+                "latitude": place["latitude"],
+                "longitude": place["longitude"],
+                "city": place["city"]["name_en"] if place["city"] else None,
+                "tz": place["tz"],
+                "timezone": place["timezone_offset"],
+                "house_system": request.house_system
             },
             sun_sign=ZodiacSign(**chart_data["sun_sign"]),
             moon_sign=ZodiacSign(**chart_data["moon_sign"]),
             ascendant=ZodiacSign(**chart_data["ascendant"]),
             planets=[PlanetPosition(**p) for p in chart_data["planets"]],
-            houses=[HouseData(**h) for h in chart_data["houses"]]
+            houses=[HouseData(**h) for h in chart_data["houses"]],
+            aspects=[AspectData(**a) for a in chart_data["aspects"]]
         )
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Chart calculation error: {str(e)}")
+    
+    history.record(user_id, "natal", request, response)
+    return response
+
+
+# Bulk uploads: rows computed per chunk, and the most rows one upload may hold
+BULK_CHUNK_ROWS = 256
+BULK_MAX_ROWS = 100_000
+
+
+def _ndjson(obj: Dict) -> bytes:
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+
+
+def render_chunk(rows: Sequence[Tuple[int, Optional[str], Dict, Tuple, Optional[CompactChart]]]) -> Tuple[bytes, int, List[Tuple[int, CompactChart]]]:
+    """
+    Render one chunk of bulk rows as NDJSON (runs in a compute worker).
+
+    Args:
+        rows: (line number, id, birth data, chart key, cached chart or None)
+
+    Returns:
+        The chunk's output lines, how many of them are charts, and the
+        charts computed here by row index (for the parent's cache)
+    """
+    lines = []
+    computed = []
+    ok = 0
+    for i, (line_no, record_id, birth_data, key, compact) in enumerate(rows):
+        if compact is None:
+            try:
+                compact = compact_chart_for_key(key)
+            except (ValueError, ArithmeticError) as e:
+                lines.append(_ndjson({"line": line_no, "id": record_id, "error": str(e)}))
+                continue
+            computed.append((i, compact))
+        ok += 1
+        lines.append(_ndjson({"line": line_no, "id": record_id, "birth_data": birth_data, **expand_chart(compact)}))
+    return b"".join(lines), ok, computed
+
+
+async def _bulk_chunk_lines(pending: List[Tuple[int, Optional[str], Dict, Tuple]]) -> Tuple[bytes, int]:
+    """Compute and render one chunk of charts in the pool; cache hits are looked up here."""
+    rows = [(line_no, record_id, birth_data, key, natal_chart_cache.get(key)) for line_no, record_id, birth_data, key in pending]
+    body, ok, computed = await compute.run(render_chunk, rows)
+    for i, compact in computed:
+        natal_chart_cache.put(pending[i][3], compact)
+    return body, ok
+
+
+async def _bulk_natal_stream(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[bytes]:
+    """Read records, compute them chunk by chunk and stream NDJSON back."""
+    started = time.perf_counter()
+    rows = charts = errors = 0
+    pending: List[Tuple[int, Optional[str], Dict, Tuple]] = []
+    
+    async for line_no, record, error in iter_records(chunks, fmt):
+        rows += 1
+        if rows > BULK_MAX_ROWS:
+            rows -= 1
+            errors += 1
+            yield _ndjson({"line": line_no, "error": f"Row limit reached ({BULK_MAX_ROWS}); remaining input ignored"})
+            break
+        
+        record_id = record.get("id") if record else None
+        if record_id is not None:
+            record_id = str(record_id)
+        try:
+            if error:
+                raise ValueError(error)
+            req = NatalChartRequest(**record)
+            place = resolve_birth_place(
+                req.birth_date,
+                req.birth_time,
+                latitude=req.latitude,
+                longitude=req.longitude,
+                city=req.city,
+                tz=req.tz,
+                timezone_offset=req.timezone_offset
+            )
+            jd = birth_julian_day(req.birth_date, req.birth_time, place["timezone_offset"])
+        except ValidationError as e:
+            errors += 1
+            yield _ndjson({"line": line_no, "id": record_id, "error": _validation_message(e)})
+            continue
+        except (ValueError, IndexError) as e:
+            errors += 1
+            yield _ndjson({"line": line_no, "id": record_id, "error": str(e)})
+            continue
+        
+        birth_data = {
+            "date": req.birth_date,
+            "time": req.birth_time,
+            "latitude": place["latitude"],
+            "longitude": place["longitude"],
+            "city": place["city"]["name_en"] if place["city"] else None,
+            "tz": place["tz"],
+            "timezone": place["timezone_offset"],
+            "house_system": req.house_system
+        }
+        key = natal_cache_key(jd, place["latitude"], place["longitude"], req.house_system)
+        pending.append((line_no, record_id, birth_data, key))
+        
+        if len(pending) >= BULK_CHUNK_ROWS:
+            body, ok = await _bulk_chunk_lines(pending)
+            charts += ok
+            errors += len(pending) - ok
+            pending = []
+            yield body
+    
+    if pending:
+        body, ok = await _bulk_chunk_lines(pending)
+        charts += ok
+        errors += len(pending) - ok
+        yield body
+    
+    elapsed = time.perf_counter() - started
+    yield _ndjson({"summary": {
+        "rows": rows,
+        "charts": charts,
+        "errors": errors,
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "charts_per_second": round(charts / elapsed, 1) if elapsed > 0 else None
+    }})
+
+
+@router.post("/v1/horoscope/natal/bulk", summary="Calculate many natal charts (streamed)")
+async def create_natal_charts_bulk(request: Request):
+    """
+    Calculate natal charts for a whole upload of birth records.
+    
+    Send the body as NDJSON (one JSON object per line) or as CSV with a
+    header row (`Content-Type: text/csv`). Each record takes the same
+    fields as **/v1/horoscope/natal**, plus an optional **id** echoed back.
+    
+    The upload is parsed as it arrives and charts are computed in chunks,
+    so results start streaming before the upload finishes. The response is
+    NDJSON: one line per record (the chart, or an **error**) tagged with
+    its input **line** number, followed by a final **summary** line with
+    counts and throughput. Invalid records are reported as soon as they
+    are read, ahead of the chunk they were part of.
+    Up to 100,000 records per upload.
+    """
+    fmt = detect_format(request.headers.get("content-type"))
+    return UploadStreamingResponse(_bulk_natal_stream(request.stream(), fmt), media_type="application/x-ndjson")
 
 
 @router.get("/v1/horoscope/sun-sign", response_model=SunSignResponse, summary="Get sun sign from birth date")
@@ -90,6 +293,202 @@ async def get_sun_sign(birth_date: str, lang: str = "th"):
         raise HTTPException(status_code=400, detail=f"Invalid date format. Use YYYY-MM-DD. Error: {str(e)}")
 
 
+@router.get("/v1/horoscope/retrogrades", response_model=RetrogradeResponse, summary="Retrograde calendar")
+async def get_retrogrades(
+    from_date: str = Query(..., alias="from", description="Start date YYYY-MM-DD", examples=["2024-01-01"]),
+    to_date: str = Query(..., alias="to", description="End date YYYY-MM-DD", examples=["2024-12-31"]),
+    planet: Optional[str] = Query(None, description="Only this planet (e.g. Mercury)")
+):
+    """
+    List retrograde periods overlapping a date range (1900-2100).
+    
+    Answered from the precomputed station table, so any range costs a
+    binary search rather than a day-by-day scan.
+    """
+    try:
+        start = datetime.strptime(from_date, "%Y-%m-%d")
+        end = datetime.strptime(to_date, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
+    if end < start:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    
+    bodies = None
+    if planet:
+        bodies = [b for b in RETROGRADE_BODIES if b.lower() == planet.lower()]
+        if not bodies:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid planet. Choose from: {', '.join(RETROGRADE_BODIES)}"
+            )
+    
+    # Include the whole 'to' day
+    periods = get_retrograde_periods(datetime_to_jd(start), datetime_to_jd(end) + 1, bodies)
+    
+    return RetrogradeResponse(
+        from_date=from_date,
+        to_date=to_date,
+        periods=[RetrogradePeriod(**p) for p in periods]
+    )
+
+
+@router.get("/v1/horoscope/now", response_model=CurrentSkyResponse, summary="Current planet positions")
+async def get_current_sky():
+    """
+    Where every planet is right now (sign, degree, retrograde).
+    
+    Served from a shared snapshot refreshed every minute, so requests do no
+    computation. **age_seconds** and **stale** report how fresh it is.
+    """
+    snapshot = get_sky()
+    age = sky_age_seconds(snapshot)
+    
+    return CurrentSkyResponse(
+        computed_at=snapshot.computed_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        age_seconds=round(age, 1),
+        stale=age > SKY_STALE_SECONDS,
+        planets=[PlanetPosition(**p) for p in snapshot.planets]
+    )
+
+
+@router.get("/v1/horoscope/daily/{sign}", response_model=DailyHoroscopeResponse, summary="Daily horoscope of a sun sign")
+async def get_daily_horoscope(
+    sign: str,
+    date: Optional[str] = Query(None, description="YYYY-MM-DD; defaults to today (Thailand time)"),
+    lang: str = Query("th", description="th or en")
+):
+    """
+    Daily horoscope for a sun sign (**sign**: 0-11 or English name, e.g. aries).
+    
+    Today's and tomorrow's texts are pre-generated for every sign and
+    language by a scheduled job, so no AI call happens at request time.
+    Other dates get the rule-based text.
+    """
+    try:
+        if lang not in DAILY_LANGUAGES:
+            raise ValueError(f"Unsupported language '{lang}'. Choose from: {', '.join(DAILY_LANGUAGES)}")
+        day = lookup_date(date).day_number if date else thai_today()
+        daily, text = daily_interpretation(day, "sign", sign_id(sign), lang)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    daily.pop("outlook")
+    return DailyHoroscopeResponse(
+        **daily,
+        lang=lang,
+        horoscope=text.text,
+        source=text.source,
+        generated_at=text.generated_at
+    )
+
+
+# Longest range a single transits request may cover
+MAX_TRANSIT_RANGE_DAYS = 5 * 366
+
+
+@router.get("/v1/horoscope/transits", response_model=TransitResponse, summary="Sign ingress timeline")
+async def get_transits(
+    from_date: str = Query(..., alias="from", description="Start date YYYY-MM-DD", examples=["2025-01-01"]),
+    to_date: str = Query(..., alias="to", description="End date YYYY-MM-DD", examples=["2025-12-31"]),
+    planet: Optional[str] = Query(None, description="Only this body (e.g. Venus)")
+):
+    """
+    List every sign ingress (e.g. "Venus enters Leo") between two dates.
+    
+    Times are found by bisection on the ephemeris to the minute and cached
+    per planet and year. Ranges are limited to 5 years.
+    """
+    try:
+        start = datetime.strptime(from_date, "%Y-%m-%d")
+        end = datetime.strptime(to_date, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
+    if end < start:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (end - start).days > MAX_TRANSIT_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail="Date range must not exceed 5 years")
+    
+    bodies = None
+    if planet:
+        bodies = [b for b in PLANETS if b.lower() == planet.lower()]
+        if not bodies:
+            raise HTTPException(status_code=400, detail=f"Invalid planet. Choose from: {', '.join(PLANETS)}")
+    
+    # Include the whole 'to' day
+    events = await cache.get_or_load(
+        "transits",
+        (from_date, to_date, bodies),
+        lambda: compute.run(find_ingresses, datetime_to_jd(start), datetime_to_jd(end) + 1, bodies)
+    )
+    
+    return TransitResponse(
+        from_date=from_date,
+        to_date=to_date,
+        events=[TransitEvent(**e) for e in events]
+    )
+
+
+@router.post("/v1/horoscope/synastry/candidates", summary="Add charts to your synastry pool")
+async def add_synastry_candidates(
+    request: SynastryCandidatesRequest,
+    user_id: str = Depends(current_user)
+):
+    """
+    Store charts that **/v1/horoscope/synastry/rank** will match against.
+    
+    Each signed-in user has their own pool (Authorization: Bearer token),
+    kept across restarts. Ids must be new: a call with an id already in
+    the pool (or repeated within the call) is refused with 409 and adds
+    nothing. Up to 100,000 charts per call and per pool.
+    """
+    try:
+        # Longitudes computed in chunks on the worker pool
+        lon_lists = await compute.map_chunked(
+            birth_longitudes,
+            [(c.birth_date, c.birth_time, c.timezone_offset) for c in request.candidates]
+        )
+    except (ValueError, IndexError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid candidate: {str(e)}")
+    
+    candidates = [(c.id, lons) for c, lons in zip(request.candidates, lon_lists)]
+    try:
+        total = await asyncio.to_thread(synastry_pool.add, user_id, candidates)
+    except CandidateExistsError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except PoolFullError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {"added": len(candidates), "total_candidates": total}
+
+
+@router.post("/v1/horoscope/synastry/rank", response_model=SynastryRankResponse, summary="Rank synastry matches")
+async def rank_synastry(
+    request: SynastryRankRequest,
+    user_id: str = Depends(current_user)
+):
+    """
+    Score one chart against every chart in your pool and return the best **top_k**.
+    
+    The score sums aspect harmony between every planet pair: trines,
+    sextiles and conjunctions add, squares and oppositions subtract, each
+    weighted by how close to exact it is. Your chart is turned into a
+    profile of quarter-degree bins first, so a pool of 100,000 charts ranks
+    in well under a second.
+    """
+    try:
+        total, matches = await compute.run(
+            rank_owner_pool, synastry_pool.path, user_id, request.birth_date, request.birth_time,
+            request.timezone_offset, request.top_k, request.orbs
+        )
+    except (ValueError, IndexError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid input: {str(e)}")
+    
+    return SynastryRankResponse(
+        total_candidates=total,
+        matches=[SynastryMatch(id=cid, score=score) for cid, score in matches]
+    )
+
+
 @router.get("/test/zodiac", summary="Get all zodiac signs")
 async def get_zodiac_signs():
     """
@@ -97,6 +496,10 @@ async def get_zodiac_signs():
     
     Useful for building UI dropdowns or reference.
     """
+    return await cache.get_or_load("static", "zodiac", _zodiac_signs)
+
+
+async def _zodiac_signs() -> Dict:
     return {
         "total_signs": 12,
         "signs": [ZodiacSign(**sign) for sign in ZODIAC_SIGNS]
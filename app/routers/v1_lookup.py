@@ -0,0 +1,128 @@
+"""
+Lookup API Router
+Columnar bulk lookups of sun sign, Thai birth day and naksat for many dates
+"""
+
+import json
+from typing import Dict
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+
+from app.models.lookup_models import BulkLookupRequest, BulkLookupResponse
+from app.core.executor import compute
+from app.engines.dates import lookup_columns
+from app.engines.astrology import ZODIAC_SIGNS
+from app.engines.thai_astrology import (
+    THAI_BIRTH_DAYS,
+    THAI_YEAR_ANIMALS,
+    DEFAULT_LATITUDE,
+    DEFAULT_LONGITUDE,
+    DEFAULT_TIMEZONE_OFFSET,
+    check_place,
+    ensure_lunar_table,
+    thai_day_column
+)
+
+router = APIRouter(prefix="/v1/lookup", tags=["Lookup"])
+
+# Most dates accepted in one call
+MAX_BULK_DATES = 5_000_000
+
+LEGEND = {
+    "sun_sign": [{"en": s["name_en"], "th": s["name_th"]} for s in ZODIAC_SIGNS],
+    "weekday": [{"en": d["name_en"], "th": d["name_th"]} for d in THAI_BIRTH_DAYS[:7]],
+    "thai_day": [{"en": d["name_en"], "th": d["name_th"]} for d in THAI_BIRTH_DAYS],
+    "naksat": [{"en": a["animal_en"], "th": a["name_th"]} for a in THAI_YEAR_ANIMALS],
+}
+
+
+def lookup_body(body: bytes, content_type: str, new_year_days: Dict[int, int]) -> bytes:
+    """
+    The bulk lookup response for a raw request body (runs in a compute worker).
+
+    Raises:
+        ValueError: With the 400 message when the body is not valid
+    """
+    payload = {}
+    try:
+        if "text/plain" in content_type:
+            dates = body.decode("utf-8").split()
+        else:
+            payload = json.loads(body)
+            dates = payload["dates"]
+            if not isinstance(dates, list):
+                raise TypeError("'dates' must be a list")
+        times = payload.get("times")
+        if times is not None and (not isinstance(times, list) or len(times) != len(dates)):
+            raise TypeError("'times' must be a list as long as 'dates'")
+        place = (
+            float(payload.get("latitude", DEFAULT_LATITUDE)),
+            float(payload.get("longitude", DEFAULT_LONGITUDE)),
+            str(payload.get("timezone_offset", DEFAULT_TIMEZONE_OFFSET)),
+        )
+        if times is not None:
+            check_place(*place)
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid body: expected {{\"dates\": [...]}} ({e})")
+    
+    if len(dates) > MAX_BULK_DATES:
+        raise ValueError(f"Too many dates (max {MAX_BULK_DATES})")
+    
+    result = lookup_columns(dates, new_year_days)
+    
+    # Built by hand: jsonable_encoder is far too slow for million-element lists
+    response = {
+        "count": len(dates),
+        "columns": {
+            "sun_sign": result["sun_sign"].tolist(),
+            "weekday": result["weekday"].tolist(),
+            "naksat": result["naksat"].tolist(),
+        },
+        "invalid": result["invalid"],
+        "legend": LEGEND,
+    }
+    if times is not None:
+        response["columns"]["thai_day"] = thai_day_column(dates, times, *place).tolist()
+    return json.dumps(response, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkLookupResponse,
+    summary="Bulk sun sign / birth day / naksat lookup",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": BulkLookupRequest.model_json_schema()},
+                "text/plain": {"schema": {"type": "string", "description": "One YYYY-MM-DD date per line"}},
+            },
+        }
+    },
+)
+async def bulk_lookup(request: Request):
+    """
+    Resolve sun sign, Thai birth day and ปีนักษัตร for many dates at once.
+    
+    Send `{"dates": [...]}` as JSON, or plain text with one date per line.
+    Results are columnar: `columns.sun_sign[i]`, `columns.weekday[i]` and
+    `columns.naksat[i]` belong to the i-th date, as ids into **legend**.
+    The naksat changes at the Thai lunar new year (ขึ้น 1 ค่ำ เดือน 5).
+    Invalid dates get -1 and are listed in **invalid**. Up to 5,000,000
+    dates per call.
+    
+    Add `"times": [...]` (HH:MM, same length as dates) to also get a
+    **thai_day** column: the Thai day starts at sunrise at `latitude` /
+    `longitude` (default Bangkok, `timezone_offset` +07:00), and 7 means
+    Wednesday night (ราหู).
+    """
+    body = await request.body()
+    try:
+        # Parsing, lookups and JSON encoding all run in a worker: millions of dates take seconds
+        content = await compute.run(
+            lookup_body, body, request.headers.get("content-type", ""), ensure_lunar_table().new_year_days()
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=content, media_type="application/json")
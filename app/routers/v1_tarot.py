@@ -3,9 +3,12 @@ Tarot API Router
 Endpoints for drawing tarot cards
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import Optional
 
+from app.core.auth import optional_user
+from app.core.cache import cache
+from app.core.history import history
 from app.models.tarot_models import TarotCard, TarotDrawResponse
 from app.engines.tarot import draw_cards, FULL_DECK
 
@@ -13,7 +16,7 @@ router = APIRouter(prefix="/test", tags=["Tarot Test"])
 
 
 @router.get("/draw", response_model=TarotDrawResponse, summary="Draw a single tarot card")
-async def draw_single_card():
+async def draw_single_card(user_id: Optional[str] = Depends(optional_user)):
     """
     Draw a single tarot card for quick guidance.
     
@@ -21,17 +24,20 @@ async def draw_single_card():
     """
     cards, spread_type, positions = draw_cards(1)
     
-    return TarotDrawResponse(
+    response = TarotDrawResponse(
         spread_type=spread_type,
         cards=[TarotCard(**card) for card in cards],
         positions=positions
     )
+    history.record(user_id, "tarot", {"count": 1}, response)
+    return response
 
 
 @router.get("/draw/{count}", response_model=TarotDrawResponse, summary="Draw multiple tarot cards")
 async def draw_multiple_cards(
     count: int,
-    spread: Optional[str] = Query(None, description="Spread type: single, past_present_future, celtic_cross")
+    spread: Optional[str] = Query(None, description="Spread type: single, past_present_future, celtic_cross"),
+    user_id: Optional[str] = Depends(optional_user)
 ):
     """
     Draw multiple tarot cards.
@@ -48,11 +54,13 @@ async def draw_multiple_cards(
     
     cards, spread_type, positions = draw_cards(count)
     
-    return TarotDrawResponse(
+    response = TarotDrawResponse(
         spread_type=spread_type,
         cards=[TarotCard(**card) for card in cards],
         positions=positions
     )
+    history.record(user_id, "tarot", {"count": count, "spread": spread}, response)
+    return response
 
 
 @router.get("/deck", summary="Get all cards in the deck")
@@ -62,6 +70,10 @@ async def get_full_deck():
     
     Useful for exploring the deck or building UI components.
     """
+    return await cache.get_or_load("static", "tarot_deck", _full_deck)
+
+
+async def _full_deck() -> dict:
     return {
         "total_cards": len(FULL_DECK),
         "deck": [TarotCard(**card) for card in FULL_DECK]
@@ -71,6 +83,10 @@ async def get_full_deck():
 @router.get("/deck/major", summary="Get Major Arcana cards")
 async def get_major_arcana():
     """Returns all 22 Major Arcana cards (The Fool through The World)."""
+    return await cache.get_or_load("static", "tarot_major", _major_arcana)
+
+
+async def _major_arcana() -> dict:
     major = [card for card in FULL_DECK if card["arcana"] == "major"]
     return {
         "total_cards": len(major),
@@ -95,9 +111,13 @@ async def get_minor_by_suit(suit: str):
             detail=f"Invalid suit. Choose from: {', '.join(valid_suits)}"
         )
     
-    suit_cards = [card for card in FULL_DECK if card.get("suit") == suit.lower()]
+    return await cache.get_or_load("static", ("tarot_suit", suit.lower()), lambda: _suit_cards(suit.lower()))
+
+
+async def _suit_cards(suit: str) -> dict:
+    suit_cards = [card for card in FULL_DECK if card.get("suit") == suit]
     return {
-        "suit": suit.lower(),
+        "suit": suit,
         "total_cards": len(suit_cards),
         "cards": [TarotCard(**card) for card in suit_cards]
     }
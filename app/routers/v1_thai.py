@@ -3,23 +3,48 @@ Thai Astrology API Router
 Endpoints for Thai horoscope (โหราศาสตร์ไทย)
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response
 from typing import Optional
+from datetime import datetime, timedelta, timezone
+from array import array
+import json
 
 from app.models.thai_astrology_models import (
-    ThaiYearAnimal, ThaiBirthDay, ThaiLagna,
-    ThaiReadingRequest, ThaiReadingResponse, NaksatResponse
+    ThaiYearAnimal, ThaiBirthDay, ThaiLagna, ThaiLunarDate,
+    ThaiReadingRequest, ThaiReadingResponse, NaksatResponse,
+    AuspiciousRequest, AuspiciousResponse, AuspiciousDate,
+    CompatibilityRequest, CompatibilityResponse, CompatibilityRankRequest, CompatibilityRankResponse,
+    YearlyForecastResponse, ThaiDailyResponse
 )
 from app.engines.thai_astrology import (
     get_thai_year_animal,
     get_thai_birth_day,
     calculate_thai_lagna,
-    get_thai_reading,
+    thai_reading_core,
+    get_lunar_date,
+    gregorian_from_lunar,
+    year_animal_for_date,
     gregorian_to_thai_year,
     THAI_YEAR_ANIMALS,
     THAI_BIRTH_DAYS,
-    THAI_LAGNA
+    THAI_LAGNA,
+    DEFAULT_LATITUDE,
+    DEFAULT_LONGITUDE,
+    DEFAULT_TIMEZONE_OFFSET
 )
+from app.engines.geo import resolve_birth_place
+from app.engines.auspicious import find_auspicious_dates
+from app.engines.compatibility import INVALID_SCORE, compare, id_columns, level, person_ids, rank_candidates
+from app.engines.yearly import FORECAST_LANGUAGES, yearly_forecast
+from app.engines.daily import DAILY_LANGUAGES, birth_day_id
+from app.core.cache import cache
+from app.core.auth import optional_user
+from app.core.history import history
+from app.core.executor import compute
+from app.core.interpretations import daily_interpretation, thai_today, yearly_interpretation
+from app.core.reading_templates import get_reading_templates
+from app.engines.dates import iso_date, lookup_date
 
 router = APIRouter(prefix="/v1/thai", tags=["Thai Astrology"])
 
@@ -59,20 +84,27 @@ async def get_birth_day_info(
         ..., 
         description="วันเกิด Format: YYYY-MM-DD เช่น 1990-05-15",
         examples=["1990-05-15", "2000-01-01"]
-    )
+    ),
+    birth_time: Optional[str] = Query(None, description="เวลาเกิด HH:MM - optional, วันไทยเริ่มเมื่อพระอาทิตย์ขึ้น", examples=["05:30"]),
+    latitude: float = Query(DEFAULT_LATITUDE, ge=-90, le=90, description="Birth latitude (default Bangkok)"),
+    longitude: float = Query(DEFAULT_LONGITUDE, ge=-180, le=180, description="Birth longitude (default Bangkok)"),
+    timezone_offset: str = Query(DEFAULT_TIMEZONE_OFFSET, description="UTC offset of birth_time")
 ):
     """
     Get Thai birth day information (วันเกิด).
     
     - **birth_date**: วันเกิด Format: **YYYY-MM-DD** เช่น 1990-05-15
+    - **birth_time**: optional; the Thai day starts at sunrise, so a birth
+      before sunrise belongs to the previous day, and Wednesday after
+      sunset is วันพุธกลางคืน (ราหู)
     
     Returns the ruling planet, lucky color, and personality traits.
     """
     try:
-        birth_day = get_thai_birth_day(birth_date)
+        birth_day = get_thai_birth_day(birth_date, birth_time, latitude, longitude, timezone_offset)
         return ThaiBirthDay(**birth_day)
     except ValueError as e:
-        raise HTTPException(status_code=400, detail=f"รูปแบบวันที่ไม่ถูกต้อง กรุณาใส่ YYYY-MM-DD เช่น 1990-05-15")
+        raise HTTPException(status_code=400, detail=f"รูปแบบวันที่/เวลาไม่ถูกต้อง กรุณาใส่ YYYY-MM-DD และ HH:MM เช่น 1990-05-15 14:30")
 
 
 @router.get("/lagna", response_model=ThaiLagna, summary="Get ลัคนา from birth time")
@@ -106,8 +138,40 @@ async def get_lagna(
         raise HTTPException(status_code=400, detail=f"รูปแบบเวลาไม่ถูกต้อง กรุณาใส่ HH:MM เช่น 14:30")
 
 
+@router.get("/lunar", response_model=ThaiLunarDate, summary="Convert between ค.ศ. and จันทรคติ dates")
+async def get_lunar(
+    date: Optional[str] = Query(None, description="วันที่ Format: YYYY-MM-DD", examples=["2024-04-09"]),
+    lunar_year: Optional[int] = Query(None, description="ค.ศ. year in which the lunar year's เดือน 5 begins", examples=[2024]),
+    month: Optional[int] = Query(None, ge=1, le=12, description="Lunar month (1 = เดือนอ้าย ... 12 = เดือนสิบสอง)"),
+    day: Optional[int] = Query(None, ge=1, le=15, description="ค่ำ (1-15)"),
+    waning: bool = Query(False, description="แรม (waning) instead of ขึ้น (waxing)"),
+    second_eighth: bool = Query(False, description="เดือนแปดหลัง (8-8) of a leap year")
+):
+    """
+    Convert a date to the Thai lunar calendar (ปฏิทินจันทรคติไทย), or back.
+    
+    - **date**: Gregorian date -> ขึ้น/แรม ... ค่ำ เดือน ... ปี ...
+    - or **lunar_year**, **month**, **day** (+ **waning**, **second_eighth**)
+      -> the Gregorian date, with its full lunar description
+    
+    The lunar year (and its ปีนักษัตร) starts at ขึ้น 1 ค่ำ เดือน 5.
+    Covers 1900-2100.
+    """
+    try:
+        if date is None:
+            if lunar_year is None or month is None or day is None:
+                raise ValueError("Give either date, or lunar_year, month and day")
+            date = gregorian_from_lunar(lunar_year, month, day, waning, second_eighth)
+        return ThaiLunarDate(**get_lunar_date(date))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.post("/reading", response_model=ThaiReadingResponse, summary="Get full Thai horoscope reading")
-async def get_full_thai_reading(request: ThaiReadingRequest):
+async def get_full_thai_reading(
+    request: ThaiReadingRequest,
+    user_id: Optional[str] = Depends(optional_user)
+):
     """
     Get complete Thai horoscope reading (ดูดวงแบบไทย).
     
@@ -116,21 +180,258 @@ async def get_full_thai_reading(request: ThaiReadingRequest):
     - วันเกิด (Birth Day)
     - ลัคนา (Lagna - if birth time provided)
     
+    With a birth place (**latitude/longitude** or **city**) the lagna is the
+    real sidereal Ascendant (Lahiri ayanamsa); otherwise the simplified
+    two-hours-per-rasi rule is used.
+    
     Returns a comprehensive Thai horoscope summary.
     """
     try:
-        reading = get_thai_reading(request.birth_date, request.birth_time)
+        latitude, longitude, timezone_offset = request.latitude, request.longitude, request.timezone_offset
+        if request.city or (latitude is not None and longitude is not None):
+            place = resolve_birth_place(
+                request.birth_date,
+                request.birth_time or "12:00",
+                latitude=latitude,
+                longitude=longitude,
+                city=request.city,
+                tz=request.tz,
+                timezone_offset=timezone_offset
+            )
+            latitude, longitude, timezone_offset = place["latitude"], place["longitude"], place["timezone_offset"]
+        
+        core = thai_reading_core(request.birth_date, request.birth_time, latitude, longitude, timezone_offset)
+        
+        # Same bytes as ThaiReadingResponse, spliced from pre-encoded fragments
+        content = get_reading_templates().render(request.birth_date, request.birth_time, core)
+        history.record(user_id, "thai", request, content)
+        return Response(content=content, media_type="application/json")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid input. Error: {str(e)}")
+
+
+@router.post("/auspicious", response_model=AuspiciousResponse, summary="Find ฤกษ์ดี (auspicious dates)")
+async def get_auspicious_dates(request: AuspiciousRequest):
+    """
+    Rank the best days in a date range for a wedding, business opening
+    or general use, personalised by วันเกิด and ปีนักษัตร.
+    
+    - ทักษา: days in the birth day's ศรี / เดช / มนตรี roles score highest;
+      กาลกิณี days are excluded
+    - Days whose animal clashes (ชง) with the birth year animal are excluded
+    - Waxing moon (ข้างขึ้น) days score higher; weddings also favour the
+      traditional months and avoid วันพระ, Tuesday and Saturday
+    
+    Ranges up to about 3 years; **start_date** defaults to today and
+    **end_date** to six months later.
+    """
+    try:
+        birth_day = get_thai_birth_day(request.birth_date, request.birth_time)
+        year_animal = year_animal_for_date(lookup_date(request.birth_date))
         
-        return ThaiReadingResponse(
-            birth_date=reading["birth_date"],
-            birth_time=reading["birth_time"],
-            year_animal=ThaiYearAnimal(**reading["year_animal"]),
-            birth_day=ThaiBirthDay(**reading["birth_day"]),
-            lagna=ThaiLagna(**reading["lagna"]) if reading["lagna"] else None,
-            summary_th=reading["summary_th"]
+        start_date = request.start_date
+        if start_date is None:
+            start_date = (datetime.now(timezone.utc) + timedelta(hours=7)).date().isoformat()
+        end_date = request.end_date or iso_date(lookup_date(start_date).day_number + 180)
+        
+        result = find_auspicious_dates(
+            start_date, end_date, birth_day["day_number"], year_animal["id"], request.purpose, request.limit
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return AuspiciousResponse(
+        birth_day=ThaiBirthDay(**birth_day),
+        year_animal=ThaiYearAnimal(**year_animal),
+        purpose=request.purpose,
+        start_date=start_date,
+        end_date=end_date,
+        scanned_days=result["scanned_days"],
+        excluded_days=result["excluded_days"],
+        dates=[AuspiciousDate(**d) for d in result["dates"]]
+    )
+
+
+@router.post("/compatibility", response_model=CompatibilityResponse, summary="ดวงสมพงษ์ of two people")
+async def get_compatibility(request: CompatibilityRequest):
+    """
+    Thai compatibility (ดวงสมพงษ์) of two people.
+    
+    Scores the pair from precomputed relationship matrices:
+    ปีนักษัตร (สามสหาย, คู่มิตร, ปีชง, คู่กัด + element cycle), วันเกิด
+    (each day's ทักษา role for the other) and ลัคนา (when both birth
+    times are given). Returns a 0-100 score with the breakdown.
+    """
+    try:
+        a = person_ids(request.person_a.birth_date, request.person_a.birth_time)
+        b = person_ids(request.person_b.birth_date, request.person_b.birth_time)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid input. Error: {str(e)}")
+    
+    result = compare(a, b)
+    return CompatibilityResponse(
+        **result,
+        year_animal_a=ThaiYearAnimal(**THAI_YEAR_ANIMALS[a[0]]),
+        year_animal_b=ThaiYearAnimal(**THAI_YEAR_ANIMALS[b[0]]),
+        birth_day_a=ThaiBirthDay(**THAI_BIRTH_DAYS[a[1]]),
+        birth_day_b=ThaiBirthDay(**THAI_BIRTH_DAYS[b[1]])
+    )
+
+
+# Most candidates accepted in one ranking call
+MAX_RANK_CANDIDATES = 5_000_000
+
+
+def _id_column(values, name: str) -> bytes:
+    """One id byte per candidate; -1, 255 or any id out of a byte's range is invalid."""
+    if not isinstance(values, list):
+        raise TypeError(f"'{name}' must be a list")
+    try:
+        return array("b", values).tobytes()
+    except OverflowError:
+        # Ids above 127 do not fit a signed byte: slower path, same bytes
+        return bytes(value & 0xFF if -128 <= value <= 255 else INVALID_SCORE for value in values)
+
+
+@router.post(
+    "/compatibility/rank",
+    response_model=CompatibilityRankResponse,
+    summary="Rank many candidates by ดวงสมพงษ์",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": CompatibilityRankRequest.model_json_schema()}},
+        }
+    },
+)
+async def rank_compatibility(request: Request):
+    """
+    Score one user against a large candidate list and return the best.
+    
+    Candidates are columns: either `birth_dates` (+ optional `birth_times`),
+    or precomputed ids `year_animals`, `birth_days` and `lagnas` (as
+    returned by /v1/lookup/bulk; lagna 12 = unknown), which skips date
+    parsing entirely. Each candidate is scored by table gathers over the
+    user's rows of the relationship matrices; 1,000,000 precomputed
+    candidates take about 0.1 s.
+    
+    **top[i].index** is the candidate's position in the columns. Invalid
+    candidates are counted in **invalid** and never ranked.
+    """
+    try:
+        payload = json.loads(await request.body())
+        user = payload["user"]
+        candidates = payload["candidates"]
+        limit = int(payload.get("limit", 20))
+        if not 1 <= limit <= 10000:
+            raise ValueError("'limit' must be 1-10000")
+        person = person_ids(user["birth_date"], user.get("birth_time"))
+        
+        if candidates.get("birth_dates") is not None:
+            dates = candidates["birth_dates"]
+            times = candidates.get("birth_times")
+            if not isinstance(dates, list) or (times is not None and (not isinstance(times, list) or len(times) != len(dates))):
+                raise TypeError("'birth_times' must be a list as long as 'birth_dates'")
+            count = len(dates)
+            if count > MAX_RANK_CANDIDATES:
+                raise ValueError(f"Too many candidates (max {MAX_RANK_CANDIDATES})")
+            columns = await compute.run(id_columns, dates, times)
+        else:
+            columns = tuple(_id_column(candidates[name], name) for name in ("year_animals", "birth_days", "lagnas"))
+            count = len(columns[0])
+            if any(len(column) != count for column in columns):
+                raise ValueError("'year_animals', 'birth_days' and 'lagnas' must have the same length")
+            if count > MAX_RANK_CANDIDATES:
+                raise ValueError(f"Too many candidates (max {MAX_RANK_CANDIDATES})")
+    except (ValueError, KeyError, TypeError, AttributeError, OverflowError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid body: {e}")
+    
+    result = await compute.run(rank_candidates, person, *columns, limit)
+    response = {
+        "count": count,
+        "invalid": result["invalid"],
+        "top": [{"index": i, "score": score, "level_th": level(score)[0]} for i, score in result["top"]],
+        "histogram": result["histogram"],
+    }
+    return Response(
+        content=json.dumps(response, ensure_ascii=False, separators=(",", ":")),
+        media_type="application/json"
+    )
+
+
+@router.get("/yearly/{year}", response_model=YearlyForecastResponse, summary="ดวงรายปี (yearly forecast)")
+async def get_yearly_forecast(
+    year: int,
+    birth_date: Optional[str] = Query(None, description="วันเกิด YYYY-MM-DD", examples=["1990-05-15"]),
+    birth_time: Optional[str] = Query(None, description="เวลาเกิด HH:MM - optional (before sunrise counts as the previous day)"),
+    year_animal: Optional[int] = Query(None, ge=0, le=11, description="ปีนักษัตร id instead of birth_date"),
+    birth_day: Optional[int] = Query(None, ge=0, le=7, description="วันเกิด id instead of birth_date (7 = พุธกลางคืน)"),
+    lang: str = Query("th", description="th or en")
+):
+    """
+    Yearly forecast: the year's ปีนักษัตร, element and วันอธิบดี crossed
+    with the person's ปีนักษัตร and วันเกิด.
+    
+    - **year**: ค.ศ. year (1900-2100); the lunar year starts at ขึ้น 1 ค่ำ เดือน 5
+    - **birth_date** (+ **birth_time**), or **year_animal** and **birth_day** ids
+    
+    Texts are pre-generated for every animal, birth day and language by a
+    scheduled job, so no AI call happens at request time.
+    """
+    try:
+        if lang not in FORECAST_LANGUAGES:
+            raise ValueError(f"Unsupported language '{lang}'. Choose from: {', '.join(FORECAST_LANGUAGES)}")
+        if birth_date is not None:
+            year_animal = year_animal_for_date(lookup_date(birth_date))["id"]
+            birth_day = get_thai_birth_day(birth_date, birth_time)["day_number"]
+        elif year_animal is None or birth_day is None:
+            raise ValueError("Give either birth_date, or year_animal and birth_day")
+        
+        forecast = yearly_forecast(year, year_animal, birth_day)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    text = yearly_interpretation(year, year_animal, birth_day, lang)
+    forecast.pop("outlook")
+    return YearlyForecastResponse(
+        **forecast,
+        lang=lang,
+        forecast=text.text,
+        source=text.source,
+        generated_at=text.generated_at
+    )
+
+
+@router.get("/daily/{day}", response_model=ThaiDailyResponse, summary="ดวงรายวัน of a วันเกิด")
+async def get_thai_daily(
+    day: str,
+    date: Optional[str] = Query(None, description="YYYY-MM-DD; defaults to today (Thailand time)"),
+    lang: str = Query("th", description="th or en")
+):
+    """
+    Daily Thai horoscope for a birth day (**day**: 0-7 or English name,
+    e.g. monday, wednesday-night).
+    
+    Based on the date's ทักษา role for the birth day, วันพระ and the lucky
+    color. Today's and tomorrow's texts are pre-generated by a scheduled
+    job, so no AI call happens at request time.
+    """
+    try:
+        if lang not in DAILY_LANGUAGES:
+            raise ValueError(f"Unsupported language '{lang}'. Choose from: {', '.join(DAILY_LANGUAGES)}")
+        day_number = lookup_date(date).day_number if date else thai_today()
+        daily, text = daily_interpretation(day_number, "thai_day", birth_day_id(day), lang)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    daily.pop("outlook")
+    return ThaiDailyResponse(
+        **daily,
+        lang=lang,
+        horoscope=text.text,
+        source=text.source,
+        generated_at=text.generated_at
+    )
 
 
 @router.get("/animals", summary="Get all 12 ปีนักษัตร")
@@ -140,18 +441,26 @@ async def get_all_animals():
     
     Useful for building UI dropdowns or reference.
     """
+    return await cache.get_or_load("static", "thai_animals", _all_animals)
+
+
+async def _all_animals() -> dict:
     return {
         "total": 12,
         "animals": [ThaiYearAnimal(**animal) for animal in THAI_YEAR_ANIMALS]
     }
 
 
-@router.get("/days", summary="Get all 7 วันเกิด")
+@router.get("/days", summary="Get all 8 วันเกิด")
 async def get_all_days():
     """
-    Returns all 7 Thai birth days with their attributes.
+    Returns all 8 Thai birth days (7 weekdays + Wednesday night/ราหู) with their attributes.
     """
+    return await cache.get_or_load("static", "thai_days", _all_days)
+
+
+async def _all_days() -> dict:
     return {
-        "total": 7,
+        "total": len(THAI_BIRTH_DAYS),
         "days": [ThaiBirthDay(**day) for day in THAI_BIRTH_DAYS]
     }
@@ -0,0 +1,101 @@
+"""
+Benchmark: /v1/thai/reading serialization
+
+Compares the model path (get_thai_reading -> Pydantic models ->
+JSONResponse) with the pre-encoded template path the endpoint uses, both
+in-process and through the full ASGI stack.
+
+Usage:
+    python -m scripts.bench_thai_reading [--requests 20000] [--http 3000]
+"""
+
+import argparse
+import random
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.reading_templates import get_reading_templates
+from app.engines.thai_astrology import ensure_lunar_table, get_thai_reading, thai_reading_core
+from app.models.thai_astrology_models import (
+    ThaiBirthDay, ThaiLagna, ThaiLunarDate, ThaiReadingResponse, ThaiYearAnimal
+)
+
+
+def sample_inputs(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    inputs = []
+    for _ in range(count):
+        birth_date = f"{rng.randint(1940, 2010)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        birth_time = f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}" if rng.random() < 0.7 else None
+        inputs.append((birth_date, birth_time))
+    return inputs
+
+
+def model_path(birth_date, birth_time) -> bytes:
+    """What the endpoint did before: engine dicts -> models -> JSONResponse."""
+    reading = get_thai_reading(birth_date, birth_time)
+    response = ThaiReadingResponse(
+        birth_date=reading["birth_date"],
+        birth_time=reading["birth_time"],
+        year_animal=ThaiYearAnimal(**reading["year_animal"]),
+        birth_day=ThaiBirthDay(**reading["birth_day"]),
+        lagna=ThaiLagna(**reading["lagna"]) if reading["lagna"] else None,
+        lagna_method=reading["lagna_method"],
+        lunar_date=ThaiLunarDate(**reading["lunar_date"]) if reading["lunar_date"] else None,
+        summary_th=reading["summary_th"]
+    )
+    return JSONResponse(jsonable_encoder(response)).body
+
+
+def template_path(birth_date, birth_time) -> bytes:
+    core = thai_reading_core(birth_date, birth_time)
+    return get_reading_templates().render(birth_date, birth_time, core)
+
+
+def timed(fn, inputs) -> float:
+    started = time.perf_counter()
+    for birth_date, birth_time in inputs:
+        fn(birth_date, birth_time)
+    return len(inputs) / (time.perf_counter() - started)
+
+
+def bench_http(inputs) -> float:
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        started = time.perf_counter()
+        for birth_date, birth_time in inputs:
+            client.post("/v1/thai/reading", json={"birth_date": birth_date, "birth_time": birth_time})
+        return len(inputs) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000, help="In-process renders per path")
+    parser.add_argument("--http", type=int, default=3000, help="HTTP requests (0 to skip)")
+    args = parser.parse_args()
+
+    ensure_lunar_table()
+    started = time.perf_counter()
+    templates = get_reading_templates()
+    fragments, size = templates.size()
+    print(f"templates: {fragments} fragments, {size / 1024:.0f} KiB, built in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    inputs = sample_inputs(args.requests)
+    mismatches = sum(model_path(d, t) != template_path(d, t) for d, t in inputs[:1000])
+    print(f"byte-identical output: {1000 - mismatches}/1000")
+
+    before = timed(model_path, inputs)
+    after = timed(template_path, inputs)
+    print(f"in-process  model path: {before:10,.0f} readings/s")
+    print(f"in-process  templates:  {after:10,.0f} readings/s  ({after / before:.1f}x)")
+
+    if args.http:
+        print(f"HTTP (TestClient):      {bench_http(inputs[:args.http]):10,.0f} requests/s")
+
+
+if __name__ == "__main__":
+    main()
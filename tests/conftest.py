@@ -0,0 +1,73 @@
+"""
+Shared fixtures
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.cache import SQLiteBackend, cache
+from app.core.config import settings
+from app.core.history import SQLiteHistoryStore, history
+from app.core.prompt_store import prompt_store
+from app.core.synastry_pool import synastry_pool
+
+JWT_SECRET = "test-jwt-secret"
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _make_token(claims: dict, secret: str = JWT_SECRET, alg: str = "HS256") -> str:
+    header = _b64(json.dumps({"alg": alg, "typ": "JWT"}).encode())
+    payload = _b64(json.dumps(claims).encode())
+    signature = hmac.new(secret.encode(), f"{header}.{payload}".encode(), hashlib.sha256).digest()
+    return f"{header}.{payload}.{_b64(signature)}"
+
+
+@pytest.fixture
+def make_token():
+    """Sign claims like Supabase Auth does (HS256 with the project secret)."""
+    return _make_token
+
+
+@pytest.fixture
+def bearer(monkeypatch):
+    """Authorization headers of a signed-in user, with token checks enabled."""
+    monkeypatch.setattr(settings, "SUPABASE_JWT_SECRET", JWT_SECRET)
+
+    def headers(sub: str) -> dict:
+        claims = {"sub": sub, "aud": "authenticated", "exp": time.time() + 3600}
+        return {"Authorization": f"Bearer {_make_token(claims)}"}
+    return headers
+
+
+@pytest.fixture
+def app_client(monkeypatch, tmp_path):
+    """
+    TestClient running the full lifespan, isolated from the repo's data.
+
+    Every database goes to tmp_path (prompt store, history, synastry pools,
+    cache L2), the scheduler stays off and no AI key is set, so a local
+    .env never makes the tests call Gemini.
+    """
+    from app.main import app
+
+    monkeypatch.setattr(settings, "SCHEDULER_ENABLED", False)
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", "")
+    monkeypatch.setattr(prompt_store, "path", str(tmp_path / "prompts.sqlite"))
+    monkeypatch.setattr(prompt_store, "_conn", None)
+    monkeypatch.setattr(prompt_store, "size", None)
+    monkeypatch.setattr(history, "store", SQLiteHistoryStore(str(tmp_path / "history.sqlite")))
+    monkeypatch.setattr(synastry_pool, "path", str(tmp_path / "synastry.sqlite"))
+    monkeypatch.setattr(synastry_pool, "_conn", None)
+    monkeypatch.setattr(cache, "backend", SQLiteBackend(str(tmp_path / "cache.sqlite")))
+    with TestClient(app) as client:
+        yield client
+    synastry_pool.close()
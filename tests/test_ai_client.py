@@ -0,0 +1,84 @@
+"""
+Circuit breaker around the AI provider
+"""
+
+import asyncio
+import time
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from app.core import ai_client
+from app.core.ai_client import AI_ERROR_PREFIX, CircuitBreaker, generate_interpretation
+from app.core.config import settings
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker(failures=3, cooldown=60.0)
+    monkeypatch.setattr(ai_client, "breaker", breaker)
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+    return breaker
+
+
+def failing_with(monkeypatch, error):
+    def generate(*args):
+        raise error
+    monkeypatch.setattr(ai_client, "_generate_content", generate)
+
+
+def calls(count):
+    async def scenario():
+        return [await generate_interpretation("prompt") for _ in range(count)]
+    return asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("error", [
+    google_exceptions.ServiceUnavailable("down"),
+    google_exceptions.InternalServerError("oops"),
+    google_exceptions.DeadlineExceeded("slow"),
+    google_exceptions.TooManyRequests("rate limited"),
+    google_exceptions.ResourceExhausted("quota exceeded"),
+    ConnectionError("reset"),
+    TimeoutError("timed out"),
+])
+def test_outages_open_the_circuit(monkeypatch, breaker, error):
+    failing_with(monkeypatch, error)
+    texts = calls(4)
+    assert breaker.state == "open"
+    assert breaker.rejected == 1
+    assert texts[-1] == f"{AI_ERROR_PREFIX}: AI temporarily unavailable, try again shortly"
+
+
+@pytest.mark.parametrize("error", [
+    ValueError("The response was blocked by the safety filters"),
+    google_exceptions.InvalidArgument("bad prompt"),
+])
+def test_answered_errors_do_not_count(monkeypatch, breaker, error):
+    failing_with(monkeypatch, error)
+    texts = calls(5)
+    assert breaker.state == "closed"
+    assert breaker.consecutive_failures == 0
+    assert all(text.startswith(AI_ERROR_PREFIX) for text in texts)
+
+
+def test_answered_error_closes_a_half_open_circuit(monkeypatch, breaker):
+    failing_with(monkeypatch, ConnectionError("reset"))
+    calls(3)
+    breaker.opened_at -= breaker.cooldown
+    failing_with(monkeypatch, ValueError("blocked"))
+    calls(1)
+    assert breaker.state == "closed"
+
+
+def test_hung_calls_time_out_and_count(monkeypatch, breaker):
+    monkeypatch.setattr(settings, "AI_TIMEOUT_SECONDS", 0.05)
+
+    def generate(*args):
+        time.sleep(0.3)
+        return "late", 0, 0
+    monkeypatch.setattr(ai_client, "_generate_content", generate)
+
+    texts = calls(3)
+    assert texts == [f"{AI_ERROR_PREFIX}: TimeoutError"] * 3
+    assert breaker.state == "open"
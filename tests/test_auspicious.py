@@ -0,0 +1,103 @@
+"""
+Auspicious dates: taksa roles, day animals and ranking over year masks
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from app.engines.auspicious import (
+    KALAKINI, WAXING_SCORE, TAKSA_ROLES, animal_score, day_animal, find_auspicious_dates, taksa_roles, year_rules
+)
+from app.engines.dates import day_number, lookup_date
+from app.engines.thai_astrology import ensure_lunar_table
+
+HORSE, RAT, OX = 6, 0, 1
+
+
+def test_day_animal_cycle():
+    # 2000-01-01 was a Horse day (戊午), and the animals run on day by day
+    n = day_number(2000, 1, 1)
+    assert day_animal(n) == HORSE
+    assert [day_animal(n + i) for i in range(1, 7)] == [7, 8, 9, 10, 11, RAT]
+    assert day_animal(n + 60) == HORSE
+
+
+# Traditional กาลกิณี of each birth day (Friday-born: Wednesday night, which is no weekday)
+@pytest.mark.parametrize("birth_day,kalakini_weekday", [(0, 5), (1, 0), (2, 1), (3, 2), (4, 6), (5, None), (6, 3), (7, 4)])
+def test_taksa_kalakini_days(birth_day, kalakini_weekday):
+    roles = taksa_roles(birth_day)
+    assert (roles.index(KALAKINI) if KALAKINI in roles else None) == kalakini_weekday
+    if birth_day < 7:
+        assert roles[birth_day] == 0    # บริวาร: the birth day itself
+
+
+def brute_force(start: str, end: str, birth_day: int, year_animal: int):
+    """Scanned, excluded and (score, iso date) of every kept day, straight from the rules."""
+    table = ensure_lunar_table()
+    roles = taksa_roles(birth_day)
+    first, last = date.fromisoformat(start), date.fromisoformat(end)
+    kept, excluded = [], 0
+    for i in range((last - first).days + 1):
+        day = first + timedelta(days=i)
+        n = lookup_date(day.isoformat()).day_number
+        if roles[n % 7] == KALAKINI or day_animal(n) == (year_animal + 6) % 12:
+            excluded += 1
+            continue
+        score = TAKSA_ROLES[roles[n % 7]][2] + animal_score(day_animal(n), year_animal)
+        if table.to_lunar(n).day <= 15:
+            score += WAXING_SCORE
+        kept.append((score, day.isoformat()))
+    return (last - first).days + 1, excluded, sorted(kept, key=lambda c: (-c[0], c[1]))
+
+
+@pytest.mark.parametrize("start,end,birth_day,year_animal", [
+    ("2025-03-01", "2025-03-31", 0, HORSE),
+    ("2024-12-15", "2025-01-15", 2, OX),        # crosses the year boundary
+    ("2023-11-01", "2025-02-28", 7, RAT),       # three years of masks
+])
+def test_ranking_matches_the_rules(start, end, birth_day, year_animal):
+    scanned, excluded, kept = brute_force(start, end, birth_day, year_animal)
+    result = find_auspicious_dates(start, end, birth_day, year_animal, limit=15)
+
+    assert result["scanned_days"] == scanned
+    assert result["excluded_days"] == excluded
+    assert [(d["score"], d["date"]) for d in result["dates"]] == kept[:15]
+
+
+def test_year_crossing_range_ranks_days_of_both_years():
+    result = find_auspicious_dates("2024-12-25", "2025-01-05", 1, RAT, limit=100)
+    years = {d["date"][:4] for d in result["dates"]}
+    assert years == {"2024", "2025"}
+    assert result["scanned_days"] == 12
+    assert len(result["dates"]) == 12 - result["excluded_days"]
+
+
+def test_described_dates_never_fall_on_excluded_days():
+    result = find_auspicious_dates("2025-01-01", "2025-12-31", 0, HORSE, purpose="wedding", limit=365)
+    assert all(d["taksa_role"] != TAKSA_ROLES[KALAKINI][0] for d in result["dates"])
+    clash_animal = day_animal(day_number(2000, 1, 1) + 6)      # Rat, the Horse's clash
+    assert all(day_animal(lookup_date(d["date"]).day_number) != clash_animal for d in result["dates"])
+
+
+def test_year_rules_masks_cover_every_day_once():
+    rules = year_rules(2024)
+    full = (1 << rules.days) - 1
+    assert rules.days == 366
+    assert sum(bin(mask).count("1") for mask in rules.weekday) == 366
+    assert sum(bin(mask).count("1") for mask in rules.animal) == 366
+    assert sum(bin(mask).count("1") for mask in rules.month) == 366
+    assert rules.weekday[1] & 1    # 2024-01-01 was a Monday
+    assert rules.waxing & ~full == 0
+
+
+@pytest.mark.parametrize("args,message", [
+    (("2025-01-10", "2025-01-01", 0, 0), "before"),
+    (("2020-01-01", "2025-01-01", 0, 0), "too long"),
+    (("1850-01-01", "1850-01-02", 0, 0), "1900-2100"),
+])
+def test_invalid_ranges(args, message):
+    with pytest.raises(ValueError, match=message):
+        find_auspicious_dates(*args)
+    with pytest.raises(ValueError, match="Unknown purpose"):
+        find_auspicious_dates("2025-01-01", "2025-01-02", 0, 0, purpose="party")
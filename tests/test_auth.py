@@ -0,0 +1,67 @@
+"""
+Access-token checks and per-user history
+"""
+
+import time
+
+import pytest
+
+from app.core.auth import AuthError, verify_token
+from app.core.config import settings
+from conftest import JWT_SECRET
+
+
+def claims(sub: str = "user-1", **extra) -> dict:
+    return {"sub": sub, "aud": "authenticated", "exp": time.time() + 3600, **extra}
+
+
+def test_valid_token(make_token):
+    assert verify_token(make_token(claims()), JWT_SECRET, "authenticated")["sub"] == "user-1"
+
+
+@pytest.mark.parametrize("claim_set,secret,alg", [
+    (claims(), "other-secret", "HS256"),
+    (claims(exp=time.time() - 3600), JWT_SECRET, "HS256"),
+    (claims(aud="anon"), JWT_SECRET, "HS256"),
+    (claims(), JWT_SECRET, "none"),
+])
+def test_invalid_tokens(make_token, claim_set, secret, alg):
+    with pytest.raises(AuthError):
+        verify_token(make_token(claim_set, secret, alg), JWT_SECRET, "authenticated")
+
+
+@pytest.mark.parametrize("token", ["not-a-token", "a.b.c", ""])
+def test_malformed_tokens(token):
+    with pytest.raises(AuthError):
+        verify_token(token, JWT_SECRET, "authenticated")
+
+
+@pytest.fixture
+def client(bearer, app_client):
+    return app_client
+
+
+def test_history_needs_a_valid_token(client):
+    assert client.get("/v1/history").status_code == 401
+    assert client.get("/v1/history", headers={"Authorization": "Bearer a.b.c"}).status_code == 401
+    assert client.get("/v1/history", headers={"X-User-Id": "user-1"}).status_code == 401
+
+
+def test_history_is_unavailable_without_auth_configured(client, bearer, monkeypatch):
+    headers = bearer("user-1")
+    monkeypatch.setattr(settings, "SUPABASE_JWT_SECRET", "")
+    assert client.get("/v1/history", headers=headers).status_code == 503
+
+
+def test_tarot_draws_are_recorded_per_user(client, bearer):
+    assert client.get("/test/draw/3", headers=bearer("alice")).status_code == 200
+    assert client.get("/test/draw").status_code == 200          # anonymous: not recorded
+    assert client.get("/test/draw", headers={"Authorization": "Bearer bad"}).status_code == 401
+
+    items = []
+    deadline = time.monotonic() + 5
+    while not items and time.monotonic() < deadline:
+        time.sleep(0.1)
+        items = client.get("/v1/history", headers=bearer("alice")).json()["items"]
+    assert [item["kind"] for item in items] == ["tarot"]
+    assert client.get("/v1/history", headers=bearer("bob")).json()["items"] == []
@@ -0,0 +1,61 @@
+"""
+Streamed bulk natal charts
+"""
+
+import json
+
+from app.engines.astrology import birth_julian_day, compact_chart_for_key, expand_chart, natal_cache_key
+from app.routers.v1_horoscope import render_chunk
+
+RECORD = {"birth_date": "1990-05-15", "birth_time": "14:30", "latitude": 13.75, "longitude": 100.5, "timezone_offset": "+07:00"}
+
+
+def key_of(record):
+    jd = birth_julian_day(record["birth_date"], record["birth_time"], record["timezone_offset"])
+    return natal_cache_key(jd, record["latitude"], record["longitude"], "equal")
+
+
+def test_render_chunk_uses_cached_charts_and_reports_computed_ones():
+    key = key_of(RECORD)
+    cached = compact_chart_for_key(key)
+    body, ok, computed = render_chunk([
+        (1, "a", {"date": "1990-05-15"}, key, cached),
+        (2, "b", {"date": "1990-05-15"}, key, None),
+    ])
+    lines = [json.loads(line) for line in body.decode("utf-8").splitlines()]
+
+    assert ok == 2
+    assert [i for i, _ in computed] == [1]
+    assert computed[0][1] == cached
+    assert lines[0] == json.loads(json.dumps({"line": 1, "id": "a", "birth_data": {"date": "1990-05-15"}, **expand_chart(cached)}))
+    assert lines[1]["id"] == "b" and lines[1]["sun_sign"] == lines[0]["sun_sign"]
+
+
+def test_bulk_upload_streams_charts_errors_and_summary(app_client):
+    body = "\n".join([
+        json.dumps({**RECORD, "id": "ok"}),
+        "not json",
+        json.dumps({**RECORD, "birth_date": "not-a-date", "id": "bad"}),
+        "",
+        json.dumps({**RECORD, "id": "again"}),
+    ])
+    response = app_client.post("/v1/horoscope/natal/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    charts = [line for line in lines if "planets" in line]
+    failed = {line["line"]: line for line in lines if "error" in line}
+    assert [chart["id"] for chart in charts] == ["ok", "again"]
+    assert charts[0]["planets"] == charts[1]["planets"]
+    assert set(failed) == {2, 3}
+    assert lines[-1]["summary"]["rows"] == 4
+    assert lines[-1]["summary"]["charts"] == 2
+    assert lines[-1]["summary"]["errors"] == 2
+
+
+def test_bulk_csv_upload(app_client):
+    body = "id,birth_date,birth_time,latitude,longitude,timezone_offset\nx,1990-05-15,14:30,13.75,100.5,+07:00\n"
+    response = app_client.post("/v1/horoscope/natal/bulk", content=body, headers={"Content-Type": "text/csv"})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0]["id"] == "x" and lines[0]["birth_data"]["latitude"] == 13.75
+    assert lines[-1]["summary"]["charts"] == 1
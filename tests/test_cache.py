@@ -0,0 +1,64 @@
+"""
+Cache backends, keys and the build-derived version
+"""
+
+import asyncio
+
+from app.core import cache as cache_module
+from app.core.cache import MemoryBackend, Namespace, SQLiteBackend, TwoTierCache, create_backend
+from app.core.config import build_id, settings
+from app.engines.astrology import EPHEMERIS_GENERATOR_ID
+
+
+def test_memory_backend_is_bounded_lru():
+    async def scenario():
+        backend = MemoryBackend(max_entries=3)
+        for key in "abc":
+            await backend.set(key, key.encode(), None)
+        await backend.get("a")                  # "b" is now the least recently used
+        await backend.set("d", b"d", None)
+        return [await backend.get(key) for key in "abcd"]
+
+    assert asyncio.run(scenario()) == [b"a", None, b"c", b"d"]
+
+
+def test_memory_backend_sweeps_expired_entries(monkeypatch):
+    monkeypatch.setattr(cache_module, "MEMORY_SWEEP_EVERY", 4)
+
+    async def scenario():
+        backend = MemoryBackend(max_entries=100)
+        await backend.set("short", b"1", 0.01)
+        await backend.set("long", b"2", None)
+        await asyncio.sleep(0.02)
+        await backend.set("x", b"3", None)
+        await backend.set("y", b"4", None)     # 4th write: sweep
+        return len(backend._entries)
+
+    assert asyncio.run(scenario()) == 3
+
+
+def test_auto_backend_without_redis_is_sqlite(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "auto")
+    monkeypatch.setattr(settings, "REDIS_URL", "")
+    monkeypatch.setattr(settings, "CACHE_SQLITE_PATH", str(tmp_path / "cache.sqlite"))
+    assert isinstance(create_backend(), SQLiteBackend)
+
+
+def test_chart_keys_carry_the_ephemeris_generator():
+    assert f":chart:{EPHEMERIS_GENERATOR_ID}:" in cache_module.cache.key("chart", (1, 2.0, 3.0, "equal"))
+    assert f":transits:{EPHEMERIS_GENERATOR_ID}:" in cache_module.cache.key("transits", ("2024-01-01", "2024-02-01", None))
+
+    other = TwoTierCache(MemoryBackend(), version=cache_module.cache.version)
+    other.register("chart", Namespace(ttl=None, generator=EPHEMERIS_GENERATOR_ID + "-next"))
+    assert other.key("chart", (1,)) != cache_module.cache.key("chart", (1,))
+
+
+def test_build_id_prefers_the_deployed_commit(monkeypatch):
+    for name in ("GIT_COMMIT", "SOURCE_VERSION", "RENDER_GIT_COMMIT", "RAILWAY_GIT_COMMIT_SHA"):
+        monkeypatch.delenv(name, raising=False)
+    source_hash = build_id()
+    assert source_hash == build_id() and len(source_hash) == 12
+
+    monkeypatch.setenv("SOURCE_VERSION", "0123456789abcdef")
+    assert build_id() == "0123456789ab"
+    assert settings.CACHE_VERSION.startswith(f"{settings.APP_VERSION}-")
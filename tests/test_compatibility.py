@@ -0,0 +1,79 @@
+"""
+ดวงสมพงษ์: pairwise scores and one-to-many ranking
+"""
+
+import itertools
+import random
+
+import pytest
+
+from app.engines.compatibility import (
+    ANIMALS, DAYS, INVALID_SCORE, LAGNAS, compare, rank_candidates, score_column
+)
+from app.routers.v1_thai import _id_column
+
+EVERY_PERSON = list(itertools.product(range(ANIMALS), range(DAYS), range(LAGNAS)))
+
+
+def columns_of(people):
+    return tuple(bytes(ids[k] & 0xFF for ids in people) for k in range(3))
+
+
+@pytest.mark.parametrize("person", [(0, 0, 0), (6, 7, 12), (11, 3, 5)])
+def test_score_column_matches_compare_for_every_candidate(person):
+    scores = score_column(person, *columns_of(EVERY_PERSON))
+    assert list(scores) == [compare(person, candidate)["score"] for candidate in EVERY_PERSON]
+
+
+def test_score_column_matches_compare_on_random_pairs():
+    rng = random.Random(41)
+    for _ in range(50):
+        person = rng.choice(EVERY_PERSON)
+        candidates = rng.sample(EVERY_PERSON, 200)
+        assert list(score_column(person, *columns_of(candidates))) == [compare(person, c)["score"] for c in candidates]
+
+
+@pytest.mark.parametrize("candidate", [(12, 0, 0), (0, 8, 0), (0, 0, 13), (-1, 0, 0), (0, -1, 0), (255, 255, 255), (0, 0, 255)])
+def test_invalid_ids_score_invalid(candidate):
+    valid = (3, 2, 1)
+    scores = score_column((0, 0, 0), *columns_of([valid, candidate, valid]))
+    assert scores[1] == INVALID_SCORE
+    # Neighbours are unaffected (no carry between candidate bytes)
+    assert scores[0] == scores[2] == compare((0, 0, 0), valid)["score"]
+
+
+def test_rank_candidates_orders_ties_by_position():
+    person = (0, 0, 0)
+    people = EVERY_PERSON + [(255, 0, 0), (0, 8, 0)]
+    result = rank_candidates(person, *columns_of(people), limit=25)
+    scores = [compare(person, c)["score"] for c in EVERY_PERSON]
+
+    expected = sorted(range(len(EVERY_PERSON)), key=lambda i: (-scores[i], i))[:25]
+    assert [i for i, _ in result["top"]] == expected
+    assert [score for _, score in result["top"]] == [scores[i] for i in expected]
+    assert result["invalid"] == 2
+    assert sum(result["histogram"].values()) == len(EVERY_PERSON)
+    assert rank_candidates(person, *columns_of(people), limit=1)["top"] == result["top"][:1]
+
+
+def test_id_columns_from_json():
+    assert _id_column([0, 11, -1], "year_animals") == bytes([0, 11, 255])
+    assert _id_column([0, 255, 1000, -500], "year_animals") == bytes([0, 255, 255, 255])
+    with pytest.raises(TypeError):
+        _id_column("0,1", "year_animals")
+    with pytest.raises(TypeError):
+        _id_column([0, "x", 300], "year_animals")
+
+
+def test_rank_endpoint_with_precomputed_ids(app_client):
+    body = {
+        "user": {"birth_date": "1990-05-15"},
+        "candidates": {"year_animals": [0, 6, 255, 4], "birth_days": [1, 2, 0, 3], "lagnas": [12, 12, 12, 12]},
+        "limit": 3,
+    }
+    result = app_client.post("/v1/thai/compatibility/rank", json=body).json()
+    assert result["count"] == 4 and result["invalid"] == 1
+    assert len(result["top"]) == 3 and 2 not in [entry["index"] for entry in result["top"]]
+
+    body["candidates"]["lagnas"] = [12]
+    assert app_client.post("/v1/thai/compatibility/rank", json=body).status_code == 400
@@ -0,0 +1,164 @@
+"""
+Daily horoscopes: rule-based outlooks, pre-generation, publishing and the daily endpoints
+"""
+
+import asyncio
+
+import pytest
+
+from app.core import interpretations as interp
+from app.core.ai_client import AI_ERROR_PREFIX
+from app.core.interpretations import InterpretationStore, pregenerate_daily, refresh_daily_horoscopes
+from app.engines.auspicious import TAKSA_ROLES
+from app.engines.compatibility import taksa_role
+from app.engines.daily import MOON_ASPECTS, daily_keys, daily_text, thai_daily, western_daily
+from app.engines.dates import day_number, iso_date
+from app.engines.thai_astrology import THAI_BIRTH_DAYS
+
+DAY = day_number(2024, 8, 10)       # Mercury retrograde 2024-08-05 .. 2024-08-28
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = InterpretationStore()
+    monkeypatch.setattr(interp, "interpretations", store)
+    return store
+
+
+@pytest.fixture
+def ai(monkeypatch):
+    """A leading worker with a fake model; fails the first `failures` calls per prompt."""
+    calls = {"prompts": [], "failures": 0, "active": 0, "peak": 0}
+
+    async def fake_interpret(prompt, system_instruction):
+        calls["prompts"].append(prompt)
+        calls["active"] += 1
+        calls["peak"] = max(calls["peak"], calls["active"])
+        await asyncio.sleep(0)
+        calls["active"] -= 1
+        if calls["prompts"].count(prompt) <= calls["failures"]:
+            return f"{AI_ERROR_PREFIX} quota"
+        return f"ai text {len(calls['prompts'])}"
+
+    monkeypatch.setattr(interp, "ai_available", lambda: True)
+    monkeypatch.setattr(interp.scheduler, "leading", True)
+    monkeypatch.setattr(interp, "interpret", fake_interpret)
+    monkeypatch.setattr(interp, "AI_RETRY_DELAY_SECONDS", 0)
+    return calls
+
+
+def test_western_daily_scores_the_moon_aspect_and_retrogrades():
+    moon_sign = western_daily(DAY, 0)["moon_sign"]["id"]
+    same = western_daily(DAY, moon_sign)
+    opposite = western_daily(DAY, (moon_sign + 6) % 12)
+
+    assert (same["aspect_en"], same["score"]) == ("Moon in your sign", 2)
+    assert (opposite["aspect_en"], opposite["score"]) == ("Moon opposite", -2)
+    assert all(western_daily(DAY, s)["score"] in {a[2] for a in MOON_ASPECTS.values()} | {0} for s in range(12))
+    assert "Mercury" in same["retrograde"]
+    assert any("Mercury is retrograde" in line for line in same["outlook"]["en"])
+    assert "Mercury" not in western_daily(day_number(2024, 10, 1), 0)["retrograde"]
+
+
+def test_thai_daily_roles_and_lucky_color():
+    for birth_day in range(len(THAI_BIRTH_DAYS)):
+        daily = thai_daily(DAY, birth_day)
+        lucky = next(d for d in THAI_BIRTH_DAYS if d["color"] == daily["lucky_color"])
+        assert TAKSA_ROLES[taksa_role(birth_day, lucky["day_number"])][1] == "Fortune"
+        assert daily["weekday"] == THAI_BIRTH_DAYS[DAY % 7]
+
+    # Birth day and weekday coincide: the Companions (บริวาร) role
+    assert thai_daily(DAY, DAY % 7)["role_en"] == "Companions"
+
+
+def test_holy_days_fall_every_six_to_eight_days():
+    holy = [n for n in range(day_number(2024, 1, 1), day_number(2025, 1, 1)) if thai_daily(n, 0)["holy_day"]]
+    assert 48 <= len(holy) <= 51
+    assert {b - a for a, b in zip(holy, holy[1:])} <= {6, 7, 8}
+    assert all("วันพระ" in daily_text(thai_daily(n, 0), "th") for n in holy[:3])
+
+
+def test_daily_text_rejects_unknown_languages():
+    with pytest.raises(ValueError):
+        daily_text(western_daily(DAY, 0), "fr")
+
+
+def test_rules_are_published_for_every_key_in_one_swap(store, monkeypatch):
+    monkeypatch.setattr(interp, "ai_available", lambda: False)
+    published = []
+    publish = store.publish
+
+    def recording_publish(kind, items):
+        assert store.stats() == {}          # nothing visible before the swap
+        published.append(len(items))
+        publish(kind, items)
+
+    monkeypatch.setattr(store, "publish", recording_publish)
+    counts = asyncio.run(pregenerate_daily(DAY))
+
+    assert len(daily_keys()) == 12 * 2 + 8 * 2
+    assert counts == {"generated": 40, "ai": 0, "skipped": 0}
+    assert published == [40]
+    assert store.stats() == {"daily": {"total": 40, "ai": 0, "rules": 40}}
+    item = store.get("daily", (iso_date(DAY), "sign", 4, "en"))
+    assert item.text == daily_text(western_daily(DAY, 4), "en")
+
+
+def test_ai_texts_are_retried_bounded_and_kept(store, ai):
+    ai["failures"] = 1
+    counts = asyncio.run(pregenerate_daily(DAY))
+    assert counts == {"generated": 40, "ai": 40, "skipped": 0}
+    assert len(ai["prompts"]) == 80             # one retry per key
+    assert ai["peak"] <= interp.AI_CONCURRENCY
+
+    # A second run keeps the AI texts
+    assert asyncio.run(pregenerate_daily(DAY)) == {"generated": 0, "ai": 0, "skipped": 40}
+    assert len(ai["prompts"]) == 80
+
+
+def test_rules_fallback_is_replaced_once_ai_is_back(store, ai, monkeypatch):
+    monkeypatch.setattr(interp, "ai_available", lambda: False)
+    asyncio.run(pregenerate_daily(DAY))
+    monkeypatch.setattr(interp, "ai_available", lambda: True)
+    assert asyncio.run(pregenerate_daily(DAY))["ai"] == 40
+    assert store.stats()["daily"] == {"total": 40, "ai": 40, "rules": 0}
+
+
+def test_refresh_generates_today_and_tomorrow_and_prunes_old_days(store, monkeypatch):
+    monkeypatch.setattr(interp, "ai_available", lambda: False)
+    monkeypatch.setattr(interp, "thai_today", lambda: DAY)
+    for day in (DAY - 2, DAY - 1):
+        store.put("daily", (iso_date(day), "sign", 0, "th"), "old", "rules")
+
+    result = asyncio.run(refresh_daily_horoscopes())
+
+    assert list(result) == [iso_date(DAY), iso_date(DAY + 1)]
+    assert store.get("daily", (iso_date(DAY - 2), "sign", 0, "th")) is None
+    assert store.get("daily", (iso_date(DAY - 1), "sign", 0, "th")).text == "old"
+    assert store.stats()["daily"]["total"] == 1 + 2 * 40
+
+
+def test_daily_endpoints_serve_the_published_text(app_client, store):
+    store.put("daily", ("2024-08-10", "sign", 4, "en"), "stored leo text", "ai")
+    store.put("daily", ("2024-08-10", "thai_day", 7, "th"), "stored text", "ai")
+
+    body = app_client.get("/v1/horoscope/daily/leo", params={"date": "2024-08-10", "lang": "en"}).json()
+    assert (body["horoscope"], body["source"], body["sign"]["name_en"]) == ("stored leo text", "ai", "Leo")
+
+    body = app_client.get("/v1/thai/daily/wednesday-night", params={"date": "2024-08-10"}).json()
+    assert (body["horoscope"], body["source"]) == ("stored text", "ai")
+
+    # Not pre-generated: rule-based text, not stored
+    body = app_client.get("/v1/horoscope/daily/0", params={"date": "2024-08-11", "lang": "en"}).json()
+    assert body["source"] == "rules" and body["horoscope"].startswith("Aries, 2024-08-11:")
+    assert store.get("daily", ("2024-08-11", "sign", 0, "en")) is None
+
+
+@pytest.mark.parametrize("path,params", [
+    ("/v1/horoscope/daily/ophiuchus", {}),
+    ("/v1/horoscope/daily/leo", {"lang": "fr"}),
+    ("/v1/thai/daily/funday", {}),
+    ("/v1/thai/daily/3", {"date": "2024-02-30"}),
+])
+def test_daily_endpoints_reject_bad_input(app_client, path, params):
+    assert app_client.get(path, params=params).status_code == 400
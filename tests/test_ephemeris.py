@@ -0,0 +1,74 @@
+"""
+Memory-mapped ephemeris table: interpolation accuracy, coverage and rebuilds
+"""
+
+import pytest
+
+from app.engines import ephemeris
+from app.engines.astrology import (
+    EPHEMERIS_GENERATOR_ID,
+    body_longitudes,
+    ensure_ephemeris,
+    julian_day,
+    series_longitude,
+)
+from app.engines.ephemeris import EPHEMERIS_BODIES, EphemerisTable
+
+# float32 storage plus cubic interpolation at half-day steps
+TOLERANCE_DEGREES = 0.01
+
+
+def _diff(a, b):
+    return abs((a - b + 180.0) % 360.0 - 180.0)
+
+
+@pytest.mark.parametrize("year", [1900, 1950, 2024, 2049, 2075, 2100])
+def test_table_matches_series_over_the_whole_range(year):
+    table = ensure_ephemeris()
+    jd = julian_day(year, 6, 15, 7.3)
+    assert table.covers(jd)
+    for body, value in zip(EPHEMERIS_BODIES, table.longitudes(jd)):
+        assert _diff(value, series_longitude(body, jd)) < TOLERANCE_DEGREES, body
+
+
+def test_outside_the_table_falls_back_to_the_series():
+    jd = julian_day(2150, 1, 1, 0.0)
+    assert not ensure_ephemeris().covers(jd)
+    assert body_longitudes(jd) == {body: series_longitude(body, jd) for body in EPHEMERIS_BODIES}
+
+
+def test_table_records_the_generator():
+    table = ensure_ephemeris()
+    assert table.generator_id == EPHEMERIS_GENERATOR_ID
+    assert table.jd_start == ephemeris.JD_START
+    assert table.jd_end == ephemeris.JD_END
+
+
+def _linear(body, jd):
+    return (EPHEMERIS_BODIES.index(body) * 10.0 + jd * 0.25) % 360.0
+
+
+def test_open_table_rebuilds_stale_or_corrupt_files(monkeypatch, tmp_path):
+    build_table = ephemeris.build_table
+    # open_table builds the full 1900-2100 range; keep the test table small
+    monkeypatch.setattr(
+        ephemeris, "build_table",
+        lambda path, gen, gid: build_table(path, gen, gid, jd_start=2451545.0, jd_end=2451555.0),
+    )
+    path = str(tmp_path / "eph.bin")
+    ephemeris.build_table(path, _linear, "old")
+
+    table = ephemeris.open_table(path, _linear, "new")
+    assert table.generator_id == "new"
+    assert abs(table.longitude(1, 2451550.25) - _linear("Moon", 2451550.25)) < 1e-3
+    table.close()
+
+    with open(path, "wb") as f:
+        f.write(b"garbage")
+    table = ephemeris.open_table(path, _linear, "new")
+    assert table.generator_id == "new" and table.rows == 21
+    table.close()
+
+
+def test_interpolation_unwraps_across_360():
+    assert ephemeris._cubic(359.0, 359.5, 0.0, 0.5, 0.5) == pytest.approx(359.75)
@@ -0,0 +1,85 @@
+"""
+Compute pool recovery when a worker dies
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+from app.core.executor import ComputeExecutor
+
+
+def _die_once(marker: str) -> int:
+    """Kill the worker process the first time, answer the pid afterwards."""
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return os.getpid()
+
+
+def _slow_pid(delay: float) -> int:
+    time.sleep(delay)
+    return os.getpid()
+
+
+def test_broken_pool_is_replaced_once_and_tasks_retried(tmp_path):
+    marker = str(tmp_path / "died")
+
+    async def scenario():
+        executor = ComputeExecutor(mode="process", workers=2)
+        await executor.start()
+        parent = os.getpid()
+        try:
+            results = await asyncio.gather(
+                executor.run(_die_once, marker),
+                *(executor.run(_slow_pid, 0.2) for _ in range(4)),
+            )
+            return parent, results, executor.metrics()
+        finally:
+            executor.shutdown()
+
+    parent, results, stats = asyncio.run(scenario())
+
+    # Every task, the killer and its siblings, was answered by a worker of the new pool
+    assert all(pid != parent for pid in results)
+    assert stats["pool_replacements"] == 1
+    assert stats["completed"] == 5
+    assert stats["failed"] == 0
+
+
+def _thread_id() -> int:
+    return threading.get_ident()
+
+
+def _fail():
+    raise ValueError("bad input")
+
+
+def test_inline_mode_runs_off_the_event_loop_and_counts():
+    async def scenario():
+        executor = ComputeExecutor(mode="inline")
+        await executor.start()
+        ident = await executor.run(_thread_id)
+        try:
+            await executor.run(_fail)
+        except ValueError:
+            pass
+        return threading.get_ident(), ident, executor.metrics()
+
+    loop_thread, ident, stats = asyncio.run(scenario())
+    assert ident != loop_thread
+    assert stats["mode"] == "inline"
+    assert (stats["submitted"], stats["completed"], stats["failed"], stats["in_flight"]) == (2, 1, 1, 0)
+
+
+def test_workers_are_not_forked_from_the_app():
+    async def scenario():
+        executor = ComputeExecutor(mode="process", workers=1)
+        await executor.start()
+        try:
+            return executor._pool._mp_context.get_start_method()
+        finally:
+            executor.shutdown()
+
+    assert asyncio.run(scenario()) == "forkserver"
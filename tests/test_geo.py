@@ -0,0 +1,23 @@
+"""
+Timezone offsets at historical dates
+"""
+
+import pytest
+
+from app.engines.geo import resolve_timezone_offset
+
+
+@pytest.mark.parametrize("zone,birth_date,offset", [
+    ("Asia/Bangkok", "1800-01-01", "+06:42"),
+    ("Asia/Bangkok", "1990-06-15", "+07:00"),
+    ("Europe/London", "2024-07-01", "+01:00"),
+    ("Europe/London", "2200-12-31", "+00:00"),
+])
+def test_offsets(zone, birth_date, offset):
+    assert resolve_timezone_offset(zone, birth_date) == offset
+
+
+@pytest.mark.parametrize("birth_date", ["0001-01-01", "1799-12-31", "2201-01-01", "9999-12-31"])
+def test_out_of_range_years_are_value_errors(birth_date):
+    with pytest.raises(ValueError):
+        resolve_timezone_offset("Asia/Bangkok", birth_date)
@@ -0,0 +1,57 @@
+"""
+House cusps against reference values
+"""
+
+import math
+
+import pytest
+
+from app.engines.houses import SiderealFrame, koch_cusps, placidus_cusps
+
+OBLIQUITY = 23.4393
+TOLERANCE_DEGREES = 0.05
+
+
+def frame_at(ramc: float) -> SiderealFrame:
+    return SiderealFrame(2451545.0, 0.0, ramc, OBLIQUITY, math.radians(ramc), math.radians(OBLIQUITY))
+
+
+def arc(a: float, b: float) -> float:
+    return abs((a - b + 180) % 360 - 180)
+
+
+# Koch cusps 2 and 3 from the Swiss Ephemeris (house system 'K')
+KOCH_REFERENCE = [
+    # ramc, latitude, cusp 2, cusp 3
+    (30.0, 51.5, 162.58, 187.44),
+]
+
+
+@pytest.mark.parametrize("ramc,latitude,cusp2,cusp3", KOCH_REFERENCE)
+def test_koch_matches_reference(ramc, latitude, cusp2, cusp3):
+    cusps = koch_cusps(frame_at(ramc), latitude)
+    assert arc(cusps[1], cusp2) < TOLERANCE_DEGREES
+    assert arc(cusps[2], cusp3) < TOLERANCE_DEGREES
+    # Opposite cusps
+    assert arc(cusps[7], cusp2 + 180) < TOLERANCE_DEGREES
+    assert arc(cusps[8], cusp3 + 180) < TOLERANCE_DEGREES
+
+
+@pytest.mark.parametrize("ramc", [0.0, 30.0, 120.0, 250.0, 300.0])
+@pytest.mark.parametrize("latitude", [-33.9, 0.0, 13.75, 40.0, 51.5])
+@pytest.mark.parametrize("cusps_fn", [koch_cusps, placidus_cusps])
+def test_cusps_run_in_zodiac_order(cusps_fn, ramc, latitude):
+    """Houses 1-12 follow each other counter-clockwise, every house under 180 degrees."""
+    cusps = cusps_fn(frame_at(ramc), latitude)
+    spans = [(cusps[(i + 1) % 12] - cusps[i]) % 360 for i in range(12)]
+    assert all(0 < span < 180 for span in spans)
+    assert sum(spans) == pytest.approx(360)
+
+
+def test_koch_and_placidus_share_the_angles():
+    """Both systems share the Ascendant and MC."""
+    for ramc in (0.0, 100.0, 200.0):
+        koch = koch_cusps(frame_at(ramc), 13.75)
+        placidus = placidus_cusps(frame_at(ramc), 13.75)
+        assert arc(koch[0], placidus[0]) < 1e-9
+        assert arc(koch[9], placidus[9]) < 1e-9
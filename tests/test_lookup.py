@@ -0,0 +1,103 @@
+"""
+Bulk date lookups and the sunrise-based Thai day
+"""
+
+import json
+import math
+from datetime import date, timedelta
+
+import pytest
+
+from app.engines.dates import day_number, lookup_columns, lookup_date
+from app.engines.thai_astrology import ensure_lunar_table, thai_day_column, thai_day_number
+from app.routers import v1_lookup
+
+
+def test_lookup_columns_match_single_lookups():
+    start = date(1899, 12, 25)
+    values = [(start + timedelta(days=i)).isoformat() for i in range(0, 365 * 130, 7)]
+    columns = lookup_columns(values)
+    for i, value in enumerate(values):
+        info = lookup_date(value)
+        assert (columns["sun_sign"][i], columns["weekday"][i], columns["naksat"][i]) == (info.sun_sign, info.weekday, info.naksat)
+        # Thai day numbers start on Sunday; date.weekday() on Monday
+        assert info.weekday == (date.fromisoformat(value).weekday() + 1) % 7
+    assert columns["invalid"] == []
+
+
+def test_lookup_columns_invalid_dates():
+    values = ["2024-02-29", "2023-02-29", "2024-13-01", "2024-04-31", "24-01-01", "2024-1-01", "2024-01-1x", "", None, 20240101]
+    columns = lookup_columns(values)
+    assert columns["invalid"] == list(range(1, len(values)))
+    assert columns["sun_sign"][0] == 11 and columns["weekday"][0] == 4     # Pisces, Thursday
+    assert all(columns[name][i] == -1 for name in ("sun_sign", "weekday", "naksat") for i in columns["invalid"])
+
+
+def test_naksat_changes_at_the_lunar_new_year():
+    new_year_days = ensure_lunar_table().new_year_days()
+    assert new_year_days[2024] == day_number(2024, 4, 9)
+    values = ["2024-01-01", "2024-04-08", "2024-04-09", "2024-12-31"]
+    # Rabbit (3) until the day before ขึ้น 1 ค่ำ เดือน 5, then Dragon (4)
+    assert list(lookup_columns(values, new_year_days)["naksat"]) == [3, 3, 4, 4]
+    # Without the table the animal changes on Jan 1
+    assert list(lookup_columns(values)["naksat"]) == [4, 4, 4, 4]
+
+
+def test_bulk_lookup_json_and_text(app_client):
+    dates = ["1990-05-15", "2024-04-08", "not-a-date"]
+    by_json = app_client.post("/v1/lookup/bulk", json={"dates": dates})
+    by_text = app_client.post("/v1/lookup/bulk", content="\n".join(dates), headers={"Content-Type": "text/plain"})
+    assert by_json.status_code == by_text.status_code == 200
+    assert by_json.json() == by_text.json()
+    result = by_json.json()
+    assert result["count"] == 3
+    assert result["columns"] == {"sun_sign": [1, 0, -1], "weekday": [2, 1, -1], "naksat": [6, 3, -1]}
+    assert result["invalid"] == [2]
+    assert result["legend"]["naksat"][3]["en"] == "Rabbit"
+
+
+@pytest.mark.parametrize("body", [b"{", b'{"dates": "1990-05-15"}', b'{"days": []}', b'{"dates": ["1990-05-15"], "times": []}'])
+def test_bulk_lookup_rejects_invalid_bodies(app_client, body):
+    response = app_client.post("/v1/lookup/bulk", content=body, headers={"Content-Type": "application/json"})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid body")
+
+
+def test_lookup_body_limits_the_date_count(monkeypatch):
+    monkeypatch.setattr(v1_lookup, "MAX_BULK_DATES", 2)
+    with pytest.raises(ValueError, match="Too many dates"):
+        v1_lookup.lookup_body(b"1990-01-01 1990-01-02 1990-01-03", "text/plain", {})
+    assert json.loads(v1_lookup.lookup_body(b"1990-01-01 1990-01-02", "text/plain", {}))["count"] == 2
+
+
+def test_thai_day_starts_at_sunrise():
+    # Tuesday 1990-05-15, 05:00 in Bangkok is before sunrise: still Monday
+    assert thai_day_number("1990-05-15", "05:00") == 1
+    assert thai_day_number("1990-05-15", "07:00") == 2
+    assert list(thai_day_column(["1990-05-15", "1990-05-15", "bad"], ["05:00", None, "07:00"])) == [1, 2, -1]
+
+
+@pytest.mark.parametrize("latitude,longitude", [(1000, 100.5), (-91, 100.5), (math.nan, 100.5), (13.75, 181), (13.75, math.inf)])
+def test_thai_day_rejects_invalid_places(latitude, longitude):
+    with pytest.raises(ValueError):
+        thai_day_number("1990-05-15", "05:00", latitude, longitude)
+    with pytest.raises(ValueError):
+        thai_day_column(["1990-05-15"], ["05:00"], latitude, longitude)
+
+
+@pytest.mark.parametrize("place,message", [
+    ({"latitude": 1000}, "latitude"),
+    ({"latitude": -91}, "latitude"),
+    ({"longitude": 200}, "longitude"),
+    ({"timezone_offset": "Asia/Bangkok"}, "timezone_offset"),
+])
+def test_bulk_lookup_rejects_invalid_places(app_client, place, message):
+    body = {"dates": ["1990-05-15"], "times": ["05:00"], **place}
+    response = app_client.post("/v1/lookup/bulk", json=body)
+    assert response.status_code == 400
+    assert message in response.json()["detail"]
+
+
+def test_bulk_lookup_thai_day_column(app_client):
+    body = {"dates": ["1990-05-15", "1990-05-15"], "times": ["05:00", "07:00"]}
+    assert app_client.post("/v1/lookup/bulk", json=body).json()["columns"]["thai_day"] == [1, 2]
@@ -0,0 +1,105 @@
+"""
+Thai lunar calendar against published Buddhist holy days
+"""
+
+import pytest
+
+from app.engines.thai_astrology import get_lunar_date, gregorian_from_lunar
+
+# Gregorian date, lunar month, second 8th month; all ขึ้น 15 ค่ำ
+# In an adhikamas year Visakha Bucha moves to month 7, Asalha Bucha to
+# month 8-8 and Makha Bucha (earlier, at the end of the lunar year) to month 4
+VISAKHA_BUCHA = [
+    ("2010-05-28", 7, False),
+    ("2011-05-17", 6, False),
+    ("2012-06-04", 7, False),
+    ("2013-05-24", 6, False),
+    ("2014-05-13", 6, False),
+    ("2015-06-01", 7, False),
+    ("2016-05-20", 6, False),
+    ("2017-05-10", 6, False),
+    ("2018-05-29", 7, False),
+    ("2019-05-18", 6, False),
+    ("2020-05-06", 6, False),
+    ("2021-05-26", 7, False),
+    ("2022-05-15", 6, False),
+    ("2023-06-03", 7, False),
+    ("2024-05-22", 6, False),
+    ("2025-05-11", 6, False),
+    ("2026-05-31", 7, False),
+]
+
+ASALHA_BUCHA = [
+    ("2014-07-11", 8, False),
+    ("2015-07-30", 8, True),
+    ("2016-07-19", 8, False),
+    ("2017-07-08", 8, False),
+    ("2018-07-27", 8, True),
+    ("2019-07-16", 8, False),
+    ("2020-07-05", 8, False),
+    ("2021-07-24", 8, True),
+    ("2022-07-13", 8, False),
+    ("2023-08-01", 8, True),
+    ("2024-07-20", 8, False),
+    ("2025-07-10", 8, False),
+    ("2026-07-29", 8, True),
+]
+
+MAKHA_BUCHA = [
+    ("2015-03-04", 4, False),
+    ("2016-02-22", 3, False),
+    ("2017-02-11", 3, False),
+    ("2018-03-01", 4, False),
+    ("2019-02-19", 3, False),
+    ("2020-02-08", 3, False),
+    ("2021-02-26", 4, False),
+    ("2022-02-16", 3, False),
+    ("2023-03-06", 4, False),
+    ("2024-02-24", 3, False),
+    ("2025-02-12", 3, False),
+    ("2026-03-03", 4, False),
+]
+
+LOI_KRATHONG = [
+    ("2014-11-06", 12, False),
+    ("2015-11-25", 12, False),
+    ("2016-11-14", 12, False),
+    ("2019-11-11", 12, False),
+    ("2020-10-31", 12, False),
+    ("2021-11-19", 12, False),
+    ("2022-11-08", 12, False),
+    ("2023-11-27", 12, False),
+    ("2024-11-15", 12, False),
+    ("2025-11-05", 12, False),
+]
+
+HOLY_DAYS = VISAKHA_BUCHA + ASALHA_BUCHA + MAKHA_BUCHA + LOI_KRATHONG
+
+
+@pytest.mark.parametrize("gregorian,month,second_eighth", HOLY_DAYS)
+def test_holy_days_are_the_15th_waxing_day(gregorian, month, second_eighth):
+    lunar_date = get_lunar_date(gregorian)
+    assert (lunar_date["month"], lunar_date["second_eighth"]) == (month, second_eighth)
+    assert (lunar_date["day"], lunar_date["waning"]) == (15, False)
+
+
+@pytest.mark.parametrize("gregorian,month,second_eighth", HOLY_DAYS)
+def test_holy_days_round_trip(gregorian, month, second_eighth):
+    lunar_year = get_lunar_date(gregorian)["lunar_year"]
+    assert gregorian_from_lunar(lunar_year, month, 15, second_eighth=second_eighth) == gregorian
+
+
+def test_visakha_bucha_2025_text():
+    assert get_lunar_date("2025-05-11")["text_th"].startswith("ขึ้น 15 ค่ำ เดือนหก")
+    assert get_lunar_date("2025-07-10")["text_th"].startswith("ขึ้น 15 ค่ำ เดือนแปด")
+
+
+@pytest.mark.parametrize("gregorian,month_days", [
+    ("2016-06-25", 30),     # adhikawan year: month 7 has 30 days
+    ("2014-06-25", 29),
+    ("2023-07-10", 30),     # month 8 of an adhikamas year
+])
+def test_month_lengths(gregorian, month_days):
+    lunar_date = get_lunar_date(gregorian)
+    assert lunar_date["month"] in (7, 8)
+    assert lunar_date["month_days"] == month_days
@@ -0,0 +1,88 @@
+"""
+Multiprocess metric files and their aggregation
+"""
+
+import multiprocessing
+import os
+import shutil
+
+import pytest
+
+from app.core import metrics
+from app.core.metrics import MmapValues
+
+
+def _write_and_exit(directory: str):
+    store = MmapValues(directory)
+    store.inc(("oracle_http_requests_total", ("GET", "/", "200")), 3.0)
+    store.set(("oracle_http_requests_in_progress", ()), 5.0)
+    store.set(("oracle_ai_circuit_open", ()), 1.0)
+
+
+def exited_worker(directory: str) -> int:
+    """Run a worker that writes its values file and exits; returns its pid."""
+    process = multiprocessing.get_context("fork").Process(target=_write_and_exit, args=(directory,))
+    process.start()
+    process.join()
+    return process.pid
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = MmapValues(str(tmp_path))
+    monkeypatch.setattr(metrics, "values", store)
+    return store
+
+
+def test_values_round_trip_and_grow(store, monkeypatch):
+    monkeypatch.setattr(MmapValues, "INITIAL_SIZE", 256)
+    for i in range(100):
+        store.inc(("oracle_cache_lookups_total", ("l1", str(i))), i)
+    store.inc(("oracle_cache_lookups_total", ("l1", "7")), 0.5)
+
+    [(owner, values)] = store.snapshot()
+    assert owner == store.owner and owner[0] == os.getpid()
+    assert len(values) == 100
+    assert values[("oracle_cache_lookups_total", ("l1", "7"))] == 7.5
+    assert store.get(("oracle_cache_lookups_total", ("l1", "99"))) == 99.0
+    assert os.path.getsize(store._file.name) > 256
+
+
+def test_aggregate_modes_and_exited_workers(store):
+    exited_worker(store.directory)
+    exited_worker(store.directory)
+    store.inc(("oracle_http_requests_total", ("GET", "/", "200")), 1.0)
+    store.set(("oracle_http_requests_in_progress", ()), 2.0)
+    store.set(("oracle_ai_circuit_open", ()), 0.0)
+
+    combined = metrics._aggregate()
+    # Counters keep the totals of exited workers; gauges only count running ones
+    assert combined[("oracle_http_requests_total", ("GET", "/", "200"))] == 7.0
+    assert combined[("oracle_http_requests_in_progress", ())] == 2.0
+    assert combined[("oracle_ai_circuit_open", ())] == 0.0
+
+
+def test_max_mode_takes_the_largest_live_value(store, monkeypatch):
+    store.set(("oracle_ai_circuit_open", ()), 0.0)
+    other = (os.getppid(), metrics.process_start(os.getppid()) or -1)
+    monkeypatch.setattr(store, "snapshot", lambda: [
+        (store.owner, {("oracle_ai_circuit_open", ()): 0.0}),
+        (other, {("oracle_ai_circuit_open", ()): 1.0}),
+    ])
+    assert metrics._aggregate()[("oracle_ai_circuit_open", ())] == 1.0
+
+
+def test_reused_pid_neither_truncates_nor_counts_as_alive(store):
+    pid = exited_worker(store.directory)
+    [old] = [name for name in os.listdir(store.directory) if name.startswith(f"metrics_{pid}_")]
+    store.set(("oracle_http_requests_in_progress", ()), 2.0)
+
+    # The old file as if this process had reused the exited worker's pid
+    start = int(old[:-len(".db")].split("_")[2])
+    reused = os.path.join(store.directory, f"metrics_{os.getpid()}_{start}.db")
+    shutil.move(os.path.join(store.directory, old), reused)
+    assert reused != store._file.name
+
+    combined = metrics._aggregate()
+    assert combined[("oracle_http_requests_total", ("GET", "/", "200"))] == 3.0
+    assert combined[("oracle_http_requests_in_progress", ())] == 2.0
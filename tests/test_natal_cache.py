@@ -0,0 +1,72 @@
+"""
+Natal chart cache: key normalization, LRU bounds and cache-independent results
+"""
+
+import pytest
+
+from app.engines import astrology
+from app.engines.astrology import (
+    NatalChartCache,
+    birth_julian_day,
+    calculate_natal_chart,
+    compact_chart_for_key,
+    expand_chart,
+    natal_cache_key,
+)
+
+BANGKOK = (13.7563, 100.5018)
+
+
+@pytest.fixture
+def chart_cache(monkeypatch):
+    cache = NatalChartCache(maxsize=8)
+    monkeypatch.setattr(astrology, "natal_chart_cache", cache)
+    return cache
+
+
+def test_same_utc_minute_in_different_timezones_shares_a_key():
+    bangkok = birth_julian_day("1990-05-15", "14:30", "+07:00")
+    london = birth_julian_day("1990-05-15", "08:30", "+01:00")
+    assert natal_cache_key(bangkok, *BANGKOK, "equal") == natal_cache_key(london, *BANGKOK, "equal")
+
+
+def test_keys_quantize_coordinates_and_ignore_house_system_case():
+    jd = birth_julian_day("1990-05-15", "14:30", "+07:00")
+    key = natal_cache_key(jd, 13.7563, 100.5018, "Placidus")
+    assert key == natal_cache_key(jd + 10 / 86400, 13.7551, 100.5049, "placidus")
+    assert key[1:] == (13.76, 100.5, "placidus")
+
+    assert key != natal_cache_key(jd, 13.7563, 100.5018, "koch")
+    assert key != natal_cache_key(jd + 1 / 1440, 13.7563, 100.5018, "placidus")
+    assert key != natal_cache_key(jd, 13.7663, 100.5018, "placidus")
+
+
+def test_repeated_charts_are_served_from_the_cache(chart_cache):
+    first = calculate_natal_chart("1990-05-15", "14:30", *BANGKOK, "+07:00", "placidus")
+    same_moment = calculate_natal_chart("1990-05-15", "08:30", *BANGKOK, "+01:00", "PLACIDUS")
+    assert same_moment == first
+    assert chart_cache.stats()["hits"] == 1 and chart_cache.stats()["misses"] == 1
+
+
+def test_cached_chart_equals_a_fresh_calculation(chart_cache):
+    # Inputs are quantized before computing, so a cold and a warm cache agree
+    calculate_natal_chart("1990-05-15", "14:30", 13.7563, 100.5018, "+07:00")
+    warm = calculate_natal_chart("1990-05-15", "14:30", 13.7551, 100.5049, "+07:00")
+
+    key = natal_cache_key(birth_julian_day("1990-05-15", "14:30", "+07:00"), 13.7551, 100.5049, "equal")
+    assert warm == expand_chart(compact_chart_for_key(key))
+
+
+def test_lru_evicts_the_least_recently_used_chart():
+    cache = NatalChartCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 3, "misses": 1, "hit_ratio": 0.75}
+
+    cache.clear()
+    assert len(cache) == 0 and cache.stats()["hit_ratio"] == 0.0
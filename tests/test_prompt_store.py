@@ -0,0 +1,166 @@
+"""
+Persistent prompt store: buffered writes, row count, eviction and the interpret() lookup order
+"""
+
+import asyncio
+
+import pytest
+
+from app.core import prompt_store as prompt_store_module
+from app.core.ai_client import AI_ERROR_PREFIX
+from app.core.cache import MemoryBackend, Namespace, TwoTierCache
+from app.core.prompt_store import PromptStore, interpret, prompt_key
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Fresh store and cache behind interpret(), and a model that counts its calls."""
+    store = PromptStore(str(tmp_path / "prompts.sqlite"))
+    cache = TwoTierCache(MemoryBackend(), version="test")
+    cache.register("ai", Namespace(ttl=None, cacheable=lambda text: not text.startswith(AI_ERROR_PREFIX)))
+    monkeypatch.setattr(prompt_store_module, "prompt_store", store)
+    monkeypatch.setattr(prompt_store_module, "cache", cache)
+
+    store.model_calls = []
+    store.model_reply = "model text"
+
+    async def generate(prompt, system_instruction=None):
+        store.model_calls.append(prompt)
+        return store.model_reply
+    monkeypatch.setattr(prompt_store_module, "generate_interpretation", generate)
+    return store
+
+
+def stored_rows(store):
+    with store._lock:
+        return dict(store._connection().execute("SELECT key, text FROM prompts").fetchall())
+
+
+def test_failed_flush_requeues_pending_texts(store, monkeypatch):
+    async def scenario():
+        store.put("a", "first")
+        store.put("b", "second")
+        store.touch("a")
+        real_write = store._write
+
+        def failing_write(pending, uses):
+            raise OSError("disk full")
+        monkeypatch.setattr(store, "_write", failing_write)
+        await store.flush()
+        requeued = (store.flush_errors, store.pending_writes, dict(store._uses), await store.get("a"))
+
+        # A newer text for the same key wins over the requeued one
+        store.put("a", "newer")
+        monkeypatch.setattr(store, "_write", real_write)
+        await store.flush()
+        rows = stored_rows(store)
+        await store.stop()
+        return requeued, rows
+
+    requeued, rows = asyncio.run(scenario())
+    assert requeued == (1, 2, {"a": 1}, "first")
+    assert rows == {"a": "newer", "b": "second"}
+
+
+def test_interpret_goes_cache_then_store_then_model(store):
+    async def scenario():
+        # Only on disk: answered by the store, model untouched
+        store.put(prompt_key("stored prompt"), "stored text")
+        await store.flush()
+        from_store = await interpret("stored prompt")
+
+        # Nowhere yet: the model answers and the text is queued for disk
+        from_model = await interpret("new prompt")
+        queued = store.pending_writes
+
+        # Both are cached now: neither the store nor the model is asked again
+        hits_before = store.disk_hits
+        again = (await interpret("stored prompt"), await interpret("new prompt"))
+        await store.flush()
+        rows = stored_rows(store)
+        await store.stop()
+        return from_store, from_model, queued, hits_before, again, rows
+
+    from_store, from_model, queued, hits_before, again, rows = asyncio.run(scenario())
+    assert from_store == "stored text"
+    assert from_model == "model text"
+    assert store.model_calls == ["new prompt"]
+    assert queued == 1
+    assert store.disk_hits == hits_before == 1
+    assert again == ("stored text", "model text")
+    assert rows[prompt_key("new prompt")] == "model text"
+
+
+def test_error_texts_are_never_stored(store):
+    store.model_reply = f"{AI_ERROR_PREFIX}: quota exceeded"
+
+    async def scenario():
+        first = await interpret("prompt")
+        second = await interpret("prompt")
+        await store.flush()
+        rows = stored_rows(store)
+        await store.stop()
+        return first, second, rows
+
+    first, second, rows = asyncio.run(scenario())
+    assert first == second == f"{AI_ERROR_PREFIX}: quota exceeded"
+    # Not cached either: every call asks the model again
+    assert store.model_calls == ["prompt", "prompt"]
+    assert rows == {}
+
+
+def test_warm_fills_the_cache_with_the_most_used_texts(store):
+    async def scenario():
+        for name, uses in (("rare", 1), ("common", 5)):
+            store.put(prompt_key(name), f"{name} text")
+            for _ in range(uses):
+                store.touch(prompt_key(name))
+        await store.flush()
+        warmed = store.warm(1)
+        # "common" is served from the warmed L1; "rare" still needs the store
+        texts = (await interpret("common"), await interpret("rare"))
+        await store.stop()
+        return warmed, texts
+
+    warmed, texts = asyncio.run(scenario())
+    assert warmed == 1
+    assert texts == ("common text", "rare text")
+    assert store.disk_hits == 1 and store.model_calls == []
+
+
+def test_size_is_kept_by_the_writer(tmp_path):
+    async def scenario():
+        store = PromptStore(str(tmp_path / "prompts.sqlite"), max_entries=3)
+        before = store.stats()["size"]
+        for i in range(5):
+            store.put(f"key-{i}", f"text {i}")
+        await store.flush()
+        flushed = store.stats()
+        await store.stop()
+        return before, flushed
+
+    before, flushed = asyncio.run(scenario())
+    assert before is None
+    assert flushed["size"] == 3
+    assert flushed["evicted"] == 2
+
+
+def test_size_is_read_when_the_store_opens(tmp_path):
+    async def scenario():
+        path = str(tmp_path / "prompts.sqlite")
+        store = PromptStore(path)
+        store.put("a", "text")
+        store.put("b", "text")
+        await store.stop()
+
+        reopened = PromptStore(path)
+        reopened.most_used(10)
+        await reopened.stop()
+
+        # stats() runs on the event loop: it must not touch the database
+        def no_database():
+            raise AssertionError("stats() opened the database")
+        reopened._connection = no_database
+        return reopened.stats()["size"]
+
+    assert asyncio.run(scenario()) == 2
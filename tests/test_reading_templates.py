@@ -0,0 +1,56 @@
+"""
+Pre-encoded Thai readings are byte-identical to the response model
+"""
+
+import random
+from datetime import date, timedelta
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+from app.core.reading_templates import get_reading_templates
+from app.engines.thai_astrology import get_thai_reading, thai_reading_core
+from app.models.thai_astrology_models import ThaiReadingResponse
+
+
+def model_bytes(*args) -> bytes:
+    """What FastAPI sends for a ThaiReadingResponse."""
+    return JSONResponse(jsonable_encoder(ThaiReadingResponse(**get_thai_reading(*args)))).body
+
+
+def rendered(birth_date, birth_time=None, latitude=None, longitude=None, timezone_offset="+07:00") -> bytes:
+    core = thai_reading_core(birth_date, birth_time, latitude, longitude, timezone_offset)
+    return get_reading_templates().render(birth_date, birth_time, core)
+
+
+def random_inputs(count: int, seed: int):
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(count):
+        birth_date = (date(1901, 1, 1) + timedelta(days=rng.randrange(200 * 365))).isoformat()
+        birth_time = rng.choice([None, f"{rng.randrange(24):02d}:{rng.randrange(60):02d}"])
+        if birth_time and rng.random() < 0.5:
+            place = (round(rng.uniform(-60, 60), 4), round(rng.uniform(-180, 180), 4), rng.choice(["+07:00", "-05:00", "+00:00"]))
+        else:
+            place = (None, None, "+07:00")
+        cases.append((birth_date, birth_time, *place))
+    return cases
+
+
+@pytest.mark.parametrize("args", [
+    ("1990-05-15", None, None, None, "+07:00"),
+    ("1990-05-15", "14:30", None, None, "+07:00"),
+    ("1990-05-15", "05:00", 13.7563, 100.5018, "+07:00"),       # before sunrise, sidereal lagna
+    ("2000-02-29", "23:59", 18.79, 98.98, "+07:00"),
+    ("1985-11-20", "00:00", -33.87, 151.21, "+10:00"),
+    ("2024-04-09", "12:00", None, None, "+07:00"),               # lunar new year
+])
+def test_known_readings(args):
+    assert rendered(*args) == model_bytes(*args)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_random_readings(seed):
+    for args in random_inputs(250, seed):
+        assert rendered(*args) == model_bytes(*args), args
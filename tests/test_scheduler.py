@@ -0,0 +1,76 @@
+"""
+Scheduler leader election through the prompt store lease
+"""
+
+import asyncio
+
+from app.core.prompt_store import PromptStore
+from app.core.scheduler import Scheduler
+
+
+def workers(path, count=3, lease_seconds=60.0):
+    pairs = []
+    for i in range(count):
+        scheduler = Scheduler(lease_seconds)
+        scheduler.holder = f"worker-{i}"
+        pairs.append((scheduler, PromptStore(str(path))))
+    return pairs
+
+
+def test_one_worker_leads_and_hands_over(tmp_path):
+    async def scenario():
+        pairs = workers(tmp_path / "prompts.sqlite")
+        for scheduler, store in pairs:
+            await scheduler.start(store.acquire_lease, store.release_lease)
+        first = [scheduler.leading for scheduler, _ in pairs]
+
+        # Renewals keep the same leader
+        for scheduler, _ in pairs:
+            await scheduler.elect()
+        renewed = [scheduler.leading for scheduler, _ in pairs]
+
+        # The leader shuts down and releases; the next election picks another worker
+        await pairs[0][0].stop()
+        for scheduler, _ in pairs[1:]:
+            await scheduler.elect()
+        after = [scheduler.leading for scheduler, _ in pairs[1:]]
+
+        for scheduler, store in pairs:
+            await scheduler.stop()
+            await store.stop()
+        return first, renewed, after
+
+    first, renewed, after = asyncio.run(scenario())
+    assert first == [True, False, False]
+    assert renewed == first
+    assert after == [True, False]
+
+
+def test_expired_lease_is_taken_over(tmp_path):
+    async def scenario():
+        (leader, leader_store), (follower, follower_store) = workers(tmp_path / "prompts.sqlite", 2, lease_seconds=0.05)
+        await leader.start(leader_store.acquire_lease, leader_store.release_lease)
+        leader._tasks.pop(0).cancel()           # the leader stops renewing (e.g. its process hangs)
+        await follower.start(follower_store.acquire_lease)
+        taken_early = follower.leading
+        await asyncio.sleep(0.1)
+        await follower.elect()
+        await leader.elect()
+        result = taken_early, follower.leading, leader.leading
+        for scheduler, store in ((leader, leader_store), (follower, follower_store)):
+            await scheduler.stop()
+            await store.stop()
+        return result
+
+    assert asyncio.run(scenario()) == (False, True, False)
+
+
+def test_without_a_lease_the_worker_leads():
+    async def scenario():
+        scheduler = Scheduler()
+        await scheduler.start()
+        leading = scheduler.leading
+        await scheduler.stop()
+        return leading
+
+    assert asyncio.run(scenario())
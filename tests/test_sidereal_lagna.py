@@ -0,0 +1,73 @@
+"""
+Sidereal Thai lagna: rising tables against the exact Ascendant, ayanamsa and the reading endpoint
+"""
+
+import math
+
+import pytest
+
+from app.engines.astrology import birth_julian_day
+from app.engines.houses import ascendant, ascendant_at, sidereal_frame
+from app.engines.thai_astrology import (
+    RISING_OBLIQUITY,
+    ayanamsa,
+    calculate_sidereal_lagna,
+    sidereal_ascendant,
+    tabulated_ascendant,
+)
+
+TABLE_TOLERANCE_DEGREES = 0.1
+
+
+def _diff(a, b):
+    return abs((a - b + 180.0) % 360.0 - 180.0)
+
+
+@pytest.mark.parametrize("latitude", [-55.3, -33.87, 0.0, 7.88, 13.75, 18.79, 40.5, 59.9])
+def test_rising_tables_match_the_exact_ascendant(latitude):
+    eps_rad = math.radians(RISING_OBLIQUITY)
+    for i in range(0, 720):
+        ramc = i * 0.5 + 0.17
+        exact = ascendant_at(ramc, eps_rad, math.radians(latitude))
+        assert _diff(tabulated_ascendant(ramc, latitude), exact) < TABLE_TOLERANCE_DEGREES, ramc
+
+
+def test_high_latitudes_use_the_exact_formula():
+    ramc = 123.4
+    exact = ascendant_at(ramc, math.radians(RISING_OBLIQUITY), math.radians(65.0))
+    assert tabulated_ascendant(ramc, 65.0) == exact
+
+
+def test_lahiri_ayanamsa():
+    assert ayanamsa(2451545.0) == pytest.approx(23.853, abs=1e-3)
+    assert ayanamsa(birth_julian_day("2024-01-01", "00:00")) == pytest.approx(24.19, abs=0.01)
+    with pytest.raises(ValueError, match="Unknown ayanamsa"):
+        ayanamsa(2451545.0, "fagan")
+
+
+def test_sidereal_lagna_is_the_tropical_ascendant_minus_ayanamsa():
+    jd = birth_julian_day("1990-05-15", "14:30", "+07:00")
+    tropical = ascendant(sidereal_frame(jd, 100.5018), 13.7563)
+    expected = (tropical - ayanamsa(jd)) % 360
+
+    value = sidereal_ascendant("1990-05-15", "14:30", 13.7563, 100.5018, "+07:00")
+    assert _diff(value, expected) < TABLE_TOLERANCE_DEGREES
+
+    lagna = calculate_sidereal_lagna("1990-05-15", "14:30", 13.7563, 100.5018, "+07:00")
+    assert lagna["lagna_id"] == int(value // 30)
+    assert lagna["degree"] == round(value % 30, 2)
+
+
+def test_reading_uses_the_birth_place_when_given(app_client):
+    base = {"birth_date": "1990-05-15", "birth_time": "14:30"}
+
+    simplified = app_client.post("/v1/thai/reading", json=base).json()
+    assert simplified["lagna_method"] == "simplified" and simplified["lagna"]["degree"] is None
+
+    sidereal = app_client.post("/v1/thai/reading", json={**base, "latitude": 13.7563, "longitude": 100.5018}).json()
+    expected = calculate_sidereal_lagna("1990-05-15", "14:30", 13.7563, 100.5018, "+07:00")
+    assert sidereal["lagna_method"] == "sidereal"
+    assert (sidereal["lagna"]["lagna_id"], sidereal["lagna"]["degree"]) == (expected["lagna_id"], expected["degree"])
+
+    no_time = app_client.post("/v1/thai/reading", json={"birth_date": "1990-05-15", "latitude": 13.75, "longitude": 100.5}).json()
+    assert no_time["lagna"] is None and no_time["lagna_method"] is None
@@ -0,0 +1,68 @@
+"""
+Shared current-sky snapshot: immutability, publishing and staleness
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core import sky
+from app.engines.astrology import calculate_planet_positions, datetime_to_jd
+
+
+@pytest.fixture
+def no_snapshot(monkeypatch):
+    monkeypatch.setattr(sky, "_snapshot", None)
+
+
+def test_compute_sky_matches_the_chart_positions():
+    now = datetime(2024, 3, 20, 3, 6, tzinfo=timezone.utc)
+    snapshot = sky.compute_sky(now)
+    assert snapshot.computed_at == now
+    assert snapshot.jd == datetime_to_jd(datetime(2024, 3, 20, 3, 6))
+    assert [dict(p) for p in snapshot.planets] == calculate_planet_positions(snapshot.jd)
+
+
+def test_snapshot_planets_are_read_only():
+    snapshot = sky.compute_sky()
+    with pytest.raises(TypeError):
+        snapshot.planets[0]["sign_en"] = "Aries"
+    with pytest.raises(AttributeError):
+        snapshot.jd = 0.0
+
+
+def test_get_sky_computes_once_then_reuses_the_snapshot(no_snapshot):
+    first = sky.get_sky()
+    assert sky.get_sky() is first
+    refreshed = sky.refresh_sky()
+    assert refreshed is not first and sky.get_sky() is refreshed
+
+
+def test_refresher_keeps_the_last_snapshot_when_a_refresh_fails(no_snapshot, monkeypatch):
+    previous = sky.refresh_sky()
+    calls = []
+
+    def failing():
+        calls.append(1)
+        if len(calls) == 2:
+            raise asyncio.CancelledError
+        raise RuntimeError("ephemeris unavailable")
+
+    monkeypatch.setattr(sky, "SKY_REFRESH_SECONDS", 0)
+    monkeypatch.setattr(sky, "refresh_sky", failing)
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(sky.run_sky_refresher())
+    assert len(calls) == 2 and sky.get_sky() is previous
+
+
+def test_now_endpoint_reports_age_and_staleness(app_client, monkeypatch):
+    response = app_client.get("/v1/horoscope/now")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["stale"] is False and len(body["planets"]) == len(sky.get_sky().planets)
+
+    old = sky.compute_sky(datetime.now(timezone.utc) - timedelta(seconds=sky.SKY_STALE_SECONDS + 5))
+    monkeypatch.setattr(sky, "_snapshot", old)
+    body = app_client.get("/v1/horoscope/now").json()
+    assert body["stale"] is True and body["age_seconds"] > sky.SKY_STALE_SECONDS
@@ -0,0 +1,103 @@
+"""
+Retrograde stations against a reference list (published ephemeris station times, UTC)
+"""
+
+import pytest
+
+from app.engines import ephemeris
+from app.engines.astrology import (
+    calculate_natal_chart,
+    ensure_ephemeris,
+    ensure_stations,
+    julian_day,
+    series_longitude,
+)
+from app.engines.ephemeris import STATION_DIRECT, STATION_RETROGRADE
+
+TOLERANCE_DAYS = 1.0
+
+# (body, kind, year, month, day, hour UTC)
+REFERENCE_STATIONS = [
+    ("Mercury", STATION_RETROGRADE, 2024, 4, 1, 22.2),
+    ("Mercury", STATION_DIRECT, 2024, 4, 25, 12.9),
+    ("Mercury", STATION_RETROGRADE, 2024, 8, 5, 4.9),
+    ("Mercury", STATION_DIRECT, 2024, 8, 28, 21.2),
+    ("Mercury", STATION_RETROGRADE, 2024, 11, 26, 2.7),
+    ("Mercury", STATION_DIRECT, 2024, 12, 15, 20.9),
+    ("Venus", STATION_RETROGRADE, 2025, 3, 2, 0.6),
+    ("Venus", STATION_DIRECT, 2025, 4, 12, 21.0),
+    ("Mars", STATION_RETROGRADE, 2024, 12, 6, 23.6),
+    ("Mars", STATION_DIRECT, 2025, 2, 24, 2.0),
+    ("Jupiter", STATION_RETROGRADE, 2024, 10, 9, 7.1),
+    ("Jupiter", STATION_DIRECT, 2025, 2, 4, 9.7),
+    ("Saturn", STATION_RETROGRADE, 2024, 6, 29, 19.1),
+    ("Saturn", STATION_DIRECT, 2024, 11, 15, 2.3),
+]
+
+
+def _nearest(stations, jd, kind):
+    candidates = [s for s, k in stations if k == kind]
+    return min(candidates, key=lambda s: abs(s - jd))
+
+
+@pytest.mark.parametrize("body,kind,year,month,day,hour", REFERENCE_STATIONS)
+def test_find_stations_matches_reference(body, kind, year, month, day, hour):
+    expected = julian_day(year, month, day, hour)
+    stations = ephemeris.find_stations(ensure_ephemeris(), series_longitude, body)
+    assert abs(_nearest(stations, expected, kind) - expected) <= TOLERANCE_DAYS
+
+
+@pytest.mark.parametrize("body,kind,year,month,day,hour", REFERENCE_STATIONS)
+def test_station_table_matches_reference(body, kind, year, month, day, hour):
+    expected = julian_day(year, month, day, hour)
+    stations = ensure_stations().stations(body, expected - 10, expected + 10)
+    assert abs(_nearest(stations, expected, kind) - expected) <= TOLERANCE_DAYS
+
+
+@pytest.mark.parametrize("body,date,retrograde", [
+    ("Mercury", "2024-04-10", True),
+    ("Mercury", "2024-05-10", False),
+    ("Jupiter", "2024-11-15", True),
+    ("Jupiter", "2024-09-15", False),
+    ("Mars", "2025-01-15", True),
+    ("Mars", "2024-11-15", False),
+])
+def test_natal_chart_reports_retrograde(body, date, retrograde):
+    chart = calculate_natal_chart(date, "12:00", 13.75, 100.5)
+    planet = next(p for p in chart["planets"] if p["planet_en"] == body)
+    assert planet["retrograde"] is retrograde
+
+
+def test_periods_include_one_already_under_way():
+    stations = ensure_stations()
+    # Mercury turned retrograde on 2024-04-01 and direct on 2024-04-25
+    periods = stations.periods("Mercury", julian_day(2024, 4, 10), julian_day(2024, 4, 12))
+    assert len(periods) == 1
+    start, end = periods[0]
+    assert start < julian_day(2024, 4, 10) < end
+    assert stations.is_retrograde("Mercury", julian_day(2024, 4, 10))
+    assert not stations.is_retrograde("Mercury", julian_day(2024, 5, 10))
+
+
+def test_station_file_round_trips(tmp_path):
+    path = str(tmp_path / "stations.bin")
+    ephemeris.build_station_table(path, ensure_ephemeris(), series_longitude, "test", ["Mars"])
+    stations = ephemeris.read_station_table(path)
+    assert stations.generator_id == "test"
+    assert stations.stations("Mars", julian_day(2024, 1, 1), julian_day(2025, 12, 31)) == ensure_stations().stations(
+        "Mars", julian_day(2024, 1, 1), julian_day(2025, 12, 31)
+    )
+    assert stations.stations("Mercury", julian_day(2024, 1, 1), julian_day(2025, 12, 31)) == []
+
+
+def test_retrogrades_endpoint(app_client):
+    response = app_client.get("/v1/horoscope/retrogrades", params={"from": "2024-04-10", "to": "2024-04-12"})
+    assert response.status_code == 200
+    periods = response.json()["periods"]
+    assert [p["planet_en"] for p in periods] == ["Mercury"]
+    assert periods[0]["station_retrograde"].startswith("2024-04-01")
+    assert periods[0]["station_direct"].startswith("2024-04-25")
+    assert periods[0]["sign_en"] == "Aries"
+
+    assert app_client.get("/v1/horoscope/retrogrades", params={"from": "2024-04-10", "to": "2024-04-12", "planet": "Sun"}).status_code == 400
+    assert app_client.get("/v1/horoscope/retrogrades", params={"from": "2024-04-12", "to": "2024-04-10"}).status_code == 400
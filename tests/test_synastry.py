@@ -0,0 +1,126 @@
+"""
+Synastry pools and one-to-many ranking
+"""
+
+from array import array
+
+import pytest
+
+from app.core.synastry_pool import CandidateExistsError, PoolFullError, SynastryPool
+from app.engines.aspects import (
+    aspect_score, longitude_bin, pack_longitudes, rank_packed, resolve_orbs, PROFILE_BINS_PER_DEGREE
+)
+
+REFERENCE = [10.0, 100.0, 200.0, 250.0, 300.0]
+
+
+def array_of(rows):
+    packed = array("f")
+    for row in rows:
+        packed.frombytes(pack_longitudes(row))
+    return packed
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = SynastryPool(str(tmp_path / "synastry.sqlite"), max_per_owner=3)
+    yield pool
+    pool.close()
+
+
+def test_add_and_load(pool):
+    assert pool.add("alice", [("a", REFERENCE), ("b", REFERENCE)]) == 2
+    ids, packed = pool.load("alice")
+    assert ids == ["a", "b"]
+    assert list(packed) == pytest.approx(REFERENCE * 2)
+
+
+def test_existing_ids_are_rejected_and_nothing_is_added(pool):
+    pool.add("alice", [("a", REFERENCE)])
+    with pytest.raises(CandidateExistsError) as error:
+        pool.add("alice", [("b", REFERENCE), ("a", REFERENCE)])
+    assert error.value.ids == ["a"]
+    with pytest.raises(CandidateExistsError):
+        pool.add("alice", [("c", REFERENCE), ("c", REFERENCE)])
+    assert pool.size("alice") == 1
+
+
+def test_pool_size_is_capped(pool):
+    pool.add("alice", [("a", REFERENCE), ("b", REFERENCE)])
+    with pytest.raises(PoolFullError):
+        pool.add("alice", [("c", REFERENCE), ("d", REFERENCE)])
+    assert pool.size("alice") == 2
+    assert pool.add("alice", [("c", REFERENCE)]) == 3
+
+
+def test_pools_are_per_owner_and_persistent(pool):
+    pool.add("alice", [("a", REFERENCE)])
+    pool.add("bob", [("a", REFERENCE)])
+    pool.close()
+
+    reopened = SynastryPool(pool.path)
+    assert reopened.size("alice") == 1 and reopened.size("bob") == 1
+    ids, packed = reopened.load("carol")
+    assert ids == [] and len(packed) == 0
+    reopened.close()
+
+
+def test_rank_packed_matches_pairwise_scores():
+    orb_list = resolve_orbs()
+    candidates = {
+        "same": REFERENCE,
+        "trines": [(lon + 120.0) % 360 for lon in REFERENCE],
+        "squares": [(lon + 90.0) % 360 for lon in REFERENCE],
+    }
+    packed = array_of(candidates.values())
+    ranked = rank_packed(list(candidates), packed, REFERENCE, top_k=3)
+
+    def pairwise(lons):
+        # Score at the center of each planet's bin, as the profile does
+        total = 0.0
+        for lon in lons:
+            center = (longitude_bin(lon) + 0.5) / PROFILE_BINS_PER_DEGREE
+            total += sum(aspect_score(abs((ref - center + 180.0) % 360.0 - 180.0), orb_list) for ref in REFERENCE)
+        return total
+
+    assert [cid for cid, _ in ranked] == sorted(candidates, key=lambda cid: -pairwise(candidates[cid]))
+    for cid, score in ranked:
+        assert score == pytest.approx(pairwise(candidates[cid]), abs=1e-3)
+    assert ranked[-1][0] == "squares"
+
+
+def test_rank_packed_checks_row_length():
+    with pytest.raises(ValueError):
+        rank_packed(["a"], array_of([REFERENCE[:3]]), REFERENCE)
+
+
+# ============================================================================
+# API
+# ============================================================================
+
+@pytest.fixture
+def client(bearer, app_client):
+    return app_client
+
+
+CHART = {"birth_date": "1990-05-15", "birth_time": "14:30", "timezone_offset": "+07:00"}
+
+
+def test_synastry_needs_a_signed_in_user(client):
+    assert client.post("/v1/horoscope/synastry/candidates", json={"candidates": []}).status_code == 401
+    assert client.post("/v1/horoscope/synastry/rank", json=CHART).status_code == 401
+
+
+def test_synastry_pools_per_user(client, bearer):
+    url = "/v1/horoscope/synastry/candidates"
+    added = client.post(url, json={"candidates": [{**CHART, "id": "x"}, {**CHART, "id": "y", "birth_date": "1985-01-01"}]},
+                        headers=bearer("alice"))
+    assert added.json() == {"added": 2, "total_candidates": 2}
+    assert client.post(url, json={"candidates": [{**CHART, "id": "x"}]}, headers=bearer("alice")).status_code == 409
+
+    ranked = client.post("/v1/horoscope/synastry/rank", json=CHART, headers=bearer("alice")).json()
+    assert ranked["total_candidates"] == 2
+    assert ranked["matches"][0]["id"] == "x"
+    assert client.post("/v1/horoscope/synastry/rank", json=CHART, headers=bearer("bob")).json() == {
+        "total_candidates": 0, "matches": []
+    }
@@ -0,0 +1,113 @@
+"""
+Request timing: spans, the Server-Timing header and per-route histograms
+"""
+
+import re
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import timing
+from app.core.timing import BUCKETS_MS, Histogram, RequestTimings, TimingMiddleware, TimingStats
+
+MS = 1_000_000
+
+
+@timing.timed("lookup")
+def lookup(value):
+    return value * 2
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    stats = TimingStats()
+    monkeypatch.setattr(timing, "timing_stats", stats)
+    return stats
+
+
+@pytest.fixture
+def client(stats):
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        timing.mark("validation")
+        with timing.span("db"):
+            value = lookup(item_id)
+        with timing.span("db"):
+            pass
+        timing.record("queue", 3 * MS)
+        return {"value": value}
+
+    app.add_middleware(TimingMiddleware)
+    return TestClient(app)
+
+
+def _phases(header):
+    return {name: float(dur) for name, dur in re.findall(r"(\w+);dur=([\d.]+)", header)}
+
+
+def test_spans_outside_a_request_do_nothing():
+    with timing.span("db"):
+        timing.record("queue", MS)
+        timing.mark("validation")
+    assert lookup(2) == 4
+    assert timing._current.get() is None
+
+
+def test_server_timing_header_lists_phases_then_total(client):
+    response = client.get("/items/21")
+    assert response.json() == {"value": 42}
+
+    header = response.headers["server-timing"]
+    phases = _phases(header)
+    assert list(phases) == ["validation", "lookup", "db", "queue", "total"]
+    assert header.endswith(f"total;dur={phases['total']:.3f}")
+    assert phases["queue"] == 3.0
+    assert phases["lookup"] <= phases["db"] <= phases["total"]
+    assert timing._current.get() is None
+
+
+def test_histograms_are_keyed_by_route_template(client, stats):
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/missing")
+
+    summary = stats.stats()
+    assert list(summary) == ["GET /items/{item_id}", "GET unmatched"]
+    route = summary["GET /items/{item_id}"]
+    assert set(route) == {"total", "validation", "lookup", "db", "queue"}
+    assert route["total"]["count"] == route["db"]["count"] == 2
+    assert route["queue"]["p50_ms"] == 5 and route["queue"]["avg_ms"] == 3.0
+    assert summary["GET unmatched"]["total"]["count"] == 1
+
+
+def test_repeated_phases_add_up():
+    timings = RequestTimings()
+    timings.add("db", MS)
+    timings.add("db", 2 * MS)
+    assert timings.phases == {"db": 3 * MS}
+    assert timings.header(5 * MS) == b"db;dur=3.000, total;dur=5.000"
+
+
+def test_histogram_quantiles_report_bucket_upper_bounds():
+    histogram = Histogram()
+    assert histogram.quantile(0.5) is None
+    assert histogram.summary()["avg_ms"] == 0.0
+
+    for ms in [0.2] * 50 + [3] * 45 + [40] * 4 + [60_000]:
+        histogram.observe(int(ms * MS))
+
+    assert histogram.quantile(0.5) == 0.5
+    assert histogram.quantile(0.95) == 5
+    assert histogram.quantile(0.99) == 50
+    # Past the last bound there is no finite upper bound to report
+    assert histogram.quantile(1.0) is None
+    assert histogram.counts[-1] == 1 and len(histogram.counts) == len(BUCKETS_MS) + 1
+
+
+def test_bucket_bounds_are_inclusive():
+    histogram = Histogram()
+    histogram.observe(1 * MS)
+    assert histogram.quantile(1.0) == 1
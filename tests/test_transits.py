@@ -0,0 +1,88 @@
+"""
+Sign ingress search against published equinox/solstice times and the transits endpoint
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app.engines.astrology import (
+    INGRESS_TOLERANCE_DAYS,
+    _sign_index,
+    _yearly_ingresses,
+    find_ingresses,
+    julian_day,
+)
+
+# Sun ingresses into the cardinal signs, 2024 (UTC)
+CARDINAL_INGRESSES = [
+    ("Aries", 2024, 3, 20, 3, 6),
+    ("Cancer", 2024, 6, 20, 20, 51),
+    ("Libra", 2024, 9, 22, 12, 44),
+    ("Capricorn", 2024, 12, 21, 9, 20),
+]
+
+SUN_TOLERANCE_MINUTES = 30
+
+
+def _minutes_between(iso, year, month, day, hour, minute):
+    found = datetime.strptime(iso, "%Y-%m-%dT%H:%MZ")
+    return abs((found - datetime(year, month, day, hour, minute)).total_seconds()) / 60
+
+
+@pytest.mark.parametrize("sign,year,month,day,hour,minute", CARDINAL_INGRESSES)
+def test_sun_ingresses_match_equinoxes_and_solstices(sign, year, month, day, hour, minute):
+    events = find_ingresses(julian_day(year, month, day - 1, 0.0), julian_day(year, month, day + 1, 0.0), ["Sun"])
+    assert [e["to_sign_en"] for e in events] == [sign]
+    assert _minutes_between(events[0]["time"], year, month, day, hour, minute) <= SUN_TOLERANCE_MINUTES
+    assert events[0]["retrograde"] is False
+
+
+@pytest.mark.parametrize("body", ["Sun", "Moon", "Mercury", "Mars"])
+def test_bisection_brackets_each_ingress_to_the_minute(body):
+    events = _yearly_ingresses(body, 2024)
+    assert events
+    for jd, from_id, to_id in events:
+        assert _sign_index(body, jd - INGRESS_TOLERANCE_DAYS) == from_id
+        assert _sign_index(body, jd) == to_id
+
+
+def test_retrograde_ingress_moves_back_a_sign():
+    # Mercury stationed retrograde in Virgo on 2024-08-05 and fell back into Leo
+    events = find_ingresses(julian_day(2024, 8, 1, 0.0), julian_day(2024, 9, 30, 0.0), ["Mercury"])
+    assert [(e["from_sign_en"], e["to_sign_en"], e["retrograde"]) for e in events] == [
+        ("Virgo", "Leo", True),
+        ("Leo", "Virgo", False),
+        ("Virgo", "Libra", False),
+    ]
+
+
+def test_ranges_spanning_a_new_year_are_merged_and_sorted():
+    jd_from = julian_day(2024, 12, 20, 0.0)
+    jd_to = julian_day(2025, 1, 20, 0.0)
+    events = find_ingresses(jd_from, jd_to, ["Sun", "Moon"])
+
+    times = [e["time"] for e in events]
+    assert times == sorted(times)
+    assert times[0] >= "2024-12-20" and times[-1] < "2025-01-20"
+    assert any(t.startswith("2025-") for t in times)
+    assert [e["to_sign_en"] for e in events if e["planet_en"] == "Sun"] == ["Capricorn", "Aquarius"]
+    # The Moon changes sign every 2-3 days
+    assert 12 <= sum(e["planet_en"] == "Moon" for e in events) <= 15
+
+
+def test_transits_endpoint(app_client):
+    response = app_client.get("/v1/horoscope/transits", params={"from": "2024-03-19", "to": "2024-03-20", "planet": "sun"})
+    assert response.status_code == 200
+    events = response.json()["events"]
+    assert [(e["planet_en"], e["to_sign_en"]) for e in events] == [("Sun", "Aries")]
+
+
+@pytest.mark.parametrize("params", [
+    {"from": "2024-03-20", "to": "2024-03-19"},
+    {"from": "2020-01-01", "to": "2026-01-01"},
+    {"from": "2024-03-19", "to": "2024-03-20", "planet": "Pluto"},
+    {"from": "20240319", "to": "2024-03-20"},
+])
+def test_transits_endpoint_rejects_bad_ranges(app_client, params):
+    assert app_client.get("/v1/horoscope/transits", params=params).status_code == 400